@@ -641,7 +641,7 @@ async def get_mirror_status(
                 """
                 SELECT graphs_version, assistants_version, schemas_version, 
                        threads_version, last_synced_at
-                FROM langconnect.cache_state WHERE id = 1
+                FROM langconnect.cache_state_current
                 """
             )
             
@@ -1,5 +1,6 @@
 """Agent file system API endpoints for collection and document operations."""
 
+import asyncio
 import difflib
 import json
 import logging
@@ -1395,7 +1396,8 @@ async def batch_signed_urls(
         # Get accessible collections (user-level permissions) - only needed for collection paths
         accessible_collections = await get_user_accessible_collections(resolved_user_id, "viewer")
 
-        signed_urls = {}
+        # Paths to sign, grouped by bucket (one signing request per bucket)
+        paths_by_bucket = {}
 
         for storage_path in request.storage_paths:
             try:
@@ -1442,23 +1444,36 @@ async def batch_signed_urls(
                     bucket = "collections"
                     logger.debug(f"[BATCH_SIGNED_URLS] Collection path for user {resolved_user_id}: {storage_path}")
 
-                # Generate signed URL using storage service
-                signed_url = await storage_service.get_signed_url(
-                    file_path=storage_path,
+                paths_by_bucket.setdefault(bucket, []).append(storage_path)
+
+            except Exception as e:
+                logger.exception(f"[BATCH_SIGNED_URLS] Failed to resolve storage path {storage_path}: {e}")
+                # Continue to next path instead of failing entire request
+                continue
+
+        # Sign all paths of each bucket in one storage request
+        buckets = list(paths_by_bucket)
+        results = await asyncio.gather(
+            *(
+                storage_service.get_signed_urls(
+                    file_paths=paths_by_bucket[bucket],
                     expiry_seconds=request.expiry_seconds,
                     bucket=bucket
                 )
+                for bucket in buckets
+            ),
+            return_exceptions=True,
+        )
 
-                # Fix URL for development (replace kong with localhost)
-                signed_url = fix_storage_url_for_development(signed_url)
-
-                signed_urls[storage_path] = signed_url
-                logger.debug(f"[BATCH_SIGNED_URLS] Generated signed URL for {storage_path} (bucket: {bucket})")
-
-            except Exception as e:
-                logger.exception(f"[BATCH_SIGNED_URLS] Failed to generate signed URL for {storage_path}: {e}")
-                # Continue to next path instead of failing entire request
+        signed_urls = {}
+        for bucket, result in zip(buckets, results):
+            if isinstance(result, Exception):
+                logger.error(f"[BATCH_SIGNED_URLS] Failed to generate signed URLs for bucket {bucket}: {result}")
+                # Continue with other buckets instead of failing entire request
                 continue
+            for storage_path, signed_url in result.items():
+                # Fix URL for development (replace kong with localhost)
+                signed_urls[storage_path] = fix_storage_url_for_development(signed_url)
 
         logger.info(
             f"[BATCH_SIGNED_URLS] Generated {len(signed_urls)}/{len(request.storage_paths)} signed URLs "
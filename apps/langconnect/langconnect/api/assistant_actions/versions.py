@@ -3,7 +3,7 @@ Assistant version history endpoints: list versions and restore to previous versi
 """
 
 import logging
-from typing import Annotated
+from typing import Annotated, Optional
 from fastapi import APIRouter, Depends, HTTPException
 
 from langconnect.auth import resolve_user_or_service, AuthenticatedActor
@@ -28,6 +28,7 @@ async def get_assistant_versions(
     langgraph_service: Annotated[LangGraphService, Depends(get_langgraph_service)],
     limit: int = 50,
     offset: int = 0,
+    before_version: Optional[int] = None,
 ) -> AssistantVersionsResponse:
     """
     Get version history for an assistant.
@@ -37,6 +38,9 @@ async def get_assistant_versions(
     - Configuration at that version
     - Optional commit message (if provided when saving)
 
+    Pages are newest first; pass `next_before_version` from the response as
+    `before_version` to get the next page.
+
     **Authorization:**
     - **All permission levels**: Viewers, editors, and owners can view version history
     - **Service Accounts**: Can view all assistant versions
@@ -62,6 +66,7 @@ async def get_assistant_versions(
             user_token=None,
             limit=limit,
             offset=offset,
+            before_version=before_version,
         )
 
     except HTTPException:
@@ -516,6 +516,7 @@ async def semantic_search_collection(
             return_surrounding_context=query.return_surrounding_context,
             max_context_characters=query.max_context_characters,
             format_chunks_for_llm=query.format_chunks_for_llm,
+            ef_search=query.ef_search,
         )
         
         
@@ -644,6 +645,7 @@ async def hybrid_search_collection(
             max_context_characters=query.max_context_characters,
             format_chunks_for_llm=query.format_chunks_for_llm,
             semantic_weight=query.semantic_weight,
+            ef_search=query.ef_search,
         )
         
         
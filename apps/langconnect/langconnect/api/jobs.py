@@ -1,27 +1,44 @@
 """API endpoints for job management."""
 
 import logging
-from typing import Annotated, Optional, Dict, Any
+from typing import Annotated, AsyncGenerator, Optional, Dict, Any
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from langconnect.auth import AuthenticatedActor, ServiceAccount, resolve_user_or_service
  
 from langconnect.services.job_service import job_service
+from langconnect.services.job_progress_stream import TERMINAL_STATUSES, get_job_progress_hub
+from langconnect.services.pg_listener import get_pg_listener
 from langconnect.models.job import (
     JobCreate,
     JobResponse,
     JobListResponse,
+    JobStatusBatchRequest,
+    JobStatusBatchResponse,
     JobSubmissionResponse,
     JobStatus,
     JobType
 )
+from langconnect.utils.sse import (
+    KEEPALIVE_INTERVAL_SECONDS,
+    SSE_HEADERS,
+    SSE_KEEPALIVE,
+    format_sse,
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
+# Maximum number of jobs per progress stream or batched status request
+MAX_TRACKED_JOBS = 100
+
+# How long a new stream waits for the LISTEN connection before reading its snapshot
+LISTENER_READY_TIMEOUT_SECONDS = 5
+
 
 @router.post(
     "",
@@ -101,6 +118,116 @@ async def list_jobs(
         )
 
 
+@router.get("/stream")
+async def stream_job_progress(
+    request: Request,
+    actor: Annotated[AuthenticatedActor, Depends(resolve_user_or_service)],
+    job_ids: list[str] = Query(..., description="Job IDs to watch (repeat the parameter or separate with commas)"),
+) -> StreamingResponse:
+    """
+    Stream the progress of several jobs over one server-sent event connection.
+
+    Events (`data` is a compact job status, as in POST /jobs/status/batch):
+    - **progress**: current state on connect and on every change while a job
+      is pending or processing
+    - **terminal**: the job completed, failed or was cancelled
+    - **missing**: `{"job_ids": [...]}` for jobs that do not exist or are not accessible
+    - **done**: every watched job is terminal; the stream closes afterwards
+
+    Load the full job (e.g. its result data) with GET /jobs/{job_id} once it is terminal.
+    """
+    ids = list(dict.fromkeys(
+        job_id.strip() for value in job_ids for job_id in value.split(",") if job_id.strip()
+    ))
+    if not ids:
+        raise HTTPException(status_code=400, detail="At least one job ID is required")
+    if len(ids) > MAX_TRACKED_JOBS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_TRACKED_JOBS} jobs can be watched per stream")
+
+    hub = get_job_progress_hub()
+    subscription = await hub.subscribe(ids)
+    try:
+        # Read the snapshot once LISTEN is active so no update falls in between
+        await get_pg_listener().wait_connected(LISTENER_READY_TIMEOUT_SECONDS)
+        snapshot = await job_service.get_jobs_progress(
+            ids, actor.identity, is_service_account=isinstance(actor, ServiceAccount)
+        )
+    except Exception as e:
+        hub.unsubscribe(subscription)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to stream job progress: {str(e)}"
+        )
+
+    missing = [job_id for job_id in ids if job_id not in snapshot]
+    hub.unsubscribe(subscription, missing)
+
+    async def events() -> AsyncGenerator[str, None]:
+        try:
+            active: Dict[str, int] = {}
+            yield format_sse("missing", {"job_ids": missing}, retry_ms=5000)
+            for job_id, progress in snapshot.items():
+                data = progress.model_dump(mode="json")
+                if data["status"] in TERMINAL_STATUSES:
+                    hub.unsubscribe(subscription, [job_id])
+                    yield format_sse("terminal", data)
+                else:
+                    active[job_id] = data["progress_percentage"]
+                    yield format_sse("progress", data)
+
+            while active:
+                updates = await subscription.next_updates(KEEPALIVE_INTERVAL_SECONDS)
+                if not updates:
+                    if await request.is_disconnected():
+                        return
+                    yield SSE_KEEPALIVE
+                    continue
+                for job_id, data in updates.items():
+                    if job_id not in active:
+                        continue
+                    if data["status"] in TERMINAL_STATUSES:
+                        del active[job_id]
+                        hub.unsubscribe(subscription, [job_id])
+                        yield format_sse("terminal", data)
+                    elif data["progress_percentage"] >= active[job_id]:
+                        # Updates queued before the snapshot was read can be older than it
+                        active[job_id] = data["progress_percentage"]
+                        yield format_sse("progress", data)
+
+            yield format_sse("done", {})
+        finally:
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.post("/status/batch", response_model=JobStatusBatchResponse)
+async def get_job_status_batch(
+    batch_request: JobStatusBatchRequest,
+    actor: Annotated[AuthenticatedActor, Depends(resolve_user_or_service)],
+):
+    """
+    Get the compact status of several jobs in one request.
+
+    Polling fallback for clients that cannot use GET /jobs/stream; reads only
+    the progress columns, never the job's input or result data.
+    """
+    try:
+        ids = list(dict.fromkeys(batch_request.job_ids))
+        progress = await job_service.get_jobs_progress(
+            ids, actor.identity, is_service_account=isinstance(actor, ServiceAccount)
+        )
+        return JobStatusBatchResponse(
+            jobs=[progress[job_id] for job_id in ids if job_id in progress],
+            missing=[job_id for job_id in ids if job_id not in progress]
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to get job status: {str(e)}"
+        )
+
+
 @router.get("/{job_id}", response_model=JobResponse)
 async def get_job(
     job_id: str,
@@ -69,7 +69,7 @@ async def list_graphs_from_mirror(
     - Service accounts can query independently for automation
 
     CACHING STRATEGY:
-    - ETag generation based on graphs_version from cache_state table
+    - ETag generation based on graphs_version from cache version counters
     - Returns 304 Not Modified when client ETag matches
     - Cache-Control: private, max-age=300 (5 minutes)
     - Versioning incremented on graph mutations
@@ -95,7 +95,7 @@ async def list_graphs_from_mirror(
 
             # Get cache state for ETag
             cache_state = await conn.fetchrow(
-                "SELECT graphs_version FROM langconnect.cache_state WHERE id = 1"
+                "SELECT graphs_version FROM langconnect.cache_state_current"
             )
             graphs_version = cache_state["graphs_version"] if cache_state else 1
 
@@ -259,7 +259,7 @@ async def list_assistants_from_mirror(
     - Clean separation of concerns (agents vs agent instances)
 
     CACHING STRATEGY:
-    - ETag generation based on assistants_version from cache_state table
+    - ETag generation based on assistants_version from cache version counters
     - Returns 304 Not Modified when client ETag matches
     - Cache-Control: private, max-age=180 (3 minutes)
     - Incremental sync before listing to reduce post-create flicker
@@ -303,7 +303,7 @@ async def list_assistants_from_mirror(
 
             # Get cache state for ETag
             cache_state = await conn.fetchrow(
-                "SELECT assistants_version FROM langconnect.cache_state WHERE id = 1"
+                "SELECT assistants_version FROM langconnect.cache_state_current"
             )
             assistants_version = cache_state["assistants_version"] if cache_state else 1
 
@@ -653,7 +653,7 @@ async def get_assistant_schemas_from_mirror(
             
             # Get cache version for client
             cache_state = await conn.fetchrow(
-                "SELECT schemas_version FROM langconnect.cache_state WHERE id = 1"
+                "SELECT schemas_version FROM langconnect.cache_state_current"
             )
             schemas_version = cache_state["schemas_version"] if cache_state else 1
             
@@ -754,7 +754,7 @@ async def get_graph_schemas_from_mirror(
 
             # Get cache version for client
             cache_state = await conn.fetchrow(
-                "SELECT graph_schemas_version FROM langconnect.cache_state WHERE id = 1"
+                "SELECT graph_schemas_version FROM langconnect.cache_state_current"
             )
             graph_schemas_version = cache_state["graph_schemas_version"] if cache_state else 1
 
@@ -880,7 +880,7 @@ async def list_threads_from_mirror(
             
             # Get cache version
             cache_state = await conn.fetchrow(
-                "SELECT threads_version FROM langconnect.cache_state WHERE id = 1"
+                "SELECT threads_version FROM langconnect.cache_state_current"
             )
             threads_version = cache_state["threads_version"] if cache_state else 1
             
@@ -1040,7 +1040,7 @@ async def touch_thread_in_mirror(
 
             # Return current threads_version for client cache invalidation
             cache_state = await conn.fetchrow(
-                "SELECT threads_version FROM langconnect.cache_state WHERE id = 1"
+                "SELECT threads_version FROM langconnect.cache_state_current"
             )
             threads_version = cache_state["threads_version"] if cache_state else 1
 
@@ -1115,7 +1115,7 @@ async def delete_thread(
             )
 
             cache_state = await conn.fetchrow(
-                "SELECT threads_version FROM langconnect.cache_state WHERE id = 1"
+                "SELECT threads_version FROM langconnect.cache_state_current"
             )
             threads_version = cache_state["threads_version"] if cache_state else 1
 
@@ -1179,7 +1179,7 @@ async def rename_thread_in_mirror(
             )
             
             cache_state = await conn.fetchrow(
-                "SELECT threads_version FROM langconnect.cache_state WHERE id = 1"
+                "SELECT threads_version FROM langconnect.cache_state_current"
             )
             threads_version = cache_state["threads_version"] if cache_state else 1
             
@@ -2,10 +2,12 @@
 Notification management endpoints for permission sharing system.
 """
 
+import asyncio
 import logging
-from typing import Annotated, Optional
+from typing import Annotated, AsyncGenerator, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 
 from langconnect.auth import resolve_user_or_service, AuthenticatedActor
 from langconnect.models.agent import (
@@ -20,6 +22,13 @@ from langconnect.services.langgraph_integration import get_langgraph_service, La
 from langconnect.database.notifications import NotificationManager
 from langconnect.database.permissions import AssistantPermissionsManager, GraphPermissionsManager
 from langconnect.database.connection import get_db_connection
+from langconnect.services.notification_stream import get_notification_hub
+from langconnect.utils.sse import (
+    KEEPALIVE_INTERVAL_SECONDS,
+    SSE_HEADERS,
+    SSE_KEEPALIVE,
+    format_sse,
+)
 
 # Set up logging
 log = logging.getLogger(__name__)
@@ -85,8 +94,10 @@ async def get_user_notifications(
             )
             notifications.append(notification_info)
         
-        # Get pending count
-        pending_count = await NotificationManager.get_unread_count(actor.identity)
+        # Get pending count (maintained in memory while the user has a stream open)
+        pending_count = get_notification_hub().cached_unread_count(actor.identity)
+        if pending_count is None:
+            pending_count = await NotificationManager.get_unread_count(actor.identity)
         
         log.info(f"Retrieved {len(notifications)} notifications for {actor.identity}")
         
@@ -129,8 +140,10 @@ async def get_unread_notification_count(
                 detail="Service accounts cannot access notification endpoints"
             )
         
-        # Get unread count
-        unread_count = await NotificationManager.get_unread_count(actor.identity)
+        # Get unread count (maintained in memory while the user has a stream open)
+        unread_count = get_notification_hub().cached_unread_count(actor.identity)
+        if unread_count is None:
+            unread_count = await NotificationManager.get_unread_count(actor.identity)
         
         return NotificationUnreadCountResponse(unread_count=unread_count)
         
@@ -144,6 +157,64 @@ async def get_unread_notification_count(
         )
 
 
+@router.get("/notifications/stream")
+async def stream_notifications(
+    request: Request,
+    actor: Annotated[AuthenticatedActor, Depends(resolve_user_or_service)]
+) -> StreamingResponse:
+    """
+    Stream notification changes for the authenticated user as server-sent events.
+
+    Events:
+    - **unread_count**: `{"unread_count": N}`, sent on connect and whenever it changes
+    - **notification**: `{"op", "id", "status", "old_status", "type", "resource_type"}`
+      when a notification is created, accepted, rejected, expired or deleted
+    - **resync**: changes may have been missed; reload the notification list
+
+    Open streams are fed by Postgres LISTEN/NOTIFY, so idle clients cause no
+    database queries. A keep-alive comment is sent every 15 seconds.
+
+    **Authorization:**
+    - **All Users**: Can stream their own notifications
+    - **Service Accounts**: Not supported
+    """
+    if actor.actor_type == "service":
+        raise HTTPException(
+            status_code=403,
+            detail="Service accounts cannot access notification endpoints"
+        )
+
+    hub = get_notification_hub()
+    user_id = actor.identity
+
+    async def events() -> AsyncGenerator[str, None]:
+        # Subscribed inside the generator: if the client disconnects before the
+        # stream starts, the generator never runs and nothing is left subscribed
+        queue: Optional[asyncio.Queue] = None
+        try:
+            queue = await hub.subscribe(user_id)
+            yield format_sse(
+                "unread_count",
+                {"unread_count": hub.cached_unread_count(user_id) or 0},
+                retry_ms=5000,
+            )
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), KEEPALIVE_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield SSE_KEEPALIVE
+                    continue
+                yield format_sse(event, data)
+        finally:
+            if queue is not None:
+                hub.unsubscribe(user_id, queue)
+            log.debug(f"Notification stream closed for {user_id}")
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 @router.post("/notifications/{notification_id}/accept", response_model=NotificationActionResponse)
 async def accept_notification(
     notification_id: str,
@@ -400,7 +400,9 @@ async def download_skill(
         # Rewrite URL from internal (kong:8000) to external (localhost:8000)
         download_url = rewrite_signed_url_for_external_access(signed_url["signedURL"])
         log.info(f"[skills:download] Generated signed URL for skill {skill_id}: {download_url[:80]}...")
-        return {"download_url": download_url}
+        # Version lets agents reuse a cached zip until the skill is updated
+        version = skill["updated_at"].isoformat() if skill["updated_at"] else None
+        return {"download_url": download_url, "version": version}
     except Exception as e:
         log.error(f"Failed to create signed URL for skill {skill_id}: {e}")
         raise HTTPException(
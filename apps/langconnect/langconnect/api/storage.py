@@ -1,17 +1,47 @@
 """Storage API endpoints for accessing images and files."""
 
-import io
 import logging
 import os
-from typing import Annotated, Dict, Any
+from typing import Annotated, AsyncIterator, Dict, Any
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
 from fastapi.responses import StreamingResponse
 from langconnect.auth import resolve_user_or_service, AuthenticatedActor
 from langconnect.database.collections import CollectionsManager
+from langconnect.services.storage_backends import StorageError
 from langconnect.services.storage_service import storage_service
 
 logger = logging.getLogger(__name__)
 
+MAX_UPLOAD_BYTES = 52428800  # 50MB
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def check_upload_size(file: UploadFile) -> None:
+    """Reject uploads whose declared size exceeds the 50MB limit."""
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=400,
+            detail="File size exceeds 50MB limit"
+        )
+
+
+async def iter_upload(file: UploadFile) -> AsyncIterator[bytes]:
+    """
+    Stream an uploaded file to storage in chunks.
+
+    The spooled upload is never read into memory as a whole; the 50MB limit is
+    enforced while streaming in case the size was not declared.
+    """
+    total = 0
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        total += len(chunk)
+        if total > MAX_UPLOAD_BYTES:
+            raise HTTPException(
+                status_code=400,
+                detail="File size exceeds 50MB limit"
+            )
+        yield chunk
+
 
 def fix_storage_url_for_development(url: str) -> str:
     """
@@ -142,19 +172,15 @@ async def upload_chat_image(
             )
 
         # Validate file size (50MB limit)
-        file_data = await file.read()
-        if len(file_data) > 52428800:  # 50MB in bytes
-            raise HTTPException(
-                status_code=400,
-                detail="File size exceeds 50MB limit"
-            )
+        check_upload_size(file)
 
         # Upload to storage
         result = await storage_service.upload_chat_image(
-            file_data=file_data,
+            file_data=iter_upload(file),
             filename=file.filename,
             content_type=content_type,
             user_id=actor.identity,
+            content_length=file.size,
         )
 
         # Generate signed URL for preview (30 minutes expiry)
@@ -235,19 +261,15 @@ async def upload_chat_document(
             )
 
         # Validate file size (50MB limit)
-        file_data = await file.read()
-        if len(file_data) > 52428800:  # 50MB in bytes
-            raise HTTPException(
-                status_code=400,
-                detail="File size exceeds 50MB limit"
-            )
+        check_upload_size(file)
 
         # Upload to storage using the same chat_uploads method
         result = await storage_service.upload_chat_image(
-            file_data=file_data,
+            file_data=iter_upload(file),
             filename=file.filename,
             content_type=content_type,
             user_id=actor.identity,
+            content_length=file.size,
         )
 
         logger.info(f"Uploaded chat document for user {actor.identity}: {result['storage_path']}")
@@ -257,7 +279,7 @@ async def upload_chat_document(
             "bucket": result["bucket"],
             "filename": file.filename,
             "content_type": content_type,
-            "file_size": len(file_data),
+            "file_size": file.size,
         }
 
     except HTTPException:
@@ -306,19 +328,15 @@ async def upload_support_image(
             )
 
         # Validate file size (50MB limit)
-        file_data = await file.read()
-        if len(file_data) > 52428800:  # 50MB in bytes
-            raise HTTPException(
-                status_code=400,
-                detail="File size exceeds 50MB limit"
-            )
+        check_upload_size(file)
 
         # Upload to storage
         result = await storage_service.upload_support_image(
-            file_data=file_data,
+            file_data=iter_upload(file),
             filename=file.filename,
             content_type=content_type,
             user_id=actor.identity,
+            content_length=file.size,
         )
 
         # Generate signed URL for preview (30 minutes expiry)
@@ -437,22 +455,18 @@ async def upload_agent_output(
         # The agent is creating these files, so we trust them more
 
         # Validate file size (50MB limit)
-        file_data = await file.read()
-        if len(file_data) > 52428800:  # 50MB in bytes
-            raise HTTPException(
-                status_code=400,
-                detail="File size exceeds 50MB limit"
-            )
+        check_upload_size(file)
 
         actual_filename = filename or file.filename or "output"
 
         # Upload to storage
         result = await storage_service.upload_agent_output(
-            file_data=file_data,
+            file_data=iter_upload(file),
             filename=actual_filename,
             content_type=content_type,
             user_id=actor.identity,
             thread_id=thread_id,
+            content_length=file.size,
         )
 
         logger.info(
@@ -539,34 +553,53 @@ async def get_thread_file(
                     detail="Access denied - you don't own this file"
                 )
 
-        # Download file from storage
-        if bucket == "agent-outputs":
-            file_data = await storage_service.download_agent_output(storage_path)
-        elif bucket == "chat-uploads":
-            file_data = await storage_service.download_chat_upload(storage_path)
-        else:
+        if bucket not in ("agent-outputs", "chat-uploads"):
             raise HTTPException(
                 status_code=400,
                 detail=f"Unsupported bucket: {bucket}"
             )
 
+        # Stream the file from storage without buffering it
+        download = await storage_service.open_download(storage_path, bucket)
+
         # Determine MIME type
         mime_type = get_mime_type_from_filename(filename)
 
+        headers = {
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "private, max-age=3600"  # Cache for 1 hour
+        }
+        if download.content_length is not None:
+            headers["Content-Length"] = str(download.content_length)
+
         return StreamingResponse(
-            io.BytesIO(file_data),
+            download,
             media_type=mime_type,
-            headers={
-                "Content-Disposition": f'attachment; filename="{filename}"',
-                "Cache-Control": "private, max-age=3600"  # Cache for 1 hour
-            }
+            headers=headers
         )
 
     except HTTPException:
         raise
+    except StorageError as e:
+        if e.status_code == 404:
+            raise HTTPException(
+                status_code=404,
+                detail=f"File not found: {str(e)}"
+            )
+        logger.error(f"Failed to download thread file: {e}")
+        if e.status_code == 400:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid file path: {str(e)}"
+            )
+        # Storage outage, auth failure, etc.: not the client's fault
+        raise HTTPException(
+            status_code=502,
+            detail=f"Storage error while downloading file: {str(e)}"
+        )
     except Exception as e:
         logger.error(f"Failed to download thread file: {e}")
         raise HTTPException(
-            status_code=404,
-            detail=f"File not found: {str(e)}"
+            status_code=500,
+            detail=f"Failed to download file: {str(e)}"
         )
\ No newline at end of file
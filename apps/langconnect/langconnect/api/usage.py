@@ -9,12 +9,12 @@ Provides APIs for:
 
 import logging
 from datetime import datetime, timezone, timedelta
-from typing import Annotated, Optional, List
+from typing import Annotated, Any, Dict, Optional, List
 from uuid import UUID as UUID_TYPE
 from decimal import Decimal
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Header
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError
 
 from langconnect.auth import AuthenticatedActor, ServiceAccount, resolve_user_or_service
 from langconnect.database.connection import get_db_connection
@@ -50,6 +50,40 @@ class UsageRecordCreate(BaseModel):
     cost: float = Field(..., ge=0, description="Cost in USD")
 
 
+class UsageBatchRecord(UsageRecordCreate):
+    """A usage record within a batch, carrying its own user context."""
+
+    user_id: Optional[str] = Field(
+        None, description="User who initiated the run (required for service accounts)"
+    )
+
+
+class UsageRecordBatchCreate(BaseModel):
+    """Request model for recording many usage records in one call.
+
+    Records are UsageBatchRecord objects, validated one by one by the endpoint
+    so a single malformed record doesn't reject the whole batch.
+    """
+
+    records: List[Dict[str, Any]] = Field(..., max_length=1000)
+
+
+class UsageRecordRejection(BaseModel):
+    """A batch record that was skipped because it is invalid."""
+
+    index: int
+    run_id: Optional[str]
+    reason: str
+
+
+class UsageRecordBatchResponse(BaseModel):
+    """Response model for a batch usage recording."""
+
+    received: int
+    recorded: int
+    rejected: List[UsageRecordRejection] = Field(default_factory=list)
+
+
 class UsageRecordResponse(BaseModel):
     """Response model for a single usage record."""
 
@@ -357,6 +391,141 @@ async def record_usage(
         )
 
 
+@router.post("/record-batch", response_model=UsageRecordBatchResponse)
+async def record_usage_batch(
+    batch: UsageRecordBatchCreate,
+    actor: Annotated[AuthenticatedActor, Depends(resolve_user_or_service)],
+    x_user_id: Annotated[Optional[str], Header(alias="X-User-Id")] = None,
+) -> UsageRecordBatchResponse:
+    """
+    Record many usage records with a single multi-row upsert.
+
+    Used by the LangGraph usage buffer, which batches per-call usage instead of
+    posting each model call to /usage/record. Records with the same
+    (run_id, model_name) are summed before insert, and the upsert accumulates
+    into existing rows exactly like /usage/record.
+
+    Invalid records (e.g. a thread_id that is not a UUID) are skipped and
+    listed in ``rejected``; the rest of the batch is still recorded.
+
+    **Authorization:**
+    - **Service Accounts**: Each record names its user via user_id (falls back to X-User-Id)
+    - **Users**: Records are always attributed to the caller
+    """
+    if not batch.records:
+        return UsageRecordBatchResponse(received=0, recorded=0)
+
+    # Merge records that target the same row; ON CONFLICT cannot touch a row twice
+    merged: dict[tuple[str, str], dict] = {}
+    rejected: List[UsageRecordRejection] = []
+    for index, raw_record in enumerate(batch.records):
+        try:
+            record = UsageBatchRecord.model_validate(raw_record)
+        except ValidationError as e:
+            run_id = raw_record.get("run_id")
+            reason = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            )
+            rejected.append(UsageRecordRejection(
+                index=index,
+                run_id=run_id if isinstance(run_id, str) else None,
+                reason=f"Invalid record: {reason}",
+            ))
+            continue
+
+        if isinstance(actor, ServiceAccount):
+            user_id = record.user_id or x_user_id
+            if not user_id:
+                rejected.append(UsageRecordRejection(
+                    index=index,
+                    run_id=record.run_id,
+                    reason="user_id (or X-User-Id header) required for each record when using service account",
+                ))
+                continue
+        else:
+            user_id = actor.identity
+
+        try:
+            thread_id = UUID_TYPE(record.thread_id)
+            assistant_id = UUID_TYPE(record.assistant_id) if record.assistant_id else None
+        except (ValueError, TypeError, AttributeError) as e:
+            rejected.append(UsageRecordRejection(index=index, run_id=record.run_id, reason=f"Invalid id: {e}"))
+            continue
+
+        key = (record.run_id, record.model_name)
+        existing = merged.get(key)
+        if existing is None:
+            merged[key] = {
+                "thread_id": thread_id,
+                "run_id": record.run_id,
+                "assistant_id": assistant_id,
+                "graph_name": record.graph_name,
+                "user_id": user_id,
+                "model_name": record.model_name,
+                "prompt_tokens": record.prompt_tokens,
+                "completion_tokens": record.completion_tokens,
+                "total_tokens": record.total_tokens,
+                "cost": Decimal(str(record.cost)),
+            }
+        else:
+            existing["prompt_tokens"] += record.prompt_tokens
+            existing["completion_tokens"] += record.completion_tokens
+            existing["total_tokens"] += record.total_tokens
+            existing["cost"] += Decimal(str(record.cost))
+
+    if rejected:
+        log.warning(
+            f"Skipped {len(rejected)} invalid usage records: "
+            + "; ".join(f"#{r.index} run {r.run_id}: {r.reason}" for r in rejected[:5])
+        )
+
+    rows = list(merged.values())
+    if not rows:
+        return UsageRecordBatchResponse(received=len(batch.records), recorded=0, rejected=rejected)
+
+    def column(name: str) -> list:
+        return [row[name] for row in rows]
+
+    try:
+        async with get_db_connection() as conn:
+            await conn.execute(
+                """
+                INSERT INTO langconnect.agent_run_costs
+                (thread_id, run_id, assistant_id, graph_name, user_id, model_name,
+                 prompt_tokens, completion_tokens, total_tokens, cost)
+                SELECT * FROM unnest(
+                    $1::uuid[], $2::text[], $3::uuid[], $4::text[], $5::text[], $6::text[],
+                    $7::int[], $8::int[], $9::int[], $10::numeric[]
+                )
+                ON CONFLICT (run_id, model_name) DO UPDATE SET
+                    prompt_tokens = agent_run_costs.prompt_tokens + EXCLUDED.prompt_tokens,
+                    completion_tokens = agent_run_costs.completion_tokens + EXCLUDED.completion_tokens,
+                    total_tokens = agent_run_costs.total_tokens + EXCLUDED.total_tokens,
+                    cost = agent_run_costs.cost + EXCLUDED.cost
+                """,
+                column("thread_id"),
+                column("run_id"),
+                column("assistant_id"),
+                column("graph_name"),
+                column("user_id"),
+                column("model_name"),
+                column("prompt_tokens"),
+                column("completion_tokens"),
+                column("total_tokens"),
+                column("cost"),
+            )
+
+        log.info(f"Recorded usage batch: {len(batch.records)} records into {len(rows)} rows")
+        return UsageRecordBatchResponse(received=len(batch.records), recorded=len(rows), rejected=rejected)
+
+    except Exception as e:
+        log.error(f"Error recording usage batch: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to record usage batch: {str(e)}",
+        )
+
+
 # ============================================================================
 # Usage Query Endpoints
 # ============================================================================
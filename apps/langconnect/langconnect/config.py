@@ -51,6 +51,47 @@ POSTGRES_PASSWORD = env("LANGCONNECT_POSTGRES_PASSWORD", cast=str, default="lang
 POSTGRES_DB = env("LANGCONNECT_POSTGRES_DB", cast=str, default="langchain_test")
 POSTGRES_SCHEMA = env("LANGCONNECT_POSTGRES_SCHEMA", cast=str, default="public")
 
+# Vector index configuration (HNSW over langchain_pg_embedding)
+# Must match the embedding model (OpenAI ada-002 / text-embedding-3-small: 1536)
+EMBEDDING_DIMENSIONS = env("EMBEDDING_DIMENSIONS", cast=int, default=512 if IS_TESTING else 1536)
+VECTOR_INDEX_M = env("VECTOR_INDEX_M", cast=int, default=16)
+VECTOR_INDEX_EF_CONSTRUCTION = env("VECTOR_INDEX_EF_CONSTRUCTION", cast=int, default=64)
+# Default query-time candidate list size; can be overridden per search request
+VECTOR_SEARCH_EF_SEARCH = env("VECTOR_SEARCH_EF_SEARCH", cast=int, default=64)
+# Collections with fewer chunks are searched exactly (a filtered scan beats the index)
+VECTOR_SEARCH_EXACT_THRESHOLD = env("VECTOR_SEARCH_EXACT_THRESHOLD", cast=int, default=20000)
+# Collections with more chunks get their own partial HNSW index from the build job
+VECTOR_INDEX_PARTIAL_THRESHOLD = env("VECTOR_INDEX_PARTIAL_THRESHOLD", cast=int, default=200000)
+# pgvector >= 0.8 iterative index scans, so filtered HNSW searches keep scanning until
+# they find enough rows ("relaxed_order" or "strict_order"); "off" disables
+VECTOR_SEARCH_ITERATIVE_SCAN = env("VECTOR_SEARCH_ITERATIVE_SCAN", cast=str, default="relaxed_order")
+
+# Storage gateway
+# "supabase" (Supabase Storage REST API) or "local" (files under STORAGE_LOCAL_ROOT, for tests/dev)
+STORAGE_BACKEND = env("STORAGE_BACKEND", cast=str, default="local" if IS_TESTING else "supabase")
+STORAGE_LOCAL_ROOT = env("STORAGE_LOCAL_ROOT", cast=str, default="/tmp/langconnect-storage")
+# Pooled HTTP connections to Supabase Storage (shared by all requests of a worker)
+STORAGE_HTTP_MAX_CONNECTIONS = env("STORAGE_HTTP_MAX_CONNECTIONS", cast=int, default=20)
+STORAGE_HTTP_TIMEOUT_SECONDS = env("STORAGE_HTTP_TIMEOUT_SECONDS", cast=float, default=60.0)
+
+# Vision analysis
+# Concurrent Vision API calls per worker (image-heavy ingestion queues behind this)
+VISION_MAX_CONCURRENCY = env("VISION_MAX_CONCURRENCY", cast=int, default=4)
+# Analysis results kept per worker, keyed by image content hash
+VISION_CACHE_SIZE = env("VISION_CACHE_SIZE", cast=int, default=512)
+
+# YouTube ingestion
+# "live" (YouTube, then Supadata) or "fixture" (transcripts from YOUTUBE_FIXTURE_DIR/{video_id}.json, for tests/dev)
+YOUTUBE_TRANSCRIPT_PROVIDER = env("YOUTUBE_TRANSCRIPT_PROVIDER", cast=str, default="fixture" if IS_TESTING else "live")
+YOUTUBE_FIXTURE_DIR = env("YOUTUBE_FIXTURE_DIR", cast=str, default="/tmp/langconnect-youtube-fixtures")
+# Concurrent transcript fetches per worker (they run in threads, off the event loop)
+YOUTUBE_MAX_CONCURRENCY = env("YOUTUBE_MAX_CONCURRENCY", cast=int, default=4)
+# Transcripts kept per worker, keyed by video ID and language preference
+YOUTUBE_CACHE_SIZE = env("YOUTUBE_CACHE_SIZE", cast=int, default=256)
+YOUTUBE_CACHE_TTL_SECONDS = env("YOUTUBE_CACHE_TTL_SECONDS", cast=int, default=86400)
+# Failed extractions are remembered briefly so retries and duplicates do not hammer the APIs
+YOUTUBE_FAILURE_TTL_SECONDS = env("YOUTUBE_FAILURE_TTL_SECONDS", cast=int, default=300)
+
 # Read allowed origins from environment variable
 ALLOW_ORIGINS_JSON = env("ALLOW_ORIGINS", cast=str, default="")
 
@@ -21,8 +21,11 @@ from fastapi import status
 from fastapi.exceptions import HTTPException
 from langchain_core.documents import Document
 
+from langconnect import config
 from langconnect.database.connection import get_db_connection, get_vectorstore
 from langconnect.database.document import DocumentManager
+from langconnect.database.metadata_index import is_index_filter
+from langconnect.database.vector_index import ann_search
 from langconnect.models import PermissionLevel
 
 logger = logging.getLogger(__name__)
@@ -917,10 +920,20 @@ class Collection:
         }
 
     async def search(
-        self, query: str, *, limit: int = 4, filter: Optional[dict[str, Any]] = None
+        self,
+        query: str,
+        *,
+        limit: int = 4,
+        filter: Optional[dict[str, Any]] = None,
+        ef_search: Optional[int] = None,
     ) -> builtins.list[dict[str, Any]]:
         """Run a semantic similarity search in the vector store.
         Note: offset is applied client-side after retrieval.
+
+        Searches use the HNSW indexes (see vector_index) when the filter
+        compiles to indexed containment predicates (equality, $eq, $in,
+        $and, $or; see metadata_index); ef_search trades recall for latency
+        per request. Other operator filters go through PGVector.
         """
         # Check if user has any access to this collection
         permission_level = await self.permissions_manager.get_user_permission_level(
@@ -933,6 +946,20 @@ class Collection:
             )
 
         details = await self._get_details_or_raise()
+
+        if is_index_filter(filter):
+            embedding = await config.DEFAULT_EMBEDDINGS.aembed_query(query)
+            async with get_db_connection() as conn:
+                rows = await ann_search(
+                    conn,
+                    self.collection_id,
+                    embedding,
+                    limit=limit,
+                    filter=filter,
+                    ef_search=ef_search,
+                )
+            return [self._format_search_row(row) for row in rows]
+
         store = get_vectorstore(collection_name=details["table_id"])
         results = store.similarity_search_with_score(query, k=limit, filter=filter)
         
@@ -992,6 +1019,22 @@ class Collection:
         
         return formatted_results
 
+    @staticmethod
+    def _format_search_row(row: Any) -> dict[str, Any]:
+        """Format an ann_search row like a PGVector search result."""
+        metadata = json.loads(row["cmetadata"]) if row["cmetadata"] else {}
+        doc_id = metadata.get("id") or metadata.get("uuid") or str(row["id"])
+        if not metadata.get("id"):
+            metadata["id"] = doc_id
+        if not metadata.get("document_id") and row["document_id"]:
+            metadata["document_id"] = str(row["document_id"])
+        return {
+            "id": doc_id,
+            "content": row["document"],
+            "metadata": metadata,
+            "similarity_score": float(row["distance"]),
+        }
+
     async def contextual_search(
         self,
         query: str,
@@ -1001,6 +1044,7 @@ class Collection:
         return_surrounding_context: bool = False,
         max_context_characters: int = 2000,
         format_chunks_for_llm: bool = False,
+        ef_search: Optional[int] = None,
     ) -> builtins.list[Any]:  # Changed to Any to handle both SearchResult and FormattedSearchResult
         """Run a contextual semantic similarity search with optional context expansion.
         
@@ -1011,6 +1055,7 @@ class Collection:
             return_surrounding_context: Whether to include surrounding context
             max_context_characters: Max characters for context expansion
             format_chunks_for_llm: Whether to format for LLM consumption
+            ef_search: Optional HNSW candidate list size for this search
             
         Returns:
             List[SearchResult] when format_chunks_for_llm=False
@@ -1020,7 +1065,7 @@ class Collection:
         from langconnect.services.search_service import SearchService, SearchFormatter
         
         # Get base search results using existing method
-        base_results = await self.search(query, limit=limit, filter=filter)
+        base_results = await self.search(query, limit=limit, filter=filter, ef_search=ef_search)
         
         # Convert to SearchResult objects with document metadata
         search_results = []
@@ -1260,6 +1305,7 @@ class Collection:
         max_context_characters: int = 2000,
         format_chunks_for_llm: bool = False,
         semantic_weight: float = 0.5,
+        ef_search: Optional[int] = None,
     ) -> builtins.list[Any]:
         """Run a hybrid search combining semantic and keyword search with optional context expansion.
         
@@ -1272,6 +1318,7 @@ class Collection:
             max_context_characters: Max characters for context expansion
             format_chunks_for_llm: Whether to format for LLM consumption
             semantic_weight: Weight for semantic results (0.0-1.0)
+            ef_search: Optional HNSW candidate list size for the semantic search
             
         Returns:
             List[SearchResult] when format_chunks_for_llm=False
@@ -1285,7 +1332,7 @@ class Collection:
         search_limit = min(limit * 2, 50)  # Cap at 50 to avoid performance issues
         
         # Run semantic search
-        semantic_results = await self.search(query, limit=search_limit, filter=filter)
+        semantic_results = await self.search(query, limit=search_limit, filter=filter, ef_search=ef_search)
         
         # Run keyword search
         keyword_results_raw = await self.keyword_search(
@@ -0,0 +1,165 @@
+"""Indexed JSONB metadata lookups for collections, documents and chunks.
+
+Metadata lives in ``cmetadata`` JSONB columns. Hot keys are served by
+expression indexes (created by migration 024, see ``METADATA_INDEXES``):
+
+- collection ownership and listing: ``cmetadata->>'owner_id'`` and
+  ``cmetadata->>'name'`` on ``langchain_pg_collection``
+- chunk lookups by source file: ``(collection_id, cmetadata->>'file_id')``
+- duplicate detection and source filters on documents:
+  ``(collection_id, cmetadata->>'content_hash')`` and ``cmetadata->>'source_type'``
+
+Arbitrary search filters use a GIN ``jsonb_path_ops`` index on
+``langchain_pg_embedding.cmetadata``, which only serves containment
+(``@>``). ``compile_filter`` turns search filters into containment
+predicates, so filtered searches read matching chunks from the index
+instead of checking the metadata of every chunk in the collection.
+
+Large deployments can build the indexes without blocking writes ahead of the
+migration with ``database/build_vector_indexes.py --metadata-only``.
+"""
+
+import json
+import logging
+import time
+from typing import Any, Optional
+
+import asyncpg
+
+logger = logging.getLogger(__name__)
+
+# Index name -> definition (after "CREATE INDEX <name>"); kept in sync with migration 024
+METADATA_INDEXES: dict[str, str] = {
+    "idx_collection_owner_id": (
+        "ON langconnect.langchain_pg_collection ((cmetadata->>'owner_id'))"
+    ),
+    "idx_collection_name": (
+        "ON langconnect.langchain_pg_collection ((cmetadata->>'name'))"
+    ),
+    "idx_embedding_file_id": (
+        "ON langconnect.langchain_pg_embedding (collection_id, (cmetadata->>'file_id'))"
+    ),
+    "idx_embedding_cmetadata_gin": (
+        "ON langconnect.langchain_pg_embedding USING gin (cmetadata jsonb_path_ops)"
+    ),
+    "idx_document_content_hash": (
+        "ON langconnect.langchain_pg_document (collection_id, (cmetadata->>'content_hash'))"
+    ),
+    "idx_document_source_type": (
+        "ON langconnect.langchain_pg_document (collection_id, (cmetadata->>'source_type'))"
+    ),
+}
+
+# ---------- filters ----------
+
+
+def _is_scalar(value: Any) -> bool:
+    return isinstance(value, (str, int, float, bool))
+
+
+def _contains(column: str, field: str, value: Any, params: list[Any]) -> str:
+    params.append(json.dumps({field: value}))
+    return f"{column} @> ${len(params)}::jsonb"
+
+
+def _compile_field(column: str, field: str, condition: Any, params: list[Any]) -> Optional[str]:
+    if _is_scalar(condition):
+        return _contains(column, field, condition, params)
+    if not isinstance(condition, dict) or not condition:
+        return None
+
+    predicates = []
+    for operator, value in condition.items():
+        if operator == "$eq" and _is_scalar(value):
+            predicates.append(_contains(column, field, value, params))
+        elif operator == "$in" and isinstance(value, list) and all(_is_scalar(v) for v in value):
+            if not value:
+                predicates.append("FALSE")
+                continue
+            # One containment per value; the planner combines them with a BitmapOr
+            alternatives = [_contains(column, field, v, params) for v in value]
+            predicates.append(f"({' OR '.join(alternatives)})")
+        else:
+            return None
+    return " AND ".join(predicates)
+
+
+def compile_filter(filter: dict[str, Any], params: list[Any], column: str = "e.cmetadata") -> Optional[str]:
+    """Compile a metadata filter to index-friendly SQL, or None if it can't be.
+
+    Supports the PGVector filter subset that maps to JSONB containment:
+    plain ``{"key": value}`` equality, ``{"key": {"$eq": value}}``,
+    ``{"key": {"$in": [values]}}`` and nested ``$and`` / ``$or`` lists.
+    Values must be scalars; containment compares JSON types, so ``1`` does
+    not match ``"1"``.
+
+    Args:
+        filter: Metadata filter
+        params: Query parameters; compiled values are appended (as JSON text)
+        column: JSONB column expression to filter
+
+    Returns:
+        SQL predicate referencing the appended parameters, or None
+    """
+    predicates = []
+    for key, condition in filter.items():
+        if key in ("$and", "$or"):
+            if not isinstance(condition, list) or not condition:
+                return None
+            parts = []
+            for sub_filter in condition:
+                if not isinstance(sub_filter, dict) or not sub_filter:
+                    return None
+                part = compile_filter(sub_filter, params, column)
+                if part is None:
+                    return None
+                parts.append(f"({part})")
+            joiner = " AND " if key == "$and" else " OR "
+            predicates.append(f"({joiner.join(parts)})")
+        elif key.startswith("$"):
+            return None
+        else:
+            predicate = _compile_field(column, key, condition, params)
+            if predicate is None:
+                return None
+            predicates.append(predicate)
+    return " AND ".join(predicates) if predicates else "TRUE"
+
+
+def is_index_filter(filter: Optional[dict[str, Any]]) -> bool:
+    """Whether a filter (or no filter) can be served by compile_filter."""
+    if not filter:
+        return True
+    return compile_filter(filter, []) is not None
+
+
+# ---------- index DDL ----------
+
+
+async def build_metadata_indexes(conn: asyncpg.Connection) -> dict[str, str]:
+    """Create missing metadata indexes without blocking writes.
+
+    Must not run inside a transaction (uses CREATE INDEX CONCURRENTLY).
+
+    Returns:
+        "created" or "exists" per index name
+    """
+    # vector_index imports this module for compile_filter
+    from langconnect.database.vector_index import _index_exists
+
+    results = {}
+    for name, definition in METADATA_INDEXES.items():
+        state = await _index_exists(conn, name)
+        if state is False:
+            # Leftover from an interrupted concurrent build
+            await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS langconnect.{name}")
+            state = None
+        if state is not None:
+            results[name] = "exists"
+            continue
+
+        started = time.monotonic()
+        await conn.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}")
+        results[name] = "created"
+        logger.info(f"[metadata_index] created {name} in {time.monotonic() - started:.1f}s")
+    return results
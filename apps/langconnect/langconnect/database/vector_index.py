@@ -0,0 +1,381 @@
+"""Approximate nearest-neighbour (HNSW) indexing and search for collection embeddings.
+
+``langchain_pg_embedding.embedding`` is an unconstrained ``vector`` column, so
+HNSW indexes are built on ``embedding::vector(<dims>)`` for rows of the
+configured dimension, and ANN queries order by that same expression:
+
+- ``idx_embedding_hnsw`` covers all collections (created by migration 020)
+- ``idx_embedding_hnsw_c_<collection hex>`` partial indexes serve large
+  collections, so their searches don't compete with other tenants' rows
+
+Search picks a strategy per collection: its partial index if one exists, an
+exact filtered scan for small collections, otherwise the global index.
+``ef_search`` is set per request with ``SET LOCAL``.
+
+HNSW applies the collection and metadata filters after the index scan, so a
+plain scan of the global index returns at most ``ef_search`` candidates of
+which few (or none) may belong to the collection. On pgvector >= 0.8,
+``hnsw.iterative_scan`` (``VECTOR_SEARCH_ITERATIVE_SCAN``) keeps scanning
+until enough rows pass the filters; ``relaxed_order`` results are re-sorted
+by distance. Index searches that still return fewer than ``limit`` rows are
+repeated as an exact scan.
+
+Indexes are built and rebuilt by ``database/build_vector_indexes.py``, and
+recall/latency can be measured with ``database/benchmark_vector_index.py``.
+"""
+
+import logging
+import re
+import time
+import uuid
+from typing import Any, Optional
+
+import asyncpg
+
+from langconnect import config
+from langconnect.database.metadata_index import compile_filter
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_INDEX_NAME = "idx_embedding_hnsw"
+COLLECTION_INDEX_PREFIX = "idx_embedding_hnsw_c_"
+EMBEDDING_TABLE = "langconnect.langchain_pg_embedding"
+
+# Chunk counts and the set of partially indexed collections are cached briefly
+STRATEGY_CACHE_TTL_SECONDS = 60
+
+_chunk_counts: dict[str, tuple[int, float]] = {}
+_indexed_collections: tuple[set[str], float] = (set(), 0.0)
+# Whether the installed pgvector supports hnsw.iterative_scan (checked once)
+_iterative_scan_supported: Optional[bool] = None
+
+
+def collection_index_name(collection_id: str) -> str:
+    """Name of the partial HNSW index for a collection."""
+    return f"{COLLECTION_INDEX_PREFIX}{uuid.UUID(str(collection_id)).hex}"
+
+
+def vector_literal(embedding: list[float]) -> str:
+    """Text form of a vector, passed as text and cast with ``::text::vector`` in queries."""
+    return "[" + ",".join(repr(float(x)) for x in embedding) + "]"
+
+
+# ---------- index DDL ----------
+
+
+def _index_definition(
+    name: str,
+    *,
+    dims: int,
+    m: int,
+    ef_construction: int,
+    collection_id: Optional[str] = None,
+    concurrently: bool = True,
+) -> str:
+    predicate = f"vector_dims(embedding) = {int(dims)}"
+    if collection_id is not None:
+        # Literal UUID (validated) so the planner can match the partial index predicate
+        predicate += f" AND collection_id = '{uuid.UUID(str(collection_id))}'::uuid"
+    return (
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {name} "
+        f"ON {EMBEDDING_TABLE} USING hnsw ((embedding::vector({int(dims)})) vector_cosine_ops) "
+        f"WITH (m = {int(m)}, ef_construction = {int(ef_construction)}) "
+        f"WHERE {predicate}"
+    )
+
+
+async def set_maintenance_work_mem(conn: asyncpg.Connection, value: str) -> None:
+    """Raise maintenance_work_mem for this session (HNSW builds are much faster when the graph fits)."""
+    if not re.fullmatch(r"\d+\s*(kB|MB|GB)", value):
+        raise ValueError(f"Invalid maintenance_work_mem: {value!r}")
+    await conn.execute(f"SET maintenance_work_mem = '{value}'")
+
+
+async def _index_exists(conn: asyncpg.Connection, name: str) -> Optional[bool]:
+    """None if missing, else whether the index is valid (a failed CONCURRENTLY build is not)."""
+    row = await conn.fetchrow(
+        """
+        SELECT i.indisvalid
+        FROM pg_class c
+        JOIN pg_index i ON i.indexrelid = c.oid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'langconnect' AND c.relname = $1
+        """,
+        name,
+    )
+    return None if row is None else row["indisvalid"]
+
+
+async def build_index(
+    conn: asyncpg.Connection,
+    *,
+    collection_id: Optional[str] = None,
+    dims: int = config.EMBEDDING_DIMENSIONS,
+    m: int = config.VECTOR_INDEX_M,
+    ef_construction: int = config.VECTOR_INDEX_EF_CONSTRUCTION,
+    rebuild: bool = False,
+) -> str:
+    """Build the global (or a collection's partial) HNSW index without blocking writes.
+
+    With ``rebuild``, a replacement index is built next to the existing one and
+    swapped in, so searches keep using the old index until the new one is ready
+    (e.g. after changing ``m`` / ``ef_construction``).
+
+    Must not run inside a transaction (uses CREATE INDEX CONCURRENTLY).
+
+    Returns:
+        "created", "rebuilt" or "exists"
+    """
+    name = collection_index_name(collection_id) if collection_id else GLOBAL_INDEX_NAME
+    state = await _index_exists(conn, name)
+    if state is False:
+        # Leftover from an interrupted concurrent build
+        await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS langconnect.{name}")
+        state = None
+
+    started = time.monotonic()
+    if state is None:
+        await conn.execute(_index_definition(
+            name, dims=dims, m=m, ef_construction=ef_construction, collection_id=collection_id
+        ))
+        result = "created"
+    elif rebuild:
+        tmp_name = f"{name}_new"
+        await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS langconnect.{tmp_name}")
+        await conn.execute(_index_definition(
+            tmp_name, dims=dims, m=m, ef_construction=ef_construction, collection_id=collection_id
+        ))
+        await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS langconnect.{name}")
+        await conn.execute(f"ALTER INDEX langconnect.{tmp_name} RENAME TO {name}")
+        result = "rebuilt"
+    else:
+        return "exists"
+
+    invalidate_strategy_cache()
+    logger.info(
+        f"[vector_index] {result} {name} (dims={dims}, m={m}, ef_construction={ef_construction}) "
+        f"in {time.monotonic() - started:.1f}s"
+    )
+    return result
+
+
+async def drop_collection_index(conn: asyncpg.Connection, collection_id: str) -> None:
+    """Drop a collection's partial HNSW index (searches fall back to the global index)."""
+    await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS langconnect.{collection_index_name(collection_id)}")
+    invalidate_strategy_cache()
+
+
+async def collection_chunk_counts(conn: asyncpg.Connection) -> dict[str, int]:
+    """Chunk counts per collection."""
+    rows = await conn.fetch(
+        f"SELECT collection_id, COUNT(*) AS chunks FROM {EMBEDDING_TABLE} GROUP BY collection_id"
+    )
+    return {str(row["collection_id"]): row["chunks"] for row in rows}
+
+
+async def sync_collection_indexes(
+    conn: asyncpg.Connection,
+    *,
+    threshold: int = config.VECTOR_INDEX_PARTIAL_THRESHOLD,
+    dims: int = config.EMBEDDING_DIMENSIONS,
+    m: int = config.VECTOR_INDEX_M,
+    ef_construction: int = config.VECTOR_INDEX_EF_CONSTRUCTION,
+    rebuild: bool = False,
+) -> dict[str, list[str]]:
+    """Give collections above threshold a partial index; drop those that shrank well below it.
+
+    Indexes are only dropped below half the threshold, so collections near the
+    threshold don't flap between runs.
+    """
+    counts = await collection_chunk_counts(conn)
+    indexed = await _load_indexed_collections(conn)
+    stats: dict[str, list[str]] = {"created": [], "rebuilt": [], "dropped": [], "kept": []}
+
+    for collection_id, chunks in sorted(counts.items(), key=lambda item: -item[1]):
+        if chunks >= threshold:
+            result = await build_index(
+                conn, collection_id=collection_id, dims=dims, m=m,
+                ef_construction=ef_construction, rebuild=rebuild,
+            )
+            stats["created" if result == "created" else "rebuilt" if result == "rebuilt" else "kept"].append(collection_id)
+        elif collection_id in indexed and chunks < threshold // 2:
+            await drop_collection_index(conn, collection_id)
+            stats["dropped"].append(collection_id)
+
+    # Indexes of deleted collections
+    for collection_id in indexed - counts.keys():
+        await drop_collection_index(conn, collection_id)
+        stats["dropped"].append(collection_id)
+    return stats
+
+
+# ---------- search ----------
+
+
+def invalidate_strategy_cache() -> None:
+    global _indexed_collections
+    _chunk_counts.clear()
+    _indexed_collections = (set(), 0.0)
+
+
+async def _load_indexed_collections(conn: asyncpg.Connection) -> set[str]:
+    rows = await conn.fetch(
+        """
+        SELECT c.relname
+        FROM pg_class c
+        JOIN pg_index i ON i.indexrelid = c.oid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'langconnect' AND c.relname LIKE $1 AND i.indisvalid
+        """,
+        f"{COLLECTION_INDEX_PREFIX}%",
+    )
+    collections = set()
+    for row in rows:
+        suffix = row["relname"][len(COLLECTION_INDEX_PREFIX):]
+        try:
+            collections.add(str(uuid.UUID(hex=suffix)))
+        except ValueError:
+            continue  # e.g. a *_new index mid-rebuild
+    return collections
+
+
+async def _has_collection_index(conn: asyncpg.Connection, collection_id: str) -> bool:
+    global _indexed_collections
+    collections, loaded_at = _indexed_collections
+    if time.monotonic() - loaded_at > STRATEGY_CACHE_TTL_SECONDS:
+        collections = await _load_indexed_collections(conn)
+        _indexed_collections = (collections, time.monotonic())
+    return collection_id in collections
+
+
+async def _chunk_count(conn: asyncpg.Connection, collection_id: str) -> int:
+    cached = _chunk_counts.get(collection_id)
+    if cached and time.monotonic() - cached[1] <= STRATEGY_CACHE_TTL_SECONDS:
+        return cached[0]
+    # Counting stops at the threshold; only "small or not" matters
+    count = await conn.fetchval(
+        f"SELECT COUNT(*) FROM (SELECT 1 FROM {EMBEDDING_TABLE} WHERE collection_id = $1 LIMIT $2) s",
+        uuid.UUID(collection_id),
+        config.VECTOR_SEARCH_EXACT_THRESHOLD,
+    )
+    _chunk_counts[collection_id] = (count, time.monotonic())
+    return count
+
+
+async def choose_strategy(conn: asyncpg.Connection, collection_id: str) -> str:
+    """"partial", "exact" or "global" for a collection."""
+    if await _has_collection_index(conn, collection_id):
+        return "partial"
+    if await _chunk_count(conn, collection_id) < config.VECTOR_SEARCH_EXACT_THRESHOLD:
+        return "exact"
+    return "global"
+
+
+async def _supports_iterative_scan(conn: asyncpg.Connection) -> bool:
+    global _iterative_scan_supported
+    if _iterative_scan_supported is None:
+        version = await conn.fetchval("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+        try:
+            major, minor = (int(part) for part in (version or "0.0").split(".")[:2])
+        except ValueError:
+            major, minor = 0, 0
+        _iterative_scan_supported = (major, minor) >= (0, 8)
+        if not _iterative_scan_supported:
+            logger.warning(
+                f"[vector_index] pgvector {version} has no iterative index scans; "
+                "filtered searches that come up short fall back to exact scans"
+            )
+    return _iterative_scan_supported
+
+
+async def ann_search(
+    conn: asyncpg.Connection,
+    collection_id: str,
+    embedding: list[float],
+    *,
+    limit: int = 4,
+    filter: Optional[dict[str, Any]] = None,
+    ef_search: Optional[int] = None,
+    strategy: Optional[str] = None,
+) -> list[asyncpg.Record]:
+    """Nearest chunks of a collection by cosine distance.
+
+    Args:
+        conn: Database connection
+        collection_id: Collection UUID
+        embedding: Query embedding
+        limit: Number of results
+        filter: Metadata filter supported by metadata_index.compile_filter
+        ef_search: HNSW candidate list size for this query (default VECTOR_SEARCH_EF_SEARCH)
+        strategy: Force "partial", "exact" or "global" (e.g. for benchmarks)
+
+    Returns:
+        Rows with id, document_id, document, cmetadata and distance, nearest
+        first. Fewer than ``limit`` rows only if the collection (after
+        filtering) has fewer matching chunks.
+
+    Raises:
+        ValueError: If the filter can't be compiled to index-friendly predicates
+    """
+    collection_id = str(uuid.UUID(str(collection_id)))
+    dims = len(embedding)
+    strategy = strategy or await choose_strategy(conn, collection_id)
+
+    params: list[Any] = [vector_literal(embedding), limit]
+    if strategy == "exact":
+        # Plain column expression: the HNSW expression indexes don't apply
+        distance = "e.embedding <=> $1::text::vector"
+    else:
+        distance = f"(e.embedding::vector({dims})) <=> $1::text::vector({dims})"
+
+    if strategy == "partial":
+        # The partial index predicate only matches a literal collection id
+        collection_clause = f"e.collection_id = '{collection_id}'::uuid"
+    else:
+        params.append(uuid.UUID(collection_id))
+        collection_clause = f"e.collection_id = ${len(params)}"
+
+    filter_clause = ""
+    if filter:
+        predicate = compile_filter(filter, params, "e.cmetadata")
+        if predicate is None:
+            raise ValueError(f"Unsupported metadata filter: {filter}")
+        filter_clause = f"AND {predicate}"
+
+    query = f"""
+        SELECT e.id, e.document_id, e.document, e.cmetadata, {distance} AS distance
+        FROM {EMBEDDING_TABLE} e
+        WHERE {collection_clause}
+          AND vector_dims(e.embedding) = {dims}
+          {filter_clause}
+        ORDER BY {distance}
+        LIMIT $2
+    """
+
+    iterative_scan = config.VECTOR_SEARCH_ITERATIVE_SCAN.lower()
+    if iterative_scan in ("", "off") or strategy == "exact" or not await _supports_iterative_scan(conn):
+        iterative_scan = "off"
+
+    async with conn.transaction():
+        if strategy != "exact":
+            ef = max(ef_search or config.VECTOR_SEARCH_EF_SEARCH, limit)
+            await conn.execute("SELECT set_config('hnsw.ef_search', $1, true)", str(ef))
+            if iterative_scan != "off":
+                await conn.execute("SELECT set_config('hnsw.iterative_scan', $1, true)", iterative_scan)
+        rows = await conn.fetch(query, *params)
+
+    if iterative_scan == "relaxed_order":
+        # Relaxed iterative scans may return rows slightly out of order
+        rows = sorted(rows, key=lambda row: row["distance"])
+
+    if strategy != "exact" and len(rows) < limit:
+        # The index scan ran out of candidates before finding enough rows that
+        # pass the filters; the exact scan is bounded by the collection
+        logger.info(
+            f"[vector_index] {strategy} search of {collection_id} returned {len(rows)}/{limit} rows, "
+            "retrying as an exact scan"
+        )
+        return await ann_search(
+            conn, collection_id, embedding, limit=limit, filter=filter, strategy="exact"
+        )
+    return rows
@@ -466,6 +466,7 @@ class AssistantVersionsResponse(BaseModel):
     versions: List[AssistantVersionInfo] = Field(default_factory=list, description="List of versions (newest first)")
     total_versions: int = Field(..., description="Total number of versions")
     latest_version: int = Field(..., description="Current/latest version number")
+    next_before_version: Optional[int] = Field(None, description="Cursor for the next page (pass as before_version); None on the last page")
 
 
 class AssistantRestoreRequest(BaseModel):
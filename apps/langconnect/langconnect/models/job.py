@@ -124,6 +124,33 @@ class JobListResponse(BaseModel):
     has_more: bool = Field(..., description="Whether there are more pages")
 
 
+class JobProgress(BaseModel):
+    """Compact job status used for progress tracking (stream events and batched status)."""
+    
+    id: str = Field(..., description="Job ID")
+    status: JobStatus = Field(..., description="Current job status")
+    progress_percentage: int = Field(default=0, description="Progress percentage")
+    current_step: Optional[str] = Field(None, description="Current processing step")
+    total_steps: Optional[int] = Field(None, description="Total processing steps")
+    documents_processed: int = Field(default=0, description="Number of documents processed")
+    chunks_created: int = Field(default=0, description="Number of chunks created")
+    error_message: Optional[str] = Field(None, description="Error message if failed")
+    completed_at: Optional[datetime.datetime] = Field(None, description="Job completion timestamp")
+
+
+class JobStatusBatchRequest(BaseModel):
+    """Schema for requesting the status of several jobs at once."""
+    
+    job_ids: list[str] = Field(..., min_length=1, max_length=100, description="Job IDs to look up")
+
+
+class JobStatusBatchResponse(BaseModel):
+    """Schema for batched job status."""
+    
+    jobs: list[JobProgress] = Field(..., description="Status of each job found")
+    missing: list[str] = Field(default_factory=list, description="Requested job IDs that were not found or are not accessible")
+
+
 class JobSubmissionResponse(BaseModel):
     """Schema for job submission response."""
     
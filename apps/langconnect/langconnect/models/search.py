@@ -14,6 +14,12 @@ class SearchQuery(BaseModel):
     query: str = Field(..., description="Search query text")
     limit: int = Field(default=10, ge=1, le=100, description="Maximum number of results to return")
     filter: Optional[dict[str, Any]] = Field(None, description="Optional metadata filters")
+    ef_search: Optional[int] = Field(
+        None,
+        ge=1,
+        le=1000,
+        description="HNSW candidate list size (higher = better recall, slower); defaults to server setting"
+    )
 
 
 class ContextualSearchQuery(SearchQuery):
@@ -81,6 +87,12 @@ class HybridSearchQuery(BaseModel):
         le=1.0,
         description="Weight for semantic search results (0.0-1.0, keyword weight = 1 - semantic_weight)"
     )
+    ef_search: Optional[int] = Field(
+        None,
+        ge=1,
+        le=1000,
+        description="HNSW candidate list size for the semantic part (higher = better recall, slower)"
+    )
 
 
 # =====================
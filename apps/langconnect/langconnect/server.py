@@ -20,6 +20,8 @@ from langconnect.api.storage import router as storage_router
 from langconnect.api.skills import router as skills_router
 from langconnect.config import ALLOWED_ORIGINS
 from langconnect.database.collections import CollectionsManager
+from langconnect.services.pg_listener import close_pg_listener
+from langconnect.services.storage_service import storage_service
 from langconnect.services.sync_scheduler import start_sync_scheduler, stop_sync_scheduler
 from langconnect.sentry import init_sentry
 
@@ -60,6 +62,10 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     logger.info("App is shutting down. Stopping background worker...")
     # Stop LangGraph sync scheduler
     await stop_sync_scheduler()
+    # Close the LISTEN connection used by push streams
+    await close_pg_listener()
+    # Close pooled storage connections
+    await storage_service.close()
 
 
 APP = FastAPI(
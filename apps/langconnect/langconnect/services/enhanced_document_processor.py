@@ -1549,6 +1549,9 @@ class EnhancedDocumentProcessor:
             "web_urls": 0
         }
         
+        # Fetch YouTube transcripts concurrently up front; the loop below then reads them from the cache
+        await self.youtube_service.prefetch_transcripts(urls)
+        
         for i, url in enumerate(urls):
             try:
                 if progress_callback:
@@ -0,0 +1,120 @@
+"""
+Push delivery of job progress.
+
+Progress changes to processing_jobs are published by a database trigger on
+the 'langconnect_job_progress' channel (migration 022), so updates reach every
+worker no matter which one runs the job. The hub listens once per worker and
+hands updates to the streams watching each job:
+
+- One stream watches any number of jobs, so a bulk upload needs a single
+  connection instead of one polling loop per file
+- Updates are coalesced per job; a slow client gets the latest state of each
+  job rather than a growing backlog
+- After the listener reconnects (NOTIFYs may have been missed), the watched
+  jobs are re-read and their current state is pushed
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Iterable, Optional, Set
+
+from langconnect.models.job import JobProgress, JobStatus
+from langconnect.services.job_service import job_service
+from langconnect.services.pg_listener import get_pg_listener
+
+log = logging.getLogger(__name__)
+
+JOB_PROGRESS_CHANNEL = "langconnect_job_progress"
+
+TERMINAL_STATUSES = {JobStatus.COMPLETED.value, JobStatus.FAILED.value, JobStatus.CANCELLED.value}
+
+
+class JobProgressSubscription:
+    """Latest unsent progress of each job watched by one stream."""
+
+    def __init__(self, job_ids: Iterable[str]) -> None:
+        self.job_ids: Set[str] = set(job_ids)
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._ready = asyncio.Event()
+
+    def push(self, job_id: str, progress: Dict[str, Any]) -> None:
+        self._pending[job_id] = progress
+        self._ready.set()
+
+    async def next_updates(self, timeout: float) -> Dict[str, Dict[str, Any]]:
+        """Wait up to timeout for updates; returns them keyed by job ID (empty on timeout)."""
+        if not self._pending:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return {}
+        updates, self._pending = self._pending, {}
+        self._ready.clear()
+        return updates
+
+
+class JobProgressHub:
+    """Fans job progress changes out to the streams watching each job."""
+
+    def __init__(self) -> None:
+        self._watchers: Dict[str, Set[JobProgressSubscription]] = {}
+        self._started = False
+
+    async def _ensure_started(self) -> None:
+        if not self._started:
+            self._started = True
+            await get_pg_listener().subscribe(
+                JOB_PROGRESS_CHANNEL, self._on_notify, on_reconnect=self._on_reconnect
+            )
+
+    async def subscribe(self, job_ids: Iterable[str]) -> JobProgressSubscription:
+        """Start watching jobs; access must have been checked by the caller."""
+        await self._ensure_started()
+        subscription = JobProgressSubscription(job_ids)
+        for job_id in subscription.job_ids:
+            self._watchers.setdefault(job_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: JobProgressSubscription, job_ids: Optional[Iterable[str]] = None) -> None:
+        """Stop watching some jobs, or all jobs of the subscription."""
+        for job_id in list(job_ids if job_ids is not None else subscription.job_ids):
+            subscription.job_ids.discard(job_id)
+            watchers = self._watchers.get(job_id)
+            if not watchers:
+                continue
+            watchers.discard(subscription)
+            if not watchers:
+                del self._watchers[job_id]
+
+    def _publish(self, progress: Dict[str, Any]) -> None:
+        for subscription in list(self._watchers.get(progress["id"], ())):
+            subscription.push(progress["id"], progress)
+
+    async def _on_notify(self, payload: str) -> None:
+        change = json.loads(payload)
+        if str(change.get("id") or "") not in self._watchers:
+            return
+        change["id"] = str(change["id"])
+        change.pop("user_id", None)
+        self._publish(JobProgress.model_validate(change).model_dump(mode="json"))
+
+    async def _on_reconnect(self) -> None:
+        job_ids = list(self._watchers)
+        if not job_ids:
+            return
+        progress = await job_service.get_jobs_progress(job_ids)
+        for job_progress in progress.values():
+            self._publish(job_progress.model_dump(mode="json"))
+        log.info(f"Re-read progress of {len(progress)} watched jobs after listener reconnect")
+
+
+_hub: Optional[JobProgressHub] = None
+
+
+def get_job_progress_hub() -> JobProgressHub:
+    """Get the process-wide job progress hub."""
+    global _hub
+    if _hub is None:
+        _hub = JobProgressHub()
+    return _hub
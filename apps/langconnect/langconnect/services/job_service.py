@@ -18,6 +18,7 @@ from langconnect.models.job import (
     JobUpdate, 
     JobResponse, 
     JobListResponse,
+    JobProgress,
     JobSubmissionResponse,
     ProcessingOptions
 )
@@ -208,6 +209,61 @@ class JobService:
                 created_at=result["created_at"]
             )
     
+    async def get_jobs_progress(
+        self,
+        job_ids: List[str],
+        user_id: Optional[str] = None,
+        is_service_account: bool = False
+    ) -> Dict[str, JobProgress]:
+        """Get the compact progress of several jobs with one query.
+        
+        Args:
+            job_ids: Job identifiers (invalid IDs are treated as not found)
+            user_id: ID of the requesting user; None skips the ownership check
+                (for internal callers that already verified access)
+            is_service_account: Whether the request is from a service account
+            
+        Returns:
+            Progress keyed by job ID, only for jobs that exist and are accessible
+        """
+        valid_ids = []
+        for job_id in job_ids:
+            try:
+                valid_ids.append(UUID(job_id))
+            except (ValueError, TypeError):
+                continue
+        if not valid_ids:
+            return {}
+        
+        query = """
+            SELECT id, status, progress_percent, current_step, total_steps,
+                   documents_processed, chunks_created, error_message, completed_at
+            FROM processing_jobs
+            WHERE id = ANY($1::uuid[])
+        """
+        params: list = [valid_ids]
+        if user_id is not None and not is_service_account:
+            query += " AND user_id = $2"
+            params.append(user_id)
+        
+        async with get_db_connection() as conn:
+            results = await conn.fetch(query, *params)
+        
+        return {
+            str(result["id"]): JobProgress(
+                id=str(result["id"]),
+                status=JobStatus(result["status"]),
+                progress_percentage=result["progress_percent"] or 0,
+                current_step=result["current_step"],
+                total_steps=result["total_steps"],
+                documents_processed=result["documents_processed"] or 0,
+                chunks_created=result["chunks_created"] or 0,
+                error_message=result["error_message"],
+                completed_at=result["completed_at"]
+            )
+            for result in results
+        }
+    
     async def list_jobs(
         self, 
         user_id: str, 
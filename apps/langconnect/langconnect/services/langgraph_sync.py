@@ -1097,8 +1097,7 @@ class LangGraphSyncService:
                     """
                     SELECT graphs_version, assistants_version, schemas_version, 
                            threads_version, last_synced_at
-                    FROM langconnect.cache_state
-                    WHERE id = 1
+                    FROM langconnect.cache_state_current
                     """
                 )
                 
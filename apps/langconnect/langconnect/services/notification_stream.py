@@ -0,0 +1,141 @@
+"""
+Push delivery of notification changes.
+
+Notification inserts, status changes and deletes are published by a database
+trigger on the 'langconnect_notifications' channel (migration 021). The hub
+listens once per worker and fans changes out to the connected users' streams:
+
+- Unread (pending) counts are loaded once when a user connects and then
+  maintained from the change events, so connected clients cause no polling
+  queries. Changes that arrive while the count is loading are buffered and
+  applied once it has loaded
+- Events for users without an open stream are ignored
+- After the listener reconnects (NOTIFYs may have been missed), counts are
+  reloaded and clients are told to resync
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional, Set
+
+from langconnect.database.notifications import NotificationManager
+from langconnect.services.pg_listener import get_pg_listener
+
+log = logging.getLogger(__name__)
+
+NOTIFICATIONS_CHANNEL = "langconnect_notifications"
+
+# Events buffered per stream; a client that falls further behind gets a resync
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class NotificationHub:
+    """Per-user notification streams and unread counters."""
+
+    def __init__(self) -> None:
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._unread: Dict[str, int] = {}
+        # Deltas received while a user's unread count is being loaded
+        self._loading: Dict[str, int] = {}
+        self._started = False
+
+    async def _ensure_started(self) -> None:
+        if not self._started:
+            self._started = True
+            await get_pg_listener().subscribe(
+                NOTIFICATIONS_CHANNEL, self._on_notify, on_reconnect=self._on_reconnect
+            )
+
+    async def subscribe(self, user_id: str) -> asyncio.Queue:
+        """Open a stream for a user; events are (event, data) tuples."""
+        await self._ensure_started()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+
+        if user_id not in self._unread and user_id not in self._loading:
+            self._loading[user_id] = 0
+            try:
+                count = await NotificationManager.get_unread_count(user_id)
+            except BaseException:
+                # Failed or cancelled (client gone): don't leave the queue subscribed
+                self.unsubscribe(user_id, queue)
+                raise
+            finally:
+                delta = self._loading.pop(user_id, 0)
+            # Only keep it if the user is still connected (and nothing set it meanwhile)
+            if user_id in self._subscribers:
+                self._unread.setdefault(user_id, max(0, count + delta))
+
+        log.debug(f"Notification stream opened for {user_id} ({len(self._subscribers[user_id])} open)")
+        return queue
+
+    def unsubscribe(self, user_id: str, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(user_id)
+        if not subscribers:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[user_id]
+            self._unread.pop(user_id, None)
+
+    def cached_unread_count(self, user_id: str) -> Optional[int]:
+        """Unread count maintained for a connected user, or None."""
+        return self._unread.get(user_id)
+
+    def _publish(self, user_id: str, event: str, data: Dict[str, Any]) -> None:
+        for queue in list(self._subscribers.get(user_id, ())):
+            try:
+                queue.put_nowait((event, data))
+            except asyncio.QueueFull:
+                # Drop the backlog; the client reloads everything on resync
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(("resync", {}))
+
+    async def _on_notify(self, payload: str) -> None:
+        change = json.loads(payload)
+        user_id = str(change.get("recipient_user_id") or "")
+        if user_id not in self._subscribers:
+            return
+
+        status = change.get("status")
+        old_status = change.get("old_status")
+        if change.get("op") == "UPDATE" and status == old_status:
+            return
+
+        delta = int(status == "pending") - int(old_status == "pending")
+        if delta and user_id in self._loading:
+            self._loading[user_id] += delta
+        if delta and user_id in self._unread:
+            self._unread[user_id] = max(0, self._unread[user_id] + delta)
+
+        self._publish(user_id, "notification", {
+            "op": change.get("op"),
+            "id": change.get("id"),
+            "status": status,
+            "old_status": old_status,
+            "type": change.get("type"),
+            "resource_type": change.get("resource_type"),
+        })
+        if delta and user_id in self._unread:
+            self._publish(user_id, "unread_count", {"unread_count": self._unread[user_id]})
+
+    async def _on_reconnect(self) -> None:
+        for user_id in list(self._subscribers):
+            count = await NotificationManager.get_unread_count(user_id)
+            if user_id in self._subscribers:
+                self._unread[user_id] = count
+                self._publish(user_id, "resync", {})
+                self._publish(user_id, "unread_count", {"unread_count": count})
+
+
+_hub: Optional[NotificationHub] = None
+
+
+def get_notification_hub() -> NotificationHub:
+    """Get the process-wide notification hub."""
+    global _hub
+    if _hub is None:
+        _hub = NotificationHub()
+    return _hub
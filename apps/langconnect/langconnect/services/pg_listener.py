@@ -0,0 +1,175 @@
+"""
+Postgres LISTEN/NOTIFY listener.
+
+One dedicated connection per worker listens on all subscribed channels and
+dispatches payloads to in-process callbacks, so push features (notification
+streams, job progress) cost no pooled connections and no polling queries.
+
+Payloads are queued per channel and handed to the callbacks by one worker
+task per channel, so a channel's callbacks see NOTIFYs one at a time in the
+order they were sent (an update is never applied before its insert).
+
+NOTIFY messages sent while the connection is down are lost; subscribers
+register a reconnect callback to re-read any state they maintain.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import asyncpg
+
+from langconnect import config
+
+log = logging.getLogger(__name__)
+
+NotifyCallback = Callable[[str], Awaitable[None]]
+ReconnectCallback = Callable[[], Awaitable[None]]
+
+RECONNECT_MAX_DELAY_SECONDS = 30
+
+
+class PgListener:
+    """Shared LISTEN connection with automatic reconnect."""
+
+    def __init__(self) -> None:
+        self._callbacks: Dict[str, List[NotifyCallback]] = {}
+        self._reconnect_callbacks: List[ReconnectCallback] = []
+        self._conn: Optional[asyncpg.Connection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._queues: Dict[str, "asyncio.Queue[str]"] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._connected = asyncio.Event()
+        self._lost = asyncio.Event()
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    async def subscribe(
+        self,
+        channel: str,
+        callback: NotifyCallback,
+        on_reconnect: Optional[ReconnectCallback] = None,
+    ) -> None:
+        """Call callback with the payload of every NOTIFY on channel."""
+        first = channel not in self._callbacks
+        self._callbacks.setdefault(channel, []).append(callback)
+        if on_reconnect is not None:
+            self._reconnect_callbacks.append(on_reconnect)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        elif first and self._conn is not None and not self._conn.is_closed():
+            await self._conn.add_listener(channel, self._dispatch)
+
+    async def wait_connected(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _dispatch(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        queue = self._queues.get(channel)
+        if queue is None:
+            queue = self._queues[channel] = asyncio.Queue()
+        queue.put_nowait(payload)
+        worker = self._workers.get(channel)
+        if worker is None or worker.done():
+            self._workers[channel] = asyncio.create_task(self._deliver(channel, queue))
+
+    async def _deliver(self, channel: str, queue: "asyncio.Queue[str]") -> None:
+        while True:
+            payload = await queue.get()
+            for callback in list(self._callbacks.get(channel, [])):
+                await self._safe_call(callback, payload, channel)
+
+    async def _safe_call(self, callback: NotifyCallback, payload: str, channel: str) -> None:
+        try:
+            await callback(payload)
+        except Exception as e:
+            log.error(f"[pg_listener] Callback for channel {channel} failed: {e}")
+
+    def _on_termination(self, connection: asyncpg.Connection) -> None:
+        self._connected.clear()
+        self._lost.set()
+
+    async def _connect(self) -> asyncpg.Connection:
+        search_path = f"{config.POSTGRES_SCHEMA},public" if config.POSTGRES_SCHEMA != "public" else "public"
+        conn = await asyncpg.connect(
+            user=config.POSTGRES_USER,
+            password=config.POSTGRES_PASSWORD,
+            host=config.POSTGRES_HOST,
+            port=config.POSTGRES_PORT,
+            database=config.POSTGRES_DB,
+            server_settings={"search_path": search_path, "application_name": "langconnect-listener"},
+        )
+        conn.add_termination_listener(self._on_termination)
+        for channel in list(self._callbacks):
+            await conn.add_listener(channel, self._dispatch)
+        return conn
+
+    async def _run(self) -> None:
+        delay = 1.0
+        reconnecting = False
+        while True:
+            try:
+                self._lost.clear()
+                self._conn = await self._connect()
+                self._connected.set()
+                log.info(f"[pg_listener] Listening on {', '.join(self._callbacks)}")
+                delay = 1.0
+                if reconnecting:
+                    # Changes notified while disconnected were missed
+                    for on_reconnect in list(self._reconnect_callbacks):
+                        try:
+                            await on_reconnect()
+                        except Exception as e:
+                            log.error(f"[pg_listener] Reconnect callback failed: {e}")
+                await self._lost.wait()
+                log.warning("[pg_listener] Listener connection lost, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error(f"[pg_listener] Failed to listen: {e}; retrying in {delay:.0f}s")
+            self._connected.clear()
+            reconnecting = True
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY_SECONDS)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        for worker in self._workers.values():
+            worker.cancel()
+        self._workers.clear()
+        self._queues.clear()
+        if self._conn is not None and not self._conn.is_closed():
+            await self._conn.close()
+        self._conn = None
+        self._connected.clear()
+
+
+_listener: Optional[PgListener] = None
+
+
+def get_pg_listener() -> PgListener:
+    """Get the process-wide listener."""
+    global _listener
+    if _listener is None:
+        _listener = PgListener()
+    return _listener
+
+
+async def close_pg_listener() -> None:
+    """Close the listener connection (app shutdown)."""
+    global _listener
+    if _listener is not None:
+        await _listener.close()
+        _listener = None
@@ -0,0 +1,371 @@
+"""Async storage gateway backends.
+
+StorageService talks to object storage through one of these backends:
+
+- SupabaseStorageBackend: Supabase Storage REST API over a pooled
+  httpx.AsyncClient. Uploads and downloads are streamed, so file size does
+  not affect memory use and transfers never block the event loop
+- LocalStorageBackend: files on the local filesystem (tests and development)
+
+Both accept upload bodies as bytes or an async iterable of byte chunks, and
+return downloads as StorageDownload streams.
+"""
+
+import asyncio
+import logging
+import os
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Union
+from urllib.parse import quote
+
+import httpx
+
+from langconnect import config
+
+logger = logging.getLogger(__name__)
+
+# Upload body: whole content or a stream of chunks
+StorageData = Union[bytes, AsyncIterable[bytes]]
+
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+# Supabase Storage accepts at most 1000 prefixes per remove request
+REMOVE_BATCH_SIZE = 1000
+
+# Concurrent requests for multi-object operations
+MULTI_OBJECT_CONCURRENCY = 8
+
+
+class StorageError(Exception):
+    """Storage operation failed; status_code follows HTTP semantics (404 = not found)."""
+
+    def __init__(self, message: str, status_code: int = 500):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class StorageDownload:
+    """An open download.
+
+    Iterate to stream the body; the underlying connection or file is released
+    when iteration ends. Call aclose() if the body is not consumed.
+    """
+
+    def __init__(
+        self,
+        chunks: AsyncIterator[bytes],
+        close: Callable[[], Awaitable[None]],
+        content_type: Optional[str] = None,
+        content_length: Optional[int] = None,
+    ):
+        self._chunks = chunks
+        self._close = close
+        self.content_type = content_type
+        self.content_length = content_length
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in self._chunks:
+                yield chunk
+        finally:
+            await self.aclose()
+
+    async def read(self) -> bytes:
+        """Read the whole body (only for callers that need it in memory)."""
+        return b"".join([chunk async for chunk in self])
+
+    async def aclose(self) -> None:
+        await self._close()
+
+
+class StorageBackend(ABC):
+    """Object storage operations used by StorageService."""
+
+    @abstractmethod
+    async def upload(
+        self,
+        bucket: str,
+        path: str,
+        data: StorageData,
+        content_type: str,
+        *,
+        upsert: bool = False,
+        cache_control: str = "3600",
+        content_length: Optional[int] = None,
+    ) -> None:
+        ...
+
+    @abstractmethod
+    async def open_download(self, bucket: str, path: str) -> StorageDownload:
+        ...
+
+    @abstractmethod
+    async def remove(self, bucket: str, paths: List[str]) -> None:
+        ...
+
+    @abstractmethod
+    async def list(self, bucket: str, prefix: str, *, limit: int = 1000, offset: int = 0) -> List[Dict]:
+        """List objects directly under prefix; each entry has at least 'name'."""
+        ...
+
+    @abstractmethod
+    async def create_signed_url(self, bucket: str, path: str, expires_in: int) -> str:
+        ...
+
+    @abstractmethod
+    async def create_signed_urls(self, bucket: str, paths: List[str], expires_in: int) -> Dict[str, str]:
+        """Signed URLs keyed by path; paths that could not be signed are omitted."""
+        ...
+
+    @abstractmethod
+    def public_url(self, bucket: str, path: str) -> str:
+        ...
+
+    async def aclose(self) -> None:
+        """Release pooled connections (app shutdown)."""
+
+
+class SupabaseStorageBackend(StorageBackend):
+    """Supabase Storage REST API over one pooled HTTP client per worker."""
+
+    def __init__(self, url: str, key: str):
+        self.base_url = f"{url.rstrip('/')}/storage/v1"
+        self._headers = {"Authorization": f"Bearer {key}", "apikey": key}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self._headers,
+                timeout=httpx.Timeout(config.STORAGE_HTTP_TIMEOUT_SECONDS, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=config.STORAGE_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=config.STORAGE_HTTP_MAX_CONNECTIONS,
+                ),
+            )
+        return self._client
+
+    @staticmethod
+    def _object_path(bucket: str, path: str) -> str:
+        return f"{quote(bucket)}/{quote(path.lstrip('/'), safe='/')}"
+
+    @staticmethod
+    async def _raise_for_status(response: httpx.Response, action: str) -> None:
+        if not response.is_error:
+            return
+        await response.aread()
+        try:
+            body = response.json()
+            message = body.get("message") or body.get("error") or response.text
+            # Storage API reports missing objects as 400 with statusCode "404"
+            status_code = int(body.get("statusCode") or response.status_code)
+        except (ValueError, AttributeError):
+            message, status_code = response.text, response.status_code
+        raise StorageError(f"Failed to {action}: {message}", status_code)
+
+    async def upload(
+        self,
+        bucket: str,
+        path: str,
+        data: StorageData,
+        content_type: str,
+        *,
+        upsert: bool = False,
+        cache_control: str = "3600",
+        content_length: Optional[int] = None,
+    ) -> None:
+        headers = {
+            "content-type": content_type,
+            "cache-control": f"max-age={cache_control}",
+            "x-upsert": "true" if upsert else "false",
+        }
+        if content_length is not None:
+            headers["content-length"] = str(content_length)
+        response = await self.client.post(
+            f"/object/{self._object_path(bucket, path)}", content=data, headers=headers
+        )
+        await self._raise_for_status(response, f"upload {bucket}/{path}")
+
+    async def open_download(self, bucket: str, path: str) -> StorageDownload:
+        request = self.client.build_request("GET", f"/object/{self._object_path(bucket, path)}")
+        response = await self.client.send(request, stream=True)
+        try:
+            await self._raise_for_status(response, f"download {bucket}/{path}")
+        except StorageError:
+            await response.aclose()
+            raise
+        length = response.headers.get("content-length")
+        return StorageDownload(
+            response.aiter_bytes(DOWNLOAD_CHUNK_SIZE),
+            response.aclose,
+            content_type=response.headers.get("content-type"),
+            content_length=int(length) if length else None,
+        )
+
+    async def remove(self, bucket: str, paths: List[str]) -> None:
+        semaphore = asyncio.Semaphore(MULTI_OBJECT_CONCURRENCY)
+
+        async def remove_batch(batch: List[str]) -> None:
+            async with semaphore:
+                response = await self.client.request(
+                    "DELETE", f"/object/{quote(bucket)}", json={"prefixes": batch}
+                )
+            await self._raise_for_status(response, f"remove {len(batch)} objects from {bucket}")
+
+        await asyncio.gather(*(
+            remove_batch(paths[i:i + REMOVE_BATCH_SIZE]) for i in range(0, len(paths), REMOVE_BATCH_SIZE)
+        ))
+
+    async def list(self, bucket: str, prefix: str, *, limit: int = 1000, offset: int = 0) -> List[Dict]:
+        response = await self.client.post(
+            f"/object/list/{quote(bucket)}",
+            json={
+                "prefix": prefix,
+                "limit": limit,
+                "offset": offset,
+                "sortBy": {"column": "name", "order": "asc"},
+            },
+        )
+        await self._raise_for_status(response, f"list {bucket}/{prefix}")
+        return response.json() or []
+
+    def _absolute_signed_url(self, signed_path: str) -> str:
+        return f"{self.base_url}/{signed_path.lstrip('/')}"
+
+    async def create_signed_url(self, bucket: str, path: str, expires_in: int) -> str:
+        response = await self.client.post(
+            f"/object/sign/{self._object_path(bucket, path)}", json={"expiresIn": expires_in}
+        )
+        await self._raise_for_status(response, f"sign {bucket}/{path}")
+        signed_path = (response.json() or {}).get("signedURL")
+        if not signed_path:
+            raise StorageError("Failed to generate signed URL")
+        return self._absolute_signed_url(signed_path)
+
+    async def create_signed_urls(self, bucket: str, paths: List[str], expires_in: int) -> Dict[str, str]:
+        if not paths:
+            return {}
+        response = await self.client.post(
+            f"/object/sign/{quote(bucket)}", json={"expiresIn": expires_in, "paths": paths}
+        )
+        await self._raise_for_status(response, f"sign {len(paths)} objects in {bucket}")
+        return {
+            item["path"]: self._absolute_signed_url(item["signedURL"])
+            for item in response.json() or []
+            if item.get("signedURL") and not item.get("error")
+        }
+
+    def public_url(self, bucket: str, path: str) -> str:
+        return f"{self.base_url}/object/public/{self._object_path(bucket, path)}"
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class LocalStorageBackend(StorageBackend):
+    """Objects stored as files under root/<bucket>/<path> (tests and development).
+
+    Signed and public URLs are file:// URIs; file I/O runs in worker threads.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root).resolve()
+
+    def _file(self, bucket: str, path: str) -> Path:
+        target = (self.root / bucket / path.lstrip("/")).resolve()
+        if not target.is_relative_to(self.root / bucket):
+            raise StorageError(f"Invalid storage path: {path}", 400)
+        return target
+
+    async def upload(
+        self,
+        bucket: str,
+        path: str,
+        data: StorageData,
+        content_type: str,
+        *,
+        upsert: bool = False,
+        cache_control: str = "3600",
+        content_length: Optional[int] = None,
+    ) -> None:
+        target = self._file(bucket, path)
+        if not upsert and target.exists():
+            raise StorageError(f"Failed to upload {bucket}/{path}: The resource already exists", 409)
+        await asyncio.to_thread(target.parent.mkdir, parents=True, exist_ok=True)
+
+        # Write to a temporary file and rename, so readers never see partial objects
+        partial = target.with_name(f".{target.name}.{uuid.uuid4().hex}.part")
+        handle = await asyncio.to_thread(open, partial, "wb")
+        try:
+            if isinstance(data, (bytes, bytearray)):
+                await asyncio.to_thread(handle.write, data)
+            else:
+                async for chunk in data:
+                    await asyncio.to_thread(handle.write, chunk)
+            await asyncio.to_thread(handle.close)
+            await asyncio.to_thread(os.replace, partial, target)
+        except BaseException:
+            handle.close()
+            partial.unlink(missing_ok=True)
+            raise
+
+    async def open_download(self, bucket: str, path: str) -> StorageDownload:
+        target = self._file(bucket, path)
+        if not target.is_file():
+            raise StorageError(f"Failed to download {bucket}/{path}: Object not found", 404)
+        handle = await asyncio.to_thread(open, target, "rb")
+
+        async def chunks() -> AsyncIterator[bytes]:
+            while chunk := await asyncio.to_thread(handle.read, DOWNLOAD_CHUNK_SIZE):
+                yield chunk
+
+        async def close() -> None:
+            handle.close()
+
+        return StorageDownload(chunks(), close, content_length=target.stat().st_size)
+
+    async def remove(self, bucket: str, paths: List[str]) -> None:
+        for path in paths:
+            await asyncio.to_thread(self._file(bucket, path).unlink, missing_ok=True)
+
+    async def list(self, bucket: str, prefix: str, *, limit: int = 1000, offset: int = 0) -> List[Dict]:
+        directory = self._file(bucket, prefix) if prefix else self.root / bucket
+        if not directory.is_dir():
+            return []
+        names = sorted(
+            entry.name for entry in directory.iterdir()
+            if not (entry.name.startswith(".") and entry.name.endswith(".part"))
+        )
+        return [{"name": name} for name in names[offset:offset + limit]]
+
+    async def create_signed_url(self, bucket: str, path: str, expires_in: int) -> str:
+        target = self._file(bucket, path)
+        if not target.is_file():
+            raise StorageError(f"Failed to sign {bucket}/{path}: Object not found", 404)
+        return target.as_uri()
+
+    async def create_signed_urls(self, bucket: str, paths: List[str], expires_in: int) -> Dict[str, str]:
+        return {
+            path: self._file(bucket, path).as_uri()
+            for path in paths
+            if self._file(bucket, path).is_file()
+        }
+
+    def public_url(self, bucket: str, path: str) -> str:
+        return self._file(bucket, path).as_uri()
+
+
+def create_storage_backend() -> StorageBackend:
+    """Create the backend selected by STORAGE_BACKEND."""
+    if config.STORAGE_BACKEND == "local":
+        logger.info(f"Using local storage backend at {config.STORAGE_LOCAL_ROOT}")
+        return LocalStorageBackend(config.STORAGE_LOCAL_ROOT)
+    if config.STORAGE_BACKEND != "supabase":
+        raise ValueError(f"Unknown STORAGE_BACKEND: {config.STORAGE_BACKEND}")
+    return SupabaseStorageBackend(config.SUPABASE_URL, config.SUPABASE_KEY)
@@ -2,11 +2,15 @@
 
 import logging
 import re
-from typing import Optional, BinaryIO
+from typing import Dict, List, Optional
 from datetime import datetime
-from supabase import create_client
 
 from langconnect import config
+from langconnect.services.storage_backends import (
+    StorageData,
+    StorageDownload,
+    create_storage_backend,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +20,7 @@ CHAT_UPLOADS_BUCKET = "chat-uploads"
 SUPPORT_BUCKET = "support"
 AGENT_OUTPUTS_BUCKET = "agent-outputs"
 SIGNED_URL_EXPIRY_SECONDS = 1800  # 30 minutes
+LIST_PAGE_SIZE = 1000
 
 
 class StorageService:
@@ -26,11 +31,12 @@ class StorageService:
 
         Uses internal URL (SUPABASE_URL) for all storage operations within Docker.
         URLs returned to clients are transformed to use SUPABASE_PUBLIC_URL.
+        Operations go through the async storage gateway (STORAGE_BACKEND).
         """
         # Internal URL for all operations within Docker network
         self.internal_url = config.SUPABASE_URL
         self.public_url = config.SUPABASE_PUBLIC_URL
-        self.client = create_client(self.internal_url, config.SUPABASE_KEY)
+        self.backend = create_storage_backend()
         self.collections_bucket = COLLECTIONS_BUCKET
         self.chat_uploads_bucket = CHAT_UPLOADS_BUCKET
         self.support_bucket = SUPPORT_BUCKET
@@ -95,18 +101,20 @@ class StorageService:
 
     async def upload_image(
         self,
-        file_data: bytes,
+        file_data: StorageData,
         filename: str,
         content_type: str,
-        collection_uuid: str
+        collection_uuid: str,
+        content_length: Optional[int] = None,
     ) -> dict:
         """Upload an image file to Supabase Storage.
 
         Args:
-            file_data: Binary file content
+            file_data: File content (bytes or an async iterable of chunks)
             filename: Original filename
             content_type: MIME type (e.g., 'image/jpeg')
             collection_uuid: UUID of the collection
+            content_length: Size in bytes, if known (for streamed content)
 
         Returns:
             dict with:
@@ -122,14 +130,13 @@ class StorageService:
             file_path = self._generate_storage_path(collection_uuid, filename)
 
             # Upload to Supabase Storage
-            response = self.client.storage.from_(self.collections_bucket).upload(
-                path=file_path,
-                file=file_data,
-                file_options={
-                    "content-type": content_type,
-                    "cache-control": "3600",
-                    "upsert": "false"  # Don't overwrite existing files
-                }
+            await self.backend.upload(
+                self.collections_bucket,
+                file_path,
+                file_data,
+                content_type,
+                upsert=False,  # Don't overwrite existing files
+                content_length=content_length,
             )
 
             logger.info(f"Uploaded image to storage: {file_path}")
@@ -138,7 +145,7 @@ class StorageService:
             storage_uri = f"storage://{self.collections_bucket}/{file_path}"
 
             # Get public URL (if bucket is public)
-            public_url = self.client.storage.from_(self.collections_bucket).get_public_url(file_path)
+            public_url = self.backend.public_url(self.collections_bucket, file_path)
 
             return {
                 "storage_path": storage_uri,
@@ -173,18 +180,20 @@ class StorageService:
 
     async def upload_chat_image(
         self,
-        file_data: bytes,
+        file_data: StorageData,
         filename: str,
         content_type: str,
         user_id: str,
+        content_length: Optional[int] = None,
     ) -> dict:
         """Upload a chat image file to Supabase Storage.
 
         Args:
-            file_data: Binary file content
+            file_data: File content (bytes or an async iterable of chunks)
             filename: Original filename
             content_type: MIME type (e.g., 'image/jpeg')
             user_id: UUID of the user
+            content_length: Size in bytes, if known (for streamed content)
 
         Returns:
             dict with:
@@ -200,14 +209,13 @@ class StorageService:
             file_path = self._generate_chat_storage_path(user_id, filename)
 
             # Upload to Supabase Storage
-            response = self.client.storage.from_(self.chat_uploads_bucket).upload(
-                path=file_path,
-                file=file_data,
-                file_options={
-                    "content-type": content_type,
-                    "cache-control": "3600",
-                    "upsert": "false"  # Don't overwrite existing files
-                }
+            await self.backend.upload(
+                self.chat_uploads_bucket,
+                file_path,
+                file_data,
+                content_type,
+                upsert=False,  # Don't overwrite existing files
+                content_length=content_length,
             )
 
             logger.info(f"Uploaded chat image to storage: {file_path}")
@@ -245,18 +253,20 @@ class StorageService:
 
     async def upload_support_image(
         self,
-        file_data: bytes,
+        file_data: StorageData,
         filename: str,
         content_type: str,
         user_id: str,
+        content_length: Optional[int] = None,
     ) -> dict:
         """Upload a support screenshot to Supabase Storage.
 
         Args:
-            file_data: Binary file content
+            file_data: File content (bytes or an async iterable of chunks)
             filename: Original filename
             content_type: MIME type (e.g., 'image/jpeg')
             user_id: UUID of the user
+            content_length: Size in bytes, if known (for streamed content)
 
         Returns:
             dict with:
@@ -272,14 +282,13 @@ class StorageService:
             file_path = self._generate_support_storage_path(user_id, filename)
 
             # Upload to Supabase Storage
-            response = self.client.storage.from_(self.support_bucket).upload(
-                path=file_path,
-                file=file_data,
-                file_options={
-                    "content-type": content_type,
-                    "cache-control": "3600",
-                    "upsert": "false"  # Don't overwrite existing files
-                }
+            await self.backend.upload(
+                self.support_bucket,
+                file_path,
+                file_data,
+                content_type,
+                upsert=False,  # Don't overwrite existing files
+                content_length=content_length,
             )
 
             logger.info(f"Uploaded support screenshot to storage: {file_path}")
@@ -322,14 +331,7 @@ class StorageService:
             bucket_name = bucket or self.collections_bucket
 
             # Use internal client for API call
-            response = self.client.storage.from_(bucket_name).create_signed_url(
-                path=file_path,
-                expires_in=expiry
-            )
-
-            signed_url = response.get("signedURL")
-            if not signed_url:
-                raise ValueError("Failed to generate signed URL")
+            signed_url = await self.backend.create_signed_url(bucket_name, file_path, expiry)
 
             # Transform to public URL for browser access
             signed_url = self._make_url_public(signed_url)
@@ -341,6 +343,32 @@ class StorageService:
             logger.error(f"Failed to generate signed URL: {e}")
             raise
 
+    async def get_signed_urls(
+        self,
+        file_paths: List[str],
+        expiry_seconds: Optional[int] = None,
+        bucket: Optional[str] = None
+    ) -> Dict[str, str]:
+        """Generate signed URLs for several files of one bucket in one request.
+
+        Args:
+            file_paths: Paths within bucket
+            expiry_seconds: Expiry time in seconds (default: 30 minutes)
+            bucket: Bucket name (default: collections bucket)
+
+        Returns:
+            Signed URLs keyed by file path (files that could not be signed are omitted)
+
+        Raises:
+            Exception: If the request fails
+        """
+        expiry = expiry_seconds or self.signed_url_expiry
+        bucket_name = bucket or self.collections_bucket
+
+        signed_urls = await self.backend.create_signed_urls(bucket_name, file_paths, expiry)
+        logger.debug(f"Generated {len(signed_urls)}/{len(file_paths)} signed URLs in {bucket_name}")
+        return {path: self._make_url_public(url) for path, url in signed_urls.items()}
+
     async def delete_file(self, file_path: str, bucket: Optional[str] = None) -> bool:
         """Delete a file from storage.
 
@@ -356,7 +384,7 @@ class StorageService:
         """
         try:
             bucket_name = bucket or self.collections_bucket
-            self.client.storage.from_(bucket_name).remove([file_path])
+            await self.backend.remove(bucket_name, [file_path])
             logger.info(f"Deleted file from storage: {file_path}")
             return True
 
@@ -364,6 +392,46 @@ class StorageService:
             logger.error(f"Failed to delete file from storage: {e}")
             raise
 
+    async def delete_files(self, file_paths: List[str], bucket: Optional[str] = None) -> int:
+        """Delete several files from one bucket (batched, batches run concurrently).
+
+        Args:
+            file_paths: Paths within bucket
+            bucket: Bucket name (default: collections bucket)
+
+        Returns:
+            Number of files requested for deletion
+
+        Raises:
+            Exception: If deletion fails
+        """
+        if not file_paths:
+            return 0
+        bucket_name = bucket or self.collections_bucket
+        await self.backend.remove(bucket_name, file_paths)
+        logger.info(f"Deleted {len(file_paths)} files from storage bucket {bucket_name}")
+        return len(file_paths)
+
+    async def list_files(self, prefix: str, bucket: Optional[str] = None) -> List[str]:
+        """List the paths of all files directly under a folder.
+
+        Args:
+            prefix: Folder path within bucket (without trailing slash)
+            bucket: Bucket name (default: collections bucket)
+
+        Returns:
+            File paths ({prefix}/{name})
+        """
+        bucket_name = bucket or self.collections_bucket
+        file_paths: List[str] = []
+        offset = 0
+        while True:
+            entries = await self.backend.list(bucket_name, prefix, limit=LIST_PAGE_SIZE, offset=offset)
+            file_paths.extend(f"{prefix}/{entry['name']}" for entry in entries if entry.get("name"))
+            if len(entries) < LIST_PAGE_SIZE:
+                return file_paths
+            offset += LIST_PAGE_SIZE
+
     async def delete_thread_images(self, user_id: str, thread_id: str) -> int:
         """Delete all images associated with a thread.
 
@@ -380,26 +448,14 @@ class StorageService:
         try:
             # List all files in the thread folder
             # Path format: {user_id}/{thread_id}/
-            prefix = f"{user_id}/{thread_id}/"
-
-            # List files with this prefix
-            response = self.client.storage.from_(self.chat_uploads_bucket).list(
-                path=f"{user_id}/{thread_id}"
-            )
-
-            if not response:
-                logger.info(f"No files found for thread {thread_id}")
-                return 0
-
-            # Extract file paths
-            file_paths = [f"{prefix}{file['name']}" for file in response if file.get('name')]
+            file_paths = await self.list_files(f"{user_id}/{thread_id}", bucket=self.chat_uploads_bucket)
 
             if not file_paths:
                 logger.info(f"No files to delete for thread {thread_id}")
                 return 0
 
             # Delete all files
-            self.client.storage.from_(self.chat_uploads_bucket).remove(file_paths)
+            await self.delete_files(file_paths, bucket=self.chat_uploads_bucket)
             logger.info(f"Deleted {len(file_paths)} files from thread {thread_id}")
             return len(file_paths)
 
@@ -456,7 +512,7 @@ class StorageService:
             return await self.get_signed_url(parsed["file_path"])
         else:
             # Get public URL from internal client and transform for external access
-            url = self.client.storage.from_(parsed["bucket"]).get_public_url(parsed["file_path"])
+            url = self.backend.public_url(parsed["bucket"], parsed["file_path"])
             return self._make_url_public(url)
 
     def _generate_agent_output_path(
@@ -483,20 +539,22 @@ class StorageService:
 
     async def upload_agent_output(
         self,
-        file_data: bytes,
+        file_data: StorageData,
         filename: str,
         content_type: str,
         user_id: str,
         thread_id: str,
+        content_length: Optional[int] = None,
     ) -> dict:
         """Upload a file created by an agent to Supabase Storage.
 
         Args:
-            file_data: Binary file content
+            file_data: File content (bytes or an async iterable of chunks)
             filename: Original filename
             content_type: MIME type
             user_id: UUID of the user
             thread_id: UUID of the thread
+            content_length: Size in bytes, if known (for streamed content)
 
         Returns:
             dict with:
@@ -512,14 +570,13 @@ class StorageService:
             file_path = self._generate_agent_output_path(user_id, thread_id, filename)
 
             # Upload to Supabase Storage with upsert to allow updates
-            response = self.client.storage.from_(self.agent_outputs_bucket).upload(
-                path=file_path,
-                file=file_data,
-                file_options={
-                    "content-type": content_type,
-                    "cache-control": "3600",
-                    "upsert": "true"  # Allow updates (for file revisions)
-                }
+            await self.backend.upload(
+                self.agent_outputs_bucket,
+                file_path,
+                file_data,
+                content_type,
+                upsert=True,  # Allow updates (for file revisions)
+                content_length=content_length,
             )
 
             logger.info(f"Uploaded agent output to storage: {file_path}")
@@ -534,12 +591,39 @@ class StorageService:
             logger.error(f"Failed to upload agent output to storage: {e}")
             raise
 
+    async def open_download(self, file_path: str, bucket: str) -> StorageDownload:
+        """Open a streamed download of a file.
+
+        Iterate the returned StorageDownload to stream the content (e.g. into a
+        StreamingResponse) without holding the whole file in memory.
+
+        Args:
+            file_path: Path within bucket
+            bucket: Bucket name
+
+        Returns:
+            Open StorageDownload
+
+        Raises:
+            StorageError: If the file does not exist (status_code 404) or the download fails
+        """
+        try:
+            download = await self.backend.open_download(bucket, file_path)
+            logger.debug(f"Opened download from storage: {bucket}/{file_path}")
+            return download
+
+        except Exception as e:
+            logger.error(f"Failed to download {bucket}/{file_path} from storage: {e}")
+            raise
+
     async def download_agent_output(
         self,
         storage_path: str,
     ) -> bytes:
         """Download a file from agent outputs storage.
 
+        Prefer open_download() for large files.
+
         Args:
             storage_path: Path within the agent-outputs bucket
 
@@ -549,17 +633,8 @@ class StorageService:
         Raises:
             Exception: If download fails
         """
-        try:
-            response = self.client.storage.from_(self.agent_outputs_bucket).download(
-                path=storage_path
-            )
-
-            logger.debug(f"Downloaded agent output from storage: {storage_path}")
-            return response
-
-        except Exception as e:
-            logger.error(f"Failed to download agent output from storage: {e}")
-            raise
+        download = await self.open_download(storage_path, self.agent_outputs_bucket)
+        return await download.read()
 
     async def download_chat_upload(
         self,
@@ -567,6 +642,8 @@ class StorageService:
     ) -> bytes:
         """Download a file from chat uploads storage.
 
+        Prefer open_download() for large files.
+
         Args:
             storage_path: Path within the chat-uploads bucket
 
@@ -576,17 +653,12 @@ class StorageService:
         Raises:
             Exception: If download fails
         """
-        try:
-            response = self.client.storage.from_(self.chat_uploads_bucket).download(
-                path=storage_path
-            )
-
-            logger.debug(f"Downloaded chat upload from storage: {storage_path}")
-            return response
+        download = await self.open_download(storage_path, self.chat_uploads_bucket)
+        return await download.read()
 
-        except Exception as e:
-            logger.error(f"Failed to download chat upload from storage: {e}")
-            raise
+    async def close(self) -> None:
+        """Release pooled storage connections (app shutdown)."""
+        await self.backend.aclose()
 
 
 # Global service instance
@@ -4,8 +4,15 @@ Thread Naming Service
 AI-powered automatic thread naming and summarization using GPT-5 nano.
 Generates concise names and detailed summaries from conversation history.
 Features token limiting to prevent excessive costs on long conversations.
+
+Batches are claimed with FOR UPDATE SKIP LOCKED (so concurrent workers never
+name the same thread) and processed with bounded concurrency; database
+connections are only held for the claim and the final update, never across
+LangGraph or LLM calls.
 """
 
+import asyncio
+import functools
 import logging
 import re
 from typing import Optional, List, Dict, Any
@@ -25,9 +32,21 @@ env = Config()
 THREAD_NAMING_ENABLED = env("THREAD_NAMING_ENABLED", cast=str, default="true").lower() == "true"
 THREAD_NAMING_MODEL = env("THREAD_NAMING_MODEL", cast=str, default="gpt-5-nano")
 MAX_TOKENS_FOR_NAMING = env("MAX_TOKENS_FOR_NAMING", cast=int, default=20000)
+THREAD_NAMING_CONCURRENCY = env("THREAD_NAMING_CONCURRENCY", cast=int, default=4)
 OPENAI_API_KEY = env("OPENAI_API_KEY", cast=str, default="")
 
 
+@functools.lru_cache(maxsize=1)
+def _get_encoding() -> "tiktoken.Encoding":
+    """Tokenizer for token limiting (loaded once per process)."""
+    try:
+        # Initialize tokenizer for gpt-5 (uses same encoding as gpt-4)
+        return tiktoken.encoding_for_model("gpt-4")
+    except KeyError:
+        # Fallback to cl100k_base encoding (used by GPT-4/GPT-5)
+        return tiktoken.get_encoding("cl100k_base")
+
+
 class ThreadNamingSummary(BaseModel):
     """Structured output from LLM for thread naming."""
 
@@ -84,7 +103,9 @@ class ThreadNamingService:
         """
         Fetch conversation messages from LangGraph API.
 
-        Filters to only human and AI messages (excludes tool calls).
+        Reads only the latest thread state (not the full checkpoint history)
+        and de-duplicates messages by id. Filters to only human and AI
+        messages (excludes tool calls).
 
         Args:
             thread_id: UUID of the thread
@@ -97,34 +118,36 @@ class ThreadNamingService:
             RuntimeError: If LangGraph API request fails
         """
         try:
-            # Fetch thread history from LangGraph
-            # LangGraph stores messages in thread state
+            # The latest state holds the full conversation; the history endpoint
+            # would return it again once per checkpoint
+            # ThreadState: {values: {...}, next: [...], checkpoint: {...}, metadata: {...}, ...}
             response = await self.langgraph_service._make_request(
                 method="GET",
-                endpoint=f"/threads/{thread_id}/history",
+                endpoint=f"/threads/{thread_id}/state",
                 user_token=user_token
             )
 
-            # Extract messages from response
-            # LangGraph history format: Array of ThreadState objects
-            # Each ThreadState: {values: {...}, next: [...], checkpoint: {...}, metadata: {...}, ...}
-            thread_states = response if isinstance(response, list) else []
+            state_values = response.get("values") if isinstance(response, dict) else None
+            messages = state_values.get("messages", []) if isinstance(state_values, dict) else []
             all_messages = []
-
-            for state in thread_states:
-                # Extract values from each ThreadState
-                state_values = state.get("values", {})
-                messages = state_values.get("messages", [])
-                for msg in messages:
-                    # Only include human and AI messages
-                    msg_type = msg.get("type", "")
-                    if msg_type in ["human", "ai"]:
-                        content = self._extract_message_content(msg)
-                        if content:  # Skip empty messages
-                            all_messages.append({
-                                "role": "human" if msg_type == "human" else "ai",
-                                "content": content
-                            })
+            seen_ids = set()
+
+            for msg in messages:
+                msg_id = msg.get("id")
+                if msg_id:
+                    if msg_id in seen_ids:
+                        continue
+                    seen_ids.add(msg_id)
+
+                # Only include human and AI messages
+                msg_type = msg.get("type", "")
+                if msg_type in ["human", "ai"]:
+                    content = self._extract_message_content(msg)
+                    if content:  # Skip empty messages
+                        all_messages.append({
+                            "role": "human" if msg_type == "human" else "ai",
+                            "content": content
+                        })
 
             log.info(f"Fetched {len(all_messages)} messages for thread {thread_id}")
             return all_messages
@@ -201,19 +224,21 @@ class ThreadNamingService:
         Returns:
             Formatted markdown string
         """
-        formatted_lines = []
-
-        for msg in messages:
-            role = msg["role"]
-            content = msg["content"]
+        formatted_lines = [
+            line for line in (self._format_message(msg) for msg in messages) if line
+        ]
+        return "\n\n".join(formatted_lines)
 
-            # Format as markdown
-            if role == "human":
-                formatted_lines.append(f"**User**: {content}")
-            elif role == "ai":
-                formatted_lines.append(f"**Assistant**: {content}")
+    def _format_message(self, message: Dict[str, Any]) -> str:
+        """Format a single message as markdown (empty for unknown roles)."""
+        role = message["role"]
+        content = message["content"]
 
-        return "\n\n".join(formatted_lines)
+        if role == "human":
+            return f"**User**: {content}"
+        if role == "ai":
+            return f"**Assistant**: {content}"
+        return ""
 
     def _trim_messages_to_token_limit(
         self,
@@ -223,8 +248,9 @@ class ThreadNamingService:
         """
         Trim messages to stay under token limit by removing earliest messages.
 
-        Strategy: Keep removing the oldest messages until we're under the limit.
-        This preserves recent context which is more important for naming.
+        Strategy: Keep the newest messages whose cumulative token count fits
+        the limit. This preserves recent context which is more important for
+        naming. Each message is tokenized once.
 
         Args:
             messages: List of message dictionaries
@@ -236,31 +262,27 @@ class ThreadNamingService:
         if not messages:
             return messages
 
-        try:
-            # Initialize tokenizer for gpt-5 (uses same encoding as gpt-4)
-            encoding = tiktoken.encoding_for_model("gpt-4")
-        except KeyError:
-            # Fallback to cl100k_base encoding (used by GPT-4/GPT-5)
-            encoding = tiktoken.get_encoding("cl100k_base")
+        encoding = _get_encoding()
 
-        # Count tokens for all messages
-        formatted = self._format_messages_for_llm(messages)
-        total_tokens = len(encoding.encode(formatted))
+        # Per-message token counts; the "\n\n" separator between messages is one token
+        token_counts = [
+            len(encoding.encode(self._format_message(msg))) + 1 for msg in messages
+        ]
+        total_tokens = sum(token_counts)
 
         # If already under limit, return as-is
         if total_tokens <= max_tokens:
             log.info(f"Messages within token limit: {total_tokens}/{max_tokens} tokens")
             return messages
 
-        # Trim from the start (earliest messages)
-        trimmed_messages = messages.copy()
-        while total_tokens > max_tokens and len(trimmed_messages) > 5:
-            # Always keep at least 5 messages for context
-            trimmed_messages.pop(0)  # Remove oldest message
-            formatted = self._format_messages_for_llm(trimmed_messages)
-            total_tokens = len(encoding.encode(formatted))
+        # Drop from the start (earliest messages), always keeping at least 5 for context
+        start = 0
+        while total_tokens > max_tokens and len(messages) - start > 5:
+            total_tokens -= token_counts[start]
+            start += 1
+        trimmed_messages = messages[start:]
 
-        removed_count = len(messages) - len(trimmed_messages)
+        removed_count = start
         log.info(
             f"Trimmed {removed_count} messages to fit token limit: "
             f"{total_tokens}/{max_tokens} tokens ({len(trimmed_messages)} messages kept)"
@@ -337,45 +359,70 @@ class ThreadNamingService:
         self,
         thread_id: str,
         name: str,
-        summary: str
-    ):
+        summary: str,
+        claimed_message_count: Optional[int] = None
+    ) -> bool:
         """
         Update thread mirror with AI-generated name and summary.
 
+        The update is skipped if the user renamed the thread while it was being
+        named. The thread stays queued only if messages arriving since it was
+        claimed crossed a naming interval (1, 5, 10, 15...), mirroring the
+        touch endpoint; otherwise a naming that raced a message would be
+        repeated for no new interval.
+
         Args:
             thread_id: UUID of the thread
             name: Generated thread name
             summary: Generated thread summary
+            claimed_message_count: message_count when the thread was claimed
+
+        Returns:
+            True if the thread was updated
         """
         async with self.db_pool.acquire() as conn:
-            await conn.execute(
+            status = await conn.execute(
                 """
                 UPDATE langconnect.threads_mirror
                 SET
                     name = $2,
                     summary = $3,
                     last_naming_at = NOW(),
-                    needs_naming = false,
+                    needs_naming = CASE
+                        WHEN $4::int IS NULL THEN false
+                        -- A naming interval was reached after the claim
+                        WHEN $4::int < 1 AND message_count >= 1 THEN needs_naming
+                        WHEN message_count / 5 > $4::int / 5 THEN needs_naming
+                        ELSE false
+                    END,
                     updated_at = NOW()
                 WHERE thread_id = $1
+                  AND user_renamed = false
                 """,
                 thread_id,
                 name,
-                summary
+                summary,
+                claimed_message_count
             )
 
+            if status.endswith(" 0"):
+                log.info(f"Thread {thread_id} was renamed by its user during naming, keeping user name")
+                return False
+
             # Increment threads version for cache invalidation
             await conn.fetchval(
                 "SELECT langconnect.increment_cache_version('threads')"
             )
 
             log.info(f"Updated thread {thread_id} with AI-generated name and summary")
+            return True
 
     async def process_thread(
         self,
         thread_id: str,
         user_id: str,
-        user_token: Optional[str] = None
+        user_token: Optional[str] = None,
+        claimed_message_count: Optional[int] = None
     ) -> bool:
         """
         Main processing function for a single thread.
@@ -389,6 +436,7 @@ class ThreadNamingService:
             thread_id: UUID of the thread
             user_id: User ID who owns the thread
             user_token: Optional user JWT for scoped access
+            claimed_message_count: message_count when the thread was claimed for naming
 
         Returns:
             True if successful, False if failed
@@ -407,11 +455,14 @@ class ThreadNamingService:
             result = await self.generate_name_and_summary(messages)
 
             # 3. Update database
-            await self.update_thread_mirror(
+            updated = await self.update_thread_mirror(
                 thread_id=thread_id,
                 name=result.name,
-                summary=result.summary
+                summary=result.summary,
+                claimed_message_count=claimed_message_count
             )
+            if not updated:
+                return False
 
             log.info(f"Successfully named thread {thread_id}: '{result.name}'")
             return True
@@ -420,19 +471,66 @@ class ThreadNamingService:
             log.error(f"Failed to process thread {thread_id}: {e}", exc_info=True)
             return False
 
+    async def claim_threads(
+        self,
+        limit: int,
+        min_interval_seconds: int
+    ) -> List[asyncpg.Record]:
+        """
+        Claim a batch of threads needing naming.
+
+        Rows locked by another worker are skipped, and claimed threads get
+        last_naming_at = NOW(), so they are not claimed again for
+        min_interval_seconds whether naming succeeds, fails or the worker dies.
+
+        Args:
+            limit: Maximum number of threads to claim
+            min_interval_seconds: Minimum seconds since last naming attempt
+
+        Returns:
+            Claimed rows with thread_id, user_id and message_count
+        """
+        async with self.db_pool.acquire() as conn:
+            return await conn.fetch(
+                """
+                UPDATE langconnect.threads_mirror AS t
+                SET last_naming_at = NOW()
+                FROM (
+                    SELECT thread_id
+                    FROM langconnect.threads_mirror
+                    WHERE needs_naming = true
+                      AND user_renamed = false
+                      AND (last_naming_at IS NULL
+                           OR last_naming_at < NOW() - INTERVAL '1 second' * $2)
+                    ORDER BY last_message_at DESC
+                    LIMIT $1
+                    FOR UPDATE SKIP LOCKED
+                ) AS claimed
+                WHERE t.thread_id = claimed.thread_id
+                RETURNING t.thread_id, t.user_id, t.message_count
+                """,
+                limit,
+                min_interval_seconds
+            )
+
     async def process_batch(
         self,
         limit: int = 5,
-        min_interval_seconds: int = 60
+        min_interval_seconds: int = 60,
+        concurrency: int = THREAD_NAMING_CONCURRENCY
     ) -> Dict[str, int]:
         """
         Process a batch of threads needing naming.
 
         Used by background scheduler to process multiple threads efficiently.
+        Threads are claimed in one short transaction and then named
+        concurrently (at most ``concurrency`` at a time) without holding a
+        database connection.
 
         Args:
             limit: Maximum number of threads to process in this batch
             min_interval_seconds: Minimum seconds since last naming attempt
+            concurrency: Maximum threads named at the same time
 
         Returns:
             Dictionary with counts: {'processed': N, 'succeeded': M, 'failed': K}
@@ -441,55 +539,38 @@ class ThreadNamingService:
             log.debug("Thread naming disabled via THREAD_NAMING_ENABLED=false")
             return {"processed": 0, "succeeded": 0, "failed": 0}
 
-        async with self.db_pool.acquire() as conn:
-            # Fetch threads needing naming
-            threads = await conn.fetch(
-                """
-                SELECT thread_id, user_id
-                FROM langconnect.threads_mirror
-                WHERE needs_naming = true
-                  AND user_renamed = false
-                  AND (last_naming_at IS NULL
-                       OR last_naming_at < NOW() - INTERVAL '1 second' * $2)
-                ORDER BY last_message_at DESC
-                LIMIT $1
-                """,
-                limit,
-                min_interval_seconds
-            )
+        threads = await self.claim_threads(limit, min_interval_seconds)
 
-            if not threads:
-                log.debug("No threads needing naming found")
-                return {"processed": 0, "succeeded": 0, "failed": 0}
+        if not threads:
+            log.debug("No threads needing naming found")
+            return {"processed": 0, "succeeded": 0, "failed": 0}
 
-            log.info(f"Processing {len(threads)} threads for naming")
+        log.info(f"Processing {len(threads)} threads for naming (concurrency={concurrency})")
 
-            succeeded = 0
-            failed = 0
+        semaphore = asyncio.Semaphore(max(1, concurrency))
 
-            for thread in threads:
+        async def run(thread: asyncpg.Record) -> bool:
+            async with semaphore:
                 try:
-                    success = await self.process_thread(
+                    return await self.process_thread(
                         thread_id=str(thread["thread_id"]),
-                        user_id=thread["user_id"]
+                        user_id=thread["user_id"],
+                        claimed_message_count=thread["message_count"]
                     )
-
-                    if success:
-                        succeeded += 1
-                    else:
-                        failed += 1
-
                 except Exception as e:
                     log.error(f"Error processing thread {thread['thread_id']}: {e}")
-                    failed += 1
-                    continue
-
-            log.info(f"Batch complete: {succeeded} succeeded, {failed} failed")
-            return {
-                "processed": len(threads),
-                "succeeded": succeeded,
-                "failed": failed
-            }
+                    return False
+
+        results = await asyncio.gather(*(run(thread) for thread in threads))
+        succeeded = sum(1 for success in results if success)
+        failed = len(results) - succeeded
+
+        log.info(f"Batch complete: {succeeded} succeeded, {failed} failed")
+        return {
+            "processed": len(threads),
+            "succeeded": succeeded,
+            "failed": failed
+        }
 
 
 def get_thread_naming_service(db_pool: asyncpg.Pool) -> ThreadNamingService:
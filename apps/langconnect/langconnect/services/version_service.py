@@ -2,8 +2,9 @@
 Assistant Version History Service
 
 This service manages version history for assistants:
-- Fetches versions from LangGraph SDK
-- Mirrors versions to local database for fast reads
+- Mirrors versions from LangGraph SDK to the local database, incrementally
+  from the highest synced version
+- Serves version history from the local database with keyset pagination
 - Stores optional commit messages (local-only metadata)
 - Restores previous versions by creating new versions with old config
 """
@@ -38,353 +39,259 @@ class VersionService:
         user_token: Optional[str] = None,
         limit: int = 50,
         offset: int = 0,
+        before_version: Optional[int] = None,
     ) -> AssistantVersionsResponse:
         """
         Fetch version history for an assistant.
 
-        First tries to fetch from LangGraph Cloud (if available), then falls back
-        to local-only version history. Local development servers don't support
-        the versioning API.
+        History is served from the local assistant_versions table. LangGraph is
+        only contacted when the mirrored assistant is at a newer version than
+        the last sync, and then only the missing versions are written.
 
         Args:
             assistant_id: Assistant to get versions for
             user_token: User JWT for LangGraph auth
             limit: Max versions to return
-            offset: Pagination offset
+            offset: Pagination offset (prefer before_version)
+            before_version: Keyset cursor; return versions older than this one
 
         Returns:
-            AssistantVersionsResponse with version list
+            AssistantVersionsResponse with version list (newest first)
         """
         try:
             log.info(f"Fetching versions for assistant {assistant_id}")
 
-            # Get current assistant info for name and latest version
-            current_assistant = await self.langgraph_service._make_request(
-                "GET",
-                f"assistants/{assistant_id}",
-                user_token=user_token,
-            )
+            state = await self._get_history_state(assistant_id)
+            if state is None:
+                # Not mirrored yet; the version table references the mirror
+                from langconnect.services.langgraph_sync import LangGraphSyncService
+                await LangGraphSyncService(self.langgraph_service).sync_assistant(assistant_id, user_token=user_token)
+                state = await self._get_history_state(assistant_id)
+                if state is None:
+                    raise RuntimeError(f"Assistant {assistant_id} not found")
 
-            current_name = current_assistant.get("name", "Unknown") if current_assistant else "Unknown"
-            current_version = current_assistant.get("version", 1) if current_assistant else 1
+            synced_version = state["synced_version"]
+            if synced_version is None or state["version"] > synced_version:
+                if await self._sync_new_versions(assistant_id, synced_version, user_token=user_token):
+                    state = await self._get_history_state(assistant_id)
 
-            # Try to fetch versions from LangGraph Cloud (may not be available in dev)
-            langgraph_versions = []
-            try:
-                versions_data = await self.langgraph_service._make_request(
-                    "GET",
-                    f"assistants/{assistant_id}/versions",
-                    user_token=user_token,
+            latest_version = state["version"]
+
+            async with get_db_connection() as conn:
+                rows = await conn.fetch(
+                    """
+                    SELECT
+                        av.version,
+                        av.name,
+                        av.description,
+                        av.config,
+                        av.metadata,
+                        av.tags,
+                        av.commit_message,
+                        av.created_by,
+                        av.langgraph_created_at,
+                        ur.display_name as created_by_display_name
+                    FROM langconnect.assistant_versions av
+                    LEFT JOIN langconnect.user_roles ur ON av.created_by = ur.user_id
+                    WHERE av.assistant_id = $1
+                      AND ($2::INTEGER IS NULL OR av.version < $2)
+                    ORDER BY av.version DESC
+                    LIMIT $3 OFFSET $4
+                    """,
+                    UUID(assistant_id),
+                    before_version,
+                    limit,
+                    offset,
                 )
-                if versions_data:
-                    if isinstance(versions_data, dict):
-                        langgraph_versions = [versions_data]
-                    else:
-                        langgraph_versions = versions_data
-                log.info(f"Got {len(langgraph_versions)} versions from LangGraph API")
-            except Exception as lg_error:
-                # LangGraph versioning API not available (e.g., local dev server)
-                log.info(f"LangGraph versioning API not available, using local-only history: {lg_error}")
-
-            # Get versions from local DB (may include versions not in LangGraph)
-            enriched_versions = await self._get_local_versions_with_current(
-                assistant_id,
-                langgraph_versions,
-                current_assistant,
-                current_version,
-            )
 
-            # Apply pagination
-            paginated_versions = enriched_versions[offset:offset + limit]
+            versions = [self._row_to_version_info(row, latest_version) for row in rows]
 
             return AssistantVersionsResponse(
                 assistant_id=assistant_id,
-                assistant_name=current_name,
-                versions=paginated_versions,
-                total_versions=len(enriched_versions),
-                latest_version=current_version,
+                assistant_name=state["name"],
+                versions=versions,
+                total_versions=state["total_versions"],
+                latest_version=latest_version,
+                next_before_version=versions[-1].version if len(versions) == limit and versions[-1].version > 1 else None,
             )
 
         except Exception as e:
             log.error(f"Failed to get versions for assistant {assistant_id}: {e}")
             raise RuntimeError(f"Failed to get version history: {e}")
 
-    async def _get_local_versions_with_current(
-        self,
-        assistant_id: str,
-        langgraph_versions: List[Dict[str, Any]],
-        current_assistant: Dict[str, Any],
-        current_version: int,
-    ) -> List[AssistantVersionInfo]:
+    async def _get_history_state(self, assistant_id: str) -> Optional[Dict[str, Any]]:
         """
-        Get versions from local DB, merging with LangGraph versions if available.
-        Always includes the current version from the assistant.
-
-        Args:
-            assistant_id: Assistant ID
-            langgraph_versions: Versions from LangGraph API (may be empty)
-            current_assistant: Current assistant data
-            current_version: Current version number
+        Get the mirrored assistant's name and version with the sync watermark
+        and the number of stored versions (one query).
 
         Returns:
-            List of AssistantVersionInfo sorted by version descending
+            Dict with name, version, synced_version and total_versions, or None
+            if the assistant is not in the mirror
         """
-        versions_dict: Dict[int, AssistantVersionInfo] = {}
-
         async with get_db_connection() as conn:
-            # Get all local versions with commit messages
-            local_versions = await conn.fetch(
+            row = await conn.fetchrow(
                 """
                 SELECT
-                    av.version,
-                    av.name,
-                    av.description,
-                    av.config,
-                    av.metadata,
-                    av.tags,
-                    av.commit_message,
-                    av.created_by,
-                    av.langgraph_created_at,
-                    ur.display_name as created_by_display_name
-                FROM langconnect.assistant_versions av
-                LEFT JOIN langconnect.user_roles ur ON av.created_by = ur.user_id
-                WHERE av.assistant_id = $1
-                ORDER BY av.version DESC
+                    am.name,
+                    am.version,
+                    avs.synced_version,
+                    (SELECT COUNT(*) FROM langconnect.assistant_versions av
+                     WHERE av.assistant_id = am.assistant_id) AS total_versions
+                FROM langconnect.assistants_mirror am
+                LEFT JOIN langconnect.assistant_version_sync avs ON avs.assistant_id = am.assistant_id
+                WHERE am.assistant_id = $1
                 """,
                 UUID(assistant_id)
             )
+        return dict(row) if row else None
 
-            # Add local versions to dict
-            for row in local_versions:
-                version_num = row["version"]
-                config = row["config"]
-                if isinstance(config, str):
-                    config = json.loads(config) if config else {}
-
-                metadata = row["metadata"]
-                if isinstance(metadata, str):
-                    metadata = json.loads(metadata) if metadata else {}
-
-                created_at = row["langgraph_created_at"]
-                if created_at:
-                    created_at_str = created_at.isoformat()
-                else:
-                    created_at_str = datetime.now(timezone.utc).isoformat()
-
-                # Get tags from tags column first, fall back to metadata._x_oap_tags
-                tags = row["tags"] if row["tags"] else []
-                if not tags and config:
-                    # Try to get from metadata if tags column is empty
-                    row_metadata = row["metadata"]
-                    if isinstance(row_metadata, str):
-                        try:
-                            row_metadata = json.loads(row_metadata) if row_metadata else {}
-                        except:
-                            row_metadata = {}
-                    if row_metadata:
-                        tags = row_metadata.get("_x_oap_tags", [])
-
-                versions_dict[version_num] = AssistantVersionInfo(
-                    version=version_num,
-                    name=row["name"] or "",
-                    description=row["description"],
-                    config=config,
-                    metadata=metadata,
-                    tags=tags,
-                    commit_message=row["commit_message"],
-                    created_by=row["created_by"],
-                    created_by_display_name=row["created_by_display_name"],
-                    created_at=created_at_str,
-                    is_latest=(version_num == current_version),
-                )
-
-            # Merge LangGraph versions (if any)
-            for v in langgraph_versions:
-                version_num = v.get("version", 1)
-                if version_num not in versions_dict:
-                    created_at_raw = v.get("created_at") or v.get("updated_at", "")
-                    try:
-                        if created_at_raw:
-                            created_at = datetime.fromisoformat(created_at_raw.replace("Z", "+00:00"))
-                        else:
-                            created_at = datetime.now(timezone.utc)
-                    except ValueError:
-                        created_at = datetime.now(timezone.utc)
-
-                    # Extract tags from metadata._x_oap_tags (LangGraph SDK workaround)
-                    lg_tags = v.get("metadata", {}).get("_x_oap_tags", []) if v.get("metadata") else []
-
-                    versions_dict[version_num] = AssistantVersionInfo(
-                        version=version_num,
-                        name=v.get("name", ""),
-                        description=v.get("description"),
-                        config=v.get("config", {}),
-                        metadata=v.get("metadata"),
-                        tags=lg_tags,
-                        commit_message=None,
-                        created_by=None,
-                        created_by_display_name=None,
-                        created_at=created_at.isoformat(),
-                        is_latest=(version_num == current_version),
-                    )
-
-            # Always ensure current version is included AND saved to DB
-            if current_version not in versions_dict and current_assistant:
-                created_at_raw = current_assistant.get("created_at") or current_assistant.get("updated_at", "")
-                try:
-                    if created_at_raw:
-                        created_at = datetime.fromisoformat(created_at_raw.replace("Z", "+00:00"))
-                    else:
-                        created_at = datetime.now(timezone.utc)
-                except ValueError:
-                    created_at = datetime.now(timezone.utc)
-
-                # Get tags from metadata (stored with _x_oap_tags prefix - LangGraph SDK workaround)
-                current_tags = current_assistant.get("metadata", {}).get("_x_oap_tags", []) if current_assistant.get("metadata") else []
-
-                # Save this version to DB so it persists for future lookups and restores
-                try:
-                    await conn.execute(
-                        """
-                        INSERT INTO langconnect.assistant_versions (
-                            assistant_id, version, name, description, config, metadata, tags,
-                            langgraph_created_at, commit_message, created_by
-                        ) VALUES ($1, $2, $3, $4, $5::jsonb, $6::jsonb, $7, $8, $9, $10)
-                        ON CONFLICT (assistant_id, version) DO NOTHING
-                        """,
-                        UUID(assistant_id),
-                        current_version,
-                        current_assistant.get("name", ""),
-                        current_assistant.get("description"),
-                        json.dumps(current_assistant.get("config", {})),
-                        json.dumps(current_assistant.get("metadata") or {}),
-                        current_tags,
-                        created_at,
-                        None,  # No commit message for auto-saved versions
-                        None,  # No user for auto-saved versions
-                    )
-                    log.info(f"Auto-saved current version {current_version} for assistant {assistant_id}")
-                except Exception as save_error:
-                    log.warning(f"Failed to auto-save version {current_version}: {save_error}")
-
-                versions_dict[current_version] = AssistantVersionInfo(
-                    version=current_version,
-                    name=current_assistant.get("name", ""),
-                    description=current_assistant.get("description"),
-                    config=current_assistant.get("config", {}),
-                    metadata=current_assistant.get("metadata"),
-                    tags=current_tags,
-                    commit_message=None,
-                    created_by=None,
-                    created_by_display_name=None,
-                    created_at=created_at.isoformat(),
-                    is_latest=True,
-                )
-
-        # Sort by version descending
-        return sorted(versions_dict.values(), key=lambda x: x.version, reverse=True)
-
-    async def _sync_and_enrich_versions(
+    async def _sync_new_versions(
         self,
         assistant_id: str,
-        langgraph_versions: List[Dict[str, Any]],
-        current_version: int,
-    ) -> List[AssistantVersionInfo]:
+        synced_version: Optional[int],
+        *,
+        user_token: Optional[str] = None,
+    ) -> bool:
         """
-        Sync versions to local DB and enrich with local metadata.
+        Mirror versions newer than synced_version from LangGraph.
+
+        Inserts all new versions with one multi-row INSERT (existing rows and
+        their commit messages are kept) and advances the sync watermark in the
+        same transaction.
 
         Args:
             assistant_id: Assistant ID
-            langgraph_versions: Versions from LangGraph
-            current_version: Current/latest version number
+            synced_version: Highest version already synced (None = never synced)
+            user_token: User JWT for LangGraph auth
 
         Returns:
-            List of enriched AssistantVersionInfo
+            True if the sync ran, False if LangGraph could not be reached
         """
-        enriched = []
-
-        async with get_db_connection() as conn:
-            # Get existing local versions with commit messages
-            local_versions = await conn.fetch(
-                """
-                SELECT
-                    av.version,
-                    av.commit_message,
-                    av.created_by,
-                    ur.display_name as created_by_display_name
-                FROM langconnect.assistant_versions av
-                LEFT JOIN langconnect.user_roles ur ON av.created_by = ur.user_id
-                WHERE av.assistant_id = $1
-                """,
-                UUID(assistant_id)
+        try:
+            current_assistant = await self.langgraph_service._make_request(
+                "GET",
+                f"assistants/{assistant_id}",
+                user_token=user_token,
             )
+        except Exception as e:
+            log.warning(f"Could not fetch assistant {assistant_id} for version sync: {e}")
+            return False
+        if not current_assistant:
+            return False
 
-            # Create lookup dict for local metadata
-            local_metadata = {
-                row["version"]: {
-                    "commit_message": row["commit_message"],
-                    "created_by": row["created_by"],
-                    "created_by_display_name": row["created_by_display_name"],
-                }
-                for row in local_versions
-            }
-
-            # Process each LangGraph version
-            for v in langgraph_versions:
-                version_num = v.get("version", 1)
-
-                # Parse created_at timestamp
-                created_at_raw = v.get("created_at") or v.get("updated_at", "")
-                try:
-                    if created_at_raw:
-                        created_at = datetime.fromisoformat(created_at_raw.replace("Z", "+00:00"))
-                    else:
-                        created_at = datetime.now(timezone.utc)
-                except ValueError:
-                    created_at = datetime.now(timezone.utc)
+        current_version = current_assistant.get("version", 1)
 
-                # Get tags from metadata (stored with _x_oap_tags prefix - LangGraph SDK workaround)
-                version_tags = v.get("metadata", {}).get("_x_oap_tags", []) if v.get("metadata") else []
+        # LangGraph Cloud only; local development servers don't support the versioning API
+        langgraph_versions: List[Dict[str, Any]] = []
+        try:
+            versions_data = await self.langgraph_service._make_request(
+                "GET",
+                f"assistants/{assistant_id}/versions",
+                user_token=user_token,
+            )
+            if versions_data:
+                langgraph_versions = [versions_data] if isinstance(versions_data, dict) else versions_data
+        except Exception as lg_error:
+            log.info(f"LangGraph versioning API not available, syncing current version only: {lg_error}")
+
+        new_versions: Dict[int, Dict[str, Any]] = {v.get("version", 1): v for v in langgraph_versions}
+        # Always include the current version (the only one known without the versioning API)
+        new_versions.setdefault(current_version, current_assistant)
+        if synced_version is not None:
+            new_versions = {num: v for num, v in new_versions.items() if num > synced_version}
+
+        numbers, names, descriptions, configs, metadatas, tags, created_ats = [], [], [], [], [], [], []
+        for num, v in sorted(new_versions.items()):
+            metadata = v.get("metadata") or {}
+            numbers.append(num)
+            names.append(v.get("name", ""))
+            descriptions.append(v.get("description"))
+            configs.append(json.dumps(v.get("config", {})))
+            metadatas.append(json.dumps(metadata))
+            # Tags are stored in metadata with _x_oap_tags prefix (LangGraph SDK workaround)
+            tags.append(json.dumps(metadata.get("_x_oap_tags", [])))
+            created_ats.append(self._parse_timestamp(v.get("created_at") or v.get("updated_at")))
 
-                # Upsert to local DB (only inserts if not exists)
+        async with get_db_connection() as conn:
+            async with conn.transaction():
+                if numbers:
+                    await conn.execute(
+                        """
+                        INSERT INTO langconnect.assistant_versions (
+                            assistant_id, version, name, description, config, metadata, tags,
+                            langgraph_created_at
+                        )
+                        SELECT $1, v.version, v.name, v.description, v.config::jsonb, v.metadata::jsonb,
+                               ARRAY(SELECT jsonb_array_elements_text(v.tags::jsonb)), v.created_at
+                        FROM unnest($2::INTEGER[], $3::TEXT[], $4::TEXT[], $5::TEXT[], $6::TEXT[], $7::TEXT[], $8::TIMESTAMPTZ[])
+                            AS v(version, name, description, config, metadata, tags, created_at)
+                        ON CONFLICT (assistant_id, version) DO NOTHING
+                        """,
+                        UUID(assistant_id),
+                        numbers,
+                        names,
+                        descriptions,
+                        configs,
+                        metadatas,
+                        tags,
+                        created_ats,
+                    )
                 await conn.execute(
                     """
-                    INSERT INTO langconnect.assistant_versions (
-                        assistant_id, version, name, description, config, metadata, tags, langgraph_created_at
-                    ) VALUES ($1, $2, $3, $4, $5::jsonb, $6::jsonb, $7, $8)
-                    ON CONFLICT (assistant_id, version) DO NOTHING
+                    INSERT INTO langconnect.assistant_version_sync (assistant_id, synced_version)
+                    VALUES ($1, $2)
+                    ON CONFLICT (assistant_id) DO UPDATE SET
+                        synced_version = GREATEST(langconnect.assistant_version_sync.synced_version, EXCLUDED.synced_version),
+                        synced_at = NOW()
                     """,
                     UUID(assistant_id),
-                    version_num,
-                    v.get("name", ""),
-                    v.get("description"),
-                    json.dumps(v.get("config", {})),
-                    json.dumps(v.get("metadata", {})),
-                    version_tags,
-                    created_at,
+                    current_version,
                 )
 
-                # Get local metadata if exists
-                local = local_metadata.get(version_num, {})
-
-                enriched.append(AssistantVersionInfo(
-                    version=version_num,
-                    name=v.get("name", ""),
-                    description=v.get("description"),
-                    config=v.get("config", {}),
-                    metadata=v.get("metadata"),
-                    tags=version_tags,
-                    commit_message=local.get("commit_message"),
-                    created_by=local.get("created_by"),
-                    created_by_display_name=local.get("created_by_display_name"),
-                    created_at=created_at.isoformat(),
-                    is_latest=(version_num == current_version),
-                ))
-
-        # Sort by version descending (newest first)
-        enriched.sort(key=lambda x: x.version, reverse=True)
-
-        return enriched
+        log.info(f"Synced {len(numbers)} new versions for assistant {assistant_id} (up to v{current_version})")
+        return True
+
+    @staticmethod
+    def _parse_timestamp(raw: Optional[str]) -> datetime:
+        """Parse a LangGraph ISO timestamp, falling back to now."""
+        try:
+            if raw:
+                return datetime.fromisoformat(raw.replace("Z", "+00:00"))
+        except ValueError:
+            pass
+        return datetime.now(timezone.utc)
+
+    @staticmethod
+    def _row_to_version_info(row: Any, latest_version: int) -> AssistantVersionInfo:
+        """Build an AssistantVersionInfo from an assistant_versions row."""
+        config = row["config"]
+        if isinstance(config, str):
+            config = json.loads(config) if config else {}
+
+        metadata = row["metadata"]
+        if isinstance(metadata, str):
+            metadata = json.loads(metadata) if metadata else {}
+
+        created_at = row["langgraph_created_at"] or datetime.now(timezone.utc)
+
+        # Get tags from tags column first, fall back to metadata._x_oap_tags
+        tags = row["tags"] if row["tags"] else []
+        if not tags and metadata:
+            tags = metadata.get("_x_oap_tags", [])
+
+        return AssistantVersionInfo(
+            version=row["version"],
+            name=row["name"] or "",
+            description=row["description"],
+            config=config or {},
+            metadata=metadata,
+            tags=tags,
+            commit_message=row["commit_message"],
+            created_by=row["created_by"],
+            created_by_display_name=row["created_by_display_name"],
+            created_at=created_at.isoformat(),
+            is_latest=(row["version"] == latest_version),
+        )
 
     async def restore_version(
         self,
@@ -1,16 +1,38 @@
-"""AI-powered image analysis service using OpenAI Vision API."""
+"""AI-powered image analysis service using OpenAI Vision API.
 
-import logging
+Images are downsized to the model's effective resolution and re-encoded
+before upload, results are cached by image content hash (re-uploads and
+duplicate images skip the API), concurrent requests for the same image share
+one call, and Vision API calls per worker are bounded.
+"""
+
+import asyncio
 import base64
-from typing import Union
+import hashlib
+import io
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from PIL import Image, ImageOps
 from pydantic import BaseModel, Field
 from openai import AsyncOpenAI
 
+from langconnect import config
+
 logger = logging.getLogger(__name__)
 
 # Model configuration
 VISION_MODEL = "gpt-4o-mini"
 
+# High-detail images are fitted within 2048x2048 and then scaled so the shortest
+# side is 768px by the API; larger uploads only cost bandwidth and latency
+MAX_LONG_SIDE = 2048
+MAX_SHORT_SIDE = 768
+JPEG_QUALITY = 85
+
+# Formats the Vision API accepts as-is (GIFs are re-encoded: only the first frame is analyzed)
+PASSTHROUGH_FORMATS = {"jpeg", "png", "webp"}
+
 VISION_SYSTEM_PROMPT = """You are an image cataloging assistant for an AI-powered knowledge base.
 Your task is to analyze images and generate structured metadata that will help AI agents understand and search the visual content.
 
@@ -49,6 +71,49 @@ class ImageMetadata(BaseModel):
     )
 
 
+def normalize_image(image_data: bytes, image_format: str) -> Tuple[bytes, str]:
+    """Downsize and re-encode an image to the Vision API's effective resolution.
+
+    EXIF orientation is applied, images with transparency are encoded as PNG and
+    everything else as JPEG. The original is kept when it is already small enough
+    and re-encoding would not shrink it, or when it cannot be decoded.
+
+    Args:
+        image_data: Raw image bytes
+        image_format: Image format (jpeg, png, webp, etc.)
+
+    Returns:
+        Tuple of (image bytes, image format) to send to the API
+    """
+    try:
+        image = ImageOps.exif_transpose(Image.open(io.BytesIO(image_data)))
+    except Exception as e:
+        logger.warning(f"Could not decode image for normalisation, sending original: {e}")
+        return image_data, image_format
+
+    width, height = image.size
+    scale = min(1.0, MAX_LONG_SIDE / max(width, height), MAX_SHORT_SIDE / min(width, height))
+    if scale < 1.0:
+        image = image.resize(
+            (max(1, round(width * scale)), max(1, round(height * scale))),
+            Image.LANCZOS,
+        )
+
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    output = io.BytesIO()
+    if has_alpha:
+        image.convert("RGBA").save(output, "PNG", optimize=True)
+        normalized_format = "png"
+    else:
+        image.convert("RGB").save(output, "JPEG", quality=JPEG_QUALITY, optimize=True)
+        normalized_format = "jpeg"
+    normalized = output.getvalue()
+
+    if scale == 1.0 and image_format in PASSTHROUGH_FORMATS and len(normalized) >= len(image_data):
+        return image_data, image_format
+    return normalized, normalized_format
+
+
 class VisionAnalysisService:
     """Service for analyzing images using OpenAI Vision API."""
 
@@ -56,6 +121,11 @@ class VisionAnalysisService:
         """Initialize the vision analysis service."""
         self.client = AsyncOpenAI()
         self.model = VISION_MODEL
+        self._semaphore = asyncio.Semaphore(max(1, config.VISION_MAX_CONCURRENCY))
+        self._cache: "OrderedDict[str, ImageMetadata]" = OrderedDict()
+        self._cache_size = config.VISION_CACHE_SIZE
+        # Analyses in progress, keyed by content hash, shared by concurrent callers
+        self._in_flight: Dict[str, asyncio.Task] = {}
 
     def _encode_image_base64(self, image_data: bytes) -> str:
         """Encode image data as base64 string.
@@ -68,30 +138,41 @@ class VisionAnalysisService:
         """
         return base64.b64encode(image_data).decode('utf-8')
 
-    async def analyze_image(
-        self,
-        image_data: bytes,
-        image_format: str = "jpeg",
-        fallback_title: str = "Untitled Image"
-    ) -> ImageMetadata:
-        """Analyze an image and extract metadata using Vision API.
+    def _cache_get(self, key: str) -> Optional[ImageMetadata]:
+        metadata = self._cache.get(key)
+        if metadata is not None:
+            self._cache.move_to_end(key)
+        return metadata
+
+    def _cache_put(self, key: str, metadata: ImageMetadata) -> None:
+        if self._cache_size <= 0:
+            return
+        self._cache[key] = metadata
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    @staticmethod
+    def _fallback_metadata(fallback_title: str) -> ImageMetadata:
+        return ImageMetadata(
+            title=fallback_title,
+            short_description=f"Image file: {fallback_title}",
+            detailed_description=f"An uploaded image file named {fallback_title}. AI analysis was not available at upload time."
+        )
+
+    async def _request_metadata(self, image_url: str) -> ImageMetadata:
+        """Call the Vision API (bounded per worker) and validate its output.
 
         Args:
-            image_data: Raw image bytes
-            image_format: Image format (jpeg, png, webp, etc.)
-            fallback_title: Title to use if analysis fails
+            image_url: Image URL or base64 data URL
 
         Returns:
-            ImageMetadata with extracted title, short description, and detailed description
+            Validated ImageMetadata
 
         Raises:
-            Exception: If analysis fails
+            Exception: If the API call fails or returns incomplete metadata
         """
-        try:
-            # Encode image as base64
-            base64_image = self._encode_image_base64(image_data)
-
-            # Call Vision API with structured output
+        async with self._semaphore:
             completion = await self.client.chat.completions.parse(
                 model=self.model,
                 messages=[
@@ -109,7 +190,7 @@ class VisionAnalysisService:
                             {
                                 "type": "image_url",
                                 "image_url": {
-                                    "url": f"data:image/{image_format};base64,{base64_image}",
+                                    "url": image_url,
                                     "detail": "high"  # Use high detail for better analysis
                                 }
                             }
@@ -121,18 +202,31 @@ class VisionAnalysisService:
                 max_tokens=500,  # Enough for detailed description
             )
 
-            metadata = completion.choices[0].message.parsed
+        metadata = completion.choices[0].message.parsed
+
+        # Validate metadata
+        if not metadata.title or not metadata.short_description or not metadata.detailed_description:
+            raise ValueError("Generated metadata is incomplete")
+
+        # Enforce length limits
+        if len(metadata.short_description) > 150:
+            metadata.short_description = metadata.short_description[:147] + "..."
 
-            # Validate metadata
-            if not metadata.title or not metadata.short_description or not metadata.detailed_description:
-                raise ValueError("Generated metadata is incomplete")
+        if len(metadata.detailed_description) > 500:
+            metadata.detailed_description = metadata.detailed_description[:497] + "..."
 
-            # Enforce length limits
-            if len(metadata.short_description) > 150:
-                metadata.short_description = metadata.short_description[:147] + "..."
+        return metadata
 
-            if len(metadata.detailed_description) > 500:
-                metadata.detailed_description = metadata.detailed_description[:497] + "..."
+    async def _analyze_uncached(self, key: str, image_data: bytes, image_format: str) -> Optional[ImageMetadata]:
+        """Normalise and analyze an image; caches and returns the result, or None on failure."""
+        try:
+            # Decoding and resampling are CPU-bound; keep them off the event loop
+            payload, payload_format = await asyncio.to_thread(normalize_image, image_data, image_format)
+            if len(payload) < len(image_data):
+                logger.debug(f"Normalised image for vision analysis: {len(image_data)} -> {len(payload)} bytes")
+
+            base64_image = self._encode_image_base64(payload)
+            metadata = await self._request_metadata(f"data:image/{payload_format};base64,{base64_image}")
 
             logger.info(
                 f"Analyzed image - Title: '{metadata.title}', "
@@ -140,16 +234,51 @@ class VisionAnalysisService:
                 f"Detailed: {len(metadata.detailed_description)} chars"
             )
 
+            self._cache_put(key, metadata)
             return metadata
 
         except Exception as e:
             logger.error(f"Vision analysis failed: {e}")
-            # Return fallback metadata
-            return ImageMetadata(
-                title=fallback_title,
-                short_description=f"Image file: {fallback_title}",
-                detailed_description=f"An uploaded image file named {fallback_title}. AI analysis was not available at upload time."
-            )
+            return None
+
+    async def analyze_image(
+        self,
+        image_data: bytes,
+        image_format: str = "jpeg",
+        fallback_title: str = "Untitled Image"
+    ) -> ImageMetadata:
+        """Analyze an image and extract metadata using Vision API.
+
+        Results are cached by the SHA-256 of the image bytes, so the same image
+        uploaded again (or to another collection) is not re-analyzed.
+
+        Args:
+            image_data: Raw image bytes
+            image_format: Image format (jpeg, png, webp, etc.)
+            fallback_title: Title to use if analysis fails
+
+        Returns:
+            ImageMetadata with extracted title, short description, and detailed description
+            (fallback metadata if analysis fails)
+        """
+        key = hashlib.sha256(image_data).hexdigest()
+
+        cached = self._cache_get(key)
+        if cached is not None:
+            logger.info(f"Vision analysis cache hit - Title: '{cached.title}'")
+            return cached.model_copy()
+
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._analyze_uncached(key, image_data, image_format))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+        # Shielded so a cancelled caller does not cancel the analysis for the others
+        metadata = await asyncio.shield(task)
+        if metadata is None:
+            return self._fallback_metadata(fallback_title)
+        return metadata.model_copy()
 
     async def analyze_image_from_url(
         self,
@@ -170,46 +299,7 @@ class VisionAnalysisService:
         """
         try:
             # Call Vision API directly with URL
-            completion = await self.client.chat.completions.parse(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": VISION_SYSTEM_PROMPT
-                    },
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": "Analyze this image and provide the structured metadata."
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": image_url,
-                                    "detail": "high"
-                                }
-                            }
-                        ]
-                    }
-                ],
-                response_format=ImageMetadata,
-                temperature=0.3,
-                max_tokens=500,
-            )
-
-            metadata = completion.choices[0].message.parsed
-
-            # Validate and enforce limits (same as analyze_image)
-            if not metadata.title or not metadata.short_description or not metadata.detailed_description:
-                raise ValueError("Generated metadata is incomplete")
-
-            if len(metadata.short_description) > 150:
-                metadata.short_description = metadata.short_description[:147] + "..."
-
-            if len(metadata.detailed_description) > 500:
-                metadata.detailed_description = metadata.detailed_description[:497] + "..."
+            metadata = await self._request_metadata(image_url)
 
             logger.info(f"Analyzed image from URL - Title: '{metadata.title}'")
 
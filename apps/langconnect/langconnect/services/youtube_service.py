@@ -1,12 +1,25 @@
-"""YouTube transcript extraction and processing service."""
+"""YouTube transcript extraction and processing service.
 
+Transcript fetches are blocking network calls, so they run in worker threads
+(bounded per worker by YOUTUBE_MAX_CONCURRENCY) instead of on the event loop.
+Transcripts are cached per worker by video ID and language preference, so a
+video added to several collections is fetched once, and concurrent requests
+for the same video share one fetch. YOUTUBE_TRANSCRIPT_PROVIDER=fixture reads
+transcripts from local JSON files instead of the network (tests and dev).
+"""
+
+import asyncio
+import dataclasses
 import logging
 import re
 import os
 import json
+import time
 import requests
-from typing import Dict, List, Optional, Any, Tuple
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass
+from types import SimpleNamespace
 
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api.formatters import TextFormatter
@@ -27,8 +40,14 @@ from youtube_transcript_api._errors import (
 from langchain_core.documents import Document
 from requests import Session
 
+from langconnect import config
+
 logger = logging.getLogger(__name__)
 
+# Transcript language preference when none is given, and the languages tried after it
+DEFAULT_LANGUAGES = ['en']
+FALLBACK_LANGUAGES = ['en', 'es', 'fr', 'de']
+
 
 @dataclass
 class YouTubeTranscript:
@@ -43,6 +62,54 @@ class YouTubeProcessingError(Exception):
     pass
 
 
+class TranscriptCache:
+    """LRU cache of transcripts (and recent failures) keyed by (video ID, languages)."""
+
+    def __init__(self, max_size: int, ttl_seconds: int, failure_ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.failure_ttl_seconds = failure_ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Union[YouTubeTranscript, YouTubeProcessingError]]]" = OrderedDict()
+
+    def get(self, key: Tuple[str, str]) -> Optional[Union[YouTubeTranscript, YouTubeProcessingError]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Tuple[str, str], value: Union[YouTubeTranscript, YouTubeProcessingError]) -> None:
+        ttl = self.failure_ttl_seconds if isinstance(value, YouTubeProcessingError) else self.ttl_seconds
+        if self.max_size <= 0 or ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# Shared by every YouTubeService instance of the worker
+_transcript_cache = TranscriptCache(
+    config.YOUTUBE_CACHE_SIZE,
+    config.YOUTUBE_CACHE_TTL_SECONDS,
+    config.YOUTUBE_FAILURE_TTL_SECONDS,
+)
+_in_flight: Dict[Tuple[str, str], asyncio.Task] = {}
+_fetch_semaphore = asyncio.Semaphore(max(1, config.YOUTUBE_MAX_CONCURRENCY))
+
+
+def _read_json_file(path: str) -> Any:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
 class YouTubeService:
     """Service for extracting and processing YouTube video transcripts."""
     
@@ -53,6 +120,9 @@ class YouTubeService:
         # Initialize Supadata API configuration
         self.supadata_api_url = "https://api.supadata.ai/v1/youtube/transcript"
         self.supadata_api_key = os.getenv('SUPADATA_API_TOKEN')
+
+        self.provider = config.YOUTUBE_TRANSCRIPT_PROVIDER
+        self.fixture_dir = config.YOUTUBE_FIXTURE_DIR
     
     def extract_video_id(self, url: str) -> Optional[str]:
         """Extract YouTube video ID from various URL formats.
@@ -88,43 +158,88 @@ class YouTubeService:
         """
         return self.extract_video_id(url) is not None
     
+    def _fetch_standard_transcript(self, video_id: str, languages: List[str]) -> Tuple[Any, List[Dict[str, Any]]]:
+        """Blocking: list the video's transcripts and fetch the best one (run in a thread)."""
+        # Get available transcripts using static method
+        transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
+        
+        # Try to get the best available transcript
+        transcript = self._get_best_transcript(transcript_list, languages)
+        
+        # Fetch transcript data
+        return transcript, transcript.fetch()
+    
     async def extract_transcript_standard_api(
-        self, 
-        video_id: str, 
-        progress_callback: Optional[callable] = None
+        self,
+        video_id: str,
+        progress_callback: Optional[callable] = None,
+        languages: Optional[List[str]] = None
     ) -> YouTubeTranscript:
         """Extract transcript using the standard youtube-transcript-api.
         
         Args:
             video_id: YouTube video ID
             progress_callback: Optional callback for progress updates
-            
+            languages: Preferred transcript languages (default: English)
+        
         Returns:
             YouTubeTranscript object with content and metadata
-            
+        
         Raises:
             YouTubeProcessingError: If transcript extraction fails
         """
         if progress_callback:
             progress_callback("Trying standard YouTube transcript API")
         
-        # Get available transcripts using static method
-        transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
-        
-        # Try to get the best available transcript
-        transcript = self._get_best_transcript(transcript_list)
+        async with _fetch_semaphore:
+            transcript, transcript_data = await asyncio.to_thread(
+                self._fetch_standard_transcript, video_id, languages or DEFAULT_LANGUAGES
+            )
         
         if progress_callback:
             progress_callback(f"Found transcript in {transcript.language}")
         
-        # Fetch transcript data
-        transcript_data = transcript.fetch()
-        
         # Process transcript into usable format
         return self._process_standard_transcript_data(
             transcript_data, video_id, transcript
         )
     
+    async def extract_transcript_fixture(self, video_id: str) -> YouTubeTranscript:
+        """Load a transcript from the fixture directory (YOUTUBE_TRANSCRIPT_PROVIDER=fixture).
+        
+        The fixture file {YOUTUBE_FIXTURE_DIR}/{video_id}.json holds the transcript
+        entries ([{"text", "start", "duration"}]) under "entries", plus optional
+        "language", "language_code" and "is_generated".
+        
+        Args:
+            video_id: YouTube video ID
+        
+        Returns:
+            YouTubeTranscript object with content and metadata
+        
+        Raises:
+            YouTubeProcessingError: If there is no fixture for the video
+        """
+        fixture_path = os.path.join(self.fixture_dir, f"{video_id}.json")
+        try:
+            fixture = await asyncio.to_thread(_read_json_file, fixture_path)
+        except FileNotFoundError:
+            raise YouTubeProcessingError(f"No transcript fixture for video {video_id} in {self.fixture_dir}")
+        except ValueError as e:
+            raise YouTubeProcessingError(f"Invalid transcript fixture {fixture_path}: {str(e)}")
+        
+        transcript_obj = SimpleNamespace(
+            language=fixture.get('language', 'English'),
+            language_code=fixture.get('language_code', 'en'),
+            is_generated=fixture.get('is_generated', False),
+            is_translatable=False,
+        )
+        transcript = self._process_standard_transcript_data(
+            fixture.get('entries', []), video_id, transcript_obj
+        )
+        transcript.metadata['extraction_method'] = 'fixture'
+        return transcript
+    
     async def extract_transcript_supadata_api(
         self, 
         video_id: str, 
@@ -153,11 +268,13 @@ class YouTubeService:
                 'x-api-key': self.supadata_api_key
             }
             
-            response = requests.get(
-                f"{self.supadata_api_url}?videoId={video_id}", 
-                headers=headers,
-                timeout=30
-            )
+            async with _fetch_semaphore:
+                response = await asyncio.to_thread(
+                    requests.get,
+                    f"{self.supadata_api_url}?videoId={video_id}",
+                    headers=headers,
+                    timeout=30
+                )
             response.raise_for_status()
             data = response.json()
             
@@ -173,23 +290,25 @@ class YouTubeService:
             raise YouTubeProcessingError(f"Failed to parse Supadata response: {str(e)}")
     
     async def extract_transcript(
-        self, 
-        url: str, 
-        progress_callback: Optional[callable] = None
+        self,
+        url: str,
+        progress_callback: Optional[callable] = None,
+        languages: Optional[List[str]] = None
     ) -> YouTubeTranscript:
-        """Extract transcript from YouTube video using tiered approach.
+        """Extract transcript from YouTube video, reusing cached transcripts.
         
-        This method tries multiple approaches in order:
-        1. Standard youtube-transcript-api
-        2. Supadata API (if configured)
+        Transcripts are cached by video ID and language preference; concurrent
+        requests for the same video wait for one extraction. Failures are
+        cached for YOUTUBE_FAILURE_TTL_SECONDS.
         
         Args:
             url: YouTube video URL
             progress_callback: Optional callback for progress updates
-            
+            languages: Preferred transcript languages (default: English)
+        
         Returns:
             YouTubeTranscript object with content and metadata
-            
+        
         Raises:
             YouTubeProcessingError: If all transcript extraction methods fail
         """
@@ -197,9 +316,91 @@ class YouTubeService:
         if not video_id:
             raise YouTubeProcessingError(f"Invalid YouTube URL format: {url}")
         
+        languages = languages or DEFAULT_LANGUAGES
+        key = (video_id, ",".join(languages))
+        
+        cached = _transcript_cache.get(key)
+        if isinstance(cached, YouTubeProcessingError):
+            raise YouTubeProcessingError(str(cached))
+        if cached is not None:
+            if progress_callback:
+                progress_callback(f"Using cached transcript for video: {video_id}")
+            return dataclasses.replace(cached, metadata=dict(cached.metadata))
+        
+        task = _in_flight.get(key)
+        if task is None:
+            task = asyncio.create_task(
+                self._extract_transcript_uncached(video_id, languages, progress_callback)
+            )
+            _in_flight[key] = task
+            task.add_done_callback(lambda _: _in_flight.pop(key, None))
+        elif progress_callback:
+            progress_callback(f"Waiting for transcript extraction already running for video: {video_id}")
+        
+        try:
+            # Shielded so a cancelled caller does not cancel the extraction for the others
+            transcript = await asyncio.shield(task)
+        except YouTubeProcessingError as e:
+            _transcript_cache.put(key, e)
+            raise
+        
+        _transcript_cache.put(key, transcript)
+        return dataclasses.replace(transcript, metadata=dict(transcript.metadata))
+    
+    async def prefetch_transcripts(
+        self,
+        urls: List[str],
+        languages: Optional[List[str]] = None
+    ) -> None:
+        """Extract the transcripts of several YouTube URLs concurrently into the cache.
+        
+        Batch ingestion calls this before processing its URLs one by one, so the
+        fetches overlap (bounded by YOUTUBE_MAX_CONCURRENCY). Non-YouTube URLs are
+        ignored and failures are left for the per-URL processing to report.
+        
+        Args:
+            urls: URLs to prefetch
+            languages: Preferred transcript languages (default: English)
+        """
+        youtube_urls = list(dict.fromkeys(url for url in urls if self.is_youtube_url(url)))
+        if len(youtube_urls) < 2:
+            return
+        await asyncio.gather(
+            *(self.extract_transcript(url, languages=languages) for url in youtube_urls),
+            return_exceptions=True,
+        )
+    
+    async def _extract_transcript_uncached(
+        self,
+        video_id: str,
+        languages: List[str],
+        progress_callback: Optional[callable] = None
+    ) -> YouTubeTranscript:
+        """Extract transcript from YouTube video using tiered approach.
+        
+        This method tries multiple approaches in order:
+        1. Standard youtube-transcript-api
+        2. Supadata API (if configured)
+        
+        With YOUTUBE_TRANSCRIPT_PROVIDER=fixture, only the fixture directory is used.
+        
+        Args:
+            video_id: YouTube video ID
+            languages: Preferred transcript languages
+            progress_callback: Optional callback for progress updates
+        
+        Returns:
+            YouTubeTranscript object with content and metadata
+        
+        Raises:
+            YouTubeProcessingError: If all transcript extraction methods fail
+        """
         if progress_callback:
             progress_callback(f"Extracting transcript for video: {video_id}")
         
+        if self.provider == "fixture":
+            return await self.extract_transcript_fixture(video_id)
+        
         # Store errors from each attempt
         errors = []
         
@@ -208,7 +409,7 @@ class YouTubeService:
             if progress_callback:
                 progress_callback("Attempting standard YouTube API")
             
-            transcript = await self.extract_transcript_standard_api(video_id, progress_callback)
+            transcript = await self.extract_transcript_standard_api(video_id, progress_callback, languages)
             
             if progress_callback:
                 progress_callback("Standard API extraction completed successfully")
@@ -290,30 +491,33 @@ class YouTubeService:
         
         raise YouTubeProcessingError(combined_error)
     
-    def _get_best_transcript(self, transcript_list) -> Any:
+    def _get_best_transcript(self, transcript_list, languages: Optional[List[str]] = None) -> Any:
         """Get the best available transcript from the list.
         
         Args:
             transcript_list: List of available transcripts
+            languages: Preferred transcript languages (default: English)
             
         Returns:
             Best transcript object
         """
-        # Preference order: manual English, manual any language, generated English, generated any
+        preferred = languages or DEFAULT_LANGUAGES
+        others = [code for code in FALLBACK_LANGUAGES if code not in preferred]
+        # Preference order: preferred language, manual any language, generated preferred, generated any
         try:
-            # Try manual English first
-            return transcript_list.find_transcript(['en'])
+            # Try preferred language first
+            return transcript_list.find_transcript(preferred)
         except:
             try:
                 # Try any manual transcript
-                return transcript_list.find_manually_created_transcript(['en', 'es', 'fr', 'de'])
+                return transcript_list.find_manually_created_transcript(preferred + others)
             except:
                 try:
-                    # Try generated English
-                    return transcript_list.find_generated_transcript(['en'])
+                    # Try generated preferred language
+                    return transcript_list.find_generated_transcript(preferred)
                 except:
                     # Try any generated transcript
-                    return transcript_list.find_generated_transcript(['es', 'fr', 'de'])
+                    return transcript_list.find_generated_transcript(others)
     
     def _process_standard_transcript_data(
         self, 
@@ -483,7 +687,8 @@ class YouTubeService:
         url: str,
         title: str = "",
         description: str = "",
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        languages: Optional[List[str]] = None
     ) -> List[Document]:
         """Process a YouTube URL into LangChain documents using tiered transcript extraction.
         
@@ -492,6 +697,7 @@ class YouTubeService:
             title: Custom title for the document
             description: Custom description for the document
             progress_callback: Optional callback for progress updates
+            languages: Preferred transcript languages (default: English)
             
         Returns:
             List of processed Document objects
@@ -504,7 +710,7 @@ class YouTubeService:
                 progress_callback("Starting YouTube video processing")
             
             # Extract transcript using tiered approach
-            transcript = await self.extract_transcript(url, progress_callback)
+            transcript = await self.extract_transcript(url, progress_callback, languages)
             
             if progress_callback:
                 progress_callback("Creating document from transcript")
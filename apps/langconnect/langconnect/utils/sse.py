@@ -0,0 +1,30 @@
+"""
+Server-sent events helpers.
+"""
+
+import json
+from typing import Any, Optional
+
+# Keep proxies (nginx, Next.js) from buffering or caching the stream
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+}
+
+# Comment line; keeps idle connections open through proxies and load balancers
+SSE_KEEPALIVE = ": keepalive\n\n"
+
+KEEPALIVE_INTERVAL_SECONDS = 15
+
+
+def format_sse(event: str, data: Any, event_id: Optional[str] = None, retry_ms: Optional[int] = None) -> str:
+    """Format one server-sent event with a JSON data payload."""
+    lines = []
+    if retry_ms is not None:
+        lines.append(f"retry: {retry_ms}")
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
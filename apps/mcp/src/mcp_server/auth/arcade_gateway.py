@@ -0,0 +1,278 @@
+"""Async gateway for Arcade tool authorization and execution.
+
+``ArcadeAuthManager`` wraps the synchronous Arcade client, so every call it
+makes blocks the event loop. Tool executions go through this gateway instead:
+
+1. One pooled ``AsyncArcade`` client (keep-alive HTTP connections) per process
+2. Authorization results cached per (user, tool) with TTL and LRU bounds
+   (tools of one toolkit can require different scopes); pending
+   authorizations are rechecked after a short interval
+3. Concurrent authorization checks for the same key share one Arcade call
+4. Arcade calls are limited per toolkit, so one slow provider cannot take
+   every connection in the pool
+
+Point ``ARCADE_BASE_URL`` at a local fake Arcade server to exercise the
+gateway without the real API; ``client_factory`` can also be injected.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..config import settings
+from ..utils.exceptions import AuthenticationError, AuthorizationError, ToolExecutionError
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Pending authorizations are rechecked at most this often
+PENDING_RECHECK_SECONDS = 10
+
+AuthKey = Tuple[str, str]
+
+
+@dataclass
+class _AuthEntry:
+    """Cached authorization result for a user and tool."""
+
+    authorized: bool
+    auth_url: Optional[str]
+    expires_at: float
+
+    @property
+    def is_expired(self) -> bool:
+        return time.time() >= self.expires_at
+
+
+def toolkit_of(tool_name: str) -> str:
+    """Toolkit part of an MCP Arcade tool name (Toolkit_ToolName)."""
+    return tool_name.split("_", 1)[0].lower() if "_" in tool_name else "arcade"
+
+
+def _is_arcade_auth_error(error: Exception) -> bool:
+    try:
+        from arcadepy import AuthenticationError as ArcadeAuthError
+        from arcadepy import PermissionDeniedError
+    except ImportError:
+        return False
+    return isinstance(error, (ArcadeAuthError, PermissionDeniedError))
+
+
+def _create_async_client() -> Any:
+    """Create the pooled async Arcade client."""
+    try:
+        import httpx
+        from arcadepy import AsyncArcade
+    except ImportError as e:
+        logger.error("Arcade library not available", error=str(e))
+        raise AuthenticationError(f"Arcade library not installed: {str(e)}")
+
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.arcade_max_connections,
+            max_keepalive_connections=settings.arcade_max_connections,
+        ),
+        timeout=settings.arcade_request_timeout,
+    )
+    return AsyncArcade(
+        api_key=settings.arcade_api_key,
+        base_url=settings.arcade_base_url,
+        http_client=http_client,
+    )
+
+
+class ArcadeGateway:
+    """Non-blocking Arcade authorization and tool execution."""
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any] = _create_async_client,
+        auth_ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        toolkit_concurrency: Optional[int] = None,
+    ) -> None:
+        self._client_factory = client_factory
+        self._client: Any = None
+        self.auth_ttl = auth_ttl if auth_ttl is not None else settings.user_auth_cache_ttl
+        self.max_entries = max_entries if max_entries is not None else settings.arcade_auth_cache_max_entries
+        self.toolkit_concurrency = (
+            toolkit_concurrency if toolkit_concurrency is not None else settings.arcade_toolkit_max_concurrency
+        )
+        self._auth_cache: "OrderedDict[AuthKey, _AuthEntry]" = OrderedDict()
+        self._inflight: Dict[AuthKey, asyncio.Task] = {}
+        self._toolkit_limits: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def client(self) -> Any:
+        """Get or create the pooled async Arcade client."""
+        if self._client is None:
+            self._client = self._client_factory()
+            logger.info("Async Arcade client initialized", base_url=settings.arcade_base_url)
+        return self._client
+
+    def _toolkit_limit(self, toolkit: str) -> asyncio.Semaphore:
+        limit = self._toolkit_limits.get(toolkit)
+        if limit is None:
+            limit = asyncio.Semaphore(self.toolkit_concurrency)
+            self._toolkit_limits[toolkit] = limit
+        return limit
+
+    # ---------- authorization cache ----------
+
+    def _get_entry(self, key: AuthKey) -> Optional[_AuthEntry]:
+        entry = self._auth_cache.get(key)
+        if entry is None:
+            return None
+        if entry.is_expired:
+            del self._auth_cache[key]
+            return None
+        self._auth_cache.move_to_end(key)
+        return entry
+
+    def _put_entry(self, key: AuthKey, authorized: bool, auth_url: Optional[str]) -> None:
+        ttl = self.auth_ttl if authorized else min(self.auth_ttl, PENDING_RECHECK_SECONDS)
+        self._auth_cache[key] = _AuthEntry(authorized=authorized, auth_url=auth_url, expires_at=time.time() + ttl)
+        self._auth_cache.move_to_end(key)
+        while len(self._auth_cache) > self.max_entries:
+            self._auth_cache.popitem(last=False)
+
+    def invalidate(self, user_id: str, tool_name: Optional[str] = None) -> None:
+        """Drop cached authorization for a user, optionally only for one tool's toolkit.
+
+        A revoked grant affects every tool of the toolkit, so all of them are dropped.
+        """
+        toolkit = toolkit_of(tool_name) if tool_name else None
+        for key in [key for key in self._auth_cache if key[0] == user_id]:
+            if toolkit is None or toolkit_of(key[1]) == toolkit:
+                del self._auth_cache[key]
+
+    def cleanup_expired(self) -> int:
+        """Remove expired authorization entries; returns how many were removed."""
+        expired = [key for key, entry in self._auth_cache.items() if entry.is_expired]
+        for key in expired:
+            del self._auth_cache[key]
+        return len(expired)
+
+    # ---------- Arcade calls ----------
+
+    async def check_authorization(self, user_id: str, tool_name: str) -> Optional[str]:
+        """Check if a user is authorized for a tool.
+
+        Args:
+            user_id: The Arcade user ID (email when available)
+            tool_name: The tool name to check authorization for
+
+        Returns:
+            Authorization URL if authorization is needed, None if authorized
+        """
+        key = (user_id, tool_name)
+        entry = self._get_entry(key)
+        if entry is not None:
+            return None if entry.authorized else entry.auth_url
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._authorize(key, user_id, tool_name))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _authorize(self, key: AuthKey, user_id: str, tool_name: str) -> Optional[str]:
+        try:
+            async with self._toolkit_limit(toolkit_of(tool_name)):
+                auth_response = await self.client.tools.authorize(tool_name=tool_name, user_id=user_id)
+        except Exception as e:
+            logger.error("Arcade authorization check failed", user_id=user_id, tool=tool_name, error=str(e))
+            if _is_arcade_auth_error(e):
+                raise AuthorizationError(
+                    f"Authorization required for tool '{tool_name}' but failed to get auth URL"
+                )
+            raise AuthenticationError(f"Authorization check failed: {str(e)}")
+
+        authorized = auth_response.status == "completed"
+        auth_url = None if authorized else auth_response.url
+        self._put_entry(key, authorized, auth_url)
+        logger.info(
+            "Arcade authorization checked",
+            user_id=user_id,
+            tool=tool_name,
+            toolkit=toolkit_of(tool_name),
+            status=auth_response.status,
+        )
+        return auth_url
+
+    async def execute_tool(
+        self,
+        user_id: str,
+        tool_name: str,
+        tool_input: Dict[str, Any],
+        user_email: Optional[str] = None,
+    ) -> Any:
+        """Execute an Arcade tool for a user.
+
+        Args:
+            user_id: The user ID
+            tool_name: The tool name to execute
+            tool_input: The tool input parameters
+            user_email: Optional user email (preferred for Arcade authorization)
+
+        Returns:
+            The tool output value
+
+        Raises:
+            AuthorizationError: If authorization is required
+            ToolExecutionError: If Arcade reports a failed execution
+        """
+        # Use email as user identifier if available, as Arcade works better with emails
+        arcade_user_id = user_email if user_email else user_id
+
+        auth_url = await self.check_authorization(arcade_user_id, tool_name)
+        if auth_url:
+            raise AuthorizationError(f"Authorization required for tool '{tool_name}'", auth_url=auth_url)
+
+        start_time = time.time()
+        try:
+            async with self._toolkit_limit(toolkit_of(tool_name)):
+                response = await self.client.tools.execute(
+                    tool_name=tool_name,
+                    input=tool_input,
+                    user_id=arcade_user_id,
+                )
+        except Exception as e:
+            if not _is_arcade_auth_error(e):
+                logger.error("Tool execution error", user_id=user_id, tool=tool_name, error=str(e))
+                raise
+            # Authorization was revoked since it was cached; get a fresh auth URL
+            logger.warning("Authorization error during tool execution", user_id=user_id, tool=tool_name, error=str(e))
+            self.invalidate(arcade_user_id, tool_name)
+            auth_url = await self.check_authorization(arcade_user_id, tool_name)
+            raise AuthorizationError(f"Authorization required for tool '{tool_name}'", auth_url=auth_url)
+
+        if response.success and response.output:
+            logger.info(
+                "Tool execution successful",
+                user_id=user_id,
+                tool=tool_name,
+                duration_ms=(time.time() - start_time) * 1000,
+            )
+            return response.output.value
+
+        error_msg = "Unknown error"
+        if response.output and response.output.error:
+            error_msg = str(response.output.error.message)
+        logger.error("Tool execution failed", user_id=user_id, tool=tool_name, error=error_msg)
+        raise ToolExecutionError(tool_name, error_msg)
+
+    async def aclose(self) -> None:
+        """Close pooled connections (called on server shutdown)."""
+        for task in list(self._inflight.values()):
+            task.cancel()
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+# Global Arcade gateway instance
+arcade_gateway = ArcadeGateway()
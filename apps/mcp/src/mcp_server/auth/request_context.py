@@ -0,0 +1,86 @@
+"""Request-scoped execution context for MCP tool calls.
+
+The streamable HTTP transport serves many clients from one ``MCPToolServer``
+instance, so the caller's identity cannot live on the server object. Each
+request binds a ``RequestContext`` to a ``ContextVar``; asyncio copies the
+current context into every task it spawns, so the MCP session handlers and
+tool executions started for that request see their own caller and nobody
+else's.
+"""
+
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Iterator, Optional
+
+from pydantic import BaseModel, Field
+
+from .user_context import UserContext
+
+
+class RequestContext(BaseModel):
+    """Per-request execution state passed from the HTTP handler to tools."""
+
+    user_context: UserContext
+    request_id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    started_at: float = Field(default_factory=time.time)
+    transport: str = "http"
+
+    model_config = {"frozen": True}
+
+    @property
+    def user_id(self) -> str:
+        """ID of the authenticated caller."""
+        return self.user_context.user_id
+
+    @property
+    def user_email(self) -> Optional[str]:
+        """Email of the authenticated caller, if known."""
+        return self.user_context.email
+
+    @property
+    def auth_method(self) -> str:
+        """How the caller authenticated (mcp_access_token, service_account, ...)."""
+        return self.user_context.metadata.get("auth_method", "unknown")
+
+    @property
+    def jwt_token(self) -> Optional[str]:
+        """Supabase JWT for downstream LangConnect calls, if the caller has one."""
+        return self.user_context.metadata.get("jwt_token")
+
+    @property
+    def elapsed_ms(self) -> float:
+        """Milliseconds since the request was received."""
+        return (time.time() - self.started_at) * 1000
+
+
+_request_context: ContextVar[Optional[RequestContext]] = ContextVar(
+    "mcp_request_context", default=None
+)
+
+
+def bind_request_context(context: RequestContext) -> Token:
+    """Bind a request context to the current task; pass the token to reset."""
+    return _request_context.set(context)
+
+
+def reset_request_context(token: Token) -> None:
+    """Restore the context that was active before ``bind_request_context``."""
+    _request_context.reset(token)
+
+
+def get_request_context() -> Optional[RequestContext]:
+    """Return the context bound to the current request, if any."""
+    return _request_context.get()
+
+
+@contextmanager
+def request_scope(user_context: UserContext, transport: str = "http") -> Iterator[RequestContext]:
+    """Bind a fresh request context for the duration of the ``with`` block."""
+    context = RequestContext(user_context=user_context, transport=transport)
+    token = bind_request_context(context)
+    try:
+        yield context
+    finally:
+        reset_request_context(token)
@@ -23,6 +23,18 @@ class Settings(BaseSettings):
     arcade_base_url: str = Field(
         default="https://api.arcade.dev", description="Arcade API base URL"
     )
+    arcade_max_connections: int = Field(
+        default=50, description="Maximum pooled HTTP connections to the Arcade API"
+    )
+    arcade_toolkit_max_concurrency: int = Field(
+        default=10, description="Maximum concurrent Arcade calls per toolkit"
+    )
+    arcade_request_timeout: float = Field(
+        default=60.0, description="Arcade API request timeout in seconds"
+    )
+    arcade_auth_cache_max_entries: int = Field(
+        default=10000, description="Maximum cached Arcade authorization results"
+    )
 
     # Tavily Configuration
     tavily_api_key: Optional[str] = Field(
@@ -33,6 +45,30 @@ class Settings(BaseSettings):
     e2b_api_key: Optional[str] = Field(
         default=None, description="E2B API key for code sandbox execution"
     )
+    e2b_sandbox_backend: str = Field(
+        default="e2b", description="Sandbox backend for execute_code: 'e2b' or 'local' (subprocess, for tests)"
+    )
+    e2b_pool_warm_size: int = Field(
+        default=2, description="Pre-booted sandboxes kept ready for new user/thread leases"
+    )
+    e2b_pool_max_leases: int = Field(
+        default=200, description="Maximum leased sandboxes; least recently used are killed beyond this"
+    )
+    e2b_pool_idle_ttl: int = Field(
+        default=900, description="Seconds a leased sandbox may sit idle before it is reaped"
+    )
+    e2b_pool_preinstall_packages: str = Field(
+        default="", description="Comma-separated pip packages installed on warm sandboxes"
+    )
+    e2b_pool_liveness_window: int = Field(
+        default=60, description="Seconds a sandbox seen alive is trusted without a remote health check"
+    )
+    e2b_pool_keepalive_interval: int = Field(
+        default=30, description="Seconds between batched sandbox timeout extensions and reaping"
+    )
+    e2b_pool_shutdown_mode: str = Field(
+        default="kill", description="On shutdown, 'kill' leased sandboxes or 'detach' and let them time out"
+    )
 
     # MCP Server Configuration
     mcp_server_port: int = Field(default=8000, description="MCP server port")
@@ -55,6 +91,21 @@ class Settings(BaseSettings):
     supabase_service_key: Optional[str] = Field(
         default=None, description="Supabase service role key"
     )
+    artifact_storage_backend: str = Field(
+        default="supabase", description="Storage for tool output artifacts: 'supabase' or 'local' (filesystem, for tests)"
+    )
+    artifact_local_dir: str = Field(
+        default="/tmp/mcp-artifacts", description="Root directory for the local artifact storage backend"
+    )
+    artifact_upload_concurrency: int = Field(
+        default=4, description="Maximum concurrent artifact uploads"
+    )
+    artifact_upload_retries: int = Field(
+        default=3, description="Retries (with exponential backoff) for a failed artifact upload"
+    )
+    artifact_failed_inline_max_bytes: int = Field(
+        default=512 * 1024, description="Failed uploads up to this size are returned inline (base64) on the next call"
+    )
     
     # OAuth 2.1 and MCP Authentication Configuration
     frontend_base_url: str = Field(
@@ -66,6 +117,18 @@ class Settings(BaseSettings):
     langconnect_base_url: str = Field(
         default="http://langconnect:8080", description="LangConnect API base URL for internal communication"
     )
+    langconnect_max_connections: int = Field(
+        default=50, description="Maximum pooled keep-alive connections to LangConnect"
+    )
+    langconnect_max_concurrency: int = Field(
+        default=32, description="Maximum concurrent in-flight requests to LangConnect"
+    )
+    langconnect_request_timeout: float = Field(
+        default=30.0, description="LangConnect request timeout in seconds"
+    )
+    langconnect_max_retries: int = Field(
+        default=2, description="Retries for transient LangConnect failures"
+    )
     oauth_issuer: Optional[str] = Field(
         default=None, description="OAuth 2.1 issuer URL (defaults to Supabase URL)"
     )
@@ -124,6 +187,11 @@ class Settings(BaseSettings):
         description="CORS origins",
     )
 
+    @property
+    def e2b_pool_preinstall_list(self) -> List[str]:
+        """Get warm sandbox pip packages as a list."""
+        return [pkg.strip() for pkg in self.e2b_pool_preinstall_packages.split(",") if pkg.strip()]
+
     @property
     def enabled_services_list(self) -> List[str]:
         """Get enabled services as a list."""
@@ -17,10 +17,16 @@ from starlette.types import Receive, Scope, Send
 from starlette.responses import JSONResponse, Response
 from starlette.requests import Request
 
+from .auth.request_context import (
+    RequestContext,
+    bind_request_context,
+    get_request_context,
+    request_scope,
+)
 from .auth.user_context import UserContext, user_context_manager
 from .config import settings
 from .tools.base import BaseTool
-from .tools.custom_tools import CUSTOM_TOOLS
+from .tools.catalogue import ToolCatalogue
 from .utils.exceptions import (
     AuthenticationError,
     AuthorizationError,
@@ -28,6 +34,7 @@ from .utils.exceptions import (
     ToolExecutionError,
     ToolNotFoundError,
 )
+from .utils.langconnect_client import close_langconnect_client
 from .sentry import get_logger
 
 logger = get_logger(__name__)
@@ -38,8 +45,7 @@ class MCPToolServer:
 
     def __init__(self) -> None:
         self.server = Server(settings.mcp_server_name)
-        self._tools_cache: Dict[str, BaseTool] = {}
-        self._current_user_context: Optional[UserContext] = None
+        self.catalogue = ToolCatalogue()
         self._setup_handlers()
 
     def _setup_handlers(self) -> None:
@@ -49,32 +55,15 @@ class MCPToolServer:
         async def handle_list_tools() -> List[types.Tool]:
             """Handle tools/list request."""
             try:
-                logger.debug("Listing available tools")
-                
-                # Get all available tools
-                all_tools = await self._get_all_tools()
-                
-                # Convert to MCP tool format
-                mcp_tools = []
-                for tool in all_tools:
-                    tool_schema = tool.definition.to_mcp_schema()
-                    
-                    # Create meta dict with toolkit information
-                    meta = {}
-                    if tool_schema["function"].get("toolkit"):
-                        meta["toolkit"] = tool_schema["function"]["toolkit"]
-                    if tool_schema["function"].get("toolkit_display_name"):
-                        meta["toolkit_display_name"] = tool_schema["function"]["toolkit_display_name"]
-                    
-                    mcp_tools.append(types.Tool(
-                        name=tool.name,
-                        description=tool.description,
-                        inputSchema=tool_schema["function"]["parameters"],
-                        _meta=meta if meta else None
-                    ))
-                
-                logger.debug("Tools listed successfully", count=len(mcp_tools))
-                return mcp_tools
+                # Served from the precompiled catalogue snapshot
+                snapshot = await self.catalogue.get_snapshot()
+                logger.debug(
+                    "Tools listed successfully",
+                    count=len(snapshot.mcp_tools),
+                    catalogue_version=snapshot.version,
+                    etag=snapshot.etag[:16]
+                )
+                return list(snapshot.mcp_tools)
                 
             except Exception as e:
                 logger.error("Failed to list tools", error=str(e))
@@ -105,8 +94,9 @@ class MCPToolServer:
                 mcp_compliance="Tool execution with proper authentication and authorization"
             )
             
-            # Get user context (set by middleware)
-            user_context = self._get_current_user_context()
+            # Get the context bound by the HTTP handler for this request
+            request_context = self._get_request_context()
+            user_context = request_context.user_context
             
             logger.info(
                 "MCP Tool Execution: User context validated",
@@ -124,7 +114,7 @@ class MCPToolServer:
                 logger.error(
                     "MCP Tool Execution: Tool not found",
                     tool_name=name,
-                    available_tools=list(self._tools_cache.keys()),
+                    catalogue_version=self.catalogue.snapshot_version,
                     user_id=user_context.user_id
                 )
                 raise ToolNotFoundError(name)
@@ -132,7 +122,7 @@ class MCPToolServer:
             # Execute the tool with timeout
             try:
                 # Add JWT token for memory tools that need authentication with LangConnect
-                execution_kwargs = arguments or {}
+                execution_kwargs = dict(arguments or {})
                 if hasattr(tool, 'toolkit_name') and tool.toolkit_name == 'memory':
                     # Block memory tools for service-account authentication (MCP security requirement)
                     auth_method = user_context.metadata.get('auth_method') if hasattr(user_context, 'metadata') else None
@@ -181,6 +171,7 @@ class MCPToolServer:
                     tool.execute(
                         user_id=user_context.user_id,
                         user_email=user_context.email,
+                        _request_context=request_context,
                         **execution_kwargs
                     ),
                     timeout=settings.tool_execution_timeout
@@ -245,55 +236,35 @@ class MCPToolServer:
 
     async def _get_all_tools(self) -> List[BaseTool]:
         """Get all available tools (Arcade + custom)."""
-        all_tools = []
-        
-        # Get Arcade tools if enabled and available
-        if settings.enable_arcade:
-            try:
-                from .tools.arcade_tools import arcade_tools_manager
-                arcade_tools = await arcade_tools_manager.get_available_tools()
-                all_tools.extend(arcade_tools)
-                logger.info("Arcade tools loaded successfully", count=len(arcade_tools))
-            except ImportError as e:
-                logger.warning("Arcade tools not available - arcadepy not installed", error=str(e))
-            except Exception as e:
-                logger.warning("Failed to load Arcade tools", error=str(e))
-        else:
-            logger.info("Arcade tools disabled in configuration")
-        
-        # Get custom tools
-        if settings.enable_custom_tools:
-            all_tools.extend(CUSTOM_TOOLS)
-            logger.info("Custom tools loaded", count=len(CUSTOM_TOOLS))
-        
-        # Update cache
-        self._tools_cache = {tool.name: tool for tool in all_tools}
-        
-        return all_tools
+        snapshot = await self.catalogue.get_snapshot()
+        return list(snapshot.tools.values())
 
     async def _get_tool(self, tool_name: str) -> Optional[BaseTool]:
         """Get a specific tool by name."""
-        # Check cache first
-        if tool_name in self._tools_cache:
-            return self._tools_cache[tool_name]
-        
-        # Refresh tools and check again
-        await self._get_all_tools()
-        return self._tools_cache.get(tool_name)
+        return await self.catalogue.get_tool(tool_name)
 
     def set_user_context(self, user_context: UserContext) -> None:
-        """Set the current user context (called by middleware)."""
-        self._current_user_context = user_context
-
-    def _get_current_user_context(self) -> UserContext:
-        """Get the current user context."""
-        if self._current_user_context:
-            return self._current_user_context
+        """Bind a user context to the current request.
+
+        Deprecated: prefer ``request_scope`` so the binding is reset when the
+        request finishes. The context is stored in a ContextVar, never on the
+        server instance, so concurrent requests cannot see each other's user.
+        """
+        bind_request_context(RequestContext(user_context=user_context))
+
+    def _get_request_context(self) -> RequestContext:
+        """Get the context bound to the current request."""
+        request_context = get_request_context()
+        if request_context:
+            return request_context
         
-        # Fallback for backward compatibility
-        return UserContext(
-            user_id="default_user",
-            authenticated_at=time.time()
+        # Fallback for stdio transport and backward compatibility
+        return RequestContext(
+            user_context=UserContext(
+                user_id="default_user",
+                authenticated_at=time.time()
+            ),
+            transport="stdio",
         )
 
     def _format_tool_result(self, result: Any) -> Sequence[types.TextContent]:
@@ -423,12 +394,14 @@ class MCPHTTPServer:
                 )
                 
                 # Only extract user context for non-discovery endpoints
+                scope_binding = contextlib.nullcontext()
                 if not is_discovery_endpoint:
                     # Extract user context
                     user_context = user_context_manager.extract_user_context(headers_str)
                     
-                    # Set user context for this request
-                    self.mcp_server.set_user_context(user_context)
+                    # Bind user context to this request only; the session manager
+                    # runs handlers in tasks that inherit the current contextvars
+                    scope_binding = request_scope(user_context)
                     
                     logger.info("User context established", 
                                user_id=user_context.user_id,
@@ -437,10 +410,11 @@ class MCPHTTPServer:
                     logger.info("Skipping authentication for OAuth discovery endpoint", path=request_path)
                 
                 # Handle the MCP request
-                logger.info("Passing request to session manager",
-                           method=scope.get('method'),
-                           path=scope.get('path'))
-                await self.session_manager.handle_request(scope, receive, send)
+                with scope_binding:
+                    logger.info("Passing request to session manager",
+                               method=scope.get('method'),
+                               path=scope.get('path'))
+                    await self.session_manager.handle_request(scope, receive, send)
                 
             except AuthenticationError as e:
                 client_ip = dict(scope.get("headers", {})).get(b"x-forwarded-for", b"unknown").decode()
@@ -509,7 +483,11 @@ class MCPHTTPServer:
                 "status": "healthy", 
                 "server": settings.mcp_server_name,
                 "transports": ["streamable-http"],
-                "version": "0.1.0"
+                "version": "0.1.0",
+                "tool_catalogue": {
+                    "version": self.mcp_server.catalogue.snapshot_version,
+                    "etag": self.mcp_server.catalogue.etag,
+                },
             })
 
         async def handle_oauth_discovery(request: Request) -> JSONResponse:
@@ -707,10 +685,19 @@ class MCPHTTPServer:
             """Context manager for managing session manager lifecycle."""
             async with self.session_manager.run():
                 logger.info("MCP server started with official Streamable HTTP transport!")
+                # Build the tool catalogue before the first tools/list arrives
+                self.mcp_server.catalogue.schedule_refresh()
+                await self._run_tool_hooks("startup")
                 try:
                     yield
                 finally:
                     logger.info("MCP server shutting down...")
+                    await self._run_tool_hooks("shutdown")
+                    await self.mcp_server.catalogue.close()
+                    await close_langconnect_client()
+                    if settings.enable_arcade:
+                        from .auth.arcade_gateway import arcade_gateway
+                        await arcade_gateway.aclose()
 
         # Create routes - specific routes MUST come before the Mount
         routes = []
@@ -766,6 +753,19 @@ class MCPHTTPServer:
                 expose_headers=["Mcp-Session-Id"],
             )
 
+    async def _run_tool_hooks(self, hook: str) -> None:
+        """Run a lifecycle hook (startup/shutdown) on every custom tool."""
+        if not settings.enable_custom_tools:
+            return
+        from .tools.custom_tools import CUSTOM_TOOLS
+        results = await asyncio.gather(
+            *(getattr(tool, hook)() for tool in CUSTOM_TOOLS),
+            return_exceptions=True,
+        )
+        for tool, result in zip(CUSTOM_TOOLS, results):
+            if isinstance(result, Exception):
+                logger.warning("Tool lifecycle hook failed", tool=tool.name, hook=hook, error=str(result))
+
     async def run_http(self) -> None:
         """Run the HTTP server."""
         import uvicorn
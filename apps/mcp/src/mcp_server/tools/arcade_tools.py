@@ -1,5 +1,6 @@
 """Arcade tools integration for the MCP server."""
 
+import asyncio
 import time
 from typing import Dict, List, Optional
 
@@ -69,54 +70,8 @@ class ArcadeToolsManager:
         logger.info("Refreshing Arcade tools cache")
 
         try:
-            # Lazy import arcade auth manager
-            from ..auth.arcade_auth import arcade_auth_manager
-
-            # Get all available tools from Arcade with pagination
-            arcade_client = arcade_auth_manager.arcade_client
-            all_tools = []
-            offset = 0
-            limit = 1000
-            total_fetched = 0
-
-            # Fetch all pages of tools
-            while True:
-                logger.debug(f"Fetching tools page with offset={offset}, limit={limit}")
-
-                # Fetch the current page
-                # Note: Using offset parameter if available, otherwise may need multiple calls
-                if offset == 0:
-                    response = arcade_client.tools.list(limit=limit)
-                else:
-                    # Try to use offset parameter if supported by the API
-                    try:
-                        response = arcade_client.tools.list(limit=limit, offset=offset)
-                    except TypeError:
-                        # If offset parameter is not supported, we can only get first batch
-                        logger.warning("Arcade API client does not support offset parameter, fetching more tools via alternative method")
-                        # Try alternative pagination if available
-                        break
-
-                if not response.items:
-                    logger.debug(f"No more items at offset={offset}, stopping pagination")
-                    break
-
-                all_tools.extend(response.items)
-                total_fetched += len(response.items)
-                logger.debug(f"Fetched {len(response.items)} tools, total so far: {total_fetched}")
-
-                # Check if we've fetched all available tools
-                if len(response.items) < limit:
-                    logger.debug(f"Fetched {len(response.items)} tools (less than limit {limit}), assuming end of data")
-                    break
-
-                # Move to next page
-                offset += limit
-
-                # Safety check to prevent infinite loops
-                if offset > 10000:
-                    logger.warning(f"Reached maximum offset {offset}, stopping pagination for safety")
-                    break
+            # The Arcade client is synchronous; page through it off the event loop
+            all_tools = await asyncio.to_thread(self._list_arcade_tools)
 
             if not all_tools:
                 logger.warning("No tools returned from Arcade API")
@@ -130,18 +85,7 @@ class ArcadeToolsManager:
 
             for arcade_tool in all_tools:
                 if self._should_include_tool(arcade_tool):
-                    # Use the fully qualified name format: Toolkit_ToolName
-                    if hasattr(arcade_tool, 'toolkit') and arcade_tool.toolkit:
-                        toolkit_name = arcade_tool.toolkit.name
-                        full_tool_name = f"{toolkit_name}_{arcade_tool.name}"
-                    else:
-                        # Fallback to just the tool name if no toolkit
-                        full_tool_name = arcade_tool.name
-
-                    tool_instance = ArcadeTool(
-                        arcade_tool_name=full_tool_name,
-                        arcade_definition=arcade_tool
-                    )
+                    tool_instance = self._build_tool(arcade_tool)
                     new_cache[tool_instance.name] = tool_instance
                 else:
                     filtered_count += 1
@@ -162,6 +106,73 @@ class ArcadeToolsManager:
             logger.error("Failed to refresh Arcade tools cache", error=str(e))
             raise ArcadeAPIError(f"Failed to refresh tools cache: {str(e)}")
 
+    def _build_tool(self, arcade_tool) -> ArcadeTool:
+        """Wrap an Arcade tool definition as an MCP tool."""
+        # Use the fully qualified name format: Toolkit_ToolName
+        if hasattr(arcade_tool, 'toolkit') and arcade_tool.toolkit:
+            toolkit_name = arcade_tool.toolkit.name
+            full_tool_name = f"{toolkit_name}_{arcade_tool.name}"
+        else:
+            # Fallback to just the tool name if no toolkit
+            full_tool_name = arcade_tool.name
+
+        return ArcadeTool(
+            arcade_tool_name=full_tool_name,
+            arcade_definition=arcade_tool
+        )
+
+    def _list_arcade_tools(self) -> list:
+        """Fetch every tool definition from Arcade, following pagination."""
+        # Lazy import arcade auth manager
+        from ..auth.arcade_auth import arcade_auth_manager
+
+        arcade_client = arcade_auth_manager.arcade_client
+        all_tools = []
+        offset = 0
+        limit = 1000
+        total_fetched = 0
+
+        # Fetch all pages of tools
+        while True:
+            logger.debug(f"Fetching tools page with offset={offset}, limit={limit}")
+
+            # Fetch the current page
+            # Note: Using offset parameter if available, otherwise may need multiple calls
+            if offset == 0:
+                response = arcade_client.tools.list(limit=limit)
+            else:
+                # Try to use offset parameter if supported by the API
+                try:
+                    response = arcade_client.tools.list(limit=limit, offset=offset)
+                except TypeError:
+                    # If offset parameter is not supported, we can only get first batch
+                    logger.warning("Arcade API client does not support offset parameter, fetching more tools via alternative method")
+                    # Try alternative pagination if available
+                    break
+
+            if not response.items:
+                logger.debug(f"No more items at offset={offset}, stopping pagination")
+                break
+
+            all_tools.extend(response.items)
+            total_fetched += len(response.items)
+            logger.debug(f"Fetched {len(response.items)} tools, total so far: {total_fetched}")
+
+            # Check if we've fetched all available tools
+            if len(response.items) < limit:
+                logger.debug(f"Fetched {len(response.items)} tools (less than limit {limit}), assuming end of data")
+                break
+
+            # Move to next page
+            offset += limit
+
+            # Safety check to prevent infinite loops
+            if offset > 10000:
+                logger.warning(f"Reached maximum offset {offset}, stopping pagination for safety")
+                break
+
+        return all_tools
+
     def _should_include_tool(self, arcade_tool) -> bool:
         """Check if a tool should be included based on configuration.
 
@@ -199,6 +210,43 @@ class ArcadeToolsManager:
 
         return True
 
+    async def resolve_tool(self, tool_name: str) -> Optional[BaseTool]:
+        """Fetch a single Arcade tool by its MCP name without listing every tool.
+
+        Args:
+            tool_name: The MCP tool name (Toolkit_ToolName)
+
+        Returns:
+            The tool if Arcade knows it and it is enabled, None otherwise
+        """
+        if tool_name in self._tools_cache:
+            return self._tools_cache[tool_name]
+        if "_" not in tool_name:
+            return None
+
+        # Lazy import arcade auth manager
+        from ..auth.arcade_auth import arcade_auth_manager
+
+        toolkit_name, name = tool_name.split("_", 1)
+
+        def fetch():
+            return arcade_auth_manager.arcade_client.tools.get(name=f"{toolkit_name}.{name}")
+
+        try:
+            arcade_tool = await asyncio.to_thread(fetch)
+        except Exception as e:
+            logger.debug("Arcade tool lookup failed", tool=tool_name, error=str(e))
+            return None
+
+        if not arcade_tool or not self._should_include_tool(arcade_tool):
+            return None
+
+        tool = self._build_tool(arcade_tool)
+        if tool.name != tool_name:
+            return None
+        self._tools_cache[tool.name] = tool
+        return tool
+
     def get_tools_by_service(self, service_name: str) -> List[BaseTool]:
         """Get tools for a specific service.
         
@@ -242,15 +290,15 @@ class ArcadeToolsManager:
         Returns:
             Authorization URL if needed, None if authorized
         """
-        # Lazy import arcade auth manager
-        from ..auth.arcade_auth import arcade_auth_manager
+        # Lazy import arcade gateway
+        from ..auth.arcade_gateway import arcade_gateway
         
         # Get the actual Arcade tool name
         tool = await self.get_tool(tool_name)
         if not tool:
             raise ValueError(f"Tool '{tool_name}' not found")
         
-        return arcade_auth_manager.check_user_authorization(
+        return await arcade_gateway.check_authorization(
             user_id=user_id,
             tool_name=tool.arcade_tool_name
         )
@@ -124,13 +124,21 @@ class BaseTool(ABC):
         
         Args:
             user_id: The user ID executing the tool
-            **kwargs: Tool input parameters
+            **kwargs: Tool input parameters. The server also passes
+                ``_request_context`` (a ``RequestContext``) with the caller's
+                identity and request metadata for this call.
             
         Returns:
             Tool execution result
         """
         pass
 
+    async def startup(self) -> None:
+        """Start background resources (called once when the HTTP server starts)."""
+
+    async def shutdown(self) -> None:
+        """Release background resources (called when the HTTP server stops)."""
+
     def validate_input(self, **kwargs: Any) -> Dict[str, Any]:
         """Validate tool input parameters."""
         validated = {}
@@ -246,13 +254,15 @@ class ArcadeTool(BaseTool):
 
     async def execute(self, user_id: str, user_email: Optional[str] = None, **kwargs: Any) -> Any:
         """Execute the Arcade tool."""
-        from ..auth.arcade_auth import arcade_auth_manager
+        from ..auth.arcade_gateway import arcade_gateway
+        
+        kwargs.pop("_request_context", None)
         
         # Validate input
         validated_input = self.validate_input(**kwargs)
         
-        # Execute via Arcade auth manager
-        return arcade_auth_manager.execute_tool(
+        # Execute via the async Arcade gateway (never blocks the event loop)
+        return await arcade_gateway.execute_tool(
             user_id=user_id,
             tool_name=self.arcade_tool_name,
             tool_input=validated_input,
@@ -285,7 +295,7 @@ class CustomTool(BaseTool):
         # Validate input
         validated_input = self.validate_input(**kwargs)
         
-        # Pass through special arguments that start with _ (like _jwt_token, _context_*)
+        # Pass through special arguments that start with _ (like _jwt_token, _context_*, _request_context)
         # These are internal arguments used for authentication and context passing
         for key, value in kwargs.items():
             if key.startswith('_') and key not in validated_input:
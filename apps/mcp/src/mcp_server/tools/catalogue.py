@@ -0,0 +1,273 @@
+"""Precomputed, versioned tool catalogue for the MCP server.
+
+``tools/list`` is called at the start of every agent run, so the server keeps
+an immutable snapshot of the compiled MCP tool schemas and serves it directly:
+
+1. Each tool's MCP schema is compiled once per definition version (Arcade
+   toolkit version, or the tool class for custom tools) and reused across
+   refreshes
+2. Snapshots carry a monotonically increasing version and a content hash
+   (ETag), which only changes when the published schemas change
+3. Stale snapshots keep being served while Arcade toolkits are refreshed in a
+   background task; a failed Arcade refresh keeps the previous Arcade tools
+4. A lookup miss resolves that single tool from Arcade instead of rebuilding
+   the whole catalogue, with a short negative cache for unknown names
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from mcp import types
+
+from ..config import settings
+from ..utils.logging import get_logger
+from .base import ArcadeTool, BaseTool
+
+logger = get_logger(__name__)
+
+# How long a name that Arcade could not resolve is remembered as missing
+MISS_CACHE_TTL_SECONDS = 60
+MISS_CACHE_MAX_ENTRIES = 1024
+
+
+@dataclass(frozen=True)
+class CatalogueSnapshot:
+    """Immutable view of the published tools."""
+
+    version: int
+    etag: str
+    tools: Mapping[str, BaseTool]
+    mcp_tools: Tuple[types.Tool, ...]
+    built_at: float = field(default_factory=time.time)
+
+    @property
+    def age(self) -> float:
+        """Seconds since the snapshot was built."""
+        return time.time() - self.built_at
+
+
+def compile_tool(tool: BaseTool) -> types.Tool:
+    """Compile a tool's definition into its MCP ``tools/list`` entry."""
+    tool_schema = tool.definition.to_mcp_schema()
+
+    # Create meta dict with toolkit information
+    meta = {}
+    if tool_schema["function"].get("toolkit"):
+        meta["toolkit"] = tool_schema["function"]["toolkit"]
+    if tool_schema["function"].get("toolkit_display_name"):
+        meta["toolkit_display_name"] = tool_schema["function"]["toolkit_display_name"]
+
+    return types.Tool(
+        name=tool.name,
+        description=tool.description,
+        inputSchema=tool_schema["function"]["parameters"],
+        _meta=meta if meta else None
+    )
+
+
+def definition_version(tool: BaseTool) -> str:
+    """Version key under which a tool's compiled schema can be reused."""
+    if isinstance(tool, ArcadeTool):
+        toolkit = getattr(tool.arcade_definition, "toolkit", None)
+        version = getattr(toolkit, "version", None)
+        if toolkit is not None and version:
+            return f"{toolkit.name}@{version}"
+        dump = getattr(tool.arcade_definition, "model_dump_json", None)
+        if dump is not None:
+            return hashlib.sha256(dump().encode()).hexdigest()
+        return f"arcade:{id(tool.arcade_definition)}"
+    return f"{type(tool).__module__}.{type(tool).__qualname__}"
+
+
+def _compute_etag(mcp_tools: Tuple[types.Tool, ...]) -> str:
+    payload = json.dumps(
+        [tool.model_dump(mode="json", by_alias=True, exclude_none=True) for tool in mcp_tools],
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ToolCatalogue:
+    """Builds and serves catalogue snapshots for one MCP server."""
+
+    def __init__(self, refresh_interval: Optional[float] = None) -> None:
+        self.refresh_interval = refresh_interval if refresh_interval is not None else settings.tool_cache_ttl
+        self._snapshot: Optional[CatalogueSnapshot] = None
+        self._compiled: Dict[Tuple[str, str], types.Tool] = {}
+        self._arcade_tools: List[BaseTool] = []
+        self._misses: Dict[str, float] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._resolving: Dict[str, asyncio.Task] = {}
+
+    # ---------- building ----------
+
+    def _compile(self, tool: BaseTool) -> types.Tool:
+        key = (tool.name, definition_version(tool))
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            compiled = compile_tool(tool)
+            self._compiled[key] = compiled
+        return compiled
+
+    def _publish(self, tools: List[BaseTool]) -> CatalogueSnapshot:
+        """Swap in a snapshot for ``tools``, keeping the version if nothing changed."""
+        by_name = {tool.name: tool for tool in tools}
+        mcp_tools = tuple(self._compile(tool) for tool in by_name.values())
+        etag = _compute_etag(mcp_tools)
+
+        current = self._snapshot
+        if current is not None and current.etag == etag:
+            snapshot = replace(current, tools=MappingProxyType(by_name), built_at=time.time())
+        else:
+            snapshot = CatalogueSnapshot(
+                version=(current.version + 1) if current else 1,
+                etag=etag,
+                tools=MappingProxyType(by_name),
+                mcp_tools=mcp_tools,
+            )
+            logger.info(
+                "Tool catalogue published",
+                version=snapshot.version,
+                etag=etag[:16],
+                tool_count=len(mcp_tools),
+            )
+
+        # Drop compiled schemas for tools (or versions) that are no longer published
+        live = {(tool.name, definition_version(tool)) for tool in by_name.values()}
+        self._compiled = {key: value for key, value in self._compiled.items() if key in live}
+        self._snapshot = snapshot
+        return snapshot
+
+    async def _load_arcade_tools(self) -> List[BaseTool]:
+        """Fetch Arcade tools, falling back to the last good set on failure."""
+        if not settings.enable_arcade:
+            return []
+        try:
+            from .arcade_tools import arcade_tools_manager
+            self._arcade_tools = await arcade_tools_manager.get_available_tools(force_refresh=True)
+            logger.info("Arcade tools loaded successfully", count=len(self._arcade_tools))
+        except ImportError as e:
+            logger.warning("Arcade tools not available - arcadepy not installed", error=str(e))
+        except Exception as e:
+            logger.warning(
+                "Failed to load Arcade tools, keeping previous set",
+                error=str(e),
+                previous_count=len(self._arcade_tools),
+            )
+        return self._arcade_tools
+
+    def _custom_tools(self) -> List[BaseTool]:
+        if not settings.enable_custom_tools:
+            return []
+        from .custom_tools import CUSTOM_TOOLS
+        return list(CUSTOM_TOOLS)
+
+    async def refresh(self) -> CatalogueSnapshot:
+        """Rebuild the catalogue from Arcade and custom tools."""
+        start_time = time.time()
+        arcade_tools = await self._load_arcade_tools()
+        snapshot = self._publish([*arcade_tools, *self._custom_tools()])
+        self._misses.clear()
+        logger.info(
+            "Tool catalogue refreshed",
+            version=snapshot.version,
+            tool_count=len(snapshot.tools),
+            duration_ms=(time.time() - start_time) * 1000,
+        )
+        return snapshot
+
+    def schedule_refresh(self) -> asyncio.Task:
+        """Start a background refresh unless one is already running."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_in_background())
+        return self._refresh_task
+
+    async def _refresh_in_background(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.error("Background tool catalogue refresh failed", error=str(e))
+
+    async def close(self) -> None:
+        """Cancel background work (called on server shutdown)."""
+        tasks = [task for task in (self._refresh_task, *self._resolving.values()) if task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refresh_task = None
+        self._resolving.clear()
+
+    # ---------- serving ----------
+
+    @property
+    def snapshot_version(self) -> Optional[int]:
+        """Version of the published snapshot, or None before the first build."""
+        return self._snapshot.version if self._snapshot else None
+
+    @property
+    def etag(self) -> Optional[str]:
+        """Content hash of the published tool schemas."""
+        return self._snapshot.etag if self._snapshot else None
+
+    async def get_snapshot(self) -> CatalogueSnapshot:
+        """Return the current snapshot, building the first one if needed.
+
+        Stale snapshots are returned immediately while a background refresh
+        replaces them.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            await asyncio.shield(self.schedule_refresh())
+            if self._snapshot is None:
+                # The first build failed outright; serve what can be built locally
+                return self._publish(self._custom_tools())
+            return self._snapshot
+        if snapshot.age > self.refresh_interval:
+            self.schedule_refresh()
+        return snapshot
+
+    async def get_tool(self, tool_name: str) -> Optional[BaseTool]:
+        """Look up a tool, resolving a single Arcade tool on a miss."""
+        snapshot = await self.get_snapshot()
+        tool = snapshot.tools.get(tool_name)
+        if tool is not None or not settings.enable_arcade:
+            return tool
+
+        missed_at = self._misses.get(tool_name)
+        if missed_at is not None and time.time() - missed_at < MISS_CACHE_TTL_SECONDS:
+            return None
+
+        task = self._resolving.get(tool_name)
+        if task is None:
+            task = asyncio.create_task(self._resolve_arcade_tool(tool_name))
+            self._resolving[tool_name] = task
+            task.add_done_callback(lambda _: self._resolving.pop(tool_name, None))
+        return await asyncio.shield(task)
+
+    async def _resolve_arcade_tool(self, tool_name: str) -> Optional[BaseTool]:
+        try:
+            from .arcade_tools import arcade_tools_manager
+            tool = await arcade_tools_manager.resolve_tool(tool_name)
+        except Exception as e:
+            logger.warning("Failed to resolve Arcade tool", tool_name=tool_name, error=str(e))
+            tool = None
+
+        if tool is None:
+            if len(self._misses) >= MISS_CACHE_MAX_ENTRIES:
+                self._misses.clear()
+            self._misses[tool_name] = time.time()
+            return None
+
+        # Publish the resolved tool without refetching the rest of the catalogue
+        current = self._snapshot
+        self._arcade_tools = [t for t in self._arcade_tools if t.name != tool.name] + [tool]
+        tools = [t for t in (current.tools.values() if current else []) if t.name != tool.name]
+        self._publish([*tools, tool])
+        logger.info("Arcade tool resolved on demand", tool_name=tool_name)
+        return tool
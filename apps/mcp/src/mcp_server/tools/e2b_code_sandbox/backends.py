@@ -0,0 +1,280 @@
+"""Sandbox backends for the code execution tool.
+
+A backend creates, connects to and kills sandboxes. The sandbox objects it
+returns follow the subset of ``e2b_code_interpreter.AsyncSandbox`` used by the
+tool and the pool: ``sandbox_id``, ``run_code()``, ``is_running()``,
+``set_timeout()`` and ``kill()``.
+
+- ``E2BSandboxBackend`` returns real E2B sandboxes
+- ``LocalSandboxBackend`` runs a persistent Python subprocess per sandbox, for
+  tests and local development without an E2B account
+"""
+
+import asyncio
+import json
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from ...config import settings
+from ...utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+REQUEST_TIMEOUT = 60  # 1 minute for API requests
+PIP_INSTALL_TIMEOUT = 180  # 3 minutes for package installation
+
+
+class SandboxBackend(ABC):
+    """Creates and manages sandboxes for the code execution tool."""
+
+    name: str = "abstract"
+
+    @abstractmethod
+    async def create(self, metadata: Dict[str, str], timeout: int) -> Any:
+        """Boot a new sandbox."""
+
+    @abstractmethod
+    async def connect(self, sandbox_id: str) -> Any:
+        """Connect to an existing sandbox by ID."""
+
+    @abstractmethod
+    async def kill(self, sandbox_id: str) -> bool:
+        """Kill a sandbox by ID; returns False if it was not found."""
+
+    @abstractmethod
+    async def install_packages(self, sandbox: Any, packages: List[str]) -> bool:
+        """Install pip packages in a sandbox; returns True on success."""
+
+
+class E2BSandboxBackend(SandboxBackend):
+    """Sandboxes hosted by E2B."""
+
+    name = "e2b"
+
+    async def create(self, metadata: Dict[str, str], timeout: int) -> Any:
+        from e2b_code_interpreter import AsyncSandbox
+
+        return await AsyncSandbox.create(
+            timeout=timeout,
+            metadata=metadata,
+            api_key=settings.e2b_api_key,
+            request_timeout=REQUEST_TIMEOUT,
+        )
+
+    async def connect(self, sandbox_id: str) -> Any:
+        from e2b_code_interpreter import AsyncSandbox
+
+        return await AsyncSandbox.connect(sandbox_id, api_key=settings.e2b_api_key)
+
+    async def kill(self, sandbox_id: str) -> bool:
+        from e2b_code_interpreter import AsyncSandbox
+
+        # Use static method to kill by ID
+        return await AsyncSandbox.kill(sandbox_id, api_key=settings.e2b_api_key)
+
+    async def install_packages(self, sandbox: Any, packages: List[str]) -> bool:
+        # Build pip install command
+        packages_str = " ".join(f'"{pkg}"' for pkg in packages)
+        install_code = f"""
+import subprocess
+import sys
+
+print("Installing packages: {packages_str}")
+try:
+    result = subprocess.run([
+        sys.executable, "-m", "pip", "install", "--quiet"
+    ] + {packages!r}, capture_output=True, text=True, timeout=120)
+
+    if result.returncode == 0:
+        print("✅ Packages installed successfully")
+    else:
+        print(f"❌ Package installation failed: {{result.stderr}}")
+        raise SystemExit(1)
+
+except Exception as e:
+    print(f"❌ Package installation error: {{e}}")
+    raise
+"""
+        execution = await sandbox.run_code(
+            install_code,
+            timeout=PIP_INSTALL_TIMEOUT,
+            request_timeout=REQUEST_TIMEOUT,
+        )
+        if execution.error:
+            logger.warning(
+                "Package installation had errors",
+                packages=packages,
+                error=str(execution.error),
+            )
+            return False
+        logger.info("Packages installed successfully", packages=packages)
+        return True
+
+
+# ---------- local subprocess backend ----------
+
+# Runs inside the sandbox subprocess: reads one JSON request per line, executes
+# it in a persistent namespace and writes one JSON response per line.
+_LOCAL_DRIVER = r'''
+import ast, contextlib, io, json, sys, traceback
+namespace = {"__name__": "__main__"}
+for line in sys.stdin:
+    request = json.loads(line)
+    stdout, stderr = io.StringIO(), io.StringIO()
+    response = {"text": None, "error": None}
+    try:
+        tree = ast.parse(request["code"], "<sandbox>", "exec")
+        last = tree.body.pop() if tree.body and isinstance(tree.body[-1], ast.Expr) else None
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            exec(compile(tree, "<sandbox>", "exec"), namespace)
+            if last is not None:
+                value = eval(compile(ast.Expression(last.value), "<sandbox>", "eval"), namespace)
+                if value is not None:
+                    response["text"] = repr(value)
+    except BaseException as e:
+        response["error"] = {"name": type(e).__name__, "value": str(e), "traceback": traceback.format_exc()}
+    response["stdout"] = stdout.getvalue().splitlines(keepends=True)
+    response["stderr"] = stderr.getvalue().splitlines(keepends=True)
+    sys.__stdout__.write(json.dumps(response) + "\n")
+    sys.__stdout__.flush()
+'''
+
+
+@dataclass
+class LocalExecutionError:
+    """Error raised by code run in a local sandbox."""
+
+    name: str
+    value: str
+    traceback: str
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.value}"
+
+
+@dataclass
+class LocalLogs:
+    """Captured output of a local execution."""
+
+    stdout: List[str] = field(default_factory=list)
+    stderr: List[str] = field(default_factory=list)
+
+
+@dataclass
+class LocalExecution:
+    """Execution result shaped like ``e2b_code_interpreter.Execution``."""
+
+    text: Optional[str] = None
+    error: Optional[LocalExecutionError] = None
+    logs: LocalLogs = field(default_factory=LocalLogs)
+    results: List[Any] = field(default_factory=list)
+
+
+class LocalSandbox:
+    """Persistent Python subprocess with an AsyncSandbox-like interface."""
+
+    def __init__(self, sandbox_id: str, process: asyncio.subprocess.Process, workdir: str, timeout: int) -> None:
+        self.sandbox_id = sandbox_id
+        self.metadata: Dict[str, str] = {}
+        self._process = process
+        self._workdir = workdir
+        self._lock = asyncio.Lock()
+        self._expires_at = time.time() + timeout
+
+    async def run_code(self, code: str, timeout: Optional[float] = None, request_timeout: Optional[float] = None) -> LocalExecution:
+        if not await self.is_running():
+            raise RuntimeError(f"Sandbox {self.sandbox_id} is not running")
+        async with self._lock:
+            self._process.stdin.write((json.dumps({"code": code}) + "\n").encode())
+            await self._process.stdin.drain()
+            try:
+                line = await asyncio.wait_for(self._process.stdout.readline(), timeout=timeout)
+            except asyncio.TimeoutError:
+                await self.kill()
+                raise TimeoutError(f"Execution timed out after {timeout} seconds")
+        if not line:
+            raise RuntimeError(f"Sandbox {self.sandbox_id} exited during execution")
+
+        response = json.loads(line)
+        error = response.get("error")
+        return LocalExecution(
+            text=response.get("text"),
+            error=LocalExecutionError(**error) if error else None,
+            logs=LocalLogs(stdout=response.get("stdout", []), stderr=response.get("stderr", [])),
+        )
+
+    async def is_running(self) -> bool:
+        if self._process.returncode is None and time.time() >= self._expires_at:
+            await self.kill()
+        return self._process.returncode is None
+
+    async def set_timeout(self, timeout: int) -> None:
+        self._expires_at = time.time() + timeout
+
+    async def kill(self) -> None:
+        if self._process.returncode is None:
+            self._process.kill()
+            await self._process.wait()
+        shutil.rmtree(self._workdir, ignore_errors=True)
+
+
+class LocalSandboxBackend(SandboxBackend):
+    """Runs each sandbox as a local Python subprocess (no isolation; tests only)."""
+
+    name = "local"
+
+    def __init__(self) -> None:
+        self._sandboxes: Dict[str, LocalSandbox] = {}
+
+    async def create(self, metadata: Dict[str, str], timeout: int) -> Any:
+        sandbox_id = f"local-{uuid.uuid4().hex[:12]}"
+        workdir = tempfile.mkdtemp(prefix=f"{sandbox_id}-")
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-u", "-c", _LOCAL_DRIVER,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            cwd=workdir,
+        )
+        sandbox = LocalSandbox(sandbox_id, process, workdir, timeout)
+        sandbox.metadata = dict(metadata)
+        # Forget sandboxes that were killed directly through their handle
+        self._sandboxes = {
+            key: value for key, value in self._sandboxes.items() if value._process.returncode is None
+        }
+        self._sandboxes[sandbox_id] = sandbox
+        return sandbox
+
+    async def connect(self, sandbox_id: str) -> Any:
+        sandbox = self._sandboxes.get(sandbox_id)
+        if sandbox is None or not await sandbox.is_running():
+            raise LookupError(f"Sandbox {sandbox_id} not found")
+        return sandbox
+
+    async def kill(self, sandbox_id: str) -> bool:
+        sandbox = self._sandboxes.pop(sandbox_id, None)
+        if sandbox is None:
+            return False
+        await sandbox.kill()
+        return True
+
+    async def install_packages(self, sandbox: Any, packages: List[str]) -> bool:
+        # Local sandboxes share the host interpreter; never pip install into it
+        logger.warning("Skipping package installation on local sandbox", packages=packages)
+        return False
+
+
+def create_backend(name: Optional[str] = None) -> SandboxBackend:
+    """Create the backend selected by ``E2B_SANDBOX_BACKEND``."""
+    name = (name or settings.e2b_sandbox_backend).lower()
+    if name == "local":
+        return LocalSandboxBackend()
+    if name == "e2b":
+        return E2BSandboxBackend()
+    raise ValueError(f"Unknown sandbox backend: {name}")
@@ -1,7 +1,6 @@
 """E2B Code Sandbox execution tool."""
 
 import json
-import time
 from typing import Any, Dict, List, Optional, Tuple
 
 from e2b_code_interpreter import AsyncSandbox
@@ -10,18 +9,11 @@ from ...config import settings
 from ...utils.exceptions import ToolExecutionError
 from ...utils.logging import get_logger
 from ..base import CustomTool, ToolParameter
+from .pool import SandboxPool
 
-# Supabase storage utilities for output handling
-try:
-    from ...utils.supabase_storage import (
-        OutputMetadata,
-        generate_output_filename,
-        upload_output_to_supabase,
-        is_supabase_storage_available,
-    )
-    SUPABASE_STORAGE_AVAILABLE = is_supabase_storage_available()
-except ImportError:
-    SUPABASE_STORAGE_AVAILABLE = False
+# Artifact storage for image outputs (Supabase, or local filesystem for tests)
+from ...utils.artifact_store import get_artifact_store
+from ...utils.supabase_storage import OutputMetadata
 
 logger = get_logger(__name__)
 
@@ -42,7 +34,19 @@ class E2BExecuteCodeTool(CustomTool):
     
     def __init__(self) -> None:
         super().__init__()
-        self._sandbox_cache: Dict[Tuple[str, str], AsyncSandbox] = {}
+        self._pool = SandboxPool(sandbox_timeout=self.DEFAULT_TIMEOUT)
+
+    async def startup(self) -> None:
+        """Start filling the warm sandbox pool."""
+        if self._pool.backend.name != "e2b" or settings.e2b_api_key:
+            self._pool.start()
+
+    async def shutdown(self) -> None:
+        """Kill (or detach, per E2B_POOL_SHUTDOWN_MODE) pooled sandboxes and flush uploads."""
+        await self._pool.close()
+        store = get_artifact_store()
+        if store is not None:
+            await store.flush(timeout=30)
         
     @property
     def name(self) -> str:
@@ -118,7 +122,7 @@ class E2BExecuteCodeTool(CustomTool):
     async def _execute_impl(self, user_id: str, **kwargs: Any) -> Any:
         """Execute the E2B code sandbox tool."""
         # Validate E2B API key is configured
-        if not settings.e2b_api_key:
+        if self._pool.backend.name == "e2b" and not settings.e2b_api_key:
             raise ToolExecutionError(
                 "e2b_code_sandbox",
                 "E2B API key not configured. Please set E2B_API_KEY environment variable."
@@ -158,21 +162,45 @@ class E2BExecuteCodeTool(CustomTool):
                 user_id, thread_id, sandbox_id, reset
             )
             
-            # Install pip packages if specified
+            # Install pip packages if specified (skips ones already in this sandbox)
             if pip_packages:
                 await self._install_packages(sandbox, pip_packages)
             
             # Execute the code
-            execution = await sandbox.run_code(
-                code,
-                timeout=timeout_seconds,
-                request_timeout=self.REQUEST_TIMEOUT,
-            )
+            try:
+                execution = await sandbox.run_code(
+                    code,
+                    timeout=timeout_seconds,
+                    request_timeout=self.REQUEST_TIMEOUT,
+                )
+            except Exception:
+                # Pooled leases skip the remote health check when recently seen
+                # alive; if the sandbox died since, retry once on a fresh one
+                if sandbox_id or not await self._pool.discard_if_dead(user_id, thread_id):
+                    raise
+                logger.info("Leased sandbox died, retrying on a new sandbox", thread_id=thread_id)
+                sandbox, execution_sandbox_id = await self._get_or_create_sandbox(
+                    user_id, thread_id, None, False
+                )
+                if pip_packages:
+                    await self._install_packages(sandbox, pip_packages)
+                execution = await sandbox.run_code(
+                    code,
+                    timeout=timeout_seconds,
+                    request_timeout=self.REQUEST_TIMEOUT,
+                )
             
             # Process results
             result = await self._process_execution_result(
                 execution, user_id, assistant_id, thread_id, execution_sandbox_id
             )
+
+            # Images from earlier calls whose background upload failed
+            store = get_artifact_store()
+            if store is not None:
+                failed_artifacts = store.take_failed(user_id, thread_id)
+                if failed_artifacts:
+                    result["failed_artifacts"] = failed_artifacts
             
             # Handle sandbox cleanup
             if close_sandbox:
@@ -219,8 +247,6 @@ class E2BExecuteCodeTool(CustomTool):
         reset: bool
     ) -> Tuple[AsyncSandbox, str]:
         """Get or create a sandbox for the user/thread."""
-        cache_key = (user_id, thread_id)
-        
         # Handle reset request
         if reset:
             await self._cleanup_sandbox(user_id, thread_id, None)
@@ -228,7 +254,7 @@ class E2BExecuteCodeTool(CustomTool):
         # Handle specific sandbox ID
         if sandbox_id:
             try:
-                sandbox = await AsyncSandbox.connect(sandbox_id, api_key=settings.e2b_api_key)
+                sandbox = await self._pool.backend.connect(sandbox_id)
                 # Update timeout
                 await sandbox.set_timeout(self.DEFAULT_TIMEOUT)
                 logger.info("Connected to specific sandbox", sandbox_id=sandbox_id)
@@ -240,121 +266,17 @@ class E2BExecuteCodeTool(CustomTool):
                     error=str(e),
                 )
         
-        # Check cache first
-        if cache_key in self._sandbox_cache and not reset:
-            try:
-                sandbox = self._sandbox_cache[cache_key]
-                # Verify sandbox is alive by checking if it's running
-                is_running = await sandbox.is_running()
-                if not is_running:
-                    # Remove dead sandbox from cache
-                    del self._sandbox_cache[cache_key]
-                    logger.debug("Removed dead sandbox from cache")
-                else:
-                    # Update timeout
-                    await sandbox.set_timeout(self.DEFAULT_TIMEOUT)
-                    logger.info("Using cached sandbox", sandbox_id=sandbox.sandbox_id)
-                    return sandbox, sandbox.sandbox_id
-            except Exception:
-                # Remove dead sandbox from cache
-                del self._sandbox_cache[cache_key]
-                logger.debug("Removed dead sandbox from cache")
-        
-        # Try to find existing sandbox via metadata
-        if not reset:
-            try:
-                existing_sandbox_id = await self._find_existing_sandbox(user_id, thread_id)
-                if existing_sandbox_id:
-                    sandbox = await AsyncSandbox.connect(existing_sandbox_id, api_key=settings.e2b_api_key)
-                    await sandbox.set_timeout(self.DEFAULT_TIMEOUT)
-                    self._sandbox_cache[cache_key] = sandbox
-                    logger.info("Reconnected to existing sandbox", sandbox_id=existing_sandbox_id)
-                    return sandbox, existing_sandbox_id
-            except Exception as e:
-                logger.warning(
-                    "Failed to reconnect to existing sandbox",
-                    user_id=user_id,
-                    thread_id=thread_id,
-                    error=str(e),
-                )
-        
-        # Create new sandbox
-        metadata = {
-            "user_id": user_id,
-            "thread_id": thread_id,
-            "purpose": "e2b_code_sandbox_mcp",
-            "created_at": str(int(time.time())),
-        }
-        
-        sandbox = await AsyncSandbox.create(
-            timeout=self.DEFAULT_TIMEOUT,
-            metadata=metadata,
-            api_key=settings.e2b_api_key,
-            request_timeout=self.REQUEST_TIMEOUT,
-        )
-        
-        # Cache the new sandbox
-        self._sandbox_cache[cache_key] = sandbox
-        
-        logger.info("Created new sandbox", sandbox_id=sandbox.sandbox_id, metadata=metadata)
-        
+        # Lease from the pool: the existing sandbox for this thread, a warm one, or a new one
+        sandbox, _ = await self._pool.acquire(user_id, thread_id)
         return sandbox, sandbox.sandbox_id
     
-    async def _find_existing_sandbox(self, user_id: str, thread_id: str) -> Optional[str]:
-        """Find existing sandbox by metadata - simplified approach without listing API."""
-        # For now, we'll rely on the in-memory cache since the E2B API doesn't 
-        # provide a simple way to list sandboxes by metadata
-        # This means sandboxes will be created fresh when the server restarts
-        # but will persist within a server session
-        logger.debug(
-            "Skipping sandbox search - relying on cache and creating new if needed",
-            user_id=user_id,
-            thread_id=thread_id,
-        )
-        return None
-    
     async def _install_packages(self, sandbox: AsyncSandbox, packages: List[str]) -> None:
         """Install Python packages in the sandbox."""
         if not packages:
             return
         
-        # Build pip install command
-        packages_str = " ".join(f'"{pkg}"' for pkg in packages)
-        install_code = f"""
-import subprocess
-import sys
-
-print("Installing packages: {packages_str}")
-try:
-    result = subprocess.run([
-        sys.executable, "-m", "pip", "install", "--quiet"
-    ] + {packages!r}, capture_output=True, text=True, timeout=120)
-    
-    if result.returncode == 0:
-        print("✅ Packages installed successfully")
-    else:
-        print(f"❌ Package installation failed: {{result.stderr}}")
-        
-except Exception as e:
-    print(f"❌ Package installation error: {{e}}")
-"""
-        
         try:
-            execution = await sandbox.run_code(
-                install_code, 
-                timeout=180,  # 3 minutes for package installation
-                request_timeout=self.REQUEST_TIMEOUT,
-            )
-            
-            if execution.error:
-                logger.warning(
-                    "Package installation had errors", 
-                    packages=packages,
-                    error=str(execution.error),
-                )
-            else:
-                logger.info("Packages installed successfully", packages=packages)
-                
+            await self._pool.install_packages(sandbox, packages)
         except Exception as e:
             logger.error("Failed to install packages", packages=packages, error=str(e))
             # Don't fail the entire execution for package installation errors
@@ -437,65 +359,54 @@ except Exception as e:
         assistant_id: str,
         thread_id: str
     ) -> Dict[str, Any]:
-        """Process image data for storage or base64 return."""
-        # Always attempt to upload to Supabase storage
-        if SUPABASE_STORAGE_AVAILABLE:
-            try:
-                # Convert image data to bytes
-                if content_type == "image/svg+xml":
-                    output_bytes = image_data.encode('utf-8')
-                else:
-                    import base64
-                    output_bytes = base64.b64decode(image_data)
-
-                # Generate filename with proper path structure
-                filename = generate_output_filename(
-                    user_id=user_id,
-                    assistant_id=assistant_id,
-                    thread_id=thread_id,
-                    tool_name="e2b_code_sandbox",
-                    format=format
-                )
+        """Store image data and return its reference, or base64 if storage is unavailable.
 
-                # Create metadata
+        The upload runs in the background; the storage path is derived from the
+        image content, so it is known before the upload completes.
+        """
+        store = get_artifact_store()
+        if store is not None:
+            try:
                 metadata = OutputMetadata(
-                    filename=filename,
+                    filename="",
                     user_id=user_id,
                     assistant_id=assistant_id,
                     thread_id=thread_id,
                     tool_name="e2b_code_sandbox",
                     content_type=content_type,
-                    size_bytes=len(output_bytes),
+                    size_bytes=0,
                     format=format,
                     additional_metadata={
                         "source": "e2b_sandbox_execution",
                     }
                 )
-
-                # Upload to Supabase Storage
-                storage_path, _ = upload_output_to_supabase(
-                    output_bytes, metadata, content_type
+                ref = store.submit(
+                    image_data,
+                    encoding="text" if content_type == "image/svg+xml" else "base64",
+                    content_type=content_type,
+                    format=format,
+                    metadata=metadata,
                 )
 
                 return {
                     "type": content_type,
-                    "storage_path": storage_path,
-                    "bucket": "agent-outputs",
-                    "filename": filename,
+                    "storage_path": ref.storage_path,
+                    "bucket": ref.bucket,
+                    "filename": ref.storage_path,
                     "format": "storage_path",
-                    "size_bytes": len(output_bytes),
+                    "size_bytes": ref.size_bytes,
                 }
 
             except Exception as e:
                 logger.warning(
-                    "Failed to upload output to Supabase Storage, falling back to base64",
+                    "Failed to store output, falling back to base64",
                     error=str(e),
                     user_id=user_id,
                     assistant_id=assistant_id,
                     thread_id=thread_id,
                 )
 
-        # Fallback to base64 (if Supabase unavailable or upload failed)
+        # Fallback to base64 (if storage unavailable)
         return {
             "type": content_type,
             "data": image_data,
@@ -524,25 +435,15 @@ except Exception as e:
         thread_id: str, 
         sandbox_id: Optional[str]
     ) -> None:
-        """Clean up sandbox and remove from cache."""
-        cache_key = (user_id, thread_id)
-        
-        # Remove from cache
-        if cache_key in self._sandbox_cache:
-            try:
-                sandbox = self._sandbox_cache[cache_key]
-                await sandbox.kill()
-                logger.info("Killed cached sandbox", sandbox_id=sandbox_id)
-            except Exception as e:
-                logger.warning("Failed to kill cached sandbox", error=str(e))
-            finally:
-                del self._sandbox_cache[cache_key]
+        """Clean up sandbox and end its pool lease."""
+        released_id = await self._pool.release(user_id, thread_id)
+        if released_id:
+            logger.info("Killed leased sandbox", sandbox_id=released_id)
         
         # Kill specific sandbox if provided
-        if sandbox_id and sandbox_id != "unknown":
+        if sandbox_id and sandbox_id not in ("unknown", released_id):
             try:
-                # Use static method to kill by ID
-                killed = await AsyncSandbox.kill(sandbox_id, api_key=settings.e2b_api_key)
+                killed = await self._pool.backend.kill(sandbox_id)
                 if killed:
                     logger.info("Killed specific sandbox", sandbox_id=sandbox_id)
                 else:
@@ -0,0 +1,371 @@
+"""Warm sandbox pool for the code execution tool.
+
+Booting a sandbox and pip-installing packages dominates the latency of the
+first ``execute_code`` call in a thread. The pool keeps that work off the
+request path:
+
+1. Up to ``warm_size`` sandboxes are booted and provisioned ahead of time
+2. The first call for a (user, thread) key leases a warm sandbox instead of
+   booting one; the pool then replenishes itself in the background
+3. Leases are LRU-bounded and reaped after ``idle_ttl`` seconds without use
+4. Packages already installed in a sandbox are not installed again
+5. A sandbox seen alive within ``liveness_window`` seconds is handed out
+   without a remote ``is_running()``/``set_timeout()`` round trip; a
+   background task extends the timeouts of recently used sandboxes in batches
+6. On shutdown leased sandboxes are killed, or detached to run out their
+   remaining timeout (``E2B_POOL_SHUTDOWN_MODE=detach``)
+
+Sandboxes come from a ``SandboxBackend`` (E2B, or a local subprocess backend
+for tests).
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from ...config import settings
+from ...utils.logging import get_logger
+from .backends import SandboxBackend, create_backend
+
+logger = get_logger(__name__)
+
+LeaseKey = Tuple[str, str]
+
+DEFAULT_SANDBOX_TIMEOUT = 300  # 5 minutes
+# Concurrent set_timeout() calls per keep-alive batch
+KEEPALIVE_CONCURRENCY = 16
+
+
+@dataclass
+class PooledSandbox:
+    """A sandbox owned by the pool, warm or leased."""
+
+    sandbox: Any
+    created_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+    packages: Set[str] = field(default_factory=set)
+    # Local view of the remote lifecycle: when the sandbox was last confirmed
+    # alive and when its backend timeout runs out
+    verified_at: float = field(default_factory=time.time)
+    expires_at: float = 0.0
+
+    @property
+    def sandbox_id(self) -> str:
+        return self.sandbox.sandbox_id
+
+    def extended(self, timeout: int) -> None:
+        """Record a successful ``set_timeout(timeout)``."""
+        now = time.time()
+        self.verified_at = now
+        self.expires_at = now + timeout
+
+
+class SandboxPool:
+    """Leases pre-booted sandboxes to (user, thread) keys."""
+
+    def __init__(
+        self,
+        backend: Optional[SandboxBackend] = None,
+        warm_size: Optional[int] = None,
+        max_leases: Optional[int] = None,
+        idle_ttl: Optional[float] = None,
+        sandbox_timeout: int = DEFAULT_SANDBOX_TIMEOUT,
+        preinstall_packages: Optional[List[str]] = None,
+        liveness_window: Optional[float] = None,
+        keepalive_interval: Optional[float] = None,
+    ) -> None:
+        self.backend = backend or create_backend()
+        self.warm_size = warm_size if warm_size is not None else settings.e2b_pool_warm_size
+        self.max_leases = max_leases if max_leases is not None else settings.e2b_pool_max_leases
+        self.idle_ttl = idle_ttl if idle_ttl is not None else settings.e2b_pool_idle_ttl
+        self.sandbox_timeout = sandbox_timeout
+        self.preinstall_packages = (
+            preinstall_packages if preinstall_packages is not None else settings.e2b_pool_preinstall_list
+        )
+        self.liveness_window = (
+            liveness_window if liveness_window is not None else settings.e2b_pool_liveness_window
+        )
+        self.keepalive_interval = (
+            keepalive_interval if keepalive_interval is not None else settings.e2b_pool_keepalive_interval
+        )
+
+        self._warm: Deque[PooledSandbox] = deque()
+        self._leases: "OrderedDict[LeaseKey, PooledSandbox]" = OrderedDict()
+        self._booting = 0
+        self._replenish_task: Optional[asyncio.Task] = None
+        self._maintenance_task: Optional[asyncio.Task] = None
+        self._key_locks: Dict[LeaseKey, asyncio.Lock] = {}
+
+    # ---------- leasing ----------
+
+    def _lock_for(self, key: LeaseKey) -> asyncio.Lock:
+        lock = self._key_locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._key_locks[key] = lock
+        return lock
+
+    async def acquire(self, user_id: str, thread_id: str) -> Tuple[Any, bool]:
+        """Return the sandbox leased to (user, thread), leasing a new one if needed.
+
+        Returns:
+            Tuple of (sandbox, newly_leased)
+        """
+        self._ensure_background()
+        key = (user_id, thread_id)
+        async with self._lock_for(key):
+            pooled = self._leases.get(key)
+            if pooled is not None:
+                if self._is_trusted(pooled) or await self._verify(pooled):
+                    pooled.last_used = time.time()
+                    self._leases.move_to_end(key)
+                    logger.debug("Using leased sandbox", sandbox_id=pooled.sandbox_id)
+                    return pooled.sandbox, False
+                self._leases.pop(key, None)
+                logger.debug("Removed dead sandbox from pool", sandbox_id=pooled.sandbox_id)
+
+            pooled = await self._take_warm()
+            if pooled is None:
+                pooled = await self._boot({"user_id": user_id, "thread_id": thread_id})
+                logger.info("Created new sandbox (pool empty)", sandbox_id=pooled.sandbox_id)
+            else:
+                logger.info("Leased warm sandbox", sandbox_id=pooled.sandbox_id, warm_remaining=len(self._warm))
+
+            pooled.last_used = time.time()
+            self._leases[key] = pooled
+            await self._enforce_lease_bound()
+            self._schedule_replenish()
+            return pooled.sandbox, True
+
+    def _is_trusted(self, pooled: PooledSandbox) -> bool:
+        """Whether a sandbox can be used without a remote health check.
+
+        It must have been confirmed alive recently and have enough of its
+        timeout left to outlast the liveness window.
+        """
+        now = time.time()
+        return (
+            now - pooled.verified_at < self.liveness_window
+            and pooled.expires_at - now > self.liveness_window
+        )
+
+    async def _verify(self, pooled: PooledSandbox) -> bool:
+        """Check a sandbox remotely and extend its timeout; False if it is gone."""
+        try:
+            if await pooled.sandbox.is_running():
+                await pooled.sandbox.set_timeout(self.sandbox_timeout)
+                pooled.extended(self.sandbox_timeout)
+                return True
+        except Exception as e:
+            logger.debug("Sandbox health check failed", sandbox_id=pooled.sandbox_id, error=str(e))
+        return False
+
+    async def _take_warm(self) -> Optional[PooledSandbox]:
+        while self._warm:
+            pooled = self._warm.popleft()
+            if self._is_trusted(pooled) or await self._verify(pooled):
+                return pooled
+            logger.debug("Discarded dead warm sandbox", sandbox_id=pooled.sandbox_id)
+        return None
+
+    async def release(self, user_id: str, thread_id: str, kill: bool = True) -> Optional[str]:
+        """End the lease for (user, thread); returns the released sandbox ID."""
+        key = (user_id, thread_id)
+        pooled = self._leases.pop(key, None)
+        self._key_locks.pop(key, None)
+        if pooled is None:
+            return None
+        if kill:
+            await self._kill(pooled)
+        return pooled.sandbox_id
+
+    def lease_of(self, user_id: str, thread_id: str) -> Optional[PooledSandbox]:
+        """Return the pooled sandbox leased to (user, thread), if any."""
+        return self._leases.get((user_id, thread_id))
+
+    async def discard_if_dead(self, user_id: str, thread_id: str) -> bool:
+        """Drop the lease for (user, thread) if its sandbox has died.
+
+        Leases handed out without a health check can point at a sandbox that
+        died in the meantime; callers use this after a failed call to decide
+        whether to retry on a fresh sandbox.
+        """
+        key = (user_id, thread_id)
+        pooled = self._leases.get(key)
+        if pooled is None or await self._verify(pooled):
+            return False
+        if self._leases.get(key) is pooled:
+            del self._leases[key]
+        logger.info("Discarded dead leased sandbox", sandbox_id=pooled.sandbox_id)
+        return True
+
+    async def install_packages(self, sandbox: Any, packages: List[str]) -> None:
+        """Install packages not already present in a pooled sandbox."""
+        pooled = next((p for p in self._leases.values() if p.sandbox is sandbox), None)
+        missing = [pkg for pkg in packages if pooled is None or pkg not in pooled.packages]
+        if not missing:
+            logger.debug("Packages already installed", packages=packages)
+            return
+        if await self.backend.install_packages(sandbox, missing) and pooled is not None:
+            pooled.packages.update(missing)
+
+    async def _enforce_lease_bound(self) -> None:
+        while len(self._leases) > self.max_leases:
+            key, pooled = self._leases.popitem(last=False)
+            self._key_locks.pop(key, None)
+            logger.info("Evicting least recently used sandbox lease", sandbox_id=pooled.sandbox_id)
+            await self._kill(pooled)
+
+    # ---------- booting ----------
+
+    async def _boot(self, metadata: Dict[str, str]) -> PooledSandbox:
+        metadata = {
+            "purpose": "e2b_code_sandbox_mcp",
+            "created_at": str(int(time.time())),
+            **metadata,
+        }
+        sandbox = await self.backend.create(metadata, self.sandbox_timeout)
+        pooled = PooledSandbox(sandbox=sandbox, expires_at=time.time() + self.sandbox_timeout)
+        if self.preinstall_packages:
+            try:
+                if await self.backend.install_packages(sandbox, self.preinstall_packages):
+                    pooled.packages.update(self.preinstall_packages)
+            except Exception as e:
+                logger.warning("Failed to preinstall packages", sandbox_id=pooled.sandbox_id, error=str(e))
+        return pooled
+
+    def _schedule_replenish(self) -> None:
+        if self.warm_size <= 0:
+            return
+        if self._replenish_task is None or self._replenish_task.done():
+            self._replenish_task = asyncio.create_task(self._replenish())
+
+    async def _replenish(self) -> None:
+        """Boot sandboxes until the warm set is full."""
+        missing = self.warm_size - len(self._warm) - self._booting
+        if missing <= 0:
+            return
+        self._booting += missing
+        try:
+            results = await asyncio.gather(
+                *(self._boot({"pool": "warm"}) for _ in range(missing)),
+                return_exceptions=True,
+            )
+        finally:
+            self._booting -= missing
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning("Failed to boot warm sandbox", error=str(result))
+            else:
+                self._warm.append(result)
+        logger.debug("Warm sandbox pool replenished", warm=len(self._warm), target=self.warm_size)
+
+    def start(self) -> None:
+        """Start maintenance and begin filling the warm set (e.g. on server startup)."""
+        self._ensure_background()
+        self._schedule_replenish()
+
+    # ---------- background maintenance ----------
+
+    def _ensure_background(self) -> None:
+        if self._maintenance_task is None or self._maintenance_task.done():
+            self._maintenance_task = asyncio.create_task(self._maintain_forever())
+
+    async def _maintain_forever(self) -> None:
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            try:
+                await self.reap()
+                await self.keepalive()
+            except Exception as e:
+                logger.warning("Sandbox pool maintenance failed", error=str(e))
+
+    async def reap(self) -> None:
+        """Kill idle leases and forget leases whose sandbox has timed out."""
+        now = time.time()
+        for key, pooled in list(self._leases.items()):
+            if now - pooled.last_used > self.idle_ttl:
+                logger.info("Reaping idle sandbox lease", sandbox_id=pooled.sandbox_id, idle_seconds=int(now - pooled.last_used))
+            elif pooled.expires_at <= now:
+                # Not used since its last extension; the backend has already stopped it
+                logger.debug("Forgetting timed out sandbox lease", sandbox_id=pooled.sandbox_id)
+            else:
+                continue
+            del self._leases[key]
+            self._key_locks.pop(key, None)
+            if pooled.expires_at > now:
+                await self._kill(pooled)
+        self._schedule_replenish()
+
+    async def keepalive(self) -> None:
+        """Extend, in one batch, the timeouts that would run out before the next pass.
+
+        Leases are only extended if they were used since their last extension,
+        so abandoned threads still time out; warm sandboxes are always extended.
+        """
+        horizon = time.time() + 2 * self.keepalive_interval
+        due = [
+            pooled for pooled in self._leases.values()
+            if pooled.expires_at < horizon and pooled.last_used > pooled.expires_at - self.sandbox_timeout
+        ]
+        due.extend(pooled for pooled in self._warm if pooled.expires_at < horizon)
+        if not due:
+            return
+
+        semaphore = asyncio.Semaphore(KEEPALIVE_CONCURRENCY)
+
+        async def extend(pooled: PooledSandbox) -> bool:
+            async with semaphore:
+                try:
+                    await pooled.sandbox.set_timeout(self.sandbox_timeout)
+                except Exception as e:
+                    logger.debug("Sandbox keep-alive failed", sandbox_id=pooled.sandbox_id, error=str(e))
+                    return False
+                pooled.extended(self.sandbox_timeout)
+                return True
+
+        results = await asyncio.gather(*(extend(pooled) for pooled in due))
+        dead = {id(pooled) for pooled, ok in zip(due, results) if not ok}
+        if dead:
+            # Dead leases are replaced on their next acquire(); drop dead warm spares now
+            self._warm = deque(pooled for pooled in self._warm if id(pooled) not in dead)
+        logger.debug("Sandbox keep-alive batch", extended=len(due) - len(dead), failed=len(dead))
+
+    async def _kill(self, pooled: PooledSandbox) -> None:
+        try:
+            await pooled.sandbox.kill()
+        except Exception as e:
+            logger.warning("Failed to kill sandbox", sandbox_id=pooled.sandbox_id, error=str(e))
+
+    async def close(self, mode: Optional[str] = None) -> None:
+        """Stop background tasks and shut down pooled sandboxes.
+
+        Args:
+            mode: ``"kill"`` kills leased sandboxes; ``"detach"`` leaves them to
+                run out their remaining timeout so callers holding a sandbox_id
+                can reconnect after a restart. Warm sandboxes are always killed.
+                Defaults to ``E2B_POOL_SHUTDOWN_MODE``.
+        """
+        mode = (mode or settings.e2b_pool_shutdown_mode).lower()
+        tasks = [task for task in (self._maintenance_task, self._replenish_task) if task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        to_kill = list(self._warm)
+        if mode == "detach":
+            detached = len(self._leases)
+        else:
+            detached = 0
+            to_kill.extend(self._leases.values())
+        self._warm.clear()
+        self._leases.clear()
+        self._key_locks.clear()
+        await asyncio.gather(*(self._kill(p) for p in to_kill))
+        logger.info("Sandbox pool closed", killed=len(to_kill), detached=detached)
+
+    def stats(self) -> Dict[str, int]:
+        """Pool occupancy for logging and health checks."""
+        return {"warm": len(self._warm), "booting": self._booting, "leased": len(self._leases)}
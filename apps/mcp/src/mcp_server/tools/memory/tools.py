@@ -1,5 +1,6 @@
 """Memory tools for Mem0 integration via LangConnect API."""
 
+import asyncio
 import json
 from typing import Any, Dict, List, Optional, Union
 
@@ -7,8 +8,9 @@ import aiohttp
 
 from ..base import CustomTool, ToolParameter
 from ...config import LANGCONNECT_BASE_URL, settings
+from ...utils.langconnect_client import get_langconnect_client
 from ...utils.logging import get_logger
-from ...utils.exceptions import ToolExecutionError
+from ...utils.exceptions import LangConnectAPIError, ToolExecutionError
 
 logger = get_logger(__name__)
 
@@ -76,18 +78,7 @@ class _MemoryBaseTool(CustomTool):
         jwt_token: Optional[str] = None
     ) -> Dict[str, Any]:
         """Make an authenticated HTTP request to LangConnect."""
-        url = f"{self.base_url}{endpoint}"
-        
-        # Default headers
-        request_headers = {"Content-Type": "application/json"}
-        if headers:
-            request_headers.update(headers)
-            
-        # Add JWT authentication header if token is provided
-        if jwt_token:
-            request_headers["Authorization"] = f"Bearer {jwt_token}"
-            logger.info(f"Added JWT token to request headers for {endpoint}")
-        else:
+        if not jwt_token:
             logger.warning(f"No JWT token available for {endpoint} - this will likely fail authentication")
         
         # Inject context into request data if provided
@@ -97,58 +88,34 @@ class _MemoryBaseTool(CustomTool):
             if 'run_id' in context and context['run_id']:
                 data['run_id'] = context['run_id']
         
+        client = get_langconnect_client()
         try:
-            async with aiohttp.ClientSession() as session:
-                if method.upper() == "GET":
-                    # For GET requests, add query parameters
-                    params = data if data else {}
-                    if context:
-                        if 'agent_id' in context and context['agent_id']:
-                            params['agent_id'] = context['agent_id']
-                        if 'run_id' in context and context['run_id']:
-                            params['run_id'] = context['run_id']
-                    
-                    async with session.get(url, headers=request_headers, params=params) as response:
-                        response_text = await response.text()
-                        logger.info(f"LangConnect API response - status: {response.status}, body: {response_text}")
-                        
-                        try:
-                            import json as json_module
-                            response_data = json_module.loads(response_text)
-                        except json_module.JSONDecodeError:
-                            response_data = {"detail": f"Non-JSON response: {response_text}"}
-                        
-                        if response.status >= 400:
-                            error_detail = response_data.get('detail', 'Unknown error')
-                            logger.error(f"LangConnect API error - status: {response.status}, detail: {error_detail}")
-                            raise ToolExecutionError("memory_api", f"API request failed: {error_detail}")
-                        return response_data
-                        
-                else:
-                    # For POST/PUT/DELETE requests, send data in body
-                    json_data = json.dumps(data) if data else None
-                    async with session.request(method, url, headers=request_headers, data=json_data) as response:
-                        response_text = await response.text()
-                        logger.info(f"LangConnect API response - status: {response.status}, body: {response_text}")
-                        
-                        try:
-                            import json as json_module
-                            response_data = json_module.loads(response_text)
-                        except json_module.JSONDecodeError:
-                            response_data = {"detail": f"Non-JSON response: {response_text}"}
-                        
-                        if response.status >= 400:
-                            error_detail = response_data.get('detail', 'Unknown error')
-                            logger.error(f"LangConnect API error - status: {response.status}, detail: {error_detail}")
-                            raise ToolExecutionError("memory_api", f"API request failed: {error_detail}")
-                        return response_data
+            if method.upper() == "GET":
+                # For GET requests, add query parameters
+                params = data if data else {}
+                if context:
+                    if 'agent_id' in context and context['agent_id']:
+                        params['agent_id'] = context['agent_id']
+                    if 'run_id' in context and context['run_id']:
+                        params['run_id'] = context['run_id']
+                return await client.request_json(
+                    method, endpoint, params=params, jwt_token=jwt_token, headers=headers
+                )
+            
+            # For POST/PUT/DELETE requests, send data in body
+            return await client.request_json(
+                method, endpoint, json_body=data if data else None, jwt_token=jwt_token, headers=headers
+            )
                         
+        except LangConnectAPIError as e:
+            logger.error(f"LangConnect API error - status: {e.status_code}, detail: {e.message}")
+            raise ToolExecutionError("memory_api", f"API request failed: {e.message}")
         except aiohttp.ClientError as e:
             logger.error(f"HTTP request failed: {e}")
             raise ToolExecutionError("memory_api", f"Failed to connect to LangConnect API: {e}")
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse API response: {e}")
-            raise ToolExecutionError("memory_api", f"Invalid API response format: {e}")
+        except asyncio.TimeoutError:
+            logger.error(f"LangConnect request timed out: {method} {endpoint}")
+            raise ToolExecutionError("memory_api", "LangConnect API request timed out")
         except Exception as e:
             logger.error(f"Unexpected error during API request: {e}")
             raise ToolExecutionError("memory_api", f"Unexpected error: {e}")
@@ -188,7 +155,7 @@ class AddMemoryTool(_MemoryBaseTool):
         
         # Debug logging
         logger.info(f"AddMemoryTool execution - user_id: {user_id}")
-        logger.info(f"AddMemoryTool execution - context: {context}")
+        logger.debug(f"AddMemoryTool execution - context: {context}")
         logger.info(f"AddMemoryTool execution - has jwt_token: {bool(jwt_token)}")
         logger.info(f"AddMemoryTool execution - base_url: {self.base_url}")
         
@@ -206,7 +173,7 @@ class AddMemoryTool(_MemoryBaseTool):
         
         try:
             logger.info(f"Making request to: {self.base_url}/memory/add")
-            logger.info(f"Request data: {request_data}")
+            logger.debug(f"Request data: {request_data}")
             logger.info(f"Has JWT token: {bool(jwt_token)}")
             response = await self._make_request("POST", "/memory/add", request_data, context=context, jwt_token=jwt_token)
             
@@ -279,9 +246,9 @@ class SearchMemoryTool(_MemoryBaseTool):
         try:
             # We don't pass context here to ensure search is across all user memories,
             # not just for the current agent/run.
-            logger.info(f"Making search request to LangConnect API: {request_data}")
+            logger.debug(f"Making search request to LangConnect API: {request_data}")
             response = await self._make_request("POST", "/memory/search", request_data, jwt_token=jwt_token)
-            logger.info(f"LangConnect search response: {response}")
+            logger.debug(f"LangConnect search response: {response}")
             
             if response.get("success"):
                 result_data = response.get("data", {})
@@ -0,0 +1,317 @@
+"""Asynchronous, content-addressed storage for tool output artifacts.
+
+Code execution can produce many figures per call. Uploading each one inline
+delays the tool result by the sum of all uploads and, with the synchronous
+Supabase client, blocks the event loop. The artifact store instead:
+
+1. Derives each artifact's storage path from a hash of its content, so the
+   reference can be returned before the upload finishes
+2. Uploads in background tasks, off the event loop, with bounded concurrency
+3. Skips uploads for content already stored (or being stored) at that path
+
+Failed uploads are retried with exponential backoff. An upload that still
+fails is recorded against its thread, and ``take_failed()`` hands it to the
+next tool call in that thread (inline, if small enough) so the reference
+already returned isn't silently left dangling.
+
+Uploads still pending at shutdown are awaited by ``flush()``. Backends are
+Supabase Storage, or a local filesystem backend
+(``ARTIFACT_STORAGE_BACKEND=local``) for tests and local development.
+"""
+
+import asyncio
+import base64
+import hashlib
+import os
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import settings
+from .logging import get_logger
+from .supabase_storage import (
+    OutputMetadata,
+    SupabaseStorageClient,
+    is_supabase_storage_available,
+)
+
+logger = get_logger(__name__)
+
+# Storage paths remembered as already uploaded
+KNOWN_PATHS_MAX_ENTRIES = 4096
+
+# Threads with unreported upload failures, and failures kept per thread
+FAILED_THREADS_MAX_ENTRIES = 1024
+FAILED_PER_THREAD_MAX_ENTRIES = 32
+
+INITIAL_RETRY_BACKOFF_SECONDS = 0.5
+
+
+class ArtifactBackend(ABC):
+    """Stores artifact bytes at a path."""
+
+    name: str = "abstract"
+    bucket: str = ""
+
+    @abstractmethod
+    def put(self, path: str, data: bytes, content_type: str) -> None:
+        """Store data at path (blocking; called from a worker thread).
+
+        Storing content that already exists at the path must succeed.
+        """
+
+
+class SupabaseArtifactBackend(ArtifactBackend):
+    """Artifacts in the Supabase ``agent-outputs`` bucket."""
+
+    name = "supabase"
+    bucket = SupabaseStorageClient.get_bucket_name()
+
+    def put(self, path: str, data: bytes, content_type: str) -> None:
+        client = SupabaseStorageClient.get_client()
+        try:
+            client.storage.from_(self.bucket).upload(
+                path=path,
+                file=data,
+                file_options={
+                    "content-type": content_type,
+                    "cache-control": "3600",
+                    "upsert": "false"  # Content-addressed: an existing object is identical
+                }
+            )
+        except Exception as e:
+            if "duplicate" in str(e).lower() or "already exists" in str(e).lower():
+                return
+            raise
+
+
+class LocalArtifactBackend(ArtifactBackend):
+    """Artifacts written under a local directory."""
+
+    name = "local"
+
+    def __init__(self, root: Optional[str] = None) -> None:
+        self.root = root or settings.artifact_local_dir
+        self.bucket = os.path.basename(self.root.rstrip("/")) or "artifacts"
+
+    def put(self, path: str, data: bytes, content_type: str) -> None:
+        target = os.path.join(self.root, path)
+        if os.path.exists(target):
+            return
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Write then rename so readers never see a partial file
+        tmp = f"{target}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, target)
+
+
+@dataclass(frozen=True)
+class ArtifactRef:
+    """Reference to a stored (or pending) artifact."""
+
+    storage_path: str
+    bucket: str
+    content_type: str
+    size_bytes: int
+    sha256: str
+
+
+def content_path(
+    user_id: str,
+    assistant_id: str,
+    thread_id: str,
+    tool_name: str,
+    digest: str,
+    format: str,
+) -> str:
+    """Content-addressed storage path, in the same folder layout as ``generate_output_filename``."""
+    clean_user_id = user_id.replace(" ", "_")
+    clean_assistant_id = assistant_id.replace(" ", "_")
+    clean_thread_id = thread_id.replace(" ", "_")
+    return f"{clean_user_id}/{clean_assistant_id}/{clean_thread_id}/{tool_name}_{digest[:32]}.{format}"
+
+
+def _decode(data: str, encoding: str) -> bytes:
+    return base64.b64decode(data) if encoding == "base64" else data.encode("utf-8")
+
+
+def _decoded_size(data: str, encoding: str) -> int:
+    if encoding != "base64":
+        return len(data.encode("utf-8"))
+    stripped = data.rstrip()
+    return len(stripped) * 3 // 4 - (len(stripped) - len(stripped.rstrip("=")))
+
+
+class ArtifactStore:
+    """Background, deduplicating uploader for tool outputs."""
+
+    def __init__(self, backend: ArtifactBackend, concurrency: Optional[int] = None) -> None:
+        self.backend = backend
+        self._semaphore = asyncio.Semaphore(concurrency or settings.artifact_upload_concurrency)
+        self._known: "OrderedDict[str, None]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._failed: "OrderedDict[Tuple[str, str], List[Dict[str, Any]]]" = OrderedDict()
+
+    def submit(
+        self,
+        data: str,
+        encoding: str,
+        content_type: str,
+        format: str,
+        metadata: OutputMetadata,
+    ) -> ArtifactRef:
+        """Schedule an upload and return its reference immediately.
+
+        Args:
+            data: Artifact payload as returned by the sandbox
+            encoding: ``"base64"`` for binary payloads, ``"text"`` for text (e.g. SVG)
+            content_type: MIME type
+            format: File extension
+            metadata: Output metadata; ``filename`` and ``size_bytes`` are filled in
+        """
+        # Hash the payload as received; decoding happens off the event loop
+        digest = hashlib.sha256(data.encode("utf-8")).hexdigest()
+        path = content_path(
+            metadata.user_id, metadata.assistant_id, metadata.thread_id, metadata.tool_name, digest, format
+        )
+        ref = ArtifactRef(
+            storage_path=path,
+            bucket=self.backend.bucket,
+            content_type=content_type,
+            size_bytes=_decoded_size(data, encoding),
+            sha256=digest,
+        )
+
+        if path in self._known or path in self._pending:
+            logger.debug("Artifact already stored, skipping upload", storage_path=path)
+            return ref
+
+        metadata.filename = path
+        metadata.size_bytes = ref.size_bytes
+        task = asyncio.create_task(self._upload(path, data, encoding, content_type, metadata))
+        self._pending[path] = task
+        task.add_done_callback(lambda _: self._pending.pop(path, None))
+        return ref
+
+    async def _upload(
+        self,
+        path: str,
+        data: str,
+        encoding: str,
+        content_type: str,
+        metadata: OutputMetadata,
+    ) -> None:
+        retries = settings.artifact_upload_retries
+        backoff = INITIAL_RETRY_BACKOFF_SECONDS
+        for attempt in range(retries + 1):
+            try:
+                async with self._semaphore:
+                    payload = await asyncio.to_thread(_decode, data, encoding)
+                    await asyncio.to_thread(self.backend.put, path, payload, content_type)
+                break
+            except Exception as e:
+                if attempt < retries:
+                    logger.warning(
+                        "Artifact upload failed, retrying",
+                        storage_path=path,
+                        attempt=attempt + 1,
+                        error=str(e),
+                    )
+                    await asyncio.sleep(backoff)
+                    backoff *= 2
+                    continue
+                # Not remembered as stored, so the next submit of this content retries
+                logger.error(
+                    "Failed to upload artifact",
+                    storage_path=path,
+                    backend=self.backend.name,
+                    user_id=metadata.user_id,
+                    attempts=retries + 1,
+                    error=str(e),
+                )
+                self._record_failure(path, data, encoding, content_type, metadata, str(e))
+                return
+
+        self._known[path] = None
+        while len(self._known) > KNOWN_PATHS_MAX_ENTRIES:
+            self._known.popitem(last=False)
+        logger.info(
+            "Artifact uploaded",
+            storage_path=path,
+            backend=self.backend.name,
+            size_bytes=metadata.size_bytes,
+            user_id=metadata.user_id,
+            thread_id=metadata.thread_id,
+            tool_name=metadata.tool_name,
+        )
+
+    def _record_failure(
+        self,
+        path: str,
+        data: str,
+        encoding: str,
+        content_type: str,
+        metadata: OutputMetadata,
+        error: str,
+    ) -> None:
+        failure: Dict[str, Any] = {"storage_path": path, "type": content_type, "error": error}
+        if metadata.size_bytes <= settings.artifact_failed_inline_max_bytes:
+            failure["data"] = data
+            failure["format"] = "base64" if encoding == "base64" else "text"
+
+        key = (metadata.user_id, metadata.thread_id)
+        failures = self._failed.setdefault(key, [])
+        self._failed.move_to_end(key)
+        failures.append(failure)
+        del failures[:-FAILED_PER_THREAD_MAX_ENTRIES]
+        while len(self._failed) > FAILED_THREADS_MAX_ENTRIES:
+            self._failed.popitem(last=False)
+
+    def take_failed(self, user_id: str, thread_id: str) -> List[Dict[str, Any]]:
+        """Return (and forget) uploads in this thread that failed permanently.
+
+        Each entry has ``storage_path``, ``type`` and ``error``; entries up to
+        ``artifact_failed_inline_max_bytes`` also carry the content as ``data``
+        with its ``format``, so the caller can still show it.
+        """
+        return self._failed.pop((user_id, thread_id), [])
+
+    async def flush(self, timeout: Optional[float] = None) -> None:
+        """Wait for pending uploads (e.g. on shutdown)."""
+        pending = list(self._pending.values())
+        if pending:
+            _, not_done = await asyncio.wait(pending, timeout=timeout)
+            if not_done:
+                logger.warning("Artifact uploads still pending after flush", pending=len(not_done))
+        failed = sum(len(failures) for failures in self._failed.values())
+        if failed:
+            logger.error("Artifact uploads failed and were never reported to a tool call", failed=failed)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend.name,
+            "pending": len(self._pending),
+            "known": len(self._known),
+            "failed": sum(len(failures) for failures in self._failed.values()),
+        }
+
+
+_artifact_store: Optional[ArtifactStore] = None
+_artifact_store_resolved = False
+
+
+def get_artifact_store() -> Optional[ArtifactStore]:
+    """Return the process-wide artifact store, or None if no backend is available."""
+    global _artifact_store, _artifact_store_resolved
+    if not _artifact_store_resolved:
+        name = settings.artifact_storage_backend.lower()
+        if name == "local":
+            _artifact_store = ArtifactStore(LocalArtifactBackend())
+        elif name == "supabase" and is_supabase_storage_available():
+            _artifact_store = ArtifactStore(SupabaseArtifactBackend())
+        else:
+            logger.info("Artifact storage unavailable, outputs are returned inline", backend=name)
+        _artifact_store_resolved = True
+    return _artifact_store
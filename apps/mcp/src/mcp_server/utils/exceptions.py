@@ -84,6 +84,22 @@ class ArcadeAPIError(MCPServerError):
         super().__init__(message, "ARCADE_API_ERROR", context)
 
 
+class LangConnectAPIError(MCPServerError):
+    """LangConnect API related errors."""
+
+    def __init__(
+        self, 
+        message: str, 
+        status_code: Optional[int] = None,
+        context: Optional[Dict[str, Any]] = None
+    ) -> None:
+        context = context or {}
+        if status_code:
+            context["status_code"] = status_code
+        self.status_code = status_code
+        super().__init__(message, "LANGCONNECT_API_ERROR", context)
+
+
 class ConfigurationError(MCPServerError):
     """Configuration related errors."""
 
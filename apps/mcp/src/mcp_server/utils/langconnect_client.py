@@ -0,0 +1,245 @@
+"""Shared LangConnect HTTP client for MCP tools.
+
+Custom tools that call LangConnect (memory tools today) share one client
+instead of opening an ``aiohttp.ClientSession`` per call:
+
+1. A pooled connector keeps HTTP/1.1 connections alive between calls
+2. A semaphore bounds in-flight requests so a burst of tool calls cannot
+   exhaust LangConnect's worker pool
+3. Transient failures are retried with exponential backoff and full jitter;
+   non-idempotent requests are only retried when they never reached the server
+4. Response bodies are streamed in chunks with a size cap, and only request
+   metadata is logged (at debug level), never bodies
+
+The client is created lazily and closed by the HTTP server on shutdown.
+"""
+
+import asyncio
+import json
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import aiohttp
+
+from ..config import settings
+from .exceptions import LangConnectAPIError
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+# 429 and 503 mean the request was not processed, so any method can be retried
+RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+UNPROCESSED_STATUSES = frozenset({429, 503})
+
+RETRY_BASE_DELAY_SECONDS = 0.2
+RETRY_MAX_DELAY_SECONDS = 5.0
+MAX_RESPONSE_BYTES = 10 * 1024 * 1024
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+class LangConnectClient:
+    """Pooled, retrying async client for the LangConnect API."""
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        max_connections: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+    ) -> None:
+        self.base_url = (base_url or settings.langconnect_base_url).rstrip("/")
+        self.max_connections = max_connections or settings.langconnect_max_connections
+        self.max_concurrency = max_concurrency or settings.langconnect_max_concurrency
+        self.timeout = timeout or settings.langconnect_request_timeout
+        self.max_retries = max_retries if max_retries is not None else settings.langconnect_max_retries
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session, recreating it if closed or on a new event loop."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                keepalive_timeout=60,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                json_serialize=json.dumps,
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+            logger.debug("LangConnect client session created", base_url=self.base_url)
+        return self._session
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), RETRY_MAX_DELAY_SECONDS)
+            except ValueError:
+                pass
+        return random.uniform(0, min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_DELAY_SECONDS * 2 ** attempt))
+
+    async def _send(self, method: str, url: str, **kwargs: Any) -> aiohttp.ClientResponse:
+        """Send a request, retrying transient failures."""
+        idempotent = method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                response = await self._get_session().request(method, url, **kwargs)
+            except aiohttp.ClientConnectorError as e:
+                # Connection was never established, so retrying is safe for any method
+                if attempt >= self.max_retries:
+                    raise
+                reason = str(e)
+            except (aiohttp.ServerDisconnectedError, aiohttp.ClientOSError, asyncio.TimeoutError) as e:
+                if not idempotent or attempt >= self.max_retries:
+                    raise
+                reason = str(e) or type(e).__name__
+            else:
+                retryable = response.status in RETRYABLE_STATUSES and (
+                    idempotent or response.status in UNPROCESSED_STATUSES
+                )
+                if not retryable or attempt >= self.max_retries:
+                    return response
+                reason = f"status {response.status}"
+                retry_after = response.headers.get("Retry-After")
+                response.release()
+
+            attempt += 1
+            delay = self._backoff(attempt, retry_after)
+            logger.debug(
+                "Retrying LangConnect request",
+                method=method,
+                url=url,
+                attempt=attempt,
+                delay_seconds=round(delay, 3),
+                reason=reason,
+            )
+            await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        method: str,
+        endpoint: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        json_body: Optional[Any] = None,
+        jwt_token: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Send a request and yield the response for streaming reads.
+
+        The connection is returned to the pool when the block exits.
+        """
+        method = method.upper()
+        request_headers = {"Accept": "application/json"}
+        if headers:
+            request_headers.update(headers)
+        if jwt_token:
+            request_headers["Authorization"] = f"Bearer {jwt_token}"
+
+        self._get_session()
+        async with self._semaphore:
+            response = await self._send(
+                method,
+                f"{self.base_url}{endpoint}",
+                params=params,
+                json=json_body,
+                headers=request_headers,
+            )
+            try:
+                yield response
+            finally:
+                response.release()
+
+    async def _read_body(self, response: aiohttp.ClientResponse) -> bytes:
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(STREAM_CHUNK_BYTES):
+            size += len(chunk)
+            if size > MAX_RESPONSE_BYTES:
+                raise LangConnectAPIError(
+                    f"LangConnect response exceeded {MAX_RESPONSE_BYTES} bytes",
+                    status_code=response.status,
+                )
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    async def request_json(
+        self,
+        method: str,
+        endpoint: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        json_body: Optional[Any] = None,
+        jwt_token: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Any:
+        """Send a request and return the decoded JSON response.
+
+        Raises:
+            LangConnectAPIError: If LangConnect returns an error status or the
+                body is too large
+            aiohttp.ClientError: If the request could not be completed
+        """
+        start_time = time.time()
+        async with self.stream(
+            method, endpoint, params=params, json_body=json_body, jwt_token=jwt_token, headers=headers
+        ) as response:
+            body = await self._read_body(response)
+            status = response.status
+
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            data = {"detail": f"Non-JSON response: {body[:200].decode('utf-8', errors='replace')}"}
+
+        logger.debug(
+            "LangConnect request completed",
+            method=method.upper(),
+            endpoint=endpoint,
+            status=status,
+            response_bytes=len(body),
+            duration_ms=(time.time() - start_time) * 1000,
+        )
+
+        if status >= 400:
+            detail = data.get("detail", "Unknown error") if isinstance(data, dict) else "Unknown error"
+            raise LangConnectAPIError(str(detail), status_code=status)
+        return data
+
+    async def close(self) -> None:
+        """Close pooled connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._semaphore = None
+        self._loop = None
+
+
+_langconnect_client: Optional[LangConnectClient] = None
+
+
+def get_langconnect_client() -> LangConnectClient:
+    """Return the process-wide LangConnect client."""
+    global _langconnect_client
+    if _langconnect_client is None:
+        _langconnect_client = LangConnectClient()
+    return _langconnect_client
+
+
+async def close_langconnect_client() -> None:
+    """Close the process-wide LangConnect client, if one was created."""
+    if _langconnect_client is not None:
+        await _langconnect_client.close()
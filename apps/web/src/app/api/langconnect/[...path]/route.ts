@@ -63,6 +63,12 @@ async function handleRequest(req: NextRequest, { params }: { params: Promise<{ p
       headers: {...headers},
     };
 
+    // Server-sent event streams stay open; close the upstream stream when the client goes away
+    const isEventStream = (req.headers.get('accept') || '').includes('text/event-stream');
+    if (isEventStream) {
+      requestOptions.signal = req.signal;
+    }
+
     // Add body for non-GET requests
     if (req.method !== 'GET' && req.method !== 'HEAD') {
       const contentType = req.headers.get('content-type');
@@ -133,6 +139,17 @@ async function handleRequest(req: NextRequest, { params }: { params: Promise<{ p
       return r;
     }
 
+    // Pass server-sent event streams through without buffering
+    if (response.ok && response.body && (response.headers.get('content-type') || '').includes('text/event-stream')) {
+      responseHeaders['cache-control'] = 'no-cache';
+      responseHeaders['x-accel-buffering'] = 'no';
+      return new NextResponse(response.body, {
+        status: response.status,
+        statusText: response.statusText,
+        headers: responseHeaders,
+      });
+    }
+
     // Get the response data for other status codes
     const responseText = await response.text();
 
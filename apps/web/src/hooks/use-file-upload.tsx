@@ -4,6 +4,7 @@ import type { Base64ContentBlock } from "@langchain/core/messages";
 import { fileToContentBlock } from "@/lib/multimodal-utils";
 import { useAuthContext } from "@/providers/Auth";
 import { useQueryState } from "nuqs";
+import { jobProgressClient, isTerminalJobStatus } from "@/lib/job-progress";
 
 // Maximum file size in bytes (10MB)
 export const MAX_FILE_SIZE = 10 * 1024 * 1024;
@@ -85,9 +86,10 @@ export function useFileUpload({
   const dropRef = useRef<HTMLDivElement>(null);
   const [dragOver, setDragOver] = useState(false);
   const dragCounter = useRef(0);
-  const pollingIntervals = useRef<{ [key: string]: NodeJS.Timeout }>({});
+  // Stop functions for the job progress watchers, keyed by attachment id
+  const jobWatchers = useRef<{ [key: string]: () => void }>({});
 
-  // Add ref to avoid stale closure issues in polling
+  // Add ref to avoid stale closure issues in job watchers
   const processingAttachmentsRef = useRef<ProcessingAttachment[]>([]);
 
   // Keep ref in sync with state
@@ -95,13 +97,18 @@ export function useFileUpload({
     processingAttachmentsRef.current = processingAttachments;
   }, [processingAttachments]);
 
-  // Cleanup polling intervals on unmount
+  // Stop job watchers on unmount
   useEffect(() => {
     return () => {
-      Object.values(pollingIntervals.current).forEach(interval => clearInterval(interval));
+      Object.values(jobWatchers.current).forEach(stop => stop());
     };
   }, []);
 
+  const stopJobWatcher = (attachmentId: string) => {
+    jobWatchers.current[attachmentId]?.();
+    delete jobWatchers.current[attachmentId];
+  };
+
   const isDuplicate = useCallback((file: File, blocks: Base64ContentBlock[]) => {
     // Check for duplicates in content blocks
     const isDuplicateInBlocks = blocks.some(
@@ -171,9 +178,13 @@ export function useFileUpload({
   };
 
   const _startJobPolling = useCallback(async (jobId: string, attachmentId: string) => {
-    const pollInterval = setInterval(async () => {
+    const stopWatching = jobProgressClient.watch(jobId, session?.accessToken ?? '', async (progress) => {
+      // Pending or processing - keep watching
+      if (!isTerminalJobStatus(progress.status)) return;
+      stopJobWatcher(attachmentId);
+
       try {
-        
+        // Progress updates carry status only; load the extracted content once
         const response = await fetch(`/api/langconnect/jobs/${jobId}`, {
           method: 'GET',
           headers: {
@@ -190,8 +201,6 @@ export function useFileUpload({
 
         if (jobData.status === 'completed') {
           // Job completed successfully
-          clearInterval(pollingIntervals.current[attachmentId]);
-          delete pollingIntervals.current[attachmentId];
 
           // Get the attachment that was just processed
           const processedAttachment = processingAttachmentsRef.current.find(att => att.id === attachmentId);
@@ -244,11 +253,8 @@ ${content}
             // Remove the processing attachment
             setProcessingAttachments(prev => prev.filter(att => att.id !== attachmentId));
           }
-        } else if (jobData.status === 'failed') {
-          // Job failed
-          clearInterval(pollingIntervals.current[attachmentId]);
-          delete pollingIntervals.current[attachmentId];
-
+        } else {
+          // Job failed or was cancelled
           setProcessingAttachments(prev => prev.map(att => {
             if (att.id === attachmentId) {
               return {
@@ -263,20 +269,21 @@ ${content}
           toast.error(`Failed to process file`, {
             description: jobData.error_message || 'An error occurred while processing the file'
           });
-        } else {
-          // Status is 'pending' or 'processing' - continue polling
         }
       } catch (_error) {
-        // Don't immediately fail - network issues might be temporary
-        // After several consecutive failures, we could stop polling
+        setProcessingAttachments(prev => prev.map(att =>
+          att.id === attachmentId
+            ? { ...att, status: 'error', error: 'Failed to load processed file' }
+            : att
+        ));
       }
-    }, 2000); // Poll every 2 seconds
+    });
 
-    pollingIntervals.current[attachmentId] = pollInterval;
+    jobWatchers.current[attachmentId] = stopWatching;
   }, [session?.accessToken]);
 
   /**
-   * Job polling with storage path included in the final content block.
+   * Job tracking with storage path included in the final content block.
    * This creates the new XML format that includes both storage path and preview.
    */
   const startJobPollingWithStorage = useCallback(async (
@@ -284,8 +291,13 @@ ${content}
     attachmentId: string,
     storageData: { storage_path: string; bucket: string } | null
   ) => {
-    const pollInterval = setInterval(async () => {
+    const stopWatching = jobProgressClient.watch(jobId, session?.accessToken ?? '', async (progress) => {
+      // Pending or processing - keep watching
+      if (!isTerminalJobStatus(progress.status)) return;
+      stopJobWatcher(attachmentId);
+
       try {
+        // Progress updates carry status only; load the extracted content once
         const response = await fetch(`/api/langconnect/jobs/${jobId}`, {
           method: 'GET',
           headers: {
@@ -302,8 +314,6 @@ ${content}
 
         if (jobData.status === 'completed') {
           // Job completed successfully
-          clearInterval(pollingIntervals.current[attachmentId]);
-          delete pollingIntervals.current[attachmentId];
 
           // Get the attachment that was just processed
           const processedAttachment = processingAttachmentsRef.current.find(att => att.id === attachmentId);
@@ -371,11 +381,8 @@ ${legacyContent || 'No content extracted'}
             // Remove the processing attachment
             setProcessingAttachments(prev => prev.filter(att => att.id !== attachmentId));
           }
-        } else if (jobData.status === 'failed') {
-          // Job failed
-          clearInterval(pollingIntervals.current[attachmentId]);
-          delete pollingIntervals.current[attachmentId];
-
+        } else {
+          // Job failed or was cancelled
           setProcessingAttachments(prev => prev.map(att => {
             if (att.id === attachmentId) {
               return {
@@ -391,13 +398,16 @@ ${legacyContent || 'No content extracted'}
             description: jobData.error_message || 'An error occurred while processing the file'
           });
         }
-        // Status is 'pending' or 'processing' - continue polling
       } catch (_error) {
-        // Don't immediately fail - network issues might be temporary
+        setProcessingAttachments(prev => prev.map(att =>
+          att.id === attachmentId
+            ? { ...att, status: 'error', error: 'Failed to load processed file' }
+            : att
+        ));
       }
-    }, 2000);
+    });
 
-    pollingIntervals.current[attachmentId] = pollInterval;
+    jobWatchers.current[attachmentId] = stopWatching;
   }, [session?.accessToken]);
 
   /**
@@ -576,7 +586,7 @@ ${legacyContent || 'No content extracted'}
         return;
       }
 
-      // Async job response - update attachment and start polling
+      // Async job response - update attachment and start tracking progress
       setProcessingAttachments(prev => prev.map(att => {
         if (att.id === attachmentId) {
           return {
@@ -588,7 +598,7 @@ ${legacyContent || 'No content extracted'}
         return att;
       }));
 
-      // Start polling with storage data
+      // Start tracking progress with storage data
       startJobPollingWithStorage(data.job_id, attachmentId, storageData);
     } catch (error) {
       console.error('Error processing document:', error);
@@ -938,20 +948,17 @@ ${legacyContent || 'No content extracted'}
   };
 
   const removeProcessingAttachment = (id: string) => {
-    // Clear polling interval if exists
-    if (pollingIntervals.current[id]) {
-      clearInterval(pollingIntervals.current[id]);
-      delete pollingIntervals.current[id];
-    }
+    // Stop watching the job if it is still processing
+    stopJobWatcher(id);
     
     setProcessingAttachments(prev => prev.filter(att => att.id !== id));
   };
 
   const resetBlocks = () => {
     setContentBlocks([]);
-    // Clear all polling intervals
-    Object.values(pollingIntervals.current).forEach(interval => clearInterval(interval));
-    pollingIntervals.current = {};
+    // Stop all job watchers
+    Object.values(jobWatchers.current).forEach(stop => stop());
+    jobWatchers.current = {};
     setProcessingAttachments([]);
   };
 
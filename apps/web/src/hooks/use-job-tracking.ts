@@ -1,5 +1,6 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import { useAuthContext } from '@/providers/Auth';
+import { jobProgressClient, isTerminalJobStatus } from '@/lib/job-progress';
 import { toast } from 'sonner';
 import { uploadToasts } from '@/utils/upload-toasts';
 
@@ -84,8 +85,17 @@ export function useJobTracking(options?: JobTrackingOptions): UseJobTrackingRetu
   const [jobs, setJobs] = useState<ProcessingJob[]>([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
-  
-  // No longer needed - using simple polling approach
+
+  // Stop functions for the job progress watchers, keyed by job id
+  const jobWatchers = useRef<{ [jobId: string]: () => void }>({});
+
+  // Stop job watchers on unmount
+  useEffect(() => {
+    return () => {
+      Object.values(jobWatchers.current).forEach(stop => stop());
+      jobWatchers.current = {};
+    };
+  }, []);
 
   // Helper to format job from API response
   const formatJob = useCallback((apiJob: any): ProcessingJob => {
@@ -173,76 +183,76 @@ export function useJobTracking(options?: JobTrackingOptions): UseJobTrackingRetu
 
 
   // Job manipulation functions
-  // Targeted polling for a specific job
-  const startJobPolling = useCallback((jobId: string) => {
-    if (authLoading || !session?.accessToken) return;
-
-    let pollAttempts = 0;
-    const maxPollAttempts = 60; // 5 minutes max
-    
-    
-    const poll = async () => {
-      pollAttempts++;
-      
+  // Track a specific job over the shared job progress stream
+  const startJobTracking = useCallback((jobId: string) => {
+    if (authLoading || !session?.accessToken || jobWatchers.current[jobId]) return;
+
+    const stopWatching = jobProgressClient.watch(jobId, session.accessToken, async (progress) => {
+      if (!isTerminalJobStatus(progress.status)) {
+        setJobs(prev => prev.map(j =>
+          j.id === jobId
+            ? {
+                ...j,
+                status: progress.status,
+                progress_percentage: progress.progress_percentage,
+                current_step: progress.current_step ?? undefined,
+                total_steps: progress.total_steps ?? undefined,
+                documents_processed: progress.documents_processed,
+                chunks_created: progress.chunks_created,
+              }
+            : j
+        ));
+        return;
+      }
+
+      stopWatching();
+      delete jobWatchers.current[jobId];
+
       try {
+        // Progress updates carry status only; load the full job (results, duplicates) once
         const response = await fetch(`/api/langconnect/jobs/${jobId}`, {
           headers: {
             Authorization: `Bearer ${session.accessToken}`,
           },
         });
 
-        if (response.ok) {
-          const updatedJobData = await response.json();
-          const updatedJob = formatJob(updatedJobData);
-          
-          setJobs(prev => prev.map(j => 
-            j.id === jobId ? updatedJob : j
-          ));
-
-          // Check if job is complete
-          if (['completed', 'failed', 'cancelled'].includes(updatedJob.status)) {
-                        
-            // Show completion notification
-            if (updatedJob.status === 'completed') {
-              uploadToasts.completed(updatedJob);
-              
-              // Call the completion callback if provided
-              if (options?.onJobCompleted) {
-                options.onJobCompleted(updatedJob);
-              }
-            } else if (updatedJob.status === 'failed') {
-              uploadToasts.failed(updatedJob.error_message || 'Processing failed', updatedJob);
-            } else if (updatedJob.status === 'cancelled') {
-              toast.info(`Processing cancelled: ${updatedJob.title}`, {
-                description: 'Job was cancelled by user',
-              });
-            }
-            
-            // Remove the job from state after a short delay to allow the toast to show
-            setTimeout(() => {
-              setJobs(prev => prev.filter(j => j.id !== jobId));
-                          }, 1000);
-            
-            return; // Stop polling
-          }
-          
-          // Continue polling if still active and under max attempts
-          if (pollAttempts < maxPollAttempts) {
-            const delay = pollAttempts < 10 ? 1000 : pollAttempts < 30 ? 2000 : 5000;
-            setTimeout(poll, delay);
-          } else {
-            console.warn(`⏰ Polling timeout for job ${jobId} after ${maxPollAttempts} attempts`);
+        if (!response.ok) {
+          console.error(`Failed to load job ${jobId}: ${response.status}`);
+          return;
+        }
+
+        const updatedJob = formatJob(await response.json());
+
+        setJobs(prev => prev.map(j =>
+          j.id === jobId ? updatedJob : j
+        ));
+
+        // Show completion notification
+        if (updatedJob.status === 'completed') {
+          uploadToasts.completed(updatedJob);
+
+          // Call the completion callback if provided
+          if (options?.onJobCompleted) {
+            options.onJobCompleted(updatedJob);
           }
-        } else {
-          console.error(`Failed to poll job ${jobId}: ${response.status}`);
+        } else if (updatedJob.status === 'failed') {
+          uploadToasts.failed(updatedJob.error_message || 'Processing failed', updatedJob);
+        } else if (updatedJob.status === 'cancelled') {
+          toast.info(`Processing cancelled: ${updatedJob.title}`, {
+            description: 'Job was cancelled by user',
+          });
         }
+
+        // Remove the job from state after a short delay to allow the toast to show
+        setTimeout(() => {
+          setJobs(prev => prev.filter(j => j.id !== jobId));
+        }, 1000);
       } catch (error) {
-        console.error(`Polling error for job ${jobId}:`, error);
+        console.error(`Error loading job ${jobId}:`, error);
       }
-    };
+    });
 
-    // Start polling immediately
-    poll();
+    jobWatchers.current[jobId] = stopWatching;
   }, [authLoading, session?.accessToken, formatJob, options]);
 
   const addJob = useCallback((job: ProcessingJob) => {
@@ -253,11 +263,11 @@ export function useJobTracking(options?: JobTrackingOptions): UseJobTrackingRetu
       return [...prev, job];
     });
 
-    // Start polling for this specific job if it's active
+    // Start tracking this specific job if it's active
     if (['pending', 'processing'].includes(job.status)) {
-      startJobPolling(job.id);
+      startJobTracking(job.id);
     }
-  }, [startJobPolling]);
+  }, [startJobTracking]);
 
   const updateJobStatus = useCallback((jobId: string, updates: Partial<ProcessingJob>) => {
     setJobs(prev => prev.map(job => 
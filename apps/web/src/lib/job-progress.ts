@@ -0,0 +1,253 @@
+/**
+ * Shared job progress tracking.
+ *
+ * Every job watched anywhere in the app is multiplexed over one server-sent
+ * event stream (GET /jobs/stream). When the stream is unavailable, the watched
+ * jobs are polled together with a single batched request (POST /jobs/status/batch)
+ * instead of one polling loop per job. Both endpoints accept at most
+ * MAX_JOBS_PER_REQUEST jobs, so larger sets use one stream (or request) per chunk.
+ */
+
+import { readServerSentEvents } from "@/lib/sse";
+
+export type JobProgressStatus = 'pending' | 'processing' | 'completed' | 'failed' | 'cancelled';
+
+export interface JobProgress {
+  id: string;
+  status: JobProgressStatus;
+  progress_percentage: number;
+  current_step?: string | null;
+  total_steps?: number | null;
+  documents_processed: number;
+  chunks_created: number;
+  error_message?: string | null;
+  completed_at?: string | null;
+}
+
+export type JobProgressListener = (progress: JobProgress) => void;
+
+const TERMINAL_STATUSES: JobProgressStatus[] = ['completed', 'failed', 'cancelled'];
+
+// Short delay before (re)opening the stream so jobs added together share one connection
+const CONNECT_DEBOUNCE_MS = 100;
+const RECONNECT_MAX_DELAY_MS = 30000;
+const FALLBACK_POLL_INTERVAL_MS = 2000;
+// Server limit on job ids per stream or batch status request
+const MAX_JOBS_PER_REQUEST = 100;
+
+export function isTerminalJobStatus(status: string): boolean {
+  return TERMINAL_STATUSES.includes(status as JobProgressStatus);
+}
+
+function chunkJobIds(jobIds: string[]): string[][] {
+  const chunks: string[][] = [];
+  for (let start = 0; start < jobIds.length; start += MAX_JOBS_PER_REQUEST) {
+    chunks.push(jobIds.slice(start, start + MAX_JOBS_PER_REQUEST));
+  }
+  return chunks;
+}
+
+class JobProgressClient {
+  private listeners = new Map<string, Set<JobProgressListener>>();
+  private accessToken: string | null = null;
+  private controller: AbortController | null = null;
+  private connectTimer: ReturnType<typeof setTimeout> | null = null;
+  private pollTimer: ReturnType<typeof setInterval> | null = null;
+  private streamUnavailable = false;
+  private retryDelay = 1000;
+
+  /**
+   * Calls listener with every progress update of a job, starting with its
+   * current state. Returns a function that stops watching.
+   */
+  watch(jobId: string, accessToken: string, listener: JobProgressListener): () => void {
+    this.accessToken = accessToken;
+
+    let jobListeners = this.listeners.get(jobId);
+    if (!jobListeners) {
+      jobListeners = new Set();
+      this.listeners.set(jobId, jobListeners);
+      // The open stream does not include this job yet
+      this.scheduleConnect(CONNECT_DEBOUNCE_MS);
+    }
+    jobListeners.add(listener);
+
+    return () => this.unwatch(jobId, listener);
+  }
+
+  private unwatch(jobId: string, listener: JobProgressListener) {
+    const jobListeners = this.listeners.get(jobId);
+    if (!jobListeners) return;
+
+    jobListeners.delete(listener);
+    if (jobListeners.size === 0) {
+      // Updates for this job may still arrive on the open stream; they are ignored
+      this.listeners.delete(jobId);
+    }
+    if (this.listeners.size === 0) {
+      this.stop();
+    }
+  }
+
+  private stop() {
+    this.controller?.abort();
+    this.controller = null;
+    if (this.connectTimer) clearTimeout(this.connectTimer);
+    this.connectTimer = null;
+    this.stopPolling();
+    this.streamUnavailable = false;
+    this.retryDelay = 1000;
+  }
+
+  private scheduleConnect(delay: number) {
+    if (this.connectTimer) clearTimeout(this.connectTimer);
+    this.connectTimer = setTimeout(() => {
+      this.connectTimer = null;
+      this.connect();
+    }, delay);
+  }
+
+  private dispatch(progress: JobProgress) {
+    const jobListeners = this.listeners.get(progress.id);
+    if (!jobListeners) return;
+    for (const listener of Array.from(jobListeners)) {
+      listener(progress);
+    }
+  }
+
+  private dispatchMissing(jobIds: string[]) {
+    for (const id of jobIds) {
+      this.dispatch({
+        id,
+        status: 'failed',
+        progress_percentage: 0,
+        documents_processed: 0,
+        chunks_created: 0,
+        error_message: 'Job not found',
+      });
+    }
+  }
+
+  private handleEvent = (event: string, data: string) => {
+    try {
+      const payload = JSON.parse(data);
+      if (event === 'progress' || event === 'terminal') {
+        this.dispatch(payload as JobProgress);
+      } else if (event === 'missing') {
+        this.dispatchMissing(payload.job_ids || []);
+      }
+    } catch (_error) {
+      // Ignore malformed events
+    }
+  };
+
+  private async connect() {
+    this.controller?.abort();
+    this.controller = null;
+    if (this.listeners.size === 0 || !this.accessToken) return;
+
+    if (this.streamUnavailable) {
+      this.startPolling();
+      return;
+    }
+
+    const controller = new AbortController();
+    this.controller = controller;
+
+    // One stream per chunk of jobs, all closed together by the shared controller
+    const chunks = chunkJobIds(Array.from(this.listeners.keys()));
+    let opened = 0;
+    await Promise.all(chunks.map(async (jobIds) => {
+      const url = new URL('/api/langconnect/jobs/stream', window.location.origin);
+      for (const jobId of jobIds) {
+        url.searchParams.append('job_ids', jobId);
+      }
+
+      try {
+        const response = await fetch(url.toString(), {
+          headers: {
+            Authorization: `Bearer ${this.accessToken}`,
+            Accept: 'text/event-stream',
+          },
+          signal: controller.signal,
+        });
+
+        if (response.status === 404 || response.status === 405) {
+          // Backend without job streaming; polling covers every job, so
+          // close the other chunks' streams too
+          this.streamUnavailable = true;
+          controller.abort();
+          this.startPolling();
+          return;
+        }
+        if (!response.ok || !response.body) {
+          throw new Error(`Job progress stream failed: ${response.status}`);
+        }
+
+        opened += 1;
+        if (opened === chunks.length) {
+          this.stopPolling();
+          this.retryDelay = 1000;
+        }
+        await readServerSentEvents(response.body, this.handleEvent);
+      } catch (_error) {
+        if (controller.signal.aborted) return;
+        // Keep jobs moving with batched polling until the stream is back
+        this.startPolling();
+      }
+    }));
+
+    if (controller.signal.aborted || this.controller !== controller) return;
+    this.controller = null;
+
+    // The server closes the stream once every job it watched is terminal;
+    // reconnect only if jobs are still being watched
+    if (this.listeners.size > 0) {
+      this.scheduleConnect(this.retryDelay);
+      this.retryDelay = Math.min(this.retryDelay * 2, RECONNECT_MAX_DELAY_MS);
+    }
+  }
+
+  private startPolling() {
+    if (this.pollTimer) return;
+    this.pollTimer = setInterval(() => this.pollOnce(), FALLBACK_POLL_INTERVAL_MS);
+    this.pollOnce();
+  }
+
+  private stopPolling() {
+    if (this.pollTimer) clearInterval(this.pollTimer);
+    this.pollTimer = null;
+  }
+
+  private async pollOnce() {
+    const jobIds = Array.from(this.listeners.keys());
+    if (jobIds.length === 0 || !this.accessToken) {
+      this.stopPolling();
+      return;
+    }
+
+    await Promise.all(chunkJobIds(jobIds).map(async (chunk) => {
+      try {
+        const response = await fetch('/api/langconnect/jobs/status/batch', {
+          method: 'POST',
+          headers: {
+            Authorization: `Bearer ${this.accessToken}`,
+            'Content-Type': 'application/json',
+          },
+          body: JSON.stringify({ job_ids: chunk }),
+        });
+        if (!response.ok) return;
+
+        const data = await response.json();
+        for (const job of data.jobs as JobProgress[]) {
+          this.dispatch(job);
+        }
+        this.dispatchMissing(data.missing || []);
+      } catch (_error) {
+        // Network issues might be temporary; try again on the next tick
+      }
+    }));
+  }
+}
+
+export const jobProgressClient = new JobProgressClient();
@@ -0,0 +1,42 @@
+/**
+ * Minimal server-sent events reader for fetch() response bodies.
+ *
+ * EventSource cannot send an Authorization header, so LangConnect streams are
+ * opened with fetch() and parsed here instead.
+ */
+
+export type ServerSentEventHandler = (event: string, data: string) => void;
+
+/**
+ * Reads `event:` / `data:` blocks from a text/event-stream body until it ends.
+ * Comment lines (keep-alives) and `id:` / `retry:` fields are ignored.
+ */
+export async function readServerSentEvents(
+  body: ReadableStream<Uint8Array>,
+  onEvent: ServerSentEventHandler
+): Promise<void> {
+  const reader = body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = '';
+
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) return;
+    buffer += value.replace(/\r\n/g, '\n');
+
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = 'message';
+      const dataLines: string[] = [];
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+      }
+      if (dataLines.length > 0) onEvent(event, dataLines.join('\n'));
+
+      boundary = buffer.indexOf('\n\n');
+    }
+  }
+}
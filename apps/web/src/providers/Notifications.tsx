@@ -11,6 +11,7 @@ import React, {
 } from "react";
 import { useAuthContext } from "./Auth";
 import { useAgentsContext } from './Agents';
+import { readServerSentEvents } from "@/lib/sse";
 import {
   NotificationInfo,
   NotificationContextType,
@@ -205,15 +206,66 @@ export const NotificationsProvider: React.FC<{ children: ReactNode }> = ({
     fetchNotifications();
   }, [fetchNotifications]);
 
-  // Poll for new notifications every 30 seconds
+  // Live updates pushed by LangConnect over server-sent events.
+  // Falls back to polling every 30 seconds if the stream endpoint is unavailable.
   useEffect(() => {
     if (!session?.accessToken) return;
 
-    const interval = setInterval(() => {
-      fetchNotifications();
-    }, 30000); // 30 seconds
+    const controller = new AbortController();
+    let pollInterval: ReturnType<typeof setInterval> | null = null;
+    let retryDelay = 1000;
 
-    return () => clearInterval(interval);
+    const handleEvent = (event: string, data: string) => {
+      if (event === 'unread_count') {
+        try {
+          setUnreadCount(JSON.parse(data).unread_count ?? 0);
+        } catch (_error) {
+          // Ignore malformed events
+        }
+      } else if (event === 'notification' || event === 'resync') {
+        fetchNotifications();
+      }
+    };
+
+    const connect = async () => {
+      while (!controller.signal.aborted) {
+        try {
+          const response = await fetch('/api/langconnect/notifications/stream', {
+            headers: {
+              'Authorization': `Bearer ${session.accessToken}`,
+              'Accept': 'text/event-stream',
+            },
+            signal: controller.signal,
+          });
+
+          if (response.status === 404 || response.status === 405) {
+            // Backend without push support
+            pollInterval = setInterval(fetchNotifications, 30000);
+            return;
+          }
+          if (!response.ok || !response.body) {
+            throw new Error(`Notification stream failed: ${response.status}`);
+          }
+
+          retryDelay = 1000;
+          await readServerSentEvents(response.body, handleEvent);
+        } catch (_error) {
+          if (controller.signal.aborted) return;
+        }
+
+        // Reconnect with backoff and catch up on anything missed meanwhile
+        await new Promise(resolve => setTimeout(resolve, retryDelay));
+        retryDelay = Math.min(retryDelay * 2, 30000);
+        if (!controller.signal.aborted) fetchNotifications();
+      }
+    };
+
+    connect();
+
+    return () => {
+      controller.abort();
+      if (pollInterval) clearInterval(pollInterval);
+    };
   }, [session?.accessToken, fetchNotifications]);
 
   // Derived filtered notifications
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Build or rebuild HNSW and metadata indexes for collection embeddings.
+
+Creates the global HNSW index on langchain_pg_embedding and partial
+per-collection indexes for collections with at least
+VECTOR_INDEX_PARTIAL_THRESHOLD chunks (dropping partial indexes of
+collections that shrank below half the threshold or were deleted). All
+indexes are built with CREATE INDEX CONCURRENTLY, so writes continue while
+the job runs. Missing JSONB metadata indexes (migration 024) are created too.
+
+Usage:
+    # Create missing indexes (safe to run periodically, e.g. from cron)
+    python database/build_vector_indexes.py
+
+    # Only the global index (e.g. before applying migration 020 on a large table)
+    python database/build_vector_indexes.py --global-only
+
+    # Rebuild with new build parameters (old indexes serve queries until swapped)
+    python database/build_vector_indexes.py --rebuild --m 24 --ef-construction 128
+
+    # Only the metadata indexes (e.g. before applying migration 024 on a large table)
+    python database/build_vector_indexes.py --metadata-only
+
+    # Index one collection regardless of its size
+    python database/build_vector_indexes.py --collection-id <uuid>
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / "apps" / "langconnect"))
+
+from langconnect import config
+from langconnect.database.connection import close_db_pool, get_db_connection
+from langconnect.database.metadata_index import build_metadata_indexes
+from langconnect.database.vector_index import (
+    build_index,
+    drop_collection_index,
+    set_maintenance_work_mem,
+    sync_collection_indexes,
+)
+
+logging.basicConfig(level=logging.INFO)
+log = logging.getLogger(__name__)
+
+
+async def main(args: argparse.Namespace) -> None:
+    params = {"dims": args.dims, "m": args.m, "ef_construction": args.ef_construction}
+
+    try:
+        async with get_db_connection() as conn:
+            if args.maintenance_work_mem:
+                await set_maintenance_work_mem(conn, args.maintenance_work_mem)
+
+            if args.drop_collection_id:
+                await drop_collection_index(conn, args.drop_collection_id)
+                log.info(f"Dropped index for collection {args.drop_collection_id}")
+                return
+
+            if args.collection_id:
+                result = await build_index(conn, collection_id=args.collection_id, rebuild=args.rebuild, **params)
+                log.info(f"Collection {args.collection_id}: {result}")
+                return
+
+            if args.metadata_only or not args.global_only:
+                results = await build_metadata_indexes(conn)
+                for name, result in results.items():
+                    log.info(f"Metadata index {name}: {result}")
+                if args.metadata_only:
+                    return
+
+            result = await build_index(conn, rebuild=args.rebuild, **params)
+            log.info(f"Global index: {result}")
+
+            if not args.global_only:
+                stats = await sync_collection_indexes(
+                    conn, threshold=args.threshold, rebuild=args.rebuild, **params
+                )
+                log.info(f"Collection indexes: {json.dumps({k: len(v) for k, v in stats.items()})}")
+                for action in ("created", "rebuilt", "dropped"):
+                    for collection_id in stats[action]:
+                        log.info(f"  {action}: {collection_id}")
+    finally:
+        await close_db_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or rebuild HNSW and metadata indexes for collection embeddings")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild existing indexes (e.g. after changing --m)")
+    parser.add_argument("--global-only", action="store_true", help="Only build the global index")
+    parser.add_argument("--metadata-only", action="store_true", help="Only build the JSONB metadata indexes")
+    parser.add_argument("--collection-id", help="Build the partial index for one collection")
+    parser.add_argument("--drop-collection-id", help="Drop the partial index of one collection")
+    parser.add_argument("--threshold", type=int, default=config.VECTOR_INDEX_PARTIAL_THRESHOLD,
+                        help="Chunk count from which collections get a partial index")
+    parser.add_argument("--dims", type=int, default=config.EMBEDDING_DIMENSIONS, help="Embedding dimensions")
+    parser.add_argument("--m", type=int, default=config.VECTOR_INDEX_M, help="HNSW m (graph degree)")
+    parser.add_argument("--ef-construction", type=int, default=config.VECTOR_INDEX_EF_CONSTRUCTION,
+                        help="HNSW ef_construction (build-time candidate list size)")
+    parser.add_argument("--maintenance-work-mem", help="e.g. 2GB; HNSW builds are much faster when the graph fits")
+
+    asyncio.run(main(parser.parse_args()))
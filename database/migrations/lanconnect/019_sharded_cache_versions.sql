@@ -0,0 +1,108 @@
+-- Migration 019: Sharded cache version counters
+--
+-- Problem: Every mirror mutation calls langconnect.increment_cache_version(),
+-- which updates and re-reads the single cache_state row (id = 1). Thread
+-- creation, message counting and thread naming all bump threads_version, so
+-- concurrent writers queue on one row lock and the hot row accumulates dead
+-- tuples.
+--
+-- Solution: Keep each version type in 16 counter shards. An increment updates
+-- one shard (chosen by the backend PID, so concurrent connections usually hit
+-- different rows) with UPDATE ... RETURNING, and the version of a type is the
+-- sum of its shards. The sum only ever grows, so it remains a valid cache
+-- version / ETag. Readers use the cache_state_current view, which exposes the
+-- same columns as cache_state.
+--
+-- cache_state keeps last_synced_at; its *_version columns are no longer updated.
+
+SET search_path = langconnect, public;
+
+-- ============================================================================
+-- SHARD TABLE
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS langconnect.cache_version_shards (
+    version_type TEXT NOT NULL,
+    shard SMALLINT NOT NULL,
+    version BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (version_type, shard)
+);
+
+COMMENT ON TABLE langconnect.cache_version_shards IS 'Sharded cache version counters; the version of a type is the sum of its shards';
+
+-- Seed shard 0 of each type with its current version so versions keep increasing
+INSERT INTO langconnect.cache_version_shards (version_type, shard, version)
+SELECT v.version_type, 0, v.version
+FROM langconnect.cache_state cs
+CROSS JOIN LATERAL (
+    VALUES
+        ('graphs', cs.graphs_version),
+        ('assistants', cs.assistants_version),
+        ('schemas', cs.schemas_version),
+        ('graph_schemas', cs.graph_schemas_version),
+        ('threads', cs.threads_version),
+        ('versions', cs.versions_version),
+        ('skills', cs.skills_version)
+) AS v(version_type, version)
+WHERE cs.id = 1
+ON CONFLICT (version_type, shard) DO NOTHING;
+
+-- Pre-create the remaining shards so increments are plain row updates
+INSERT INTO langconnect.cache_version_shards (version_type, shard, version)
+SELECT t.version_type, s.shard, 0
+FROM unnest(ARRAY['graphs', 'assistants', 'schemas', 'graph_schemas', 'threads', 'versions', 'skills']) AS t(version_type)
+CROSS JOIN generate_series(0, 15) AS s(shard)
+ON CONFLICT (version_type, shard) DO NOTHING;
+
+-- ============================================================================
+-- INCREMENT FUNCTION
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION langconnect.increment_cache_version(
+    version_type TEXT
+) RETURNS BIGINT AS $$
+DECLARE
+    target_shard SMALLINT := (pg_backend_pid() % 16)::SMALLINT;
+    updated_type TEXT;
+    new_version BIGINT;
+BEGIN
+    UPDATE langconnect.cache_version_shards s
+    SET version = s.version + 1
+    WHERE s.version_type = increment_cache_version.version_type
+      AND s.shard = target_shard
+    RETURNING s.version_type INTO updated_type;
+
+    -- Unknown types get their shards on first use
+    IF updated_type IS NULL THEN
+        INSERT INTO langconnect.cache_version_shards AS s (version_type, shard, version)
+        VALUES (increment_cache_version.version_type, target_shard, 1)
+        ON CONFLICT (version_type, shard) DO UPDATE SET version = s.version + 1;
+    END IF;
+
+    -- Unlocked read of the other shards (MVCC); never lower than any committed version
+    SELECT COALESCE(SUM(s.version), 0)
+    INTO new_version
+    FROM langconnect.cache_version_shards s
+    WHERE s.version_type = increment_cache_version.version_type;
+
+    RETURN new_version;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================================================
+-- AGGREGATE VIEW (same columns as cache_state)
+-- ============================================================================
+
+CREATE OR REPLACE VIEW langconnect.cache_state_current AS
+SELECT
+    COALESCE(SUM(s.version) FILTER (WHERE s.version_type = 'graphs'), 1)::BIGINT AS graphs_version,
+    COALESCE(SUM(s.version) FILTER (WHERE s.version_type = 'assistants'), 1)::BIGINT AS assistants_version,
+    COALESCE(SUM(s.version) FILTER (WHERE s.version_type = 'schemas'), 1)::BIGINT AS schemas_version,
+    COALESCE(SUM(s.version) FILTER (WHERE s.version_type = 'graph_schemas'), 1)::BIGINT AS graph_schemas_version,
+    COALESCE(SUM(s.version) FILTER (WHERE s.version_type = 'threads'), 1)::BIGINT AS threads_version,
+    COALESCE(SUM(s.version) FILTER (WHERE s.version_type = 'versions'), 1)::BIGINT AS versions_version,
+    COALESCE(SUM(s.version) FILTER (WHERE s.version_type = 'skills'), 1)::BIGINT AS skills_version,
+    (SELECT cs.last_synced_at FROM langconnect.cache_state cs WHERE cs.id = 1) AS last_synced_at
+FROM langconnect.cache_version_shards s;
+
+COMMENT ON VIEW langconnect.cache_state_current IS 'Current cache versions aggregated from cache_version_shards, plus last_synced_at';
@@ -0,0 +1,28 @@
+-- Migration 020: HNSW index for collection embeddings
+--
+-- Problem: langchain_pg_embedding only has B-tree indexes on collection_id and
+-- document_id, so every semantic search computes exact distances over all
+-- chunks of the collection.
+--
+-- Solution: An HNSW index (cosine distance) over all collections. The
+-- embedding column is an unconstrained vector, so the index is built on
+-- embedding::vector(1536) for rows of that dimension (OpenAI embeddings);
+-- Collection.search orders by the same expression (see
+-- langconnect/database/vector_index.py).
+--
+-- Large deployments should build this index ahead of the migration without
+-- blocking writes (the IF NOT EXISTS below then makes this a no-op):
+--     python database/build_vector_indexes.py --global-only
+-- Partial per-collection indexes for large tenants are managed by the same
+-- script. Deployments using other embedding dimensions should build the
+-- index with EMBEDDING_DIMENSIONS set instead.
+
+SET search_path = langconnect, public;
+
+CREATE INDEX IF NOT EXISTS idx_embedding_hnsw
+ON langconnect.langchain_pg_embedding
+USING hnsw ((embedding::vector(1536)) vector_cosine_ops)
+WITH (m = 16, ef_construction = 64)
+WHERE vector_dims(embedding) = 1536;
+
+COMMENT ON INDEX langconnect.idx_embedding_hnsw IS 'HNSW (cosine) index over 1536-dimension chunk embeddings; partial per-collection indexes are named idx_embedding_hnsw_c_<collection uuid hex>';
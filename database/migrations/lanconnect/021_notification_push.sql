@@ -0,0 +1,53 @@
+-- Migration 021: Push notification changes with LISTEN/NOTIFY
+--
+-- Problem: The web app polls /notifications every 30 seconds per open tab,
+-- running the notification list query plus a COUNT(*) each time, even when
+-- nothing changed.
+--
+-- Solution: Every insert, status change and delete on langconnect.notifications
+-- (create_notification, accept_notification, reject_notification,
+-- cleanup_expired_notifications, admin deletes) publishes a small JSON payload
+-- on the 'langconnect_notifications' channel. LangConnect listens on one
+-- connection per worker, keeps unread counters for connected users and pushes
+-- changes over server-sent events (GET /notifications/stream).
+--
+-- NOTIFY is transactional: listeners only see changes that committed.
+
+SET search_path = langconnect, public;
+
+CREATE OR REPLACE FUNCTION langconnect.notify_notification_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    payload JSON;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        payload := json_build_object(
+            'op', TG_OP,
+            'id', OLD.id,
+            'recipient_user_id', OLD.recipient_user_id,
+            'status', NULL,
+            'old_status', OLD.status
+        );
+    ELSE
+        payload := json_build_object(
+            'op', TG_OP,
+            'id', NEW.id,
+            'recipient_user_id', NEW.recipient_user_id,
+            'type', NEW.type,
+            'resource_type', NEW.resource_type,
+            'status', NEW.status,
+            'old_status', CASE WHEN TG_OP = 'UPDATE' THEN OLD.status ELSE NULL END
+        );
+    END IF;
+
+    PERFORM pg_notify('langconnect_notifications', payload::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_notifications_push ON langconnect.notifications;
+CREATE TRIGGER trigger_notifications_push
+AFTER INSERT OR DELETE OR UPDATE OF status ON langconnect.notifications
+FOR EACH ROW EXECUTE FUNCTION langconnect.notify_notification_change();
+
+COMMENT ON FUNCTION langconnect.notify_notification_change() IS 'Publishes notification inserts, status changes and deletes on the langconnect_notifications channel';
@@ -0,0 +1,56 @@
+-- Migration 022: Push job progress with LISTEN/NOTIFY
+--
+-- Problem: The web app polls GET /jobs/{id} for every job it tracks (every
+-- 1-2 seconds per chat attachment and per knowledge upload). Each poll reads
+-- the whole processing_jobs row, including input_data and result_data, so a
+-- bulk upload of dozens of files runs dozens of polling loops against the API
+-- and the database.
+--
+-- Solution: Every change to the progress fields of a job publishes a compact
+-- JSON payload on the 'langconnect_job_progress' channel. LangConnect listens
+-- on one connection per worker and multiplexes the jobs a client is watching
+-- over a single server-sent event stream (GET /jobs/stream). Clients that
+-- cannot stream use POST /jobs/status/batch instead.
+--
+-- Payloads are kept well below the 8000 byte NOTIFY limit by truncating
+-- current_step and error_message; the full job is still available from
+-- GET /jobs/{id}.
+
+SET search_path = langconnect, public;
+
+CREATE OR REPLACE FUNCTION langconnect.notify_job_progress()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('langconnect_job_progress', json_build_object(
+        'id', NEW.id,
+        'user_id', NEW.user_id,
+        'status', NEW.status,
+        'progress_percentage', NEW.progress_percent,
+        'current_step', left(NEW.current_step, 500),
+        'total_steps', NEW.total_steps,
+        'documents_processed', NEW.documents_processed,
+        'chunks_created', NEW.chunks_created,
+        'error_message', left(NEW.error_message, 2000),
+        'completed_at', NEW.completed_at
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_processing_jobs_progress_push ON langconnect.processing_jobs;
+CREATE TRIGGER trigger_processing_jobs_progress_push
+AFTER UPDATE OF status, progress_percent, current_step, total_steps, documents_processed, chunks_created, error_message
+ON langconnect.processing_jobs
+FOR EACH ROW
+WHEN (
+    OLD.status IS DISTINCT FROM NEW.status
+    OR OLD.progress_percent IS DISTINCT FROM NEW.progress_percent
+    OR OLD.current_step IS DISTINCT FROM NEW.current_step
+    OR OLD.total_steps IS DISTINCT FROM NEW.total_steps
+    OR OLD.documents_processed IS DISTINCT FROM NEW.documents_processed
+    OR OLD.chunks_created IS DISTINCT FROM NEW.chunks_created
+    OR OLD.error_message IS DISTINCT FROM NEW.error_message
+)
+EXECUTE FUNCTION langconnect.notify_job_progress();
+
+COMMENT ON FUNCTION langconnect.notify_job_progress() IS 'Publishes job progress changes on the langconnect_job_progress channel';
@@ -0,0 +1,27 @@
+-- Migration 023: Incremental assistant version history sync
+--
+-- Problem: Every read of an assistant's version history fetched the assistant
+-- and its full version list from LangGraph, wrote versions back one INSERT at
+-- a time and then re-queried local metadata, so opening the history of a
+-- long-lived assistant cost O(versions) round trips and writes every time.
+--
+-- Solution: assistant_versions is the materialised history and reads are
+-- served from it directly (keyset pagination on (assistant_id, version DESC),
+-- covered by idx_assistant_versions_lookup). This table records the highest
+-- version synced from LangGraph per assistant; only when assistants_mirror
+-- reports a newer version does a read go to LangGraph, inserting the missing
+-- versions with a single multi-row INSERT.
+
+SET search_path = langconnect, public;
+
+CREATE TABLE IF NOT EXISTS langconnect.assistant_version_sync (
+  assistant_id UUID PRIMARY KEY,
+  synced_version INTEGER NOT NULL,
+  synced_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  CONSTRAINT fk_assistant_version_sync_assistant
+    FOREIGN KEY (assistant_id)
+    REFERENCES langconnect.assistants_mirror(assistant_id)
+    ON DELETE CASCADE
+);
+
+COMMENT ON TABLE langconnect.assistant_version_sync IS 'Highest LangGraph version mirrored into assistant_versions per assistant (incremental sync watermark)';
@@ -0,0 +1,45 @@
+-- Migration 024: Indexed JSONB metadata lookups
+--
+-- Problem: Collection ownership checks and listings filter on
+-- cmetadata->>'owner_id' and sort on cmetadata->>'name', chunk deletes filter
+-- langchain_pg_embedding by cmetadata->>'file_id', duplicate detection looks up
+-- documents by cmetadata->>'content_hash', and filtered semantic searches test
+-- the metadata of every chunk in the collection. No index covers any of these
+-- expressions, so each is a full (or per-collection) scan.
+--
+-- Solution: Expression indexes on the hot metadata keys (expression indexes
+-- rather than generated columns, which would rewrite langchain_pg_embedding),
+-- plus a GIN jsonb_path_ops index on chunk metadata for arbitrary search
+-- filters. Collection.search compiles its filters to containment (@>)
+-- predicates that this index serves (see
+-- langconnect/database/metadata_index.py).
+--
+-- Large deployments should build these indexes ahead of the migration without
+-- blocking writes (the IF NOT EXISTS below then makes this a no-op):
+--     python database/build_vector_indexes.py --metadata-only
+
+SET search_path = langconnect, public;
+
+-- Collection ownership checks and listing order
+CREATE INDEX IF NOT EXISTS idx_collection_owner_id
+ON langconnect.langchain_pg_collection ((cmetadata->>'owner_id'));
+
+CREATE INDEX IF NOT EXISTS idx_collection_name
+ON langconnect.langchain_pg_collection ((cmetadata->>'name'));
+
+-- Chunks of a source file within a collection
+CREATE INDEX IF NOT EXISTS idx_embedding_file_id
+ON langconnect.langchain_pg_embedding (collection_id, (cmetadata->>'file_id'));
+
+-- Containment (@>) filters on chunk metadata
+CREATE INDEX IF NOT EXISTS idx_embedding_cmetadata_gin
+ON langconnect.langchain_pg_embedding USING gin (cmetadata jsonb_path_ops);
+
+-- Duplicate detection and source type filters on documents
+CREATE INDEX IF NOT EXISTS idx_document_content_hash
+ON langconnect.langchain_pg_document (collection_id, (cmetadata->>'content_hash'));
+
+CREATE INDEX IF NOT EXISTS idx_document_source_type
+ON langconnect.langchain_pg_document (collection_id, (cmetadata->>'source_type'));
+
+COMMENT ON INDEX langconnect.idx_embedding_cmetadata_gin IS 'Serves containment (@>) filters on chunk metadata; Collection.search compiles its filters to @> predicates';
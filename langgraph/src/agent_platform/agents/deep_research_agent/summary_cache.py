@@ -0,0 +1,187 @@
+"""Web page summary cache for deep research.
+
+Parallel researchers often hit the same URLs and would each summarise the same
+page content with an LLM call. Summaries are cached by (summarization model,
+URL, content hash), in memory per worker and optionally in a local SQLite file
+across runs:
+
+- Concurrent requests for the same key share one summarisation (single-flight)
+- Summarisations run with bounded concurrency across all researchers
+- Failed summarisations (which fall back to the raw content) are not cached
+
+Environment:
+    DEEP_RESEARCH_SUMMARY_CACHE_SIZE: In-memory entries (default 2048, 0 disables)
+    DEEP_RESEARCH_SUMMARY_CACHE_TTL: Entry lifetime in seconds (default 86400)
+    DEEP_RESEARCH_SUMMARY_CACHE_DB: SQLite path for persistence across runs (unset = memory only)
+    DEEP_RESEARCH_SUMMARY_CONCURRENCY: Concurrent summarisation calls (default 16)
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def summary_key(model_name: str, url: str, content: str) -> str:
+    """Cache key for a page summary."""
+    content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    return hashlib.sha256(f"{model_name}\0{url}\0{content_hash}".encode("utf-8")).hexdigest()
+
+
+class _SqliteStore:
+    """Blocking SQLite persistence; called from worker threads."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries "
+            "(key TEXT PRIMARY KEY, summary TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str, min_created_at: float) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary FROM summaries WHERE key = ? AND created_at >= ?",
+                (key, min_created_at),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, summary: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries (key, summary, created_at) VALUES (?, ?, ?)",
+                (key, summary, time.time()),
+            )
+            self._conn.commit()
+
+
+class SummaryCache:
+    """Single-flight, TTL-bounded LRU cache of web page summaries."""
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        ttl: float = 86400,
+        db_path: Optional[str] = None,
+        max_concurrency: int = 16,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_concurrency = max_concurrency
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._store: Optional[_SqliteStore] = None
+        if db_path:
+            try:
+                self._store = _SqliteStore(db_path)
+            except Exception as e:
+                logger.warning(f"[SUMMARY_CACHE] Persistence disabled, could not open {db_path}: {e}")
+        self.hits = 0
+        self.misses = 0
+
+    def _get_local(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        summary, created_at = entry
+        if time.time() - created_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return summary
+
+    def _put_local(self, key: str, summary: str, created_at: Optional[float] = None) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (summary, created_at or time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_summarize(
+        self,
+        model_name: str,
+        url: str,
+        content: str,
+        summarize: Callable[[], Awaitable[str]],
+    ) -> str:
+        """Return the cached summary for a page, or summarise it once.
+
+        Args:
+            model_name: Summarization model (part of the key)
+            url: Page URL
+            content: Page content as passed to the summarizer
+            summarize: Produces the summary; returns ``content`` itself on failure
+        """
+        key = summary_key(model_name, url, content)
+        summary = self._get_local(key)
+        if summary is not None:
+            self.hits += 1
+            return summary
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, content, summarize))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.hits += 1
+            logger.debug(f"[SUMMARY_CACHE] Waiting on in-flight summary for {url}")
+        # Shield so one researcher being cancelled does not cancel the others' summary
+        return await asyncio.shield(task)
+
+    async def _load(self, key: str, content: str, summarize: Callable[[], Awaitable[str]]) -> str:
+        if self._store is not None:
+            try:
+                summary = await asyncio.to_thread(self._store.get, key, time.time() - self.ttl)
+            except Exception as e:
+                logger.warning(f"[SUMMARY_CACHE] Persistent lookup failed: {e}")
+                summary = None
+            if summary is not None:
+                self.hits += 1
+                self._put_local(key, summary)
+                return summary
+
+        self.misses += 1
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            summary = await summarize()
+
+        if summary == content:
+            # Summarisation failed and fell back to the raw content; retry next time
+            return summary
+        self._put_local(key, summary)
+        if self._store is not None:
+            try:
+                await asyncio.to_thread(self._store.put, key, summary)
+            except Exception as e:
+                logger.warning(f"[SUMMARY_CACHE] Persistent write failed: {e}")
+        return summary
+
+
+_summary_cache: Optional[SummaryCache] = None
+
+
+def get_summary_cache() -> SummaryCache:
+    """Return the worker-wide summary cache, shared by all researchers."""
+    global _summary_cache
+    if _summary_cache is None:
+        _summary_cache = SummaryCache(
+            max_entries=int(os.getenv("DEEP_RESEARCH_SUMMARY_CACHE_SIZE", "2048")),
+            ttl=float(os.getenv("DEEP_RESEARCH_SUMMARY_CACHE_TTL", "86400")),
+            db_path=os.getenv("DEEP_RESEARCH_SUMMARY_CACHE_DB") or None,
+            max_concurrency=int(os.getenv("DEEP_RESEARCH_SUMMARY_CONCURRENCY", "16")),
+        )
+    return _summary_cache
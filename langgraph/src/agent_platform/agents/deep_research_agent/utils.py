@@ -31,6 +31,7 @@ from tavily import AsyncTavilyClient
 from agent_platform.agents.deep_research_agent.configuration import Configuration, SearchAPI
 from agent_platform.agents.deep_research_agent.prompts import summarize_webpage_prompt
 from agent_platform.agents.deep_research_agent.state import ResearchComplete, Summary
+from agent_platform.agents.deep_research_agent.summary_cache import get_summary_cache
 from agent_platform.services.mcp_token import fetch_tokens as central_fetch_tokens
 from agent_platform.utils.tool_utils import (
     create_langchain_mcp_tool_with_universal_context,
@@ -120,20 +121,29 @@ async def tavily_search(
     _set_run_id_for_cost_capture(config)
 
     # Step 4: Create summarization tasks (skip empty content)
+    # Summaries are cached by (model, URL, content hash) and shared across researchers,
+    # so parallel researchers hitting the same page wait on a single summarization
+    summary_cache = get_summary_cache()
+
     async def noop():
         """No-op function for results without raw content."""
         return None
 
+    def summarize(url: str, content: str):
+        return summary_cache.get_or_summarize(
+            configurable.summarization_model,
+            url,
+            content,
+            lambda: summarize_webpage(summarization_model, content),
+        )
+
     summarization_tasks = [
         noop() if not result.get("raw_content") 
-        else summarize_webpage(
-            summarization_model, 
-            result['raw_content'][:max_char_to_include]
-        )
-        for result in unique_results.values()
+        else summarize(url, result['raw_content'][:max_char_to_include])
+        for url, result in unique_results.items()
     ]
     
-    # Step 5: Execute all summarization tasks in parallel
+    # Step 5: Execute all summarization tasks in parallel (concurrency bounded by the cache)
     summaries = await asyncio.gather(*summarization_tasks)
     
     # Step 6: Combine results with their summaries
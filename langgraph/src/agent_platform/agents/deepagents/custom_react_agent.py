@@ -33,7 +33,7 @@ try:
     from agent_platform.utils.usage_tracking import (
         extract_usage_from_response,
         extract_run_context,
-        record_usage,
+        enqueue_usage,
         UsageAccumulator,
     )
     USAGE_TRACKING_AVAILABLE = True
@@ -41,7 +41,7 @@ except Exception:  # pragma: no cover
     USAGE_TRACKING_AVAILABLE = False
     extract_usage_from_response = None  # type: ignore
     extract_run_context = None  # type: ignore
-    record_usage = None  # type: ignore
+    enqueue_usage = None  # type: ignore
     UsageAccumulator = None  # type: ignore
 
 try:
@@ -521,8 +521,7 @@ def custom_create_react_agent(
                     usage.get("cost", 0.0),
                     effective_run_id
                 )
-                # Record to LangConnect immediately (fire-and-forget via asyncio)
-                import asyncio
+                # Buffer for batched delivery to LangConnect (no network hop here)
                 try:
                     # Get model name: prefer captured model from SSE stream, fall back to response metadata
                     model_name = "unknown"
@@ -533,7 +532,7 @@ def custom_create_react_agent(
                             logger.info("[call_model] Using captured SSE model: %s", model_name)
                     if model_name == "unknown":
                         model_name = getattr(response, "response_metadata", {}).get("model", "unknown")
-                    asyncio.create_task(record_usage(
+                    enqueue_usage(
                         thread_id=run_context.get("thread_id", "unknown"),
                         run_id=effective_run_id,
                         model_name=model_name,
@@ -541,7 +540,7 @@ def custom_create_react_agent(
                         user_id=run_context.get("user_id", "unknown"),
                         assistant_id=run_context.get("assistant_id"),
                         graph_name=run_context.get("graph_name") or name,
-                    ))
+                    )
                 except Exception as e:
                     logger.warning("[call_model] Failed to record usage: %s", e)
             else:
@@ -649,8 +648,7 @@ def custom_create_react_agent(
                     usage.get("cost", 0.0),
                     effective_run_id
                 )
-                # Record to LangConnect immediately (fire-and-forget)
-                import asyncio
+                # Buffer for batched delivery to LangConnect (no network hop here)
                 try:
                     # Get model name: prefer captured model from SSE stream, fall back to response metadata
                     model_name = "unknown"
@@ -661,7 +659,7 @@ def custom_create_react_agent(
                             logger.info("[acall_model] Using captured SSE model: %s", model_name)
                     if model_name == "unknown":
                         model_name = getattr(response, "response_metadata", {}).get("model", "unknown")
-                    asyncio.create_task(record_usage(
+                    enqueue_usage(
                         thread_id=run_context.get("thread_id", "unknown"),
                         run_id=effective_run_id,
                         model_name=model_name,
@@ -669,7 +667,7 @@ def custom_create_react_agent(
                         user_id=run_context.get("user_id", "unknown"),
                         assistant_id=run_context.get("assistant_id"),
                         graph_name=run_context.get("graph_name") or name,
-                    ))
+                    )
                 except Exception as e:
                     logger.warning("[acall_model] Failed to record usage: %s", e)
             else:
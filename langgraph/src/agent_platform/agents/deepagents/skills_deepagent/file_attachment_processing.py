@@ -10,6 +10,7 @@ Supported formats:
 Files are downloaded from Supabase Storage and written to /sandbox/user_uploads/.
 """
 
+import asyncio
 import re
 import httpx
 from typing import Annotated, Optional, List, Dict, Any, Tuple, Callable
@@ -175,7 +176,7 @@ def _parse_legacy_attachments(message_content: str) -> List[Dict[str, Any]]:
     return attachments
 
 
-def extract_file_attachments_to_sandbox(
+async def extract_file_attachments_to_sandbox(
     state: Annotated[SkillsDeepAgentState, InjectedState],
     thread_id: str,
     langconnect_url: str = "http://langconnect:8080",
@@ -235,7 +236,7 @@ def extract_file_attachments_to_sandbox(
 
     # Ensure user_uploads directory exists
     try:
-        sandbox.files.make_dir("/sandbox/user_uploads")
+        await sandbox.files.make_dir("/sandbox/user_uploads")
     except Exception:
         pass  # May already exist
 
@@ -250,7 +251,8 @@ def extract_file_attachments_to_sandbox(
             storage_paths = [upload['storage_path'] for upload in binary_uploads]
 
             try:
-                signed_urls = _fetch_signed_urls(
+                signed_urls = await asyncio.to_thread(
+                    _fetch_signed_urls,
                     storage_paths=storage_paths,
                     langconnect_url=langconnect_url,
                     access_token=access_token,
@@ -266,8 +268,8 @@ def extract_file_attachments_to_sandbox(
                     continue
 
                 try:
-                    file_data = _download_from_signed_url(signed_url)
-                    sandbox.files.write(upload['sandbox_path'], file_data)
+                    file_data = await asyncio.to_thread(_download_from_signed_url, signed_url)
+                    await sandbox.files.write(upload['sandbox_path'], file_data)
                     files_written += 1
                 except Exception as e:
                     logger.error("[SKILLS_FILE_ATTACH] Failed to transfer %s: %s", upload['file_name'], str(e))
@@ -283,7 +285,7 @@ def extract_file_attachments_to_sandbox(
             try:
                 markdown_file_name = f"{attachment['file_name']}.md"
                 sandbox_path = f"/sandbox/user_uploads/{markdown_file_name}"
-                sandbox.files.write(sandbox_path, attachment['content'].encode('utf-8'))
+                await sandbox.files.write(sandbox_path, attachment['content'].encode('utf-8'))
                 files_written += 1
             except Exception as e:
                 logger.error("[SKILLS_FILE_ATTACH] Failed to write legacy attachment: %s", str(e))
@@ -392,7 +394,7 @@ def create_file_attachment_node(
                 if has_binary_uploads or has_legacy_attachments:
                     # Ensure user_uploads directory exists
                     try:
-                        sandbox.files.make_dir("/sandbox/user_uploads")
+                        await sandbox.files.make_dir("/sandbox/user_uploads")
                     except Exception:
                         pass
 
@@ -402,7 +404,8 @@ def create_file_attachment_node(
                         if binary_uploads:
                             storage_paths = [upload['storage_path'] for upload in binary_uploads]
                             try:
-                                signed_urls = _fetch_signed_urls(
+                                signed_urls = await asyncio.to_thread(
+                                    _fetch_signed_urls,
                                     storage_paths=storage_paths,
                                     langconnect_url=langconnect_url,
                                     access_token=access_token,
@@ -415,8 +418,8 @@ def create_file_attachment_node(
                                 signed_url = signed_urls.get(upload['storage_path'])
                                 if signed_url:
                                     try:
-                                        file_data = _download_from_signed_url(signed_url)
-                                        sandbox.files.write(upload['sandbox_path'], file_data)
+                                        file_data = await asyncio.to_thread(_download_from_signed_url, signed_url)
+                                        await sandbox.files.write(upload['sandbox_path'], file_data)
                                         files_written += 1
                                     except Exception as e:
                                         logger.error("[SKILLS_FILE_ATTACH] Failed to transfer %s: %s", upload['file_name'], str(e))
@@ -428,7 +431,7 @@ def create_file_attachment_node(
                             try:
                                 markdown_file_name = f"{attachment['file_name']}.md"
                                 sandbox_path = f"/sandbox/user_uploads/{markdown_file_name}"
-                                sandbox.files.write(sandbox_path, attachment['content'].encode('utf-8'))
+                                await sandbox.files.write(sandbox_path, attachment['content'].encode('utf-8'))
                                 files_written += 1
                             except Exception as e:
                                 logger.error("[SKILLS_FILE_ATTACH] Failed to write legacy attachment: %s", str(e))
@@ -578,7 +581,7 @@ def create_file_attachment_nodes(
                 if has_binary_uploads or has_legacy_attachments:
                     # Ensure user_uploads directory exists
                     try:
-                        sandbox.files.make_dir("/sandbox/user_uploads")
+                        await sandbox.files.make_dir("/sandbox/user_uploads")
                     except Exception:
                         pass
 
@@ -588,7 +591,8 @@ def create_file_attachment_nodes(
                         if binary_uploads:
                             storage_paths = [upload['storage_path'] for upload in binary_uploads]
                             try:
-                                signed_urls = _fetch_signed_urls(
+                                signed_urls = await asyncio.to_thread(
+                                    _fetch_signed_urls,
                                     storage_paths=storage_paths,
                                     langconnect_url=langconnect_url,
                                     access_token=access_token,
@@ -601,8 +605,8 @@ def create_file_attachment_nodes(
                                 signed_url = signed_urls.get(upload['storage_path'])
                                 if signed_url:
                                     try:
-                                        file_data = _download_from_signed_url(signed_url)
-                                        sandbox.files.write(upload['sandbox_path'], file_data)
+                                        file_data = await asyncio.to_thread(_download_from_signed_url, signed_url)
+                                        await sandbox.files.write(upload['sandbox_path'], file_data)
                                         files_written += 1
                                     except Exception as e:
                                         logger.error("[SKILLS_FILE_ATTACH] Failed to transfer %s: %s", upload['file_name'], str(e))
@@ -614,7 +618,7 @@ def create_file_attachment_nodes(
                             try:
                                 markdown_file_name = f"{attachment['file_name']}.md"
                                 sandbox_path = f"/sandbox/user_uploads/{markdown_file_name}"
-                                sandbox.files.write(sandbox_path, attachment['content'].encode('utf-8'))
+                                await sandbox.files.write(sandbox_path, attachment['content'].encode('utf-8'))
                                 files_written += 1
                             except Exception as e:
                                 logger.error("[SKILLS_FILE_ATTACH] Failed to write legacy attachment: %s", str(e))
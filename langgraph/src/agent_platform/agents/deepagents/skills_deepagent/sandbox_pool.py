@@ -0,0 +1,274 @@
+"""
+Warm sandbox pool for Skills DeepAgent.
+
+Creating an E2B sandbox from the skills template takes several seconds and is
+paid on the first message of every new thread. The pool moves that cost off
+the request path:
+
+1. Up to SKILLS_SANDBOX_WARM_SIZE (default 0, i.e. disabled) sandboxes are
+   booted ahead of time from the template; a new thread leases one instead of
+   waiting for a boot. Warm sandboxes auto-pause like leased ones, so they are
+   killed at interpreter exit rather than left paused after a restart
+2. The pool replenishes itself in a background task after each lease
+3. Leased sandboxes are tracked per thread with an LRU bound
+   (SKILLS_SANDBOX_MAX_LEASES) and dropped after SKILLS_SANDBOX_IDLE_TTL
+   seconds without use. Dropping a lease only releases the local handle: the
+   sandbox auto-pauses on timeout and is reconnected from state.sandbox_id
+
+Sandboxes come from a SandboxFactory, so tests can inject a factory that
+returns fake or local sandboxes instead of calling E2B.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional
+
+log = logging.getLogger(__name__)
+
+# Max sandbox timeout for the E2B hobby tier
+MAX_SANDBOX_TIMEOUT = 3600
+
+
+class SandboxFactory(ABC):
+    """Creates and connects to async sandboxes. Override for tests.
+
+    Sandboxes follow the ``e2b_code_interpreter.AsyncSandbox`` interface.
+    """
+
+    @abstractmethod
+    async def create(self, timeout: int) -> Any:
+        """Boot a new sandbox."""
+
+    @abstractmethod
+    async def connect(self, sandbox_id: str) -> Any:
+        """Connect to an existing sandbox by ID."""
+
+    @abstractmethod
+    async def kill(self, sandbox_id: str) -> None:
+        """Kill a sandbox by ID (without a connected handle)."""
+
+
+class E2BSandboxFactory(SandboxFactory):
+    """Sandboxes from the E2B skills template, with auto-pause enabled."""
+
+    def __init__(self) -> None:
+        self.api_key = os.environ.get("E2B_API_KEY")
+        self.template_id = os.environ.get("E2B_TEMPLATE_ID")
+
+    async def create(self, timeout: int) -> Any:
+        from e2b_code_interpreter import AsyncSandbox
+
+        # Using beta_create for auto-pause feature (preserves state on timeout)
+        if self.template_id:
+            return await AsyncSandbox.beta_create(
+                template=self.template_id,
+                timeout=timeout,
+                auto_pause=True,
+                api_key=self.api_key,
+            )
+        return await AsyncSandbox.beta_create(timeout=timeout, auto_pause=True, api_key=self.api_key)
+
+    async def connect(self, sandbox_id: str) -> Any:
+        from e2b_code_interpreter import AsyncSandbox
+
+        # Auto-resumes the sandbox if it was paused
+        return await AsyncSandbox.connect(sandbox_id, api_key=self.api_key)
+
+    async def kill(self, sandbox_id: str) -> None:
+        from e2b_code_interpreter import AsyncSandbox
+
+        await AsyncSandbox.kill(sandbox_id, api_key=self.api_key)
+
+
+@dataclass
+class _WarmSandbox:
+    sandbox: Any
+    created_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class _Lease:
+    sandbox: Any
+    last_used: float = field(default_factory=time.time)
+
+
+class SandboxPool:
+    """Pre-booted sandboxes plus the per-thread leases handed out from them."""
+
+    def __init__(
+        self,
+        factory: Optional[SandboxFactory] = None,
+        warm_size: Optional[int] = None,
+        max_leases: Optional[int] = None,
+        idle_ttl: Optional[float] = None,
+    ) -> None:
+        self.factory = factory or E2BSandboxFactory()
+        self.warm_size = warm_size if warm_size is not None else int(os.environ.get("SKILLS_SANDBOX_WARM_SIZE", "0"))
+        self.max_leases = max_leases if max_leases is not None else int(os.environ.get("SKILLS_SANDBOX_MAX_LEASES", "500"))
+        self.idle_ttl = idle_ttl if idle_ttl is not None else float(os.environ.get("SKILLS_SANDBOX_IDLE_TTL", "3600"))
+
+        self._warm: Deque[_WarmSandbox] = deque()
+        self._leases: "OrderedDict[str, _Lease]" = OrderedDict()
+        # Leases may also be read from tool worker threads
+        self._lock = threading.Lock()
+        self._booting = 0
+        self._replenish_task: Optional[asyncio.Task] = None
+
+    # ---------- leases ----------
+
+    def get(self, thread_id: str) -> Optional[Any]:
+        """Return the sandbox leased to a thread, if any."""
+        with self._lock:
+            self._reap_idle()
+            lease = self._leases.get(thread_id)
+            if lease is None:
+                return None
+            lease.last_used = time.time()
+            self._leases.move_to_end(thread_id)
+            return lease.sandbox
+
+    def put(self, thread_id: str, sandbox: Any) -> None:
+        """Record a sandbox as leased to a thread (new or reconnected)."""
+        with self._lock:
+            self._leases[thread_id] = _Lease(sandbox=sandbox)
+            self._leases.move_to_end(thread_id)
+            while len(self._leases) > self.max_leases:
+                evicted_thread, lease = self._leases.popitem(last=False)
+                log.info(
+                    f"[sandbox][pool] Evicting least recently used lease thread={evicted_thread} "
+                    f"sandbox_id={getattr(lease.sandbox, 'sandbox_id', 'unknown')}"
+                )
+            self._reap_idle()
+
+    def release(self, thread_id: str) -> Optional[Any]:
+        """Forget a thread's lease and return its sandbox."""
+        with self._lock:
+            lease = self._leases.pop(thread_id, None)
+        return lease.sandbox if lease else None
+
+    def _reap_idle(self) -> None:
+        cutoff = time.time() - self.idle_ttl
+        while self._leases:
+            thread_id, lease = next(iter(self._leases.items()))
+            if lease.last_used >= cutoff:
+                break
+            del self._leases[thread_id]
+            log.info(f"[sandbox][pool] Dropped idle lease thread={thread_id}")
+
+    # ---------- warm sandboxes ----------
+
+    async def acquire(self, timeout: int) -> Any:
+        """Take a warm sandbox, booting one if the pool is empty.
+
+        The caller provisions the sandbox and then records it with put().
+        """
+        sandbox = await self._take_warm(timeout)
+        if sandbox is None:
+            log.info("[sandbox][pool] No warm sandbox available, creating one")
+            sandbox = await self.factory.create(timeout)
+        else:
+            log.info(f"[sandbox][pool] Took warm sandbox_id={sandbox.sandbox_id} (warm remaining={len(self._warm)})")
+        self.schedule_replenish()
+        return sandbox
+
+    async def _take_warm(self, timeout: int) -> Optional[Any]:
+        while self._warm:
+            warm = self._warm.popleft()
+            # A warm sandbox that outlived its timeout has auto-paused; resuming it
+            # costs about as much as a fresh boot, so replace it instead
+            if time.time() - warm.created_at > MAX_SANDBOX_TIMEOUT * 0.9:
+                await self._discard(warm.sandbox)
+                continue
+            try:
+                await warm.sandbox.set_timeout(timeout)
+                return warm.sandbox
+            except Exception as e:
+                log.warning(f"[sandbox][pool] Discarding unusable warm sandbox: {type(e).__name__}: {e}")
+                await self._discard(warm.sandbox)
+        return None
+
+    async def _discard(self, sandbox: Any) -> None:
+        try:
+            await sandbox.kill()
+        except Exception:
+            pass
+
+    def schedule_replenish(self) -> None:
+        """Top up the warm set in the background."""
+        if self.warm_size <= 0:
+            return
+        if self._replenish_task is None or self._replenish_task.done():
+            self._replenish_task = asyncio.create_task(self._replenish())
+
+    async def _replenish(self) -> None:
+        missing = self.warm_size - len(self._warm) - self._booting
+        if missing <= 0:
+            return
+        self._booting += missing
+        try:
+            results = await asyncio.gather(
+                *(self.factory.create(MAX_SANDBOX_TIMEOUT) for _ in range(missing)),
+                return_exceptions=True,
+            )
+        finally:
+            self._booting -= missing
+        for result in results:
+            if isinstance(result, Exception):
+                log.warning(f"[sandbox][pool] Failed to boot warm sandbox: {type(result).__name__}: {result}")
+            else:
+                self._warm.append(_WarmSandbox(sandbox=result))
+        log.info(f"[sandbox][pool] Warm pool replenished: warm={len(self._warm)} target={self.warm_size}")
+
+    async def close(self) -> None:
+        """Stop replenishing and kill the warm sandboxes (leases are left to auto-pause)."""
+        if self._replenish_task is not None and not self._replenish_task.done():
+            self._replenish_task.cancel()
+        warm = list(self._warm)
+        self._warm.clear()
+        if not warm:
+            return
+        results = await asyncio.gather(
+            *(self.factory.kill(w.sandbox.sandbox_id) for w in warm), return_exceptions=True
+        )
+        failed = sum(isinstance(result, Exception) for result in results)
+        log.info(f"[sandbox][pool] Killed {len(warm) - failed}/{len(warm)} warm sandboxes")
+
+    def stats(self) -> Dict[str, int]:
+        return {"warm": len(self._warm), "booting": self._booting, "leased": len(self._leases)}
+
+
+_pool: Optional[SandboxPool] = None
+
+
+def get_sandbox_pool() -> SandboxPool:
+    """Return the process-wide sandbox pool."""
+    global _pool
+    if _pool is None:
+        _pool = SandboxPool()
+    return _pool
+
+
+def _close_pool_at_exit() -> None:
+    # The serving loop is gone by now; kill by ID from a fresh loop
+    if _pool is None or not _pool._warm:
+        return
+    try:
+        asyncio.run(_pool.close())
+    except Exception as e:
+        log.warning(f"[sandbox][pool] Failed to kill warm sandboxes at exit: {type(e).__name__}: {e}")
+
+
+atexit.register(_close_pool_at_exit)
+
+
+def set_sandbox_pool(pool: Optional[SandboxPool]) -> None:
+    """Replace the process-wide sandbox pool (e.g. with a fake factory in tests)."""
+    global _pool
+    _pool = pool
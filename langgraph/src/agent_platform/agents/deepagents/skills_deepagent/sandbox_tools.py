@@ -11,6 +11,9 @@ This module provides two tools for interacting with the E2B sandbox environment:
    - Best for: Quick operations (ls, cat, head), running existing scripts, pip install
    - Uses E2B's commands.run() for simple shell commands
 
+All sandbox calls go through E2B's AsyncSandbox, so parallel sub-agents sharing a
+worker do not block the event loop (or each other) on shell commands and file writes.
+
 Design Decision:
 We provide two tools because:
 1. Code interpreter handles multi-line content, file writing, and complex logic naturally
@@ -22,20 +25,63 @@ We provide two tools because:
 import asyncio
 import logging
 import os
+import threading
+from collections import OrderedDict
 from typing import Any, Dict, List, Literal, Optional, Tuple
 
 import httpx
 from langchain_core.tools import tool
 
+try:
+    from .sandbox_pool import get_sandbox_pool
+    from .skill_bundle import get_skill_provisioner
+except ImportError:
+    from agent_platform.agents.deepagents.skills_deepagent.sandbox_pool import get_sandbox_pool
+    from agent_platform.agents.deepagents.skills_deepagent.skill_bundle import get_skill_provisioner
+
 log = logging.getLogger(__name__)
 
 
-# Global sandbox instances keyed by thread_id
-_sandboxes: Dict[str, Any] = {}
+class SkillZipCache:
+    """LRU cache of skill zips keyed by (skill_id, version), bounded by total bytes.
+
+    The version comes from LangConnect's download endpoint (the skill's updated_at),
+    so an updated skill is fetched again instead of being served stale.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, skill_id: str, version: str) -> Optional[bytes]:
+        with self._lock:
+            content = self._entries.get((skill_id, version))
+            if content is not None:
+                self._entries.move_to_end((skill_id, version))
+            return content
 
-# Global skill zip cache: skill_id -> bytes
+    def put(self, skill_id: str, version: str, content: bytes) -> None:
+        if len(content) > self.max_bytes:
+            return
+        with self._lock:
+            # Older versions of the skill are never served again
+            for key in [key for key in self._entries if key[0] == skill_id]:
+                self._size -= len(self._entries.pop(key))
+            self._entries[(skill_id, version)] = content
+            self._size += len(content)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+
+# Global skill zip cache
 # This avoids re-downloading skills that were recently fetched
-_skill_cache: Dict[str, bytes] = {}
+_skill_cache = SkillZipCache(int(os.environ.get("SKILLS_ZIP_CACHE_MAX_BYTES", str(64 * 1024 * 1024))))
+
+# Pip installs in a fresh sandbox can take a while; commands.run defaults to 60s
+PIP_INSTALL_TIMEOUT = 300
 
 # Packages pre-installed in the E2B template (e2b.Dockerfile)
 # Skip these during pip install to save ~5s on first message
@@ -68,6 +114,9 @@ async def fetch_skill_zip(
     """
     Fetch skill zip file from LangConnect, with optional caching.
 
+    The download endpoint is always called (it is cheap and returns the skill
+    version); the zip itself is only downloaded when that version is not cached.
+
     Args:
         skill_id: UUID of the skill
         langconnect_url: Base URL of LangConnect API
@@ -77,13 +126,6 @@ async def fetch_skill_zip(
     Returns:
         Bytes of the skill zip file or None if fetch failed
     """
-    global _skill_cache
-
-    # Check cache first
-    if use_cache and skill_id in _skill_cache:
-        log.info(f"[skills:fetch] Using cached skill {skill_id} ({len(_skill_cache[skill_id])} bytes)")
-        return _skill_cache[skill_id]
-
     try:
         async with httpx.AsyncClient() as client:
             # Get signed download URL from LangConnect
@@ -98,19 +140,27 @@ async def fetch_skill_zip(
             response.raise_for_status()
             download_info = response.json()
             download_url = download_info.get("download_url")
+            version = download_info.get("version")
 
             if not download_url:
                 log.error(f"No download URL returned for skill {skill_id}")
                 return None
 
+            # Check cache (only versioned zips are cached)
+            if use_cache and version:
+                cached = _skill_cache.get(skill_id, version)
+                if cached is not None:
+                    log.info(f"[skills:fetch] Using cached skill {skill_id}@{version} ({len(cached)} bytes)")
+                    return cached
+
             # Download the zip file from Supabase storage
             zip_response = await client.get(download_url, timeout=60.0)
             zip_response.raise_for_status()
             content = zip_response.content
 
             # Cache the result
-            if use_cache:
-                _skill_cache[skill_id] = content
+            if use_cache and version:
+                _skill_cache.put(skill_id, version, content)
 
             return content
 
@@ -119,68 +169,46 @@ async def fetch_skill_zip(
         return None
 
 
-def extract_and_upload_skill(sandbox: Any, skill_name: str, zip_content: bytes):
+async def provision_skills(
+    sandbox: Any,
+    skills: List[Dict[str, Any]],
+    langconnect_url: str,
+    access_token: str,
+    fresh: bool,
+) -> None:
     """
-    Upload skill zip to sandbox and extract it there.
+    Bring /sandbox/skills in line with the enabled skills, as one bundle.
 
-    This approach uploads the zip as a single file and uses unzip in the sandbox,
-    which is much faster than uploading files individually (1 upload + 1 command
-    vs hundreds of API calls).
-
-    Handles both zip structures:
-    - Zip with wrapper dir (e.g., docx/SKILL.md) -> unwraps to skills/docx/SKILL.md
-    - Zip without wrapper (e.g., SKILL.md at root) -> extracts to skills/{skill_name}/SKILL.md
+    All skill zips are fetched in parallel, bundled into a single hash-addressed
+    archive (see skill_bundle.py) and extracted in one command. Sandboxes that
+    already hold the bundle are left untouched. Zips are fetched every time so
+    that skill updates are picked up; unchanged versions come from the zip
+    cache and only cost the download-endpoint call.
 
     Args:
-        sandbox: E2B Sandbox instance
-        skill_name: Name of the skill (used for directory name)
-        zip_content: Raw bytes of the skill zip file
+        sandbox: E2B AsyncSandbox instance
+        skills: Valid skill references (skill_id and name set)
+        langconnect_url: Base URL of LangConnect API
+        access_token: Supabase access token for skill downloads
+        fresh: The sandbox was just created (no existing bundle to check for)
     """
-    try:
-        skill_dir = f"/sandbox/skills/{skill_name}"
-        zip_path = f"/sandbox/skills/{skill_name}.zip"
-        temp_dir = f"/sandbox/skills/_extract_{skill_name}"
-
-        # Clean up any existing directories to avoid mv nesting issues
-        sandbox.commands.run(f"rm -rf {skill_dir} {temp_dir}")
-
-        # Upload the zip file as a single file
-        sandbox.files.write(zip_path, zip_content)
-
-        # Extract to temp directory first
-        sandbox.files.make_dir(temp_dir)
-        result = sandbox.commands.run(f"unzip -o {zip_path} -d {temp_dir}")
-
-        if result.exit_code != 0:
-            log.warning(f"unzip returned exit code {result.exit_code}: {result.stderr}")
-
-        # Remove __MACOSX folder (macOS artifact) if present - it interferes with wrapper detection
-        sandbox.commands.run(f"rm -rf {temp_dir}/__MACOSX")
-
-        # Check contents of temp dir to handle wrapper directories
-        result = sandbox.commands.run(f"ls -A {temp_dir}")
-        items = [i for i in result.stdout.strip().split('\n') if i] if result.stdout else []
-
-        # If exactly one item and it's a directory, it's a wrapper - unwrap it
-        if len(items) == 1:
-            single_item = f"{temp_dir}/{items[0]}"
-            check_result = sandbox.commands.run(f"test -d {single_item} && echo 'is_dir'")
-            if 'is_dir' in (check_result.stdout or ''):
-                # Single directory wrapper - move it to be the skill dir
-                sandbox.commands.run(f"mv -T {single_item} {skill_dir}")
-                sandbox.commands.run(f"rmdir {temp_dir}")
-            else:
-                # Single file at root - rename temp to skill dir
-                sandbox.commands.run(f"mv -T {temp_dir} {skill_dir}")
-        else:
-            # Multiple items at root - rename temp to skill dir
-            sandbox.commands.run(f"mv -T {temp_dir} {skill_dir}")
+    provisioner = get_skill_provisioner()
 
-        # Clean up the zip file
-        sandbox.commands.run(f"rm {zip_path}")
+    # Parallel fetch all skill zips
+    log.info(f"[sandbox] Fetching {len(skills)} skills in parallel...")
+    zip_contents = await asyncio.gather(*(
+        fetch_skill_zip(s["skill_id"], langconnect_url, access_token)
+        for s in skills
+    ))
+    loaded = [(skill["name"], content) for skill, content in zip(skills, zip_contents) if content]
 
+    try:
+        bundle = await provisioner.get_bundle(loaded)
+        if bundle is None or provisioner.is_current(sandbox.sandbox_id, bundle.bundle_hash):
+            return
+        await provisioner.provision(sandbox, bundle, fresh=fresh)
     except Exception as e:
-        log.error(f"Failed to extract/upload skill {skill_name}: {e}")
+        log.error(f"Failed to provision skills into sandbox {sandbox.sandbox_id}: {e}")
 
 
 async def get_or_create_sandbox(
@@ -210,29 +238,34 @@ async def get_or_create_sandbox(
         existing_sandbox_id: E2B sandbox ID from previous request (for reconnection)
 
     Returns:
-        Tuple of (E2B Sandbox instance, sandbox_id, previous_sandbox_expired)
-        - sandbox: The E2B Sandbox instance
+        Tuple of (E2B AsyncSandbox instance, sandbox_id, previous_sandbox_expired)
+        - sandbox: The E2B AsyncSandbox instance
         - sandbox_id: ID for state persistence
         - previous_sandbox_expired: True if reconnection failed and a new sandbox was created
           (indicates data loss from previous sandbox)
     """
-    global _sandboxes
+    pool = get_sandbox_pool()
 
     # Import E2B here to avoid startup import issues
     try:
-        from e2b_code_interpreter import Sandbox
+        import e2b_code_interpreter  # noqa: F401
     except ImportError:
         log.error("e2b_code_interpreter not installed. Install with: pip install e2b-code-interpreter")
         raise ImportError("e2b_code_interpreter package required for sandbox support")
 
     # Get E2B API key from environment
-    e2b_api_key = os.environ.get("E2B_API_KEY")
-    if not e2b_api_key:
+    if not os.environ.get("E2B_API_KEY"):
         log.warning("E2B_API_KEY not set - sandbox features will be limited")
 
     # Track if we need to create a new sandbox because the previous one expired
     previous_sandbox_expired = False
 
+    # Filter valid skills
+    valid_skills = [
+        s for s in skills
+        if s.get("skill_id") and s.get("name")
+    ]
+
     # 1. Try to reconnect to existing sandbox (if ID provided)
     if existing_sandbox_id:
         log.info(f"[sandbox][RECONNECT] Attempting reconnection - existing_sandbox_id={existing_sandbox_id}, thread={thread_id}")
@@ -244,11 +277,7 @@ async def get_or_create_sandbox(
         # Try to reconnect using E2B's connect API (auto-resumes if paused)
         try:
             log.info(f"[sandbox][RECONNECT] Calling Sandbox.connect({existing_sandbox_id}) - this will auto-resume if paused")
-            sandbox = Sandbox.connect(existing_sandbox_id, api_key=e2b_api_key)
-            # Update in-memory cache
-            _sandboxes[thread_id] = sandbox
-            log.info(f"[sandbox][RECONNECT] SUCCESS - Reconnected to sandbox_id={existing_sandbox_id}")
-            return sandbox, existing_sandbox_id, False  # Not expired, successful reconnect
+            sandbox = await pool.factory.connect(existing_sandbox_id)
         except Exception as e:
             log.warning(f"[sandbox][RECONNECT] FAILED - Could not reconnect to sandbox_id={existing_sandbox_id}")
             log.warning(f"[sandbox][RECONNECT] Error details: {type(e).__name__}: {e}")
@@ -256,76 +285,50 @@ async def get_or_create_sandbox(
             # Mark that the previous sandbox expired - the LLM should be notified about data loss
             previous_sandbox_expired = True
             # Fall through to create new sandbox
+        else:
+            log.info(f"[sandbox][RECONNECT] SUCCESS - Reconnected to sandbox_id={existing_sandbox_id}")
+            # Apply skills enabled (or updated) since the sandbox was provisioned; this
+            # costs no sandbox calls once this worker has provisioned the current bundle
+            if valid_skills:
+                await provision_skills(sandbox, valid_skills, langconnect_url, access_token, fresh=False)
+            # Update the thread's lease
+            pool.put(thread_id, sandbox)
+            return sandbox, existing_sandbox_id, False  # Not expired, successful reconnect
 
-    # 2. Check in-memory cache (for backwards compatibility during transition)
-    if thread_id in _sandboxes:
-        cached_sandbox = _sandboxes[thread_id]
+    # 2. Check in-memory lease (for backwards compatibility during transition)
+    cached_sandbox = pool.get(thread_id)
+    if cached_sandbox is not None:
         sandbox_id = getattr(cached_sandbox, 'sandbox_id', 'unknown')
         log.info(f"[sandbox] Using cached sandbox {sandbox_id} for thread {thread_id}")
         return cached_sandbox, sandbox_id, False  # Not expired, using cache
 
-    # 3. Create new sandbox with auto-pause enabled
+    # 3. Lease a pre-booted sandbox from the warm pool (created with auto-pause enabled)
     # Auto-pause preserves sandbox state (filesystem + memory) when timeout expires
     # instead of killing the sandbox. This allows resuming later with Sandbox.connect()
-    # Get custom template ID (if set) - uses pre-built template with document processing libraries
-    template_id = os.environ.get("E2B_TEMPLATE_ID")
-
-    # Log all creation parameters for debugging
-    log.info(f"[sandbox][CREATE] Starting sandbox creation for thread={thread_id}")
-    log.info(f"[sandbox][CREATE] Parameters: timeout={timeout}s ({timeout/60:.1f} min), auto_pause=True, template_id={template_id or 'default'}")
-
-    # Create new sandbox with auto_pause=True (with custom template if configured)
-    # Using beta_create for auto-pause feature (preserves state on timeout)
-    if template_id:
-        log.info(f"[sandbox][CREATE] Calling Sandbox.beta_create with custom template: {template_id}")
-        sandbox = Sandbox.beta_create(
-            template=template_id,
-            timeout=timeout,
-            auto_pause=True,
-            api_key=e2b_api_key
-        )
-    else:
-        log.info("[sandbox][CREATE] Calling Sandbox.beta_create with default E2B code-interpreter template")
-        sandbox = Sandbox.beta_create(
-            timeout=timeout,
-            auto_pause=True,
-            api_key=e2b_api_key
-        )
+    # The pool boots from E2B_TEMPLATE_ID (pre-built template with document processing
+    # libraries) when set, and only creates a sandbox inline when no warm one is available
+    log.info(f"[sandbox][CREATE] Leasing sandbox for thread={thread_id}")
+    log.info(f"[sandbox][CREATE] Parameters: timeout={timeout}s ({timeout/60:.1f} min), auto_pause=True, pool={pool.stats()}")
+    sandbox = await pool.acquire(timeout)
 
     new_sandbox_id = sandbox.sandbox_id
-    log.info(f"[sandbox][CREATE] SUCCESS - Created sandbox_id={new_sandbox_id} for thread={thread_id} with timeout={timeout}s")
+    log.info(f"[sandbox][CREATE] SUCCESS - Leased sandbox_id={new_sandbox_id} for thread={thread_id} with timeout={timeout}s")
 
     # NOTE: Directory structure is pre-created in the E2B template (e2b.Dockerfile)
     # This saves ~1-2 seconds by avoiding multiple API calls on first message
     # Directories: /sandbox/skills, /sandbox/user_uploads, /sandbox/outputs, /sandbox/workspace
 
-    # Upload skills - fetch all in parallel for speed
+    # Upload skills as a single bundle (one write + one command)
     all_pip_requirements = set(pip_packages or [])
 
-    # Filter valid skills
-    valid_skills = [
-        s for s in skills
-        if s.get("skill_id") and s.get("name")
-    ]
-
     if valid_skills:
-        # Parallel fetch all skill zips
-        log.info(f"[sandbox] Fetching {len(valid_skills)} skills in parallel...")
-        fetch_tasks = [
-            fetch_skill_zip(s["skill_id"], langconnect_url, access_token)
-            for s in valid_skills
-        ]
-        zip_contents = await asyncio.gather(*fetch_tasks)
-
-        # Upload each skill (sequential - sandbox API doesn't parallelize well)
-        for skill, zip_content in zip(valid_skills, zip_contents):
-            if zip_content:
-                extract_and_upload_skill(sandbox, skill["name"], zip_content)
-
-                # Extract pip requirements from skill (if stored in skill reference)
-                pip_reqs = skill.get("pip_requirements")
-                if pip_reqs:
-                    all_pip_requirements.update(pip_reqs)
+        await provision_skills(sandbox, valid_skills, langconnect_url, access_token, fresh=True)
+
+        # Extract pip requirements from skills (if stored in skill reference)
+        for skill in valid_skills:
+            pip_reqs = skill.get("pip_requirements")
+            if pip_reqs:
+                all_pip_requirements.update(pip_reqs)
 
     # Install pip packages if specified (skip pre-installed ones to save time)
     if all_pip_requirements:
@@ -341,9 +344,9 @@ async def get_or_create_sandbox(
         if packages_to_install:
             packages_str = ' '.join(packages_to_install)
             log.info(f"[sandbox] Installing pip packages: {packages_str}")
-            sandbox.commands.run(f"pip install {packages_str}")
+            await sandbox.commands.run(f"pip install {packages_str}", timeout=PIP_INSTALL_TIMEOUT)
 
-    _sandboxes[thread_id] = sandbox
+    pool.put(thread_id, sandbox)
     log.info(f"[sandbox] Initialized sandbox {new_sandbox_id} for thread {thread_id} with {len(skills)} skills")
 
     # Return whether the previous sandbox expired (only true if we tried to reconnect and failed)
@@ -360,7 +363,7 @@ def get_sandbox(thread_id: str) -> Optional[Any]:
     Returns:
         Sandbox instance or None if not found
     """
-    cached = _sandboxes.get(thread_id)
+    cached = get_sandbox_pool().get(thread_id)
     if cached:
         sandbox_id = getattr(cached, 'sandbox_id', 'unknown')
         log.info(f"[sandbox][get_sandbox] Returning cached sandbox_id={sandbox_id} for thread={thread_id}")
@@ -371,18 +374,15 @@ def get_sandbox(thread_id: str) -> Optional[Any]:
 
 def cleanup_sandbox(thread_id: str):
     """
-    Clean up and remove sandbox for a thread.
+    Remove the sandbox lease for a thread.
+
+    The sandbox itself is left to auto-pause on timeout so it can be resumed
+    from state.sandbox_id.
 
     Args:
         thread_id: Thread identifier
     """
-    global _sandboxes
-    if thread_id in _sandboxes:
-        try:
-            _sandboxes[thread_id].close()
-        except Exception as e:
-            log.warning(f"Error closing sandbox for thread {thread_id}: {e}")
-        del _sandboxes[thread_id]
+    get_sandbox_pool().release(thread_id)
 
 
 def create_sandbox_tools(thread_id: str) -> Tuple[Any, Any]:
@@ -397,7 +397,7 @@ def create_sandbox_tools(thread_id: str) -> Tuple[Any, Any]:
     """
 
     @tool
-    def run_code(
+    async def run_code(
         code: str,
         language: Literal["python", "bash", "javascript"] = "python",
         timeout_seconds: int = 120
@@ -478,7 +478,7 @@ def create_sandbox_tools(thread_id: str) -> Tuple[Any, Any]:
         log.info(f"[sandbox][run_code] Executing code on sandbox_id={sandbox_id}, thread={thread_id}, language={language}")
 
         try:
-            execution = sandbox_instance.run_code(
+            execution = await sandbox_instance.run_code(
                 code,
                 language=language,
                 timeout=min(timeout_seconds, 600)
@@ -527,7 +527,7 @@ def create_sandbox_tools(thread_id: str) -> Tuple[Any, Any]:
             return f"Error executing code: {e}"
 
     @tool
-    def run_command(
+    async def run_command(
         command: str,
         timeout_seconds: int = 120
     ) -> str:
@@ -570,7 +570,7 @@ def create_sandbox_tools(thread_id: str) -> Tuple[Any, Any]:
         log.info(f"[sandbox][run_command] Executing command on sandbox_id={sandbox_id}, thread={thread_id}")
 
         try:
-            result = sandbox_instance.commands.run(
+            result = await sandbox_instance.commands.run(
                 command,
                 timeout=min(timeout_seconds, 600)  # Cap at 600s
             )
@@ -0,0 +1,196 @@
+"""
+Single-archive skill provisioning for Skills DeepAgent sandboxes.
+
+Uploading skills one zip at a time costs about eight sandbox round trips per
+skill (mkdir, write, unzip, cleanup, wrapper detection, moves). Instead, all
+enabled skills are bundled locally into one tar.gz:
+
+1. Each skill zip is normalized in-process (__MACOSX entries dropped, a single
+   wrapper directory unwrapped) under skills/<name>/
+2. The bundle is addressed by a hash of the skill names and zip contents, and
+   built bundles are cached per worker so new sandboxes reuse them
+3. Provisioning is one file write plus one command that replaces the contents
+   of /sandbox/skills and records the bundle hash in /sandbox/skills/.bundle_hash
+4. Sandboxes already holding the bundle hash are skipped; this worker also
+   remembers which bundle it provisioned into which sandbox, so repeated
+   requests for a thread cost no sandbox calls. The hash covers the zip
+   contents, so an updated skill (a new version with the same id and name)
+   is provisioned again
+"""
+
+import asyncio
+import hashlib
+import io
+import logging
+import shlex
+import tarfile
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+SKILLS_ROOT = "/sandbox/skills"
+BUNDLE_PATH = f"{SKILLS_ROOT}/.bundle.tar.gz"
+BUNDLE_HASH_PATH = f"{SKILLS_ROOT}/.bundle_hash"
+
+# Built bundles kept per worker, and sandboxes known to hold a bundle
+BUNDLE_CACHE_MAX_ENTRIES = 32
+PROVISIONED_MAX_ENTRIES = 4096
+
+
+@dataclass(frozen=True)
+class SkillBundle:
+    """A tar.gz of skills, ready to extract into /sandbox/skills."""
+
+    bundle_hash: str
+    data: bytes
+    skill_names: Tuple[str, ...]
+
+
+def bundle_hash_of(skills: List[Tuple[str, bytes]]) -> str:
+    """Hash identifying a bundle of (skill_name, zip_content) pairs."""
+    digest = hashlib.sha256()
+    for name, content in sorted(skills, key=lambda item: item[0]):
+        digest.update(name.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(hashlib.sha256(content).digest())
+    return digest.hexdigest()
+
+
+def _skill_members(zip_content: bytes) -> List[Tuple[str, zipfile.ZipInfo]]:
+    """(relative_path, info) for the files of a skill zip, wrapper directory removed."""
+    with zipfile.ZipFile(io.BytesIO(zip_content)) as archive:
+        infos = [
+            info for info in archive.infolist()
+            if not info.filename.startswith("__MACOSX/") and not info.is_dir()
+        ]
+    top_level = {info.filename.split("/", 1)[0] for info in infos}
+    # Zip with a single wrapper dir (e.g., docx/SKILL.md) -> unwrap to skills/docx/SKILL.md
+    strip = len(top_level) == 1 and all("/" in info.filename for info in infos)
+    members = []
+    for info in infos:
+        path = info.filename.split("/", 1)[1] if strip else info.filename
+        if path and ".." not in path.split("/"):
+            members.append((path, info))
+    return members
+
+
+def _build(skills: List[Tuple[str, bytes]], bundle_hash: str) -> SkillBundle:
+    buffer = io.BytesIO()
+    mtime = int(time.time())
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for name, content in skills:
+            with zipfile.ZipFile(io.BytesIO(content)) as archive:
+                for path, info in _skill_members(content):
+                    data = archive.read(info)
+                    entry = tarfile.TarInfo(f"{name}/{path}")
+                    entry.size = len(data)
+                    entry.mtime = mtime
+                    # Keep executable bits from zips built on unix; always readable
+                    entry.mode = ((info.external_attr >> 16) & 0o777) | 0o644
+                    tar.addfile(entry, io.BytesIO(data))
+    return SkillBundle(
+        bundle_hash=bundle_hash,
+        data=buffer.getvalue(),
+        skill_names=tuple(name for name, _ in skills),
+    )
+
+
+class SkillProvisioner:
+    """Builds skill bundles and provisions them into sandboxes."""
+
+    def __init__(self) -> None:
+        self._bundles: "OrderedDict[str, SkillBundle]" = OrderedDict()
+        # sandbox_id -> bundle hash
+        self._provisioned: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get_bundle(self, skills: List[Tuple[str, bytes]]) -> Optional[SkillBundle]:
+        """Return the bundle for (skill_name, zip_content) pairs, building it if needed."""
+        if not skills:
+            return None
+        bundle_hash = bundle_hash_of(skills)
+        with self._lock:
+            bundle = self._bundles.get(bundle_hash)
+            if bundle is not None:
+                self._bundles.move_to_end(bundle_hash)
+                return bundle
+
+        # Unzipping and compressing is CPU work; keep it off the event loop
+        bundle = await asyncio.to_thread(_build, skills, bundle_hash)
+        log.info(
+            f"[skills:bundle] Built bundle {bundle_hash[:12]} with {len(skills)} skills "
+            f"({len(bundle.data)} bytes)"
+        )
+        with self._lock:
+            self._bundles[bundle_hash] = bundle
+            while len(self._bundles) > BUNDLE_CACHE_MAX_ENTRIES:
+                self._bundles.popitem(last=False)
+        return bundle
+
+    def is_current(self, sandbox_id: str, bundle_hash: str) -> bool:
+        """Whether this worker provisioned the given bundle into a sandbox."""
+        with self._lock:
+            return self._provisioned.get(sandbox_id) == bundle_hash
+
+    def _remember(self, sandbox_id: str, bundle_hash: str) -> None:
+        with self._lock:
+            self._provisioned[sandbox_id] = bundle_hash
+            self._provisioned.move_to_end(sandbox_id)
+            while len(self._provisioned) > PROVISIONED_MAX_ENTRIES:
+                self._provisioned.popitem(last=False)
+
+    async def provision(self, sandbox: Any, bundle: SkillBundle, fresh: bool = False) -> bool:
+        """Make /sandbox/skills hold exactly the skills in bundle.
+
+        Args:
+            sandbox: E2B AsyncSandbox instance
+            bundle: Skill bundle to provision
+            fresh: The sandbox was just created, so skip checking for an existing bundle
+
+        Returns:
+            True if the bundle was uploaded, False if the sandbox already held it
+        """
+        sandbox_id = sandbox.sandbox_id
+        with self._lock:
+            known = self._provisioned.get(sandbox_id)
+        if known == bundle.bundle_hash:
+            self._remember(sandbox_id, bundle.bundle_hash)
+            return False
+
+        if not fresh and known is None:
+            result = await sandbox.commands.run(f"cat {BUNDLE_HASH_PATH} 2>/dev/null || true")
+            if (result.stdout or "").strip() == bundle.bundle_hash:
+                self._remember(sandbox_id, bundle.bundle_hash)
+                log.info(f"[skills:bundle] Sandbox {sandbox_id} already holds bundle {bundle.bundle_hash[:12]}")
+                return False
+
+        # Replace everything in /sandbox/skills (including skills no longer enabled)
+        await sandbox.files.write(BUNDLE_PATH, bundle.data)
+        result = await sandbox.commands.run(
+            f"find {SKILLS_ROOT} -mindepth 1 -maxdepth 1 ! -name '.bundle.tar.gz' -exec rm -rf {{}} + "
+            f"&& tar -xzf {BUNDLE_PATH} -C {SKILLS_ROOT} --no-same-owner "
+            f"&& rm -f {BUNDLE_PATH} "
+            f"&& echo {shlex.quote(bundle.bundle_hash)} > {BUNDLE_HASH_PATH}"
+        )
+        if result.exit_code != 0:
+            raise RuntimeError(f"Skill bundle extraction failed ({result.exit_code}): {result.stderr}")
+
+        self._remember(sandbox_id, bundle.bundle_hash)
+        log.info(
+            f"[skills:bundle] Provisioned bundle {bundle.bundle_hash[:12]} "
+            f"({', '.join(bundle.skill_names)}) into sandbox {sandbox_id}"
+        )
+        return True
+
+
+_provisioner = SkillProvisioner()
+
+
+def get_skill_provisioner() -> SkillProvisioner:
+    """Return the process-wide skill provisioner."""
+    return _provisioner
@@ -66,7 +66,7 @@ def create_publish_file_tool(
     """
 
     @tool
-    def publish_file_to_user(
+    async def publish_file_to_user(
         file_path: str,
         display_name: str,
         description: str = "",
@@ -108,7 +108,7 @@ def create_publish_file_tool(
             # Read file content from sandbox as bytes (critical for binary files like docx, xlsx, pdf)
             # Convert bytearray to bytes for httpx multipart upload compatibility
             try:
-                file_content = bytes(sandbox.files.read(file_path, format="bytes"))
+                file_content = bytes(await sandbox.files.read(file_path, format="bytes"))
             except Exception as e:
                 return _error_response(
                     tool_call_id,
@@ -128,9 +128,8 @@ def create_publish_file_tool(
             try:
                 upload_url = f"{langconnect_url}/storage/upload-agent-output"
 
-                # Use httpx for synchronous upload
-                with httpx.Client() as client:
-                    response = client.post(
+                async with httpx.AsyncClient() as client:
+                    response = await client.post(
                         upload_url,
                         headers={"Authorization": f"Bearer {access_token}"},
                         files={"file": (filename, file_content, mime_type)},
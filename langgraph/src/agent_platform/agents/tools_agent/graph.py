@@ -1,3 +1,4 @@
+import time
 from langchain_core.runnables import RunnableConfig
 from langgraph.prebuilt import create_react_agent
 from langchain_core.tools import StructuredTool
@@ -301,18 +302,36 @@ async def graph(config: RunnableConfig):
     combined_hook = None
     if trimming_hook and image_hook:
         async def combined_pre_model_hook(state, config):
+            started = time.perf_counter()
             # 1. Resolve orphaned tool calls first
             state = {**state, **orphan_hook(state)}
+            orphan_done = time.perf_counter()
             # 2. Trim (when images are just storage paths ~50 tokens each)
             state = {**state, **trimming_hook(state)}
+            trim_done = time.perf_counter()
             # 3. Then convert images to signed URLs (or base64 in local dev)
             state = await image_hook(state, config)
+            logger.debug(
+                "[TOOLS_AGENT] pre_model_hook orphan_ms=%.1f trim_ms=%.1f image_ms=%.1f total_ms=%.1f",
+                (orphan_done - started) * 1000,
+                (trim_done - orphan_done) * 1000,
+                (time.perf_counter() - trim_done) * 1000,
+                (time.perf_counter() - started) * 1000,
+            )
             return state
         combined_hook = combined_pre_model_hook
     elif image_hook:
         async def combined_pre_model_hook(state, config):
+            started = time.perf_counter()
             state = {**state, **orphan_hook(state)}
+            orphan_done = time.perf_counter()
             state = await image_hook(state, config)
+            logger.debug(
+                "[TOOLS_AGENT] pre_model_hook orphan_ms=%.1f image_ms=%.1f total_ms=%.1f",
+                (orphan_done - started) * 1000,
+                (time.perf_counter() - orphan_done) * 1000,
+                (time.perf_counter() - started) * 1000,
+            )
             return state
         combined_hook = combined_pre_model_hook
     elif trimming_hook:
@@ -6,20 +6,106 @@ New model:
 - Fall back to service account key when no user context
 
 Uses token exchange (RFC 8693) to convert Supabase JWTs to MCP access tokens.
+
+Exchanged tokens are memoised in-process, keyed by a hash of the subject JWT,
+and reused until shortly before the expiry reported by the exchange endpoint.
+Concurrent callers for the same JWT share a single in-flight exchange.
 """
 
+import asyncio
+import hashlib
 import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Any, Tuple
 import aiohttp
-from typing import Dict, Optional, Any
 from langchain_core.runnables import RunnableConfig
 from agent_platform.sentry import get_logger
 
 MCP_SERVICE_ACCOUNT_KEY = os.environ.get("MCP_SERVICE_ACCOUNT_KEY")
 FRONTEND_BASE_URL = os.environ.get("FRONTEND_BASE_URL", "http://localhost:3000")
 
+# Seconds before expiry at which a cached token is refreshed in the background
+MCP_TOKEN_REFRESH_MARGIN_SECONDS = int(os.environ.get("MCP_TOKEN_REFRESH_MARGIN_SECONDS", "300"))
+# Lifetime assumed when the exchange response omits expires_in
+MCP_TOKEN_DEFAULT_TTL_SECONDS = int(os.environ.get("MCP_TOKEN_DEFAULT_TTL_SECONDS", "3600"))
+MCP_TOKEN_CACHE_MAX_ENTRIES = int(os.environ.get("MCP_TOKEN_CACHE_MAX_ENTRIES", "1024"))
+
 logger = get_logger(__name__)
 
 
+@dataclass(frozen=True)
+class _CachedMcpToken:
+    access_token: str
+    expires_at: float
+
+    def is_valid(self, now: float) -> bool:
+        return now < self.expires_at
+
+    def needs_refresh(self, now: float) -> bool:
+        return now >= self.expires_at - MCP_TOKEN_REFRESH_MARGIN_SECONDS
+
+
+# subject token hash -> exchanged token
+_token_cache: Dict[str, _CachedMcpToken] = {}
+# subject token hash -> in-flight exchange task (single-flight)
+_inflight_exchanges: Dict[str, "asyncio.Task[_CachedMcpToken]"] = {}
+
+
+def _subject_token_key(supabase_jwt: str) -> str:
+    return hashlib.sha256(supabase_jwt.encode("utf-8")).hexdigest()
+
+
+def _store_token(key: str, entry: _CachedMcpToken) -> None:
+    """Insert into the cache, dropping expired entries and the soonest-expiring when full."""
+    now = time.time()
+    if len(_token_cache) >= MCP_TOKEN_CACHE_MAX_ENTRIES:
+        for stale_key in [k for k, v in _token_cache.items() if not v.is_valid(now)]:
+            _token_cache.pop(stale_key, None)
+    while len(_token_cache) >= MCP_TOKEN_CACHE_MAX_ENTRIES:
+        oldest_key = min(_token_cache, key=lambda k: _token_cache[k].expires_at)
+        _token_cache.pop(oldest_key, None)
+    _token_cache[key] = entry
+
+
+def _start_exchange(key: str, supabase_jwt: str) -> "asyncio.Task[_CachedMcpToken]":
+    """Return the in-flight exchange for this subject token, starting one if needed."""
+    loop = asyncio.get_running_loop()
+    task = _inflight_exchanges.get(key)
+    if task is not None and not task.done() and task.get_loop() is loop:
+        return task
+
+    async def _run() -> _CachedMcpToken:
+        try:
+            access_token, expires_in = await _request_token_exchange(supabase_jwt)
+            entry = _CachedMcpToken(
+                access_token=access_token,
+                expires_at=time.time() + expires_in,
+            )
+            _store_token(key, entry)
+            return entry
+        finally:
+            if _inflight_exchanges.get(key) is task:
+                _inflight_exchanges.pop(key, None)
+
+    task = loop.create_task(_run())
+    _inflight_exchanges[key] = task
+    return task
+
+
+def _log_background_refresh_result(task: "asyncio.Task[_CachedMcpToken]") -> None:
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        logger.warning(f"[MCP_TOKEN] background_refresh_failed error={str(error)}")
+
+
+def clear_mcp_token_cache() -> None:
+    """Drop all memoised MCP tokens (e.g. after a signing key rotation)."""
+    _token_cache.clear()
+
+
 async def fetch_tokens(config: RunnableConfig) -> Optional[Dict[str, Any]]:
     """
     Exchange Supabase JWT for MCP access token or use service account key.
@@ -67,6 +153,10 @@ async def fetch_tokens(config: RunnableConfig) -> Optional[Dict[str, Any]]:
 async def exchange_supabase_jwt_for_mcp_token(supabase_jwt: str) -> str:
     """
     Exchange a Supabase JWT for an MCP access token using token exchange (RFC 8693).
+
+    Results are cached until shortly before expiry. A cached token inside the
+    refresh margin is still returned immediately while a background exchange
+    renews it; concurrent callers for the same JWT share one exchange.
     
     Args:
         supabase_jwt: Valid Supabase JWT
@@ -74,6 +164,35 @@ async def exchange_supabase_jwt_for_mcp_token(supabase_jwt: str) -> str:
     Returns:
         str: MCP access token
         
+    Raises:
+        Exception: If token exchange fails
+    """
+    key = _subject_token_key(supabase_jwt)
+    now = time.time()
+    cached = _token_cache.get(key)
+
+    if cached is not None and cached.is_valid(now):
+        if cached.needs_refresh(now) and key not in _inflight_exchanges:
+            logger.debug("[MCP_TOKEN] proactive_refresh_started=true")
+            _start_exchange(key, supabase_jwt).add_done_callback(_log_background_refresh_result)
+        else:
+            logger.debug("[MCP_TOKEN] cache_hit=true")
+        return cached.access_token
+
+    if cached is not None:
+        _token_cache.pop(key, None)
+
+    entry = await asyncio.shield(_start_exchange(key, supabase_jwt))
+    return entry.access_token
+
+
+async def _request_token_exchange(supabase_jwt: str) -> Tuple[str, int]:
+    """
+    Perform the token exchange HTTP call.
+
+    Returns:
+        Tuple of (MCP access token, lifetime in seconds)
+
     Raises:
         Exception: If token exchange fails
     """
@@ -109,9 +228,15 @@ async def exchange_supabase_jwt_for_mcp_token(supabase_jwt: str) -> str:
                 logger.error(f"[MCP_TOKEN] no_access_token_in_response keys={list(result.keys())}")
                 raise Exception("No access token in exchange response")
             
+            try:
+                expires_in = int(result.get("expires_in") or MCP_TOKEN_DEFAULT_TTL_SECONDS)
+            except (TypeError, ValueError):
+                expires_in = MCP_TOKEN_DEFAULT_TTL_SECONDS
+            
             logger.debug(
-                "[MCP_TOKEN] token_exchange_successful token_length=%d",
-                len(mcp_access_token)
+                "[MCP_TOKEN] token_exchange_successful token_length=%d expires_in=%d",
+                len(mcp_access_token),
+                expires_in,
             )
             
-            return mcp_access_token
\ No newline at end of file
+            return mcp_access_token, expires_in
\ No newline at end of file
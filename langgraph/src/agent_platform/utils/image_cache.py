@@ -0,0 +1,341 @@
+"""
+Inline image cache for LangGraph agents.
+
+Local Supabase storage serves images over HTTP, which Claude's API rejects, so
+message preprocessing inlines those images as base64 data URLs. This module
+makes that inlining cheap to repeat:
+
+1. Downloads run concurrently, bounded per cache (across all requests of the
+   worker) by a semaphore
+2. Images are downscaled/recompressed to a max dimension before encoding
+   (Pillow is a required dependency; if it is missing anyway, an error is
+   logged once and images are inlined unchanged)
+3. Encoded data URLs are cached by content hash, with byte-size LRU eviction
+   in memory and an optional on-disk spill directory (disk I/O runs in a thread)
+4. Full image URLs (including the signing token) map to content hashes for a
+   short TTL, so repeated turns with the same signed URL skip the download.
+   Only the exact URL that was fetched is served from the index, so an object
+   overwritten at the same path or a URL without a valid signature is fetched
+   (and access-checked by storage) again after at most the TTL
+
+Configuration (environment variables):
+- IMAGE_INLINE_MAX_DIMENSION: longest edge in pixels after downscaling (default 1568)
+- IMAGE_INLINE_MAX_CONCURRENCY: parallel downloads per batch (default 8)
+- IMAGE_INLINE_CACHE_MAX_BYTES: in-memory cache budget (default 256 MB)
+- IMAGE_INLINE_CACHE_DIR: optional directory for spilled entries
+- IMAGE_INLINE_DISK_MAX_BYTES: on-disk budget when spilling (default 1 GB)
+- IMAGE_INLINE_URL_INDEX_MAX_ENTRIES: URLs remembered in the index (default 4096)
+- IMAGE_INLINE_URL_INDEX_TTL_SECONDS: how long a URL maps to its content (default 300)
+"""
+
+import asyncio
+import base64
+import hashlib
+import io
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+from agent_platform.sentry import get_logger
+
+logger = get_logger(__name__)
+
+IMAGE_INLINE_MAX_DIMENSION = int(os.environ.get("IMAGE_INLINE_MAX_DIMENSION", "1568"))
+IMAGE_INLINE_MAX_CONCURRENCY = int(os.environ.get("IMAGE_INLINE_MAX_CONCURRENCY", "8"))
+IMAGE_INLINE_CACHE_MAX_BYTES = int(os.environ.get("IMAGE_INLINE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+IMAGE_INLINE_CACHE_DIR = os.environ.get("IMAGE_INLINE_CACHE_DIR")
+IMAGE_INLINE_DISK_MAX_BYTES = int(os.environ.get("IMAGE_INLINE_DISK_MAX_BYTES", str(1024 * 1024 * 1024)))
+IMAGE_INLINE_URL_INDEX_MAX_ENTRIES = int(os.environ.get("IMAGE_INLINE_URL_INDEX_MAX_ENTRIES", "4096"))
+IMAGE_INLINE_URL_INDEX_TTL_SECONDS = float(os.environ.get("IMAGE_INLINE_URL_INDEX_TTL_SECONDS", "300"))
+
+# Images already smaller than this are inlined as-is unless they exceed the max dimension
+RECOMPRESS_THRESHOLD_BYTES = 512 * 1024
+JPEG_QUALITY = 85
+
+_pillow_missing_logged = False
+
+
+def normalise_image(image_data: bytes, max_dimension: int = IMAGE_INLINE_MAX_DIMENSION) -> tuple[bytes, str]:
+    """
+    Downscale and recompress an image for inlining.
+
+    Images larger than max_dimension on their longest edge are resized; large
+    images are re-encoded (JPEG for opaque images, optimised PNG otherwise).
+    Animated images and anything Pillow cannot read are returned unchanged.
+
+    Args:
+        image_data: Raw image bytes
+        max_dimension: Longest edge in pixels after resizing
+
+    Returns:
+        Tuple of (image bytes, MIME type)
+    """
+    # Imported lazily to avoid a circular import with message_utils
+    from agent_platform.utils.message_utils import detect_image_format
+
+    original_type = detect_image_format(image_data)
+    try:
+        from PIL import Image  # type: ignore
+    except ImportError:
+        global _pillow_missing_logged
+        if not _pillow_missing_logged:
+            _pillow_missing_logged = True
+            logger.error(
+                "Pillow is not installed: inline images are sent without downscaling "
+                "or recompression. Install the 'pillow' dependency."
+            )
+        return image_data, original_type
+
+    try:
+        with Image.open(io.BytesIO(image_data)) as image:
+            if getattr(image, "is_animated", False):
+                return image_data, original_type
+
+            oversized = max(image.size) > max_dimension
+            if not oversized and len(image_data) <= RECOMPRESS_THRESHOLD_BYTES:
+                return image_data, original_type
+
+            if oversized:
+                image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+            has_alpha = image.mode in ("RGBA", "LA") or (
+                image.mode == "P" and "transparency" in image.info
+            )
+            output = io.BytesIO()
+            if has_alpha:
+                image.save(output, format="PNG", optimize=True)
+                content_type = "image/png"
+            else:
+                image.convert("RGB").save(output, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+                content_type = "image/jpeg"
+
+        normalised = output.getvalue()
+        if len(normalised) >= len(image_data) and not oversized:
+            return image_data, original_type
+        return normalised, content_type
+
+    except Exception as e:
+        logger.debug("[IMAGE_CACHE] normalise_failed error=%s", str(e)[:100])
+        return image_data, original_type
+
+
+class InlineImageCache:
+    """
+    Content-addressed cache of base64 data URLs with byte-size eviction.
+
+    Entries evicted from memory are spilled to disk when a cache directory is
+    configured, and read back (and promoted) on a later hit.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = IMAGE_INLINE_CACHE_MAX_BYTES,
+        cache_dir: Optional[str] = IMAGE_INLINE_CACHE_DIR,
+        disk_max_bytes: int = IMAGE_INLINE_DISK_MAX_BYTES,
+        max_dimension: int = IMAGE_INLINE_MAX_DIMENSION,
+        max_concurrency: int = IMAGE_INLINE_MAX_CONCURRENCY,
+        url_index_max_entries: int = IMAGE_INLINE_URL_INDEX_MAX_ENTRIES,
+        url_index_ttl_seconds: float = IMAGE_INLINE_URL_INDEX_TTL_SECONDS,
+    ):
+        self.max_bytes = max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.max_dimension = max_dimension
+        self.max_concurrency = max_concurrency
+        self.url_index_max_entries = url_index_max_entries
+        self.url_index_ttl_seconds = url_index_ttl_seconds
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._entries: "OrderedDict[str, str]" = OrderedDict()  # content hash -> data URL
+        self._current_bytes = 0
+        # full URL -> (content hash, expiry on the monotonic clock)
+        self._url_index: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._inflight: Dict[str, "asyncio.Future[Optional[str]]"] = {}
+        # Shared by all requests; recreated if the cache is used from another event loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # ---------- storage ----------
+
+    def _disk_path(self, content_hash: str) -> Optional[Path]:
+        if not self.cache_dir:
+            return None
+        return self.cache_dir / f"{content_hash}.dataurl"
+
+    def _spill_many(self, entries: List[Tuple[str, str]]) -> None:
+        """Write evicted entries to disk and enforce the disk budget (blocking; run in a thread)."""
+        try:
+            for content_hash, data_url in entries:
+                path = self._disk_path(content_hash)
+                if path is not None and not path.exists():
+                    path.write_text(data_url, encoding="ascii")
+            self._trim_disk()
+        except OSError as e:
+            logger.debug("[IMAGE_CACHE] spill_failed error=%s", str(e)[:100])
+
+    def _trim_disk(self) -> None:
+        files = []
+        for path in self.cache_dir.glob("*.dataurl"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.disk_max_bytes:
+                break
+            total -= size
+            path.unlink(missing_ok=True)
+
+    def _read_disk(self, content_hash: str) -> Optional[str]:
+        """Read a spilled entry (blocking; run in a thread)."""
+        path = self._disk_path(content_hash)
+        try:
+            return path.read_text(encoding="ascii") if path is not None else None
+        except OSError:
+            return None
+
+    async def _put(self, content_hash: str, data_url: str) -> None:
+        if content_hash in self._entries:
+            self._entries.move_to_end(content_hash)
+            return
+        self._entries[content_hash] = data_url
+        self._current_bytes += len(data_url)
+        evicted = []
+        while self._current_bytes > self.max_bytes and len(self._entries) > 1:
+            evicted_hash, evicted_url = self._entries.popitem(last=False)
+            self._current_bytes -= len(evicted_url)
+            evicted.append((evicted_hash, evicted_url))
+        if evicted and self.cache_dir:
+            await asyncio.to_thread(self._spill_many, evicted)
+
+    async def _get(self, content_hash: str) -> Optional[str]:
+        data_url = self._entries.get(content_hash)
+        if data_url is not None:
+            self._entries.move_to_end(content_hash)
+            return data_url
+        if not self.cache_dir:
+            return None
+        data_url = await asyncio.to_thread(self._read_disk, content_hash)
+        if data_url is not None:
+            await self._put(content_hash, data_url)
+        return data_url
+
+    def _index_url(self, url: str, content_hash: str) -> None:
+        if self.url_index_max_entries <= 0 or self.url_index_ttl_seconds <= 0:
+            return
+        self._url_index[url] = (content_hash, time.monotonic() + self.url_index_ttl_seconds)
+        self._url_index.move_to_end(url)
+        while len(self._url_index) > self.url_index_max_entries:
+            self._url_index.popitem(last=False)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def clear(self) -> None:
+        """Drop all in-memory entries (spilled files are left in place)."""
+        self._entries.clear()
+        self._url_index.clear()
+        self._current_bytes = 0
+
+    # ---------- fetching ----------
+
+    async def _fetch(self, client: httpx.AsyncClient, url: str) -> Optional[str]:
+        async with self._get_semaphore():
+            response = await client.get(url, timeout=10.0)
+            response.raise_for_status()
+            image_data = response.content
+
+        content_hash = hashlib.sha256(image_data).hexdigest()
+        self._index_url(url, content_hash)
+
+        cached = await self._get(content_hash)
+        if cached is not None:
+            return cached
+
+        normalised, content_type = await asyncio.to_thread(normalise_image, image_data, self.max_dimension)
+        data_url = f"data:{content_type};base64,{base64.b64encode(normalised).decode('utf-8')}"
+        await self._put(content_hash, data_url)
+        logger.debug(
+            "[IMAGE_CACHE] inlined bytes_in=%d bytes_out=%d type=%s",
+            len(image_data), len(normalised), content_type
+        )
+        return data_url
+
+    async def _fetch_single_flight(self, client: httpx.AsyncClient, url: str) -> Optional[str]:
+        key = url
+        pending = self._inflight.get(key)
+        if pending is not None and pending.get_loop() is asyncio.get_running_loop():
+            return await asyncio.shield(pending)
+
+        future: "asyncio.Future[Optional[str]]" = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        result = None
+        try:
+            result = await self._fetch(client, url)
+        except Exception as e:
+            logger.warning("[IMAGE_CACHE] Failed to inline HTTP image: %s", str(e)[:100])
+        finally:
+            self._inflight.pop(key, None)
+            if not future.done():
+                future.set_result(result)
+        return result
+
+    async def lookup(self, url: str) -> Optional[str]:
+        """Return the cached data URL for a recently fetched URL without downloading."""
+        entry = self._url_index.get(url)
+        if entry is None:
+            return None
+        content_hash, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._url_index[url]
+            return None
+        self._url_index.move_to_end(url)
+        return await self._get(content_hash)
+
+    async def inline_many(self, urls: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Convert HTTP image URLs to data URLs concurrently.
+
+        Args:
+            urls: Image URLs (duplicates are fetched once)
+
+        Returns:
+            Dict mapping each URL to its data URL, or None if it could not be fetched
+        """
+        results: Dict[str, Optional[str]] = {}
+        to_fetch = []
+        for url in dict.fromkeys(urls):
+            cached = await self.lookup(url)
+            if cached is not None:
+                results[url] = cached
+            else:
+                to_fetch.append(url)
+
+        if to_fetch:
+            async with httpx.AsyncClient() as client:
+                fetched = await asyncio.gather(
+                    *(self._fetch_single_flight(client, url) for url in to_fetch)
+                )
+            results.update(zip(to_fetch, fetched))
+
+        return results
+
+
+_inline_image_cache = InlineImageCache()
+
+
+def get_inline_image_cache() -> InlineImageCache:
+    """Return the process-wide inline image cache."""
+    return _inline_image_cache
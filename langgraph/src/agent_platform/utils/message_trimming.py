@@ -0,0 +1,340 @@
+"""
+Incremental message trimming for LangGraph agents.
+
+The trimming pre-model hook runs before every model call. Recounting the whole
+history each turn makes its cost grow with thread length, so this module:
+
+1. Caches per-message token counts, keyed by message id and a cheap content
+   signature, so each turn only counts messages it has not seen before
+2. Counts with tiktoken (o200k_base/cl100k_base) when available, falling back
+   to langchain's count_tokens_approximately. These are OpenAI tokenizers, so
+   for other models (e.g. Claude through OpenRouter) counts are approximate,
+   just closer than the character heuristic. The encoding is loaded once per
+   process in a background thread: tiktoken downloads its BPE file on first
+   use (cached in TIKTOKEN_CACHE_DIR), which must not block the event loop or
+   stall air-gapped workers; approximate counts are used until it is ready
+3. Selects the kept window with a single backwards pass over cached counts,
+   mirroring trim_messages(strategy="last") semantics
+4. Optionally replaces the dropped span with a short extractive summary so the
+   model keeps a trace of earlier requests instead of losing them entirely
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+logger = logging.getLogger(__name__)
+
+# Rough per-image cost for vision models (a ~1.1 megapixel image on Claude/GPT-4o)
+IMAGE_TOKEN_ESTIMATE = 1600
+# Special tokens per message, matching count_tokens_approximately
+EXTRA_TOKENS_PER_MESSAGE = 3
+TOKEN_CACHE_MAX_ENTRIES = 50000
+SUMMARY_SNIPPET_CHARS = 200
+
+MessageTypes = Union[str, type, Sequence[Union[str, type]]]
+
+
+def _load_tiktoken_encoding():
+    """Return a tiktoken encoding if the package and its BPE files are available.
+
+    Blocking: tiktoken reads the BPE file from TIKTOKEN_CACHE_DIR and downloads
+    it on a cache miss. Only called from the background loader.
+    """
+    try:
+        import tiktoken  # type: ignore
+    except ImportError:
+        return None
+    for name in ("o200k_base", "cl100k_base"):
+        try:
+            return tiktoken.get_encoding(name)
+        except Exception:
+            continue
+    return None
+
+
+_tiktoken_encoding = None
+_tiktoken_load_started = False
+_tiktoken_lock = threading.Lock()
+
+
+def _load_tiktoken_in_background() -> None:
+    global _tiktoken_encoding
+    encoding = _load_tiktoken_encoding()
+    if encoding is None:
+        logger.warning(
+            "[TRIMMING] tiktoken encoding unavailable (TIKTOKEN_CACHE_DIR=%s), using approximate token counts",
+            os.environ.get("TIKTOKEN_CACHE_DIR", "<default>"),
+        )
+    _tiktoken_encoding = encoding
+
+
+def start_tiktoken_load() -> None:
+    """Load the tiktoken encoding in a background thread, once per process.
+
+    Safe to call at startup to warm the tokenizer; counters call it on creation.
+    """
+    global _tiktoken_load_started
+    with _tiktoken_lock:
+        if _tiktoken_load_started:
+            return
+        _tiktoken_load_started = True
+    threading.Thread(target=_load_tiktoken_in_background, name="tiktoken-loader", daemon=True).start()
+
+
+def _content_signature(message: BaseMessage) -> Tuple:
+    """Signature that changes whenever a message with the same id is edited.
+
+    A hash of the content and tool calls: hashing is linear but far cheaper
+    than tokenising, and unlike a length it catches same-length edits.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    content = message.content
+    if isinstance(content, str):
+        digest.update(content.encode("utf-8", "surrogatepass"))
+    else:
+        digest.update(json.dumps(content, sort_keys=True, default=str).encode("utf-8", "surrogatepass"))
+    if isinstance(message, AIMessage) and message.tool_calls:
+        digest.update(b"\0")
+        digest.update(json.dumps(message.tool_calls, sort_keys=True, default=str).encode("utf-8", "surrogatepass"))
+    return (message.type, digest.hexdigest())
+
+
+class MessageTokenCounter:
+    """
+    Per-message token counter with an id-keyed LRU cache.
+
+    Instances are callable with a list of messages, so they can also be passed
+    as token_counter to langchain's trim_messages.
+    """
+
+    def __init__(self, tokenizer: str = "auto", max_entries: int = TOKEN_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Tuple, int]" = OrderedDict()
+        self._use_tiktoken = tokenizer in ("auto", "tiktoken")
+        self._cached_with = None
+        if self._use_tiktoken:
+            start_tiktoken_load()
+
+    @property
+    def _encoding(self):
+        # None while the background load is running (or if it failed)
+        return _tiktoken_encoding if self._use_tiktoken else None
+
+    @property
+    def tokenizer(self) -> str:
+        return "tiktoken" if self._encoding is not None else "approximate"
+
+    def _count_uncached(self, message: BaseMessage) -> int:
+        encoding = self._encoding
+        if encoding is None:
+            return count_tokens_approximately([message])
+
+        def encode_len(text: str) -> int:
+            return len(encoding.encode(text, disallowed_special=()))
+
+        tokens = EXTRA_TOKENS_PER_MESSAGE
+        content = message.content
+        if isinstance(content, str):
+            tokens += encode_len(content)
+        else:
+            for block in content:
+                if isinstance(block, str):
+                    tokens += encode_len(block)
+                elif isinstance(block, dict) and block.get("type") == "text":
+                    tokens += encode_len(block.get("text", ""))
+                elif isinstance(block, dict) and block.get("type") in ("image", "image_url"):
+                    tokens += IMAGE_TOKEN_ESTIMATE
+                else:
+                    tokens += encode_len(json.dumps(block, default=str))
+
+        if isinstance(message, AIMessage) and message.tool_calls and not isinstance(content, list):
+            tokens += encode_len(json.dumps(message.tool_calls, default=str))
+        if isinstance(message, ToolMessage):
+            tokens += encode_len(message.tool_call_id)
+        if message.name:
+            tokens += encode_len(message.name)
+        return tokens
+
+    def count(self, message: BaseMessage) -> int:
+        """Token count for a single message, served from cache when possible."""
+        if not message.id:
+            return self._count_uncached(message)
+
+        if self._cached_with != self.tokenizer:
+            # The tokenizer finished loading; approximate counts are replaced as messages recur
+            self._cache.clear()
+            self._cached_with = self.tokenizer
+
+        key = (message.id, _content_signature(message))
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        tokens = self._count_uncached(message)
+        self._cache[key] = tokens
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return tokens
+
+    def __call__(self, messages: Sequence[BaseMessage]) -> int:
+        return sum(self.count(message) for message in messages)
+
+
+def _is_message_type(message: BaseMessage, types: MessageTypes) -> bool:
+    if isinstance(types, (str, type)):
+        types = [types]
+    names = {t for t in types if isinstance(t, str)}
+    classes = tuple(t for t in types if isinstance(t, type))
+    return message.type in names or (bool(classes) and isinstance(message, classes))
+
+
+def build_dropped_span_summary(
+    dropped: Sequence[BaseMessage],
+    max_tokens: int,
+    token_counter: Callable[[Sequence[BaseMessage]], int],
+) -> Optional[HumanMessage]:
+    """
+    Build an extractive summary of trimmed messages.
+
+    Lists the user's earlier requests (most recent first, truncated) until the
+    summary would exceed max_tokens. No model call is made, so this is safe to
+    run inside synchronous pre-model hooks.
+
+    Returns:
+        HumanMessage with the summary, or None if nothing useful was dropped
+    """
+    requests = []
+    for message in reversed(dropped):
+        if not isinstance(message, HumanMessage):
+            continue
+        text = message.content if isinstance(message.content, str) else " ".join(
+            block.get("text", "") for block in message.content
+            if isinstance(block, dict) and block.get("type") == "text"
+        )
+        text = " ".join(text.split())
+        if text:
+            requests.append(text[:SUMMARY_SNIPPET_CHARS] + ("…" if len(text) > SUMMARY_SNIPPET_CHARS else ""))
+
+    if not requests:
+        return None
+
+    header = (
+        f"[{len(dropped)} earlier messages were trimmed to fit the context window. "
+        "Earlier user requests, most recent first:]"
+    )
+    lines: List[str] = []
+    summary = None
+    for request in requests:
+        candidate = HumanMessage(
+            content="\n".join([header, *lines, f"- {request}"]),
+            id=f"trim-summary-{dropped[-1].id}",
+        )
+        if token_counter([candidate]) > max_tokens:
+            break
+        lines.append(f"- {request}")
+        summary = candidate
+    return summary
+
+
+def trim_messages_incremental(
+    messages: Sequence[BaseMessage],
+    *,
+    max_tokens: int,
+    token_counter: MessageTokenCounter,
+    start_on: Optional[MessageTypes] = None,
+    end_on: Optional[MessageTypes] = None,
+    include_system: bool = False,
+    summarize_dropped: bool = False,
+    summary_max_tokens: int = 1000,
+) -> List[BaseMessage]:
+    """
+    Keep the most recent messages that fit in max_tokens.
+
+    Behaves like trim_messages(strategy="last") but reads per-message counts
+    from token_counter's cache and selects the window in one backwards pass.
+
+    Args:
+        messages: Messages to trim
+        max_tokens: Token budget for the returned messages
+        token_counter: Cached counter used for every message
+        start_on: Message type(s) the kept window must start with
+        end_on: Message type(s) the history must end with; later messages are dropped
+        include_system: Always keep a leading SystemMessage
+        summarize_dropped: Insert an extractive summary of trimmed messages
+        summary_max_tokens: Budget reserved for the summary when trimming occurs
+
+    Returns:
+        Trimmed list of messages
+    """
+    history = list(messages)
+    if not history:
+        return []
+
+    # Filter out messages after end_on type
+    if end_on:
+        while history and not _is_message_type(history[-1], end_on):
+            history.pop()
+
+    system_message = None
+    if include_system and history and isinstance(history[0], SystemMessage):
+        system_message = history[0]
+        history = history[1:]
+
+    budget = max_tokens
+    if system_message is not None:
+        budget = max(0, budget - token_counter.count(system_message))
+
+    def select(limit: int) -> int:
+        """Return the index of the first kept message."""
+        total = 0
+        start = len(history)
+        while start > 0:
+            tokens = token_counter.count(history[start - 1])
+            if total + tokens > limit:
+                break
+            total += tokens
+            start -= 1
+        if start_on:
+            while start < len(history) and not _is_message_type(history[start], start_on):
+                start += 1
+        return start
+
+    start = select(budget)
+    summary = None
+    if summarize_dropped and start > 0:
+        start = select(max(0, budget - summary_max_tokens))
+        summary = build_dropped_span_summary(history[:start], summary_max_tokens, token_counter)
+
+    result = history[start:]
+    if summary is not None:
+        result = [summary, *result]
+    if system_message is not None:
+        result = [system_message, *result]
+
+    if start > 0:
+        logger.debug(
+            "[TRIMMING] dropped=%d kept=%d summarized=%s tokenizer=%s",
+            start, len(history) - start, summary is not None, token_counter.tokenizer
+        )
+    return result
+
+
+_counters: dict = {}
+
+
+def get_token_counter(tokenizer: str = "auto") -> MessageTokenCounter:
+    """Return the shared, cache-backed counter for a tokenizer setting."""
+    counter = _counters.get(tokenizer)
+    if counter is None:
+        counter = MessageTokenCounter(tokenizer=tokenizer)
+        _counters[tokenizer] = counter
+    return counter
@@ -6,14 +6,20 @@ This module provides utilities for:
 2. Converting storage paths to signed URLs in image content blocks
 3. Local dev fallback: Converting HTTP URLs to base64 data URLs for Claude API
 4. Converting collection_read_image tool results to multimodal content blocks
+5. Incremental, per-thread memoisation of the image preprocessing step
 """
 
 import re
 import json
-from typing import List, Dict, Any, Optional
+import time
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
 from langchain_core.messages import BaseMessage, AIMessage, ToolMessage, HumanMessage
 from langchain_core.messages.utils import filter_messages
 from agent_platform.sentry import get_logger
+from agent_platform.utils.image_cache import get_inline_image_cache
 import httpx
 
 logger = get_logger(__name__)
@@ -309,75 +315,76 @@ async def convert_collection_read_image_to_multimodal(messages: List[BaseMessage
     if not messages:
         return messages
 
-    processed_messages = []
-    for message in messages:
+    # Pass 1: Parse collection_read_image results and collect their image URLs
+    parsed: Dict[int, Tuple[str, str, str]] = {}  # index -> (name, description, url)
+    for i, message in enumerate(messages):
         # Only process ToolMessages from collection_read_image
-        if not isinstance(message, ToolMessage):
-            processed_messages.append(message)
+        if not isinstance(message, ToolMessage) or message.name != "collection_read_image":
             continue
 
-        # Check if this is from collection_read_image tool
-        if message.name != "collection_read_image":
-            processed_messages.append(message)
+        # Content should be a JSON string
+        if not isinstance(message.content, str):
             continue
 
-        # Try to parse the JSON content
         try:
-            # Content should be a JSON string
-            if not isinstance(message.content, str):
-                processed_messages.append(message)
-                continue
-
             data = json.loads(message.content)
 
             # Extract description and signed URL
             description = data.get("description", "")
             signed_url = data.get("metadata", {}).get("signed_url")
             name = data.get("metadata", {}).get("name", "Image")
+        except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
+            continue
 
-            if not signed_url:
-                logger.debug("[COLLECTION_READ_IMAGE] No signed_url found in tool result")
-                processed_messages.append(message)
-                continue
-
-            # Fix localhost URL issue (kong:8000 -> localhost:8000)
-            if "kong:8000" in signed_url:
-                signed_url = signed_url.replace("kong:8000", "localhost:8000")
+        if not signed_url:
+            logger.debug("[COLLECTION_READ_IMAGE] No signed_url found in tool result")
+            continue
 
-            # Convert HTTP URLs to base64 for local development (Claude requires HTTPS)
-            if signed_url.startswith("http://"):
-                data_url = await convert_http_url_to_base64(signed_url)
-                if data_url:
-                    signed_url = data_url
-                else:
-                    logger.warning("[COLLECTION_READ_IMAGE] Failed to convert HTTP URL to base64")
+        # Fix localhost URL issue (kong:8000 -> localhost:8000)
+        if "kong:8000" in signed_url:
+            signed_url = signed_url.replace("kong:8000", "localhost:8000")
 
-            # Create multimodal content blocks
-            multimodal_content = [
-                {
-                    "type": "text",
-                    "text": f"**{name}**\n\n{description}"
-                },
-                {
-                    "type": "image_url",
-                    "image_url": {"url": signed_url}
-                }
-            ]
+        parsed[i] = (name, description, signed_url)
 
-            # Create new ToolMessage with multimodal content
-            processed_msg = ToolMessage(
-                content=multimodal_content,
-                name=message.name,
-                tool_call_id=message.tool_call_id,
-                id=message.id,
-                additional_kwargs=message.additional_kwargs
-            )
+    if not parsed:
+        return messages
 
-            processed_messages.append(processed_msg)
+    # Convert HTTP URLs to base64 for local development (Claude requires HTTPS),
+    # fetching all images concurrently
+    http_urls = [url for _, _, url in parsed.values() if url.startswith("http://")]
+    data_urls = await get_inline_image_cache().inline_many(http_urls) if http_urls else {}
 
-        except (json.JSONDecodeError, KeyError, TypeError):
-            processed_messages.append(message)
-            continue
+    # Pass 2: Build multimodal ToolMessages
+    processed_messages = list(messages)
+    for i, (name, description, signed_url) in parsed.items():
+        message = messages[i]
+        if signed_url.startswith("http://"):
+            data_url = data_urls.get(signed_url)
+            if data_url:
+                signed_url = data_url
+            else:
+                logger.warning("[COLLECTION_READ_IMAGE] Failed to convert HTTP URL to base64")
+
+        # Create multimodal content blocks
+        multimodal_content = [
+            {
+                "type": "text",
+                "text": f"**{name}**\n\n{description}"
+            },
+            {
+                "type": "image_url",
+                "image_url": {"url": signed_url}
+            }
+        ]
+
+        # Create new ToolMessage with multimodal content
+        processed_messages[i] = ToolMessage(
+            content=multimodal_content,
+            name=message.name,
+            tool_call_id=message.tool_call_id,
+            id=message.id,
+            additional_kwargs=message.additional_kwargs
+        )
 
     return processed_messages
 
@@ -456,36 +463,19 @@ async def convert_http_url_to_base64(url: str) -> Optional[str]:
     use HTTP instead of HTTPS. Claude's API requires HTTPS URLs, so we
     convert local HTTP URLs to base64 data URLs.
 
+    Images are downscaled to IMAGE_INLINE_MAX_DIMENSION and cached by content
+    hash (see agent_platform.utils.image_cache), so repeated turns reuse the
+    encoded result instead of re-downloading it.
+
     Args:
         url: HTTP URL to convert
 
     Returns:
         data URL string (data:image/...;base64,...) or None on error
     """
-    try:
-        import base64
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, timeout=10.0)
-            response.raise_for_status()
-
-            # Get image data
-            image_data = response.content
-
-            # Detect actual format from magic bytes (don't trust HTTP header!)
-            content_type = detect_image_format(image_data)
-
-            # Convert to base64
-            base64_data = base64.b64encode(image_data).decode('utf-8')
-
-            # Create data URL
-            data_url = f"data:{content_type};base64,{base64_data}"
-            logger.debug("[MESSAGE_UTILS] Converted HTTP URL to base64: %d bytes", len(image_data))
-            return data_url
-
-    except Exception as e:
-        logger.warning("[MESSAGE_UTILS] Failed to convert HTTP URL to base64: %s", str(e)[:100])
-        return None
+    # Downloads, downscaling and caching are handled by the shared inline image cache
+    results = await get_inline_image_cache().inline_many([url])
+    return results.get(url)
 
 
 async def batch_generate_signed_urls(
@@ -733,7 +723,9 @@ async def process_messages_with_signed_urls(
     messages: List[BaseMessage],
     access_token: str,
     langconnect_api_url: str,
-    expiry_seconds: int = 1800
+    expiry_seconds: int = 1800,
+    cache: Optional["MessagePreprocessingCache"] = None,
+    cache_key: Optional[str] = None,
 ) -> List[BaseMessage]:
     """
     Process messages to replace storage paths with temporary signed URLs in image blocks.
@@ -772,101 +764,286 @@ async def process_messages_with_signed_urls(
         access_token: Supabase JWT token
         langconnect_api_url: Base URL of LangConnect API
         expiry_seconds: URL expiry time (default 30 minutes)
+        cache: Optional MessagePreprocessingCache; when given with cache_key, only
+            new or changed messages are transformed and signed URLs are reused
+        cache_key: Cache partition, normally the thread id
 
     Returns:
         New list of messages with storage paths replaced by signed URLs (or base64 data URLs) in image blocks
     """
-    # Step 0: Convert collection_read_image tool results to multimodal content first
-    # This also converts HTTP URLs to base64 for local development
-    messages = await convert_collection_read_image_to_multimodal(messages)
+    if cache is None or not cache_key:
+        # One-shot processing: a throwaway cache gives identical results
+        cache = MessagePreprocessingCache(max_threads=1)
+        cache_key = "__uncached__"
+
+    stats = await cache.process(messages, access_token, langconnect_api_url, expiry_seconds, cache_key)
+    return stats.messages
+
+
+def _rebuild_message_with_content(message: BaseMessage, content: Any) -> BaseMessage:
+    """Return a copy of message with new content, preserving all relevant attributes."""
+    if isinstance(message, HumanMessage):
+        return HumanMessage(
+            content=content,
+            id=message.id,
+            name=message.name,
+            additional_kwargs=message.additional_kwargs
+        )
+    if isinstance(message, AIMessage):
+        return AIMessage(
+            content=content,
+            id=message.id,
+            name=message.name,
+            additional_kwargs=message.additional_kwargs,
+            tool_calls=message.tool_calls if hasattr(message, 'tool_calls') else []
+        )
+    if isinstance(message, ToolMessage):
+        return ToolMessage(
+            content=content,
+            id=message.id,
+            name=message.name,
+            tool_call_id=message.tool_call_id,
+            additional_kwargs=message.additional_kwargs
+        )
+    # Fallback for other message types
+    return message.__class__(
+        content=content,
+        **{k: v for k, v in message.dict().items() if k != 'content'}
+    )
 
-    # Step 1: Extract all storage paths from image blocks across all messages
-    all_storage_paths = []
-    for message in messages:
-        paths = extract_storage_paths_from_content(message.content)
-        all_storage_paths.extend(paths)
 
-    if not all_storage_paths:
-        return messages
+# ==================== Incremental Preprocessing Cache ====================
 
-    unique_paths = set(all_storage_paths)
-    logger.debug("[MESSAGE_UTILS] Found %d unique storage paths in image blocks", len(unique_paths))
+# Cached signed URLs are re-signed once they are this close to expiry
+SIGNED_URL_REFRESH_MARGIN_SECONDS = 300
+PREPROCESS_CACHE_MAX_THREADS = 256
+PREPROCESS_CACHE_MAX_MESSAGES_PER_THREAD = 2000
 
-    # Step 2: Batch generate signed URLs
-    url_mapping = await batch_generate_signed_urls(
-        all_storage_paths,
-        access_token,
-        langconnect_api_url,
-        expiry_seconds
-    )
 
-    if not url_mapping:
-        logger.warning("[MESSAGE_UTILS] Failed to generate signed URLs")
-        return messages
+def message_fingerprint(message: BaseMessage) -> Optional[str]:
+    """
+    Build a cache key for a message from its id and a hash of its content.
 
-    # Step 2.5: Convert HTTP URLs to base64 data URLs (local development fallback)
-    # Claude's API requires HTTPS URLs, so we convert local HTTP URLs to base64
-    http_converted = 0
-    http_failed = 0
+    Tool call ids are folded in for AIMessages because the orphan hook can strip
+    malformed tool calls while keeping the message id. Messages without an id
+    (e.g. synthetic cancellation ToolMessages) are not cacheable.
 
-    for storage_path, signed_url in list(url_mapping.items()):
-        if signed_url.startswith("http://"):
-            data_url = await convert_http_url_to_base64(signed_url)
-            if data_url:
-                url_mapping[storage_path] = data_url
-                http_converted += 1
-            else:
-                http_failed += 1
+    Returns:
+        "{id}:{sha256}" or None if the message has no id
+    """
+    if not message.id:
+        return None
 
-    if http_converted > 0 or http_failed > 0:
-        logger.debug(
-            "[MESSAGE_UTILS] HTTP to base64 conversion: %d succeeded, %d failed",
-            http_converted, http_failed
-        )
+    digest = hashlib.sha256(type(message).__name__.encode("utf-8"))
+    content = message.content
+    if isinstance(content, str):
+        digest.update(content.encode("utf-8"))
+    else:
+        digest.update(json.dumps(content, sort_keys=True, default=str).encode("utf-8"))
+    if isinstance(message, AIMessage) and message.tool_calls:
+        digest.update("|".join(tc.get("id") or "" for tc in message.tool_calls).encode("utf-8"))
+    return f"{message.id}:{digest.hexdigest()}"
 
-    # Step 3: Replace storage paths in image blocks only
-    processed_messages = []
-    for message in messages:
-        # Create a new message with replaced content
-        modified_content = replace_storage_paths_in_content(
-            message.content,
-            url_mapping
-        )
 
-        # Preserve all message attributes
-        if isinstance(message, HumanMessage):
-            processed_msg = HumanMessage(
-                content=modified_content,
-                id=message.id,
-                name=message.name,
-                additional_kwargs=message.additional_kwargs
-            )
-        elif isinstance(message, AIMessage):
-            processed_msg = AIMessage(
-                content=modified_content,
-                id=message.id,
-                name=message.name,
-                additional_kwargs=message.additional_kwargs,
-                tool_calls=message.tool_calls if hasattr(message, 'tool_calls') else []
-            )
-        elif isinstance(message, ToolMessage):
-            processed_msg = ToolMessage(
-                content=modified_content,
-                id=message.id,
-                name=message.name,
-                tool_call_id=message.tool_call_id,
-                additional_kwargs=message.additional_kwargs
-            )
+@dataclass
+class _ProcessedMessage:
+    message: BaseMessage
+    expires_at: float  # float("inf") when the message holds no expiring URLs
+
+
+@dataclass
+class _ThreadCache:
+    messages: "OrderedDict[str, _ProcessedMessage]"
+    # storage_path -> (signed or data URL, expires_at)
+    urls: Dict[str, Tuple[str, float]]
+
+
+@dataclass
+class PreprocessingStats:
+    """Outcome and timing of one preprocessing pass."""
+    messages: List[BaseMessage]
+    total: int = 0
+    reused: int = 0
+    processed: int = 0
+    urls_signed: int = 0
+    urls_reused: int = 0
+    elapsed_ms: float = 0.0
+
+
+class MessagePreprocessingCache:
+    """
+    Per-thread memo of image-preprocessed messages.
+
+    Each thread keeps the processed form of every message (keyed by
+    message_fingerprint) and the signed URLs it resolved. On a new turn only
+    messages that are new or changed are converted; cached messages are reused
+    as long as every signed URL they contain is outside the refresh margin.
+
+    Signed URLs are scoped to the thread so one user's authorisation is never
+    reused for another user's request. Threads and messages are evicted LRU.
+    """
+
+    def __init__(
+        self,
+        max_threads: int = PREPROCESS_CACHE_MAX_THREADS,
+        max_messages_per_thread: int = PREPROCESS_CACHE_MAX_MESSAGES_PER_THREAD,
+        refresh_margin_seconds: int = SIGNED_URL_REFRESH_MARGIN_SECONDS,
+    ):
+        self.max_threads = max_threads
+        self.max_messages_per_thread = max_messages_per_thread
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self._threads: "OrderedDict[str, _ThreadCache]" = OrderedDict()
+
+    def clear(self, thread_id: Optional[str] = None) -> None:
+        """Drop cached state for one thread, or for all threads."""
+        if thread_id is None:
+            self._threads.clear()
         else:
-            # Fallback for other message types
-            processed_msg = message.__class__(
-                content=modified_content,
-                **{k: v for k, v in message.dict().items() if k != 'content'}
-            )
+            self._threads.pop(thread_id, None)
+
+    def _thread(self, thread_id: str) -> _ThreadCache:
+        entry = self._threads.get(thread_id)
+        if entry is None:
+            entry = _ThreadCache(messages=OrderedDict(), urls={})
+            self._threads[thread_id] = entry
+            while len(self._threads) > self.max_threads:
+                self._threads.popitem(last=False)
+        else:
+            self._threads.move_to_end(thread_id)
+        return entry
+
+    def _is_fresh(self, expires_at: float, now: float) -> bool:
+        return expires_at - self.refresh_margin_seconds > now
+
+    async def process(
+        self,
+        messages: List[BaseMessage],
+        access_token: str,
+        langconnect_api_url: str,
+        expiry_seconds: int,
+        thread_id: str,
+    ) -> PreprocessingStats:
+        """Preprocess messages, transforming only those not already cached."""
+        started = time.perf_counter()
+        now = time.time()
+        thread = self._thread(thread_id)
+        stats = PreprocessingStats(messages=list(messages), total=len(messages))
+
+        # Step 1: Reuse cached messages, collect the rest
+        pending_indices: List[int] = []
+        fingerprints: List[Optional[str]] = []
+        for i, message in enumerate(messages):
+            fingerprint = message_fingerprint(message)
+            fingerprints.append(fingerprint)
+            cached = thread.messages.get(fingerprint) if fingerprint else None
+            if cached is not None and self._is_fresh(cached.expires_at, now):
+                thread.messages.move_to_end(fingerprint)
+                stats.messages[i] = cached.message
+                stats.reused += 1
+            else:
+                pending_indices.append(i)
 
-        processed_messages.append(processed_msg)
+        if not pending_indices:
+            stats.elapsed_ms = (time.perf_counter() - started) * 1000
+            return stats
 
-    return processed_messages
+        # Step 2: Convert collection_read_image tool results to multimodal content
+        # This also converts HTTP URLs to base64 for local development
+        converted = await convert_collection_read_image_to_multimodal(
+            [messages[i] for i in pending_indices]
+        )
+
+        # Step 3: Extract storage paths from image blocks of pending messages only
+        paths_by_index: Dict[int, List[str]] = {}
+        for i, message in zip(pending_indices, converted):
+            paths = extract_storage_paths_from_content(message.content)
+            if paths:
+                paths_by_index[i] = paths
+
+        unique_paths = {p for paths in paths_by_index.values() for p in paths}
+        url_mapping: Dict[str, str] = {}
+        to_sign: List[str] = []
+        for path in unique_paths:
+            cached_url = thread.urls.get(path)
+            if cached_url is not None and self._is_fresh(cached_url[1], now):
+                url_mapping[path] = cached_url[0]
+                stats.urls_reused += 1
+            else:
+                to_sign.append(path)
+
+        # Step 4: Batch generate signed URLs for paths not already cached
+        if to_sign:
+            logger.debug("[MESSAGE_UTILS] Found %d storage paths needing signed URLs", len(to_sign))
+            signed = await batch_generate_signed_urls(
+                to_sign,
+                access_token,
+                langconnect_api_url,
+                expiry_seconds
+            )
+            if not signed:
+                logger.warning("[MESSAGE_UTILS] Failed to generate signed URLs")
+
+            # Convert HTTP URLs to base64 data URLs (local development fallback)
+            # Claude's API requires HTTPS URLs, so we convert local HTTP URLs to base64
+            http_urls = [u for u in signed.values() if u.startswith("http://")]
+            data_urls = await get_inline_image_cache().inline_many(http_urls) if http_urls else {}
+            http_converted = 0
+            http_failed = 0
+            for storage_path, signed_url in signed.items():
+                expires_at = now + expiry_seconds
+                if signed_url.startswith("http://"):
+                    data_url = data_urls.get(signed_url)
+                    if data_url:
+                        signed_url = data_url
+                        # Data URLs embed the bytes and never expire
+                        expires_at = float("inf")
+                        http_converted += 1
+                    else:
+                        http_failed += 1
+                url_mapping[storage_path] = signed_url
+                thread.urls[storage_path] = (signed_url, expires_at)
+                stats.urls_signed += 1
+
+            if http_converted > 0 or http_failed > 0:
+                logger.debug(
+                    "[MESSAGE_UTILS] HTTP to base64 conversion: %d succeeded, %d failed",
+                    http_converted, http_failed
+                )
+
+        # Step 5: Replace storage paths in image blocks of pending messages only
+        for i, message in zip(pending_indices, converted):
+            paths = paths_by_index.get(i, [])
+            if paths and url_mapping:
+                message = _rebuild_message_with_content(
+                    message,
+                    replace_storage_paths_in_content(message.content, url_mapping)
+                )
+            stats.messages[i] = message
+            stats.processed += 1
+
+            # Only memoise messages whose every image resolved
+            fingerprint = fingerprints[i]
+            if fingerprint and all(p in url_mapping for p in paths):
+                expires_at = min(
+                    (thread.urls[p][1] for p in paths if p in thread.urls),
+                    default=float("inf"),
+                )
+                thread.messages[fingerprint] = _ProcessedMessage(message=message, expires_at=expires_at)
+
+        while len(thread.messages) > self.max_messages_per_thread:
+            thread.messages.popitem(last=False)
+
+        stats.elapsed_ms = (time.perf_counter() - started) * 1000
+        return stats
+
+
+# Shared across graph builds so the cache survives from one turn to the next
+_preprocessing_cache = MessagePreprocessingCache()
+
+
+def get_preprocessing_cache() -> MessagePreprocessingCache:
+    """Return the process-wide message preprocessing cache."""
+    return _preprocessing_cache
 
 
 def create_image_preprocessor(
@@ -893,6 +1070,11 @@ def create_image_preprocessor(
             ...
         )
 
+    Messages are memoised per thread (see MessagePreprocessingCache), so each
+    turn only transforms messages added since the previous model call. The
+    hook's ``last_stats`` attribute holds the PreprocessingStats of its most
+    recent invocation.
+
     Args:
         langconnect_api_url: Base URL of LangConnect API
         expiry_seconds: URL expiry time (default 30 minutes)
@@ -924,13 +1106,31 @@ def create_image_preprocessor(
         if not messages:
             return state
 
+        thread_id = config.get("configurable", {}).get("thread_id")
+
         try:
-            processed_messages = await process_messages_with_signed_urls(
-                messages,
-                access_token,
-                langconnect_api_url,
-                expiry_seconds
-            )
+            if thread_id:
+                stats = await _preprocessing_cache.process(
+                    messages,
+                    access_token,
+                    langconnect_api_url,
+                    expiry_seconds,
+                    str(thread_id),
+                )
+                image_preprocessor_hook.last_stats = stats
+                logger.debug(
+                    "[IMAGE_HOOK] messages=%d reused=%d processed=%d urls_signed=%d urls_reused=%d elapsed_ms=%.1f",
+                    stats.total, stats.reused, stats.processed,
+                    stats.urls_signed, stats.urls_reused, stats.elapsed_ms
+                )
+                processed_messages = stats.messages
+            else:
+                processed_messages = await process_messages_with_signed_urls(
+                    messages,
+                    access_token,
+                    langconnect_api_url,
+                    expiry_seconds
+                )
 
             # Return modified state with processed messages in the same key we read from
             return {**state, messages_key: processed_messages}
@@ -939,4 +1139,5 @@ def create_image_preprocessor(
             logger.warning("[IMAGE_HOOK] Error processing messages: %s", str(e)[:100])
             return state
 
+    image_preprocessor_hook.last_stats = None
     return image_preprocessor_hook
@@ -26,10 +26,11 @@ from enum import Enum
 from pydantic import BaseModel, Field
 from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import BaseMessage
-from langchain_core.messages.utils import trim_messages, count_tokens_approximately
+from langchain_core.messages.utils import trim_messages
 from langchain_openai import ChatOpenAI
 import httpx
 
+from agent_platform.utils.message_trimming import get_token_counter, trim_messages_incremental
 from agent_platform.utils.sse_cost_capture import (
     get_current_run_id,
     add_captured_cost,
@@ -621,6 +622,15 @@ class MessageTrimmingConfig(BaseModel):
     include_system: bool = Field(default=True)
     """Always preserve system messages"""
 
+    tokenizer: str = Field(default="auto")
+    """Token counting: 'auto'/'tiktoken' use tiktoken once loaded (OpenAI tokenizers, approximate for other models), or 'approximate'"""
+
+    summarize_dropped: bool = Field(default=False)
+    """Replace trimmed messages with a short extractive summary of earlier user requests"""
+
+    summary_max_tokens: int = Field(default=1000, ge=100)
+    """Token budget reserved for the dropped-span summary"""
+
 
 class ModelConfig(BaseModel):
     """
@@ -767,6 +777,8 @@ def trim_message_history(
 
     This function helps manage long conversations by intelligently trimming
     message history while preserving important context like system messages.
+    Without a model, token counts are cached per message (see message_trimming),
+    so repeated calls over a growing history only count the new messages.
 
     Args:
         messages: List of messages to trim
@@ -779,28 +791,43 @@ def trim_message_history(
     if not config.enabled:
         return messages
 
-    # Use approximate token counting (fast and accurate enough)
-    token_counter = count_tokens_approximately
-
     # If model is provided and supports token counting, use it
     if model is not None:
-        try:
-            token_counter = model
-        except Exception:
-            token_counter = count_tokens_approximately
+        return trim_messages(
+            messages,
+            strategy=config.strategy,
+            token_counter=model,
+            max_tokens=config.max_tokens,
+            start_on=config.start_on,
+            end_on=config.end_on,
+            include_system=config.include_system,
+        )
+
+    # Per-message counts are cached across turns, so only new messages are counted
+    token_counter = get_token_counter(config.tokenizer)
+
+    if config.strategy != "last":
+        return trim_messages(
+            messages,
+            strategy=config.strategy,
+            token_counter=token_counter,
+            max_tokens=config.max_tokens,
+            start_on=config.start_on,
+            end_on=config.end_on,
+            include_system=config.include_system,
+        )
 
-    trimmed = trim_messages(
+    return trim_messages_incremental(
         messages,
-        strategy=config.strategy,
-        token_counter=token_counter,
         max_tokens=config.max_tokens,
+        token_counter=token_counter,
         start_on=config.start_on,
         end_on=config.end_on,
         include_system=config.include_system,
+        summarize_dropped=config.summarize_dropped,
+        summary_max_tokens=config.summary_max_tokens,
     )
 
-    return trimmed
-
 
 def create_trimming_hook(config: MessageTrimmingConfig):
     """
@@ -822,7 +849,7 @@ def create_trimming_hook(config: MessageTrimmingConfig):
         trimmed_messages = trim_message_history(
             messages=messages,
             config=config,
-            model=None,  # Use approximate counting in hooks for speed
+            model=None,  # Use cached per-message counting in hooks for speed
         )
         return {"llm_input_messages": trimmed_messages}
 
@@ -11,15 +11,24 @@ usage tracking is enabled in model_utils.py (via usage: { include: true }).
 Key Functions:
 - extract_usage_from_response: Extract usage data from an AIMessage
 - record_usage: Send usage data to LangConnect API
+- enqueue_usage: Buffer usage for batched delivery to LangConnect
+- UsageBuffer: In-process batcher that flushes to /usage/record-batch
 - UsageTrackingCallback: LangChain callback for automatic tracking
 - create_usage_tracking_wrapper: Wrap model calls with usage tracking
 """
 
 import os
+import json
+import time
+import uuid
+import atexit
 import logging
 import asyncio
+import tempfile
+import threading
 import httpx
-from typing import Optional, Dict, Any, List, Union
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Set
 from uuid import UUID
 from langchain_core.messages import AIMessage, BaseMessage
 from langchain_core.callbacks import BaseCallbackHandler
@@ -253,20 +262,9 @@ async def record_usage(
         logger.warning("LANGCONNECT_SERVICE_ACCOUNT_KEY not set, skipping usage recording")
         return False
 
-    payload = {
-        "thread_id": thread_id,
-        "run_id": run_id,
-        "model_name": model_name,
-        "prompt_tokens": usage_data.get("prompt_tokens", 0),
-        "completion_tokens": usage_data.get("completion_tokens", 0),
-        "total_tokens": usage_data.get("total_tokens", 0),
-        "cost": usage_data.get("cost", 0.0),
-    }
-
-    if assistant_id:
-        payload["assistant_id"] = assistant_id
-    if graph_name:
-        payload["graph_name"] = graph_name
+    payload = _build_usage_payload(
+        thread_id, run_id, model_name, usage_data, assistant_id, graph_name
+    )
 
     last_error: Optional[Exception] = None
     backoff = INITIAL_BACKOFF_SECONDS
@@ -332,6 +330,368 @@ async def record_usage(
     return False
 
 
+# Batching configuration for the usage buffer
+USAGE_BATCH_MAX_SIZE = int(os.environ.get("USAGE_BATCH_MAX_SIZE", "50"))
+USAGE_BATCH_FLUSH_SECONDS = float(os.environ.get("USAGE_BATCH_FLUSH_SECONDS", "2.0"))
+USAGE_SPILL_DIR = os.environ.get(
+    "USAGE_SPILL_DIR", os.path.join(tempfile.gettempdir(), "agent_platform_usage")
+)
+# A spill file is dropped after this many failed replays
+USAGE_SPILL_MAX_ATTEMPTS = int(os.environ.get("USAGE_SPILL_MAX_ATTEMPTS", "5"))
+# Oldest spill files are dropped beyond this many
+USAGE_SPILL_MAX_FILES = int(os.environ.get("USAGE_SPILL_MAX_FILES", "500"))
+# Spill files replayed per flush
+USAGE_SPILL_REPLAY_BATCH = int(os.environ.get("USAGE_SPILL_REPLAY_BATCH", "20"))
+# Claimed files older than this belong to a process that died mid-replay
+USAGE_SPILL_CLAIM_TIMEOUT_SECONDS = float(os.environ.get("USAGE_SPILL_CLAIM_TIMEOUT_SECONDS", "600"))
+
+
+def _build_usage_payload(
+    thread_id: str,
+    run_id: str,
+    model_name: str,
+    usage_data: Dict[str, Any],
+    assistant_id: Optional[str] = None,
+    graph_name: Optional[str] = None,
+) -> Dict[str, Any]:
+    payload = {
+        "thread_id": thread_id,
+        "run_id": run_id,
+        "model_name": model_name,
+        "prompt_tokens": usage_data.get("prompt_tokens", 0),
+        "completion_tokens": usage_data.get("completion_tokens", 0),
+        "total_tokens": usage_data.get("total_tokens", 0),
+        "cost": usage_data.get("cost", 0.0),
+    }
+    if assistant_id:
+        payload["assistant_id"] = assistant_id
+    if graph_name:
+        payload["graph_name"] = graph_name
+    return payload
+
+
+class UsageBuffer:
+    """
+    In-process buffer that batches usage records to LangConnect.
+
+    Records are queued synchronously (no network hop on the model call path)
+    and flushed to /usage/record-batch when the batch reaches max_batch_size
+    or flush_interval seconds have passed. Records with the same
+    (run_id, model_name, user_id) are merged while buffered.
+
+    Batches that still fail after retries are spilled to disk as JSON files and
+    replayed on later flushes. Records still pending at interpreter exit are
+    spilled synchronously so nothing is lost across restarts.
+
+    The spill directory may be shared by several worker processes: a process
+    claims a spill file by renaming it before reading, so each file is replayed
+    by exactly one process. Each file is sent as its own batch and dropped after
+    USAGE_SPILL_MAX_ATTEMPTS failed replays (4xx responses included, so a
+    batch is never dropped on the first rejection). Individually invalid
+    records are reported by LangConnect and not retried. The directory is
+    capped at USAGE_SPILL_MAX_FILES files.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = USAGE_BATCH_MAX_SIZE,
+        flush_interval: float = USAGE_BATCH_FLUSH_SECONDS,
+        spill_dir: str = USAGE_SPILL_DIR,
+        max_retries: int = MAX_RETRIES,
+        max_spill_attempts: int = USAGE_SPILL_MAX_ATTEMPTS,
+        max_spill_files: int = USAGE_SPILL_MAX_FILES,
+    ):
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.spill_dir = Path(spill_dir)
+        self.max_retries = max_retries
+        self.max_spill_attempts = max_spill_attempts
+        self.max_spill_files = max_spill_files
+        self._pending: Dict[tuple, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flusher: Optional[asyncio.Task] = None
+        # Size-triggered flushes; referenced so they aren't garbage-collected mid-flight
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def add(self, payload: Dict[str, Any], user_id: str) -> None:
+        """Queue a usage record; never blocks on the network."""
+        record = {**payload, "user_id": user_id}
+        key = (record["run_id"], record["model_name"], user_id)
+        with self._lock:
+            existing = self._pending.get(key)
+            if existing is None:
+                self._pending[key] = record
+            else:
+                for field in ("prompt_tokens", "completion_tokens", "total_tokens", "cost"):
+                    existing[field] = existing.get(field, 0) + record.get(field, 0)
+            size = len(self._pending)
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (sync context): leave it for the next flush or exit spill
+            return
+
+        self._ensure_flusher(loop)
+        if size >= self.max_batch_size:
+            task = loop.create_task(self.flush())
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    def _ensure_flusher(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._loop is not loop:
+            # Loop-bound resources cannot be shared across event loops
+            self._loop = loop
+            self._flush_lock = asyncio.Lock()
+            self._client = None
+            self._flusher = None
+        if self._flusher is None or self._flusher.done():
+            self._flusher = loop.create_task(self._flush_periodically())
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"Usage buffer flush failed: {e}")
+            with self._lock:
+                idle = not self._pending
+            if idle:
+                # Stop until the next record arrives
+                return
+
+    def _take_pending(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            records = list(self._pending.values())
+            self._pending.clear()
+        return records
+
+    async def flush(self) -> bool:
+        """Send all buffered (and previously spilled) records. Returns True on success."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            records = self._take_pending()
+            success = True
+            for start in range(0, len(records), 1000):
+                chunk = records[start:start + 1000]
+                if not await self._send(chunk):
+                    await asyncio.to_thread(self._spill, chunk)
+                    success = False
+
+            if not success:
+                # LangConnect is unreachable; leave older spill files for later
+                return False
+
+            # Each spill file is replayed on its own so one bad file can't hold
+            # back new records or other files
+            spilled = await asyncio.to_thread(self._claim_spilled)
+            for path, attempts, spilled_records in spilled:
+                if await self._send(spilled_records):
+                    await asyncio.to_thread(path.unlink, missing_ok=True)
+                    continue
+                success = False
+                if attempts + 1 >= self.max_spill_attempts:
+                    logger.error(
+                        f"Dropping {len(spilled_records)} spilled usage records from "
+                        f"{path.name.rsplit('.claimed-', 1)[0]} "
+                        f"after {attempts + 1} failed replays"
+                    )
+                    await asyncio.to_thread(path.unlink, missing_ok=True)
+                else:
+                    await asyncio.to_thread(self._release_spilled, path, attempts + 1, spilled_records)
+            return success
+
+    async def _send(self, records: List[Dict[str, Any]]) -> bool:
+        langconnect_url = os.environ.get("LANGCONNECT_API_URL", "http://localhost:8080")
+        service_key = os.environ.get("LANGCONNECT_SERVICE_ACCOUNT_KEY")
+
+        if not service_key:
+            logger.warning("LANGCONNECT_SERVICE_ACCOUNT_KEY not set, skipping usage recording")
+            return True
+
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=10.0)
+
+        last_error: Optional[Exception] = None
+        backoff = INITIAL_BACKOFF_SECONDS
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self._client.post(
+                    f"{langconnect_url}/usage/record-batch",
+                    json={"records": records},
+                    headers={
+                        "Authorization": f"Bearer {service_key}",
+                        "Content-Type": "application/json",
+                    },
+                )
+
+                if response.status_code in [200, 201]:
+                    try:
+                        rejected = response.json().get("rejected") or []
+                    except ValueError:
+                        rejected = []
+                    if rejected:
+                        logger.warning(
+                            f"LangConnect rejected {len(rejected)} of {len(records)} usage records: "
+                            f"{rejected[:5]}"
+                        )
+                    logger.debug(f"Recorded usage batch of {len(records)} records")
+                    return True
+
+                # Don't retry on client errors (4xx) except 429 (rate limit)
+                if 400 <= response.status_code < 500 and response.status_code != 429:
+                    # Retrying right away would fail the same way; the chunk is spilled
+                    # instead (invalid records are rejected individually with a 200, so
+                    # a 4xx here is e.g. an auth or deployment problem that may be fixed)
+                    logger.warning(
+                        f"Failed to record usage batch (client error): {response.status_code} - "
+                        f"{response.text}, spilling to disk"
+                    )
+                    return False
+
+                last_error = Exception(f"HTTP {response.status_code}: {response.text}")
+
+            except Exception as e:
+                last_error = e
+                logger.debug(f"Error recording usage batch (attempt {attempt + 1}/{self.max_retries + 1}): {e}")
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+
+        logger.warning(
+            f"Failed to record usage batch of {len(records)} records after {self.max_retries + 1} attempts, "
+            f"spilling to disk. Last error: {last_error}"
+        )
+        return False
+
+    # Spill files are "usage-<ms>-<rand>.json" and contain
+    # {"attempts": <failed replays>, "records": [...]}. While a process replays
+    # one it is renamed to "<name>.claimed-<pid>". The methods below do blocking
+    # disk I/O; flush() runs them in a worker thread.
+
+    def _write_spill_file(self, path: Path, attempts: int, records: List[Dict[str, Any]]) -> None:
+        tmp = path.with_name(f".{path.name}.tmp-{os.getpid()}")
+        tmp.write_text(json.dumps({"attempts": attempts, "records": records}))
+        # Atomic, so other processes never read a half-written file
+        os.replace(tmp, path)
+
+    def _spill(self, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        try:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            path = self.spill_dir / f"usage-{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}.json"
+            self._write_spill_file(path, 0, records)
+            self._trim_spill_dir()
+        except OSError as e:
+            logger.error(f"Failed to spill {len(records)} usage records to disk: {e}")
+
+    def _trim_spill_dir(self) -> None:
+        files = sorted(self.spill_dir.glob("usage-*.json"))
+        excess = len(files) - self.max_spill_files
+        for path in files[:max(excess, 0)]:
+            logger.error(f"Usage spill directory is full, dropping oldest spill file {path.name}")
+            path.unlink(missing_ok=True)
+
+    def _release_spilled(self, claimed: Path, attempts: int, records: List[Dict[str, Any]]) -> None:
+        """Return a claimed file to the spill directory with its attempt count bumped."""
+        path = claimed.with_name(claimed.name.rsplit(".claimed-", 1)[0])
+        try:
+            self._write_spill_file(path, attempts, records)
+            claimed.unlink(missing_ok=True)
+        except OSError as e:
+            logger.error(f"Failed to re-spill usage file {path.name}: {e}")
+
+    def _reclaim_stale(self) -> None:
+        cutoff = time.time() - USAGE_SPILL_CLAIM_TIMEOUT_SECONDS
+        for claimed in self.spill_dir.glob("usage-*.json.claimed-*"):
+            try:
+                if claimed.stat().st_mtime < cutoff:
+                    os.rename(claimed, claimed.with_name(claimed.name.rsplit(".claimed-", 1)[0]))
+            except OSError:
+                # Reclaimed by another process
+                continue
+
+    def _claim_spilled(self) -> List[tuple]:
+        """Claim up to USAGE_SPILL_REPLAY_BATCH spill files for this process.
+
+        Returns:
+            (claimed path, failed attempts, records) per claimed file
+        """
+        if not self.spill_dir.exists():
+            return []
+        self._reclaim_stale()
+        spilled = []
+        for path in sorted(self.spill_dir.glob("usage-*.json")):
+            if len(spilled) >= USAGE_SPILL_REPLAY_BATCH:
+                break
+            claimed = path.with_name(f"{path.name}.claimed-{os.getpid()}")
+            try:
+                # rename is atomic: exactly one process wins each file
+                os.rename(path, claimed)
+                os.utime(claimed)
+            except OSError:
+                continue
+            try:
+                data = json.loads(claimed.read_text())
+            except (OSError, ValueError) as e:
+                logger.warning(f"Dropping unreadable usage spill file {path.name}: {e}")
+                claimed.unlink(missing_ok=True)
+                continue
+            if isinstance(data, list):
+                # Files written before attempts were tracked
+                data = {"attempts": 0, "records": data}
+            spilled.append((claimed, data.get("attempts", 0), data.get("records", [])))
+        return spilled
+
+    def spill_pending(self) -> None:
+        """Synchronously write buffered records to disk (used at interpreter exit)."""
+        self._spill(self._take_pending())
+
+
+_usage_buffer = UsageBuffer()
+atexit.register(_usage_buffer.spill_pending)
+
+
+def get_usage_buffer() -> UsageBuffer:
+    """Return the process-wide usage buffer."""
+    return _usage_buffer
+
+
+def enqueue_usage(
+    thread_id: str,
+    run_id: str,
+    model_name: str,
+    usage_data: Dict[str, Any],
+    user_id: str,
+    assistant_id: Optional[str] = None,
+    graph_name: Optional[str] = None,
+) -> None:
+    """
+    Buffer usage data for batched delivery to LangConnect.
+
+    Takes the same arguments as record_usage but returns immediately; the
+    shared UsageBuffer sends records to /usage/record-batch in the background.
+    Prefer this on per-model-call paths.
+    """
+    payload = _build_usage_payload(
+        thread_id, run_id, model_name, usage_data, assistant_id, graph_name
+    )
+    _usage_buffer.add(payload, user_id)
+
+
+async def flush_usage_buffer() -> bool:
+    """Flush buffered usage records now (e.g. from a host shutdown hook)."""
+    return await _usage_buffer.flush()
+
+
 class UsageAccumulator:
     """
     Accumulates usage data across multiple model calls within a single run.
@@ -426,7 +786,7 @@ class UsageTrackingCallback(BaseCallbackHandler):
                 combined with manual record_usage() calls):
         callback = UsageTrackingCallback(..., auto_record=True)
         model.invoke(messages, config={"callbacks": [callback]})
-        # Usage is recorded automatically after each LLM call
+        # Usage is buffered after each LLM call and sent in batches
 
     WARNING: If auto_record=True, do NOT also call record_usage() manually
     for the same run_id/model_name, as this will result in costs being
@@ -501,38 +861,20 @@ class UsageTrackingCallback(BaseCallbackHandler):
                     model = response.llm_output.get("model") or response.llm_output.get("model_name") or self.model_name
 
                     if self.auto_record:
-                        # Record asynchronously without blocking.
-                        # Use done callback to log any errors from the background task.
-                        task = asyncio.create_task(self._record_usage(model, usage_data))
-                        task.add_done_callback(self._handle_record_task_result)
+                        # Buffered: batched to LangConnect in the background
+                        enqueue_usage(
+                            thread_id=self.thread_id,
+                            run_id=self.run_id,
+                            model_name=model,
+                            usage_data=usage_data,
+                            user_id=self.user_id,
+                            assistant_id=self.assistant_id,
+                            graph_name=self.graph_name,
+                        )
 
         except Exception as e:
             logger.warning(f"Error in usage tracking callback: {e}")
 
-    def _handle_record_task_result(self, task: asyncio.Task) -> None:
-        """Handle completion of background usage recording task."""
-        try:
-            # This will raise if the task failed
-            task.result()
-        except asyncio.CancelledError:
-            logger.debug("Usage recording task was cancelled")
-        except Exception as e:
-            logger.warning(
-                f"Background usage recording failed for run {self.run_id}: {e}"
-            )
-
-    async def _record_usage(self, model_name: str, usage_data: Dict[str, Any]) -> None:
-        """Record usage data asynchronously."""
-        await record_usage(
-            thread_id=self.thread_id,
-            run_id=self.run_id,
-            model_name=model_name,
-            usage_data=usage_data,
-            user_id=self.user_id,
-            assistant_id=self.assistant_id,
-            graph_name=self.graph_name,
-        )
-
     def get_accumulated_usage(self) -> Dict[str, Any]:
         """Get total accumulated usage across all LLM calls."""
         return self.accumulator.get_total()
@@ -690,6 +1032,10 @@ __all__ = [
     "extract_generation_id",
     "extract_usage_from_response",
     "record_usage",
+    "enqueue_usage",
+    "flush_usage_buffer",
+    "UsageBuffer",
+    "get_usage_buffer",
     "UsageAccumulator",
     "get_model_from_response",
     "UsageTrackingCallback",